@@ -0,0 +1,251 @@
+import bisect
+import logging
+import os
+import struct
+import zlib
+from typing import Tuple, Union
+
+from dnas.bogon_asn import bogon_asn
+from dnas.config import config as cfg
+from dnas.unallocated_asn import unallocated_asn
+
+
+class asn_classifier:
+    """
+    Class to classify ASNs as bogon and / or unallocated, using one index of
+    the ASN ranges which is built once per process.
+
+    The index is three sorted arrays: the first ASN, last ASN and flags of
+    each non-overlapping ASN range. It's loaded from the precompiled file
+    written by update_asn_allocations.py, or compiled from bogon_asn and
+    the unallocated ASNs file if that is missing or out of date.
+    """
+
+    # Flags for each ASN range
+    BOGON = 1
+    UNALLOCATED = 2
+
+    # Precompiled file format
+    MAGIC = b"DNASASN1"
+    HEADER = struct.Struct("<8sII")
+
+    first: list[int] = []
+    last: list[int] = []
+    flags: list[int] = []
+    """
+    The flags of each ASN which has been classified, the same ASNs are seen
+    again and again when parsing MRT files.
+    """
+    memo: dict[Union[int, str], int] = {}
+
+    @staticmethod
+    def bogon_crc() -> int:
+        """
+        Return a checksum of the bogon ASN ranges, so that a precompiled file
+        with different bogon ASN ranges isn't used.
+        """
+        return zlib.crc32(repr(bogon_asn.BOGON_RANGES).encode())
+
+    @staticmethod
+    def classify(asn: Union[int, str]) -> int:
+        """
+        Return the flags of an ASN (as an int or str), 0 when it's neither a
+        bogon nor unallocated.
+        """
+        flags = asn_classifier.memo.get(asn)
+        if flags is not None:
+            return flags
+
+        if type(asn) == str:
+            asn_int = int(asn)
+        elif type(asn) == int:
+            asn_int = asn
+        else:
+            raise TypeError(f"{asn} is not an int or str: {type(asn)}")
+
+        if not asn_classifier.first:
+            asn_classifier.load()
+
+        i = bisect.bisect_right(asn_classifier.first, asn_int) - 1
+        if i >= 0 and asn_int <= asn_classifier.last[i]:
+            flags = asn_classifier.flags[i]
+        else:
+            flags = 0
+
+        asn_classifier.memo[asn] = flags
+        return flags
+
+    @staticmethod
+    def classify_path(as_path: Union[list[str], tuple[str, ...]]) -> list[int]:
+        """
+        Return the flags of each ASN in an AS path.
+        """
+        if type(as_path) != list and type(as_path) != tuple:
+            raise TypeError(f"as_path is not a list or tuple: {type(as_path)}")
+
+        return [asn_classifier.classify(asn) for asn in as_path]
+
+    @staticmethod
+    def compile(
+        filename: str = "",
+    ) -> Tuple[list[int], list[int], list[int]]:
+        """
+        Compile the bogon ASN ranges and the unallocated ASN ranges from
+        filename, or cfg.unallocated_asns_file if filename isn't specified.
+        Return the first ASN, last ASN and flags of each ASN range.
+        """
+        if not filename:
+            filename = cfg.unallocated_asns_file
+
+        ranges = [
+            (first, last, asn_classifier.BOGON)
+            for first, last in bogon_asn.BOGON_RANGES
+        ] + [
+            (first, last, asn_classifier.UNALLOCATED)
+            for first, last in unallocated_asn.load_ranges(filename)
+        ]
+
+        """
+        Split the ASN ranges at every point where a range starts or ends, so
+        that overlapping ranges have the flags of both.
+        """
+        points = sorted(
+            set(
+                [first for first, _, _ in ranges]
+                + [last + 1 for _, last, _ in ranges]
+            )
+        )
+
+        first_asns: list[int] = []
+        last_asns: list[int] = []
+        range_flags: list[int] = []
+        for start, end in zip(points, points[1:]):
+            flags = 0
+            for first, last, flag in ranges:
+                if first <= start and end - 1 <= last:
+                    flags |= flag
+            if not flags:
+                continue
+            if (
+                last_asns
+                and last_asns[-1] == start - 1
+                and range_flags[-1] == flags
+            ):
+                last_asns[-1] = end - 1
+            else:
+                first_asns.append(start)
+                last_asns.append(end - 1)
+                range_flags.append(flags)
+
+        return first_asns, last_asns, range_flags
+
+    @staticmethod
+    def from_file(filename: str) -> bool:
+        """
+        Load the ASN ranges from the precompiled file filename. Return False
+        if it doesn't exist, is invalid, or is older than the unallocated ASNs
+        file.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}"
+            )
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            return False
+
+        if os.path.isfile(cfg.unallocated_asns_file) and os.path.getmtime(
+            cfg.unallocated_asns_file
+        ) > os.path.getmtime(filename):
+            return False
+
+        with open(filename, "rb") as f:
+            data = f.read()
+
+        if len(data) < asn_classifier.HEADER.size:
+            return False
+
+        magic, crc, count = asn_classifier.HEADER.unpack_from(data, 0)
+        if magic != asn_classifier.MAGIC or crc != asn_classifier.bogon_crc():
+            return False
+
+        if len(data) != asn_classifier.HEADER.size + (count * 9):
+            return False
+
+        p = asn_classifier.HEADER.size
+        asn_classifier.first = list(struct.unpack_from(f"<{count}I", data, p))
+        p += count * 4
+        asn_classifier.last = list(struct.unpack_from(f"<{count}I", data, p))
+        p += count * 4
+        asn_classifier.flags = list(struct.unpack_from(f"<{count}B", data, p))
+        asn_classifier.memo = {}
+        return True
+
+    @staticmethod
+    def is_bogon(asn: Union[int, str]) -> bool:
+        """
+        Return True if ASN is a bogon ASN, else False.
+        """
+        return bool(asn_classifier.classify(asn) & asn_classifier.BOGON)
+
+    @staticmethod
+    def is_unallocated(asn: Union[int, str]) -> bool:
+        """
+        Return True if ASN is unallocated, else False.
+        """
+        return bool(asn_classifier.classify(asn) & asn_classifier.UNALLOCATED)
+
+    @staticmethod
+    def load(force: bool = False) -> None:
+        """
+        Load the ASN ranges, if they aren't already loaded or force is True.
+        """
+        if asn_classifier.first and not force:
+            return
+
+        if asn_classifier.from_file(cfg.asn_classifier_file):
+            logging.debug(
+                f"Loaded {len(asn_classifier.first)} ASN ranges from "
+                f"{cfg.asn_classifier_file}"
+            )
+            return
+
+        (
+            asn_classifier.first,
+            asn_classifier.last,
+            asn_classifier.flags,
+        ) = asn_classifier.compile()
+        asn_classifier.memo = {}
+        logging.debug(f"Compiled {len(asn_classifier.first)} ASN ranges")
+
+    @staticmethod
+    def to_file(filename: str) -> None:
+        """
+        Compile the ASN ranges and write them to the precompiled file
+        filename.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}"
+            )
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        first, last, flags = asn_classifier.compile()
+        count = len(first)
+        # Replace the file in one step, it could be loaded at the same time
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(
+                asn_classifier.HEADER.pack(
+                    asn_classifier.MAGIC, asn_classifier.bogon_crc(), count
+                )
+            )
+            f.write(struct.pack(f"<{count}I", *first))
+            f.write(struct.pack(f"<{count}I", *last))
+            f.write(struct.pack(f"<{count}B", *flags))
+        os.replace(tmp_filename, filename)
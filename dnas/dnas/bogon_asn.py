@@ -1,34 +1,35 @@
+from typing import Tuple
+
+
 class bogon_asn:
     """
     Class to check if an ASN is a bogon ASN (meaning reserved by an RFC,
     the IETF, or IANA).
     """
 
+    # The first and last ASN of each bogon ASN range, compiled into the
+    # asn_classifier index
+    BOGON_RANGES: list[Tuple[int, int]] = [
+        (0, 0),  # RFC 7607
+        (23456, 23456),  # RFC 4893
+        (64496, 64511),  # RFC 5398
+        (64512, 65534),  # RFC 6996
+        (65535, 65535),  # RFC 6996
+        (65536, 65551),  # RFC 5398
+        (65552, 131071),  # IANA reserved
+        (4200000000, 4294967294),  # RFC 6996
+        (4294967295, 4294967295),  # RFC 6996
+    ]
+
     @staticmethod
     def is_bogon(asn: int) -> bool:
         """
         Return True if ASN is a bogon ASN, else False.
         """
+        # asn_classifier imports this module to compile BOGON_RANGES
+        from dnas.asn_classifier import asn_classifier
+
         if type(asn) != int:
             raise TypeError(f"{asn} is not an int: {type(asn)}")
 
-        if asn == 0:  # RFC 7607
-            return True
-        elif asn == 23456:  # RFC 4893
-            return True
-        elif asn in range(64496, 64512):  # RFC 5398
-            return True
-        elif asn in range(65536, 65552):  # RFC 5398
-            return True
-        elif asn in range(64512, 65535):  # RFC 6996
-            return True
-        elif asn in range(4200000000, 4294967296):  # RFC 6996
-            return True
-        elif asn == 65535:  # RFC 6996
-            return True
-        elif asn == 4294967295:  # RFC 6996
-            return True
-        elif asn in range(65552, 131072):  # IANA reserved
-            return True
-        else:
-            return False
+        return asn_classifier.is_bogon(asn)
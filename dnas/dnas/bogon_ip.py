@@ -1,6 +1,9 @@
+import bisect
 import ipaddress
+from typing import Union
 
 from dnas.config import config as cfg
+from dnas.ip_prefix import ip_prefix
 
 
 class bogon_ip:
@@ -27,6 +30,107 @@ class bogon_ip:
             )
         BOGON_V6_NETS.append(bog_net)
 
+    """
+    The first and last address of each bogon range, as sorted int arrays, so
+    that the bogon range which could contain a prefix is found with a binary
+    search. Bogon ranges inside another bogon range are dropped, which means
+    the ranges don't overlap.
+    """
+    BOGON_V4_FIRST: list[int] = []
+    BOGON_V4_LAST: list[int] = []
+    for bog_net in sorted(BOGON_V4_NETS):
+        if (
+            BOGON_V4_LAST
+            and int(bog_net.broadcast_address) <= BOGON_V4_LAST[-1]
+        ):
+            continue
+        BOGON_V4_FIRST.append(int(bog_net.network_address))
+        BOGON_V4_LAST.append(int(bog_net.broadcast_address))
+
+    BOGON_V6_FIRST: list[int] = []
+    BOGON_V6_LAST: list[int] = []
+    for bog_net in sorted(BOGON_V6_NETS):
+        if (
+            BOGON_V6_LAST
+            and int(bog_net.broadcast_address) <= BOGON_V6_LAST[-1]
+        ):
+            continue
+        BOGON_V6_FIRST.append(int(bog_net.network_address))
+        BOGON_V6_LAST.append(int(bog_net.broadcast_address))
+
+    @staticmethod
+    def get_bogons(prefixes: list[int]) -> list[int]:
+        """
+        Return the packed IPv4 and IPv6 prefixes in prefixes which are in a
+        bogon range, in the same order.
+        """
+        if type(prefixes) != list:
+            raise TypeError(f"prefixes is not a list: {type(prefixes)}")
+
+        bogons = []
+        for prefix in prefixes:
+            if bogon_ip.is_bogon(prefix):
+                bogons.append(prefix)
+        return bogons
+
+    @staticmethod
+    def in_range(first: int, last: int, v6: bool) -> bool:
+        """
+        Return True if the IPv4 or IPv6 addresses from first to last are all
+        in the same bogon range, else False.
+        """
+        if v6:
+            i = bisect.bisect_right(bogon_ip.BOGON_V6_FIRST, first) - 1
+            return i >= 0 and last <= bogon_ip.BOGON_V6_LAST[i]
+        else:
+            i = bisect.bisect_right(bogon_ip.BOGON_V4_FIRST, first) - 1
+            return i >= 0 and last <= bogon_ip.BOGON_V4_LAST[i]
+
+    @staticmethod
+    def is_bogon(prefix: int) -> bool:
+        """
+        Return True if a packed IPv4 or IPv6 prefix is in a bogon range, else
+        False. See ip_prefix for the packed prefix format.
+        """
+        if type(prefix) != int:
+            raise TypeError(f"prefix is not an int: {type(prefix)}")
+
+        first = ip_prefix.addr(prefix)
+        if ip_prefix.is_v6(prefix):
+            last = first | ((1 << (128 - ip_prefix.length(prefix))) - 1)
+            return bogon_ip.in_range(first, last, True)
+        else:
+            last = first | ((1 << (32 - ip_prefix.length(prefix))) - 1)
+            return bogon_ip.in_range(first, last, False)
+
+    @staticmethod
+    def is_bogon_addr(addr: Union[bytes, int], length: int, v6: bool) -> bool:
+        """
+        Return True if the prefix with network address addr, as 4 or 16
+        bytes or an int, and prefix length length, is in a bogon range, else
+        False.
+        """
+        max_len = 128 if v6 else 32
+
+        if type(addr) == bytes:
+            if len(addr) * 8 != max_len:
+                raise ValueError(
+                    f"addr is {len(addr)} bytes, not {max_len // 8} bytes"
+                )
+            addr = int.from_bytes(addr, "big")
+        elif type(addr) != int:
+            raise TypeError(f"addr is not bytes or an int: {type(addr)}")
+
+        if type(length) != int:
+            raise TypeError(f"length is not an int: {type(length)}")
+
+        if length < 0 or length > max_len:
+            raise ValueError(f"Invalid prefix length {length}")
+
+        return bogon_ip.in_range(
+            addr, addr | ((1 << (max_len - length)) - 1), v6
+        )
+
     @staticmethod
     def is_v4_bogon(subnet: str) -> bool:
         """
@@ -45,10 +149,9 @@ class bogon_ip:
                 f"{subnet} is not a valid IPv4 subnet: {type(ip_net)}"
             )
 
-        for bogon_v4_net in bogon_ip.BOGON_V4_NETS:
-            if ip_net.subnet_of(bogon_v4_net):
-                return True
-        return False
+        return bogon_ip.in_range(
+            int(ip_net.network_address), int(ip_net.broadcast_address), False
+        )
 
     @staticmethod
     def is_v6_bogon(subnet: str) -> bool:
@@ -68,7 +171,6 @@ class bogon_ip:
                 f"{subnet} is not a valid IPv6 subnet: {type(ip_net)}"
             )
 
-        for bogon_v6_net in bogon_ip.BOGON_V6_NETS:
-            if ip_net.subnet_of(bogon_v6_net):
-                return True
-        return False
+        return bogon_ip.in_range(
+            int(ip_net.network_address), int(ip_net.broadcast_address), True
+        )
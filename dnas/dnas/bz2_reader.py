@@ -0,0 +1,374 @@
+import bisect
+import bz2
+import errno
+import logging
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Deque, Iterator, Optional, Tuple, Union
+
+from dnas.config import config as cfg
+
+
+class bz2_reader:
+    """
+    Read a bz2 file, decompressing the bz2 blocks in parallel across a pool
+    of processes, and return the decompressed data in order.
+
+    A bz2 stream is a header, followed by one or more blocks of up to 900KBs
+    of (uncompressed) data, followed by an end of stream marker and a CRC of
+    the block CRCs. Each block starts with a 48 bit magic number which isn't
+    byte aligned, and can be decompressed independently by copying it into a
+    new bz2 stream which only contains that block.
+
+    The blocks are decompressed by the pool of processes pool, or by a new
+    pool of procs processes which is stopped when the reader is closed. The
+    compressed file is read incrementally, and only a few blocks are
+    decompressed ahead of the reader.
+    """
+
+    # bz2 stream header, the largest block size is used for every block
+    STREAM_HDR = b"BZh9"
+
+    # 48 bit magic numbers at the start of each block and end of each stream
+    BLOCK_MAGIC = 0x314159265359
+    EOS_MAGIC = 0x177245385090
+
+    # Number of blocks decompressed ahead of the reader, per process
+    BLOCKS_PER_PROC = 2
+
+    # Number of compressed bytes to read from the bz2 file at a time
+    READ_SIZE = 1048576
+
+    def __init__(
+        self: "bz2_reader",
+        filename: str,
+        procs: int = 0,
+        pool: Optional[Pool] = None,
+    ) -> None:
+        if not filename:
+            raise ValueError("bz2 filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if type(procs) != int or procs < 0:
+            raise ValueError(
+                f"Number of processes must be a positive integer, not {procs}"
+            )
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        self.buf = b""
+        self.closed = False
+        self.filename = filename
+        self.pos = 0
+        self.procs = procs if procs else multiprocessing.cpu_count()
+        # The EOFError to raise once all the decompressed data has been read
+        self.eof_error: Optional[EOFError] = None
+
+        """
+        The compressed data is read incrementally. data holds the compressed
+        bytes from byte offset data_start in the file, from the start of the
+        oldest block which is still needed to the last byte read:
+        """
+        self.data = b""
+        self.data_start = 0
+        self.eof = False
+        self.f = open(filename, "rb")
+        # The bit offset of every block magic number and end of stream marker
+        self.markers: list[int] = []
+        self.block_starts: set[int] = set()
+        # Bit offset up to which the markers have been found
+        self.scanned = 0
+
+        self.read_data()
+        if not self.data.startswith(bz2_reader.STREAM_HDR[:3]):
+            self.f.close()
+            raise OSError(f"{filename} is not a bz2 file")
+
+        self.own_pool = pool is None
+        self.pool = pool if pool else multiprocessing.Pool(self.procs)
+        self.blocks = self.decompress_blocks()
+        logging.debug(
+            f"Decompressing bz2 blocks from {filename} using "
+            f"{self.procs} processes"
+        )
+
+    def close(self: "bz2_reader") -> None:
+        """
+        Close the bz2 file and stop the decompression processes, unless the
+        pool was passed in by the caller.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.own_pool:
+            self.pool.terminate()
+            self.pool.join()
+        self.f.close()
+        self.buf = b""
+        self.data = b""
+
+    def __enter__(self: "bz2_reader") -> "bz2_reader":
+        return self
+
+    def __exit__(self: "bz2_reader", *args: object) -> None:
+        self.close()
+
+    @staticmethod
+    def decompress_block(data: bytes, start: int, end: int) -> Optional[bytes]:
+        """
+        Decompress the bz2 block from bit offset start to end in data, by
+        copying it into a new bz2 stream. Return None if it isn't a valid bz2
+        block.
+        """
+        nbits = end - start
+        # Block magic (48 bits) and block CRC (32 bits)
+        if nbits < 80:
+            return None
+
+        block = int.from_bytes(data[start // 8 : (end + 7) // 8], "big")
+        block >>= -end % 8
+        block &= (1 << nbits) - 1
+        block_crc = (block >> (nbits - 80)) & 0xFFFFFFFF
+
+        """
+        The stream CRC of a stream with one block is that block's CRC. The
+        stream is padded to a whole number of bytes:
+        """
+        block = (block << 80) | (bz2_reader.EOS_MAGIC << 32) | block_crc
+        nbits += 80
+        pad = -nbits % 8
+        stream = bz2_reader.STREAM_HDR + (block << pad).to_bytes(
+            (nbits + pad) // 8, "big"
+        )
+
+        try:
+            return bz2.decompress(stream)
+        except (EOFError, OSError, ValueError):
+            return None
+
+    def decompress_blocks(self: "bz2_reader") -> Iterator[bytes]:
+        """
+        Yield the decompressed bz2 blocks in order. A limited number of blocks
+        are decompressed ahead of the reader, so that neither the whole
+        compressed or decompressed file is held in memory.
+        """
+        pending: Deque[Tuple[int, int, AsyncResult]] = deque()
+        # Index in self.markers of the next block to decompress
+        i = 0
+        # Bit offset of the end of the last block returned
+        done = 0
+
+        while True:
+            while len(pending) < self.procs * bz2_reader.BLOCKS_PER_PROC:
+                while (
+                    self.marker(i) is not None
+                    and self.markers[i] not in self.block_starts
+                ):
+                    i += 1
+                if i >= len(self.markers):
+                    break
+                start = self.markers[i]
+                if self.marker(i + 1) is None:
+                    # The last block must be followed by an end of stream
+                    self.eof_error = EOFError(
+                        "Compressed file ended before the end-of-stream "
+                        "marker was reached"
+                    )
+                    i += 1
+                    break
+                end = self.markers[i + 1]
+                # Only send the bytes of this block to the pool process
+                first = start // 8
+                pending.append(
+                    (
+                        start,
+                        end,
+                        self.pool.apply_async(
+                            bz2_reader.decompress_block,
+                            (
+                                self.data[
+                                    first
+                                    - self.data_start : (end + 7) // 8
+                                    - self.data_start
+                                ],
+                                start - (first * 8),
+                                end - (first * 8),
+                            ),
+                        ),
+                    )
+                )
+                i += 1
+
+            if not pending:
+                return
+
+            start, end, result = pending.popleft()
+            # This block magic was a false match inside the previous block
+            if start < done:
+                continue
+
+            block = result.get()
+            """
+            A block or end of stream magic number can occur by chance inside
+            a block. Then the block fails to decompress and is extended to
+            the next magic number:
+            """
+            while block is None:
+                j = bisect.bisect_right(self.markers, end)
+                if self.marker(j) is None:
+                    raise OSError(f"Invalid data stream in {self.filename}")
+                end = self.markers[j]
+                block = bz2_reader.decompress_block(
+                    self.data,
+                    start - (self.data_start * 8),
+                    end - (self.data_start * 8),
+                )
+
+            done = end
+            """
+            The compressed bytes before the next block which is needed are
+            dropped:
+            """
+            keep = pending[0][0] if pending else end
+            if i < len(self.markers):
+                keep = min(keep, self.markers[i])
+            self.drop_data(keep // 8)
+            yield block
+
+    def drop_data(self: "bz2_reader", offset: int) -> None:
+        """
+        Drop the compressed bytes before byte offset offset in the file, once
+        there are at least READ_SIZE of them.
+        """
+        if offset - self.data_start >= bz2_reader.READ_SIZE:
+            self.data = self.data[offset - self.data_start :]
+            self.data_start = offset
+
+    @staticmethod
+    def find_magic(data: bytes, magic: int) -> list[int]:
+        """
+        Return the bit offset of every occurrence of the 48 bit magic number
+        in data.
+        """
+        offsets = []
+        for shift in range(0, 8):
+            """
+            Search for the bytes which the magic number covers completely at
+            this bit shift, then check the bits either side of them:
+            """
+            pattern = (magic << (8 - shift)).to_bytes(7, "big")
+            first = 0 if shift == 0 else 1
+            search = pattern[first:6]
+            p = data.find(search)
+            while p != -1:
+                byte_offset = p - first
+                window = data[byte_offset : byte_offset + 7]
+                if byte_offset >= 0 and len(window) * 8 >= shift + 48:
+                    value = int.from_bytes(window.ljust(7, b"\x00"), "big")
+                    if (value >> (8 - shift)) & 0xFFFFFFFFFFFF == magic:
+                        offsets.append(byte_offset * 8 + shift)
+                p = data.find(search, p + 1)
+        return sorted(offsets)
+
+    @staticmethod
+    def open_file(
+        filename: str, procs: int = 0, pool: Optional[Pool] = None
+    ) -> Union["bz2_reader", bz2.BZ2File]:
+        """
+        Open the bz2 file filename, using a bz2_reader which decompresses the
+        blocks across the pool of processes pool when one is passed and the
+        file is large enough for it to be faster, else a single process
+        BZ2File. procs is the number of processes in pool, and defaults to
+        cfg.BZ2_PROCS.
+        """
+        if not procs:
+            procs = (
+                cfg.BZ2_PROCS if cfg.BZ2_PROCS else multiprocessing.cpu_count()
+            )
+
+        """
+        A pool is never started here, so that each file doesn't start a new
+        pool, and a file which is opened without one (such as with
+        --no-multi, or inside a pool process) is decompressed in this
+        process:
+        """
+        if (
+            pool
+            and procs > 1
+            and os.path.getsize(filename) >= cfg.BZ2_PARALLEL_MIN_SIZE
+        ):
+            return bz2_reader(filename, procs, pool)
+
+        return bz2.BZ2File(filename, "rb")
+
+    def marker(self: "bz2_reader", i: int) -> Optional[int]:
+        """
+        Return the bit offset of the i'th magic number in the bz2 file,
+        reading more of the file until it's found, or None if there are
+        fewer magic numbers.
+        """
+        while i >= len(self.markers) and not self.eof:
+            self.read_data()
+        return self.markers[i] if i < len(self.markers) else None
+
+    def read(self: "bz2_reader", size: int = -1) -> bytes:
+        """
+        Return up to size bytes of decompressed data, or all of the remaining
+        decompressed data if size is negative. Return b"" at the end of the
+        file.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        while size < 0 or len(self.buf) - self.pos < size:
+            block = next(self.blocks, None)
+            if block is None:
+                break
+            self.buf = self.buf[self.pos :] + block
+            self.pos = 0
+
+        if self.pos == len(self.buf) and self.eof_error and size != 0:
+            raise self.eof_error
+
+        if size < 0:
+            size = len(self.buf) - self.pos
+        data = self.buf[self.pos : self.pos + size]
+        self.pos += len(data)
+        return data
+
+    def read_data(self: "bz2_reader") -> None:
+        """
+        Read the next READ_SIZE compressed bytes from the bz2 file, and find
+        the magic numbers in them.
+        """
+        data = self.f.read(bz2_reader.READ_SIZE)
+        if not data:
+            self.eof = True
+        self.data += data
+        data_end = self.data_start + len(self.data)
+
+        """
+        A magic number is up to 7 bytes long, so the last 6 bytes are
+        searched again with the next bytes read, and only the magic numbers
+        which start before them are added now, unless the whole file has
+        been read:
+        """
+        first = max(self.scanned // 8, self.data_start)
+        limit = data_end * 8 if self.eof else (data_end - 6) * 8
+        window = self.data[first - self.data_start :]
+        for magic in (bz2_reader.BLOCK_MAGIC, bz2_reader.EOS_MAGIC):
+            for offset in bz2_reader.find_magic(window, magic):
+                offset += first * 8
+                if self.scanned <= offset < limit:
+                    self.markers.append(offset)
+                    if magic == bz2_reader.BLOCK_MAGIC:
+                        self.block_starts.add(offset)
+        self.markers.sort()
+        self.scanned = max(self.scanned, limit)
@@ -73,17 +73,33 @@ class config:
     asn_stats_file = os.path.join(ASN_DATA, "iana-32bit-asns.csv")
     # Allocated ASNs list
     unallocated_asns_file = os.path.join(ASN_DATA, "unallocated-asns.txt")
+    # Precompiled bogon and unallocated ASN ranges, see asn_classifier
+    asn_classifier_file = os.path.join(ASN_DATA, "asn-classifier.bin")
 
     ###################
     # PARSER SETTINGS #
     ###################
 
     """
-    Max MRT file size to parse using multiple Python processes, files larger
-    than this value (in bytes) will be parsed without using multiprocessing
-    (a single Python process / on a single core).
+    Max number of bytes of MRT files which are held in shared memory, waiting
+    to be parsed, when SPLIT_SHM is True (the default). This is the total of
+    every MRT file being prepared and parsed at the same time, see
+    PARSE_AHEAD, and MRT files of any size are streamed into the parser
+    processes in chunks without exceeding it. The shared memory of the parser
+    container must be larger than this, see shm_size in docker-compose.yml:
     """
-    MAX_MRT_SIZE = 60000000
+    MAX_MRT_MEMORY = 256000000
+
+    """
+    Number of processes used to decompress a bz2 MRT file in parallel, 0 to
+    use all CPU cores, 1 to decompress in a single process. parse_mrts.py
+    starts this pool once, separately from the parser processes, so only
+    when multiprocessing is enabled. Files smaller than BZ2_PARALLEL_MIN_SIZE
+    (in bytes) are always decompressed in a single process, where that's
+    faster:
+    """
+    BZ2_PROCS = 0
+    BZ2_PARALLEL_MIN_SIZE = 1000000
 
     """
     Min MRT file size to parse. Files less than this size (in bytes) are
@@ -94,6 +110,29 @@ class config:
     # Undefined MED / default when missing
     MISSING_MED = -1
 
+    """
+    The engine used to decode BGP UPDATE MRT files. "native" uses the struct
+    based decoder in mrt_decoder.py which only decodes the BGP attributes
+    needed for stats, "mrtparse" uses the mrtparse library which decodes
+    everything:
+    """
+    MRT_ENGINES = ["mrtparse", "native"]
+    MRT_ENGINE = "native"
+
+    """
+    Number of entries kept for each "most/highest/longest" stat. When 0, only
+    the entries tied for the highest value are kept, otherwise the top N
+    entries are kept:
+    """
+    LEADERBOARD_TOP_K = 0
+
+    """
+    The stats generated when parsing MRT files, e.g. ["most_origin_asns"].
+    All stats are generated when empty. parse_mrts.py only stores the stats
+    in Redis when all stats are generated:
+    """
+    MRT_STATS: list[str] = []
+
     ################
     # GIT SETTINGS #
     ################
@@ -179,6 +218,51 @@ class config:
     # Temporary directory to split MRT files into
     SPLIT_DIR = "/tmp/"  # Set to None to disable MRT splitting
 
+    """
+    How MRT files are split into chunks to parse in parallel, see
+    mrt_splitter.split(). "contiguous" chunks are contiguous ranges of MRT
+    records of roughly equal size, "time" chunks are contiguous ranges of MRT
+    records covering roughly equal time windows, "round_robin" deals the MRT
+    records out to each chunk in turn. parse_mrts.py parses contiguous ranges
+    of the indexed MRT file, by time window if this is "time":
+    """
+    SPLIT_MODES = ["contiguous", "round_robin", "time"]
+    SPLIT_MODE = "contiguous"
+
+    """
+    Target size in bytes of the range of an (uncompressed) MRT file which a
+    parser process parses at a time. parse_mrts.py parses a smaller MRT file
+    whole in one process, and splits a larger one into ranges of about this
+    size. An idle parser process takes the next range from the pool's queue,
+    whichever MRT file it's from:
+    """
+    SPLIT_SIZE = 8000000
+
+    """
+    Number of SPLIT_SIZE ranges per parser process which parse_mrts.py keeps
+    queued, from as many MRT files as it takes, so that the parser processes
+    aren't idle between MRT files:
+    """
+    PARSE_QUEUE = 2
+
+    """
+    If True parse_mrts.py decompresses each MRT file into shared memory
+    segments, which the parser processes read from, instead of into SPLIT_DIR.
+    Each segment is a chunk of the MRT file, which is removed once it's
+    parsed, so an MRT file of any size is parsed within MAX_MRT_MEMORY. If
+    False each MRT file is decompressed whole into SPLIT_DIR, and its index
+    is kept, which uses as much disk space as the largest MRT file:
+    """
+    SPLIT_SHM = True
+
+    """
+    Number of MRT files parse_mrts.py decompresses and indexes ahead of the
+    MRT files being parsed, see PARSE_QUEUE. Each one is held decompressed,
+    on disk or in shared memory (within MAX_MRT_MEMORY for all of them),
+    until it's parsed:
+    """
+    PARSE_AHEAD = 1
+
     # Default interval for downloading and parsing new MRT files (seconds)
     DFT_INTERVAL = 3600
 
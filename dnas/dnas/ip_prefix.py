@@ -0,0 +1,101 @@
+import ipaddress
+import socket
+
+
+class ip_prefix:
+    """
+    Class to pack an IP prefix into a single int, which is smaller and faster
+    to hash and compare than the prefix string. The prefix length is stored
+    in the low 8 bits, the network address above it, and IPv6 prefixes have
+    the V6 bit set so that e.g. "0.0.0.0/0" and "::/0" aren't equal.
+
+    Packed prefixes are used while parsing an MRT file, they are only
+    converted back to a string when an MRT entry is created.
+    """
+
+    V6 = 1 << 136
+
+    @staticmethod
+    def addr(prefix: int) -> int:
+        """
+        Return the network address of a packed prefix as an int.
+        """
+        return (prefix & ~ip_prefix.V6) >> 8
+
+    @staticmethod
+    def from_str(subnet: str, strict: bool = True) -> int:
+        """
+        Return the packed prefix for a prefix in CIDR notation. If strict is
+        False any host bits which are set are masked, rather than raising a
+        ValueError.
+        """
+        if not subnet:
+            raise ValueError(f"Missing required options: subnet={subnet}")
+
+        if type(subnet) != str:
+            raise TypeError(f"subnet is not a string: {type(subnet)}")
+
+        ip_net = ipaddress.ip_network(subnet, strict)
+        return ip_prefix.pack(
+            int(ip_net.network_address), ip_net.prefixlen, ip_net.version
+        )
+
+    @staticmethod
+    def intern(prefix: int, prefixes: dict[int, int]) -> int:
+        """
+        Return the packed prefix stored in prefixes which is equal to prefix,
+        storing prefix if there isn't one. This means each prefix seen in an
+        MRT file is one int object, no matter how many times it is seen.
+        """
+        return prefixes.setdefault(prefix, prefix)
+
+    @staticmethod
+    def is_v6(prefix: int) -> bool:
+        """
+        Return True if the packed prefix is an IPv6 prefix, else False.
+        """
+        return prefix >= ip_prefix.V6
+
+    @staticmethod
+    def length(prefix: int) -> int:
+        """
+        Return the prefix length of a packed prefix.
+        """
+        return prefix & 0xFF
+
+    @staticmethod
+    def pack(addr: int, length: int, version: int) -> int:
+        """
+        Return the packed prefix for the network address addr, of IP version
+        4 or 6, with prefix length length.
+        """
+        if version == 4:
+            return (addr << 8) | length
+        elif version == 6:
+            return ip_prefix.V6 | (addr << 8) | length
+        else:
+            raise ValueError(f"Invalid IP version {version}")
+
+    @staticmethod
+    def to_str(prefix: int) -> str:
+        """
+        Return a packed prefix in CIDR notation.
+        """
+        if type(prefix) != int:
+            raise TypeError(f"prefix is not an int: {type(prefix)}")
+
+        addr = ip_prefix.addr(prefix)
+        if ip_prefix.is_v6(prefix):
+            return (
+                socket.inet_ntop(socket.AF_INET6, addr.to_bytes(16, "big"))
+                + "/"
+                + str(prefix & 0xFF)
+            )
+        else:
+            return "%d.%d.%d.%d/%d" % (
+                addr >> 24,
+                (addr >> 16) & 0xFF,
+                (addr >> 8) & 0xFF,
+                addr & 0xFF,
+                prefix & 0xFF,
+            )
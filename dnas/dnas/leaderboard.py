@@ -0,0 +1,299 @@
+import heapq
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+
+class leaderboard:
+    """
+    A leaderboard keeps the entries with the highest value of a metric, such
+    as the prefixes with the most updates or the longest AS paths. Entries are
+    unique by key and are returned in the order they were first offered.
+
+    By default only the entries tied for the highest value are kept, and a
+    new higher value replaces them all. If top_k is set, the top_k entries
+    with the highest values are kept instead.
+    """
+
+    def __init__(
+        self: "leaderboard",
+        metric: Callable[[Any], int],
+        key: Callable[[Any], Hashable],
+        entries: Optional[Iterable[Any]] = None,
+        top_k: int = 0,
+        zero_ties: bool = True,
+    ) -> None:
+        if not callable(metric):
+            raise TypeError(f"metric is not callable: {type(metric)}")
+
+        if not callable(key):
+            raise TypeError(f"key is not callable: {type(key)}")
+
+        if type(top_k) != int:
+            raise TypeError(f"top_k is not an int: {type(top_k)}")
+
+        if top_k < 0:
+            raise ValueError(f"top_k must be 0 or greater, not {top_k}")
+
+        self.metric = metric
+        self.key = key
+        self.top_k = top_k
+        """
+        When zero_ties is False, entries which tie with a highest value of 0
+        (or less) are not kept, only the first entry offered is.
+        """
+        self.zero_ties = zero_ties
+
+        self._best: int = 0
+        self._entries: dict[Hashable, Any] = {}
+        """
+        In top_k mode the value and offer sequence number of each kept entry
+        are tracked, and a min-heap of (value, -seq, key) orders the entries
+        for eviction. Heap items are deleted lazily: an item is stale once
+        its key was evicted or its entry's value changed.
+        """
+        self._heap: list[tuple[int, int, Hashable]] = []
+        self._seq = 0
+        self._seqs: dict[Hashable, int] = {}
+        self._values: dict[Hashable, int] = {}
+
+        if entries:
+            self.merge(entries)
+
+    def __bool__(self: "leaderboard") -> bool:
+        return bool(self._entries)
+
+    def __contains__(self: "leaderboard", key: Hashable) -> bool:
+        return key in self._entries
+
+    def __iter__(self: "leaderboard") -> Iterator[Any]:
+        return iter(self.to_list())
+
+    def __len__(self: "leaderboard") -> int:
+        return len(self._entries)
+
+    def add(
+        self: "leaderboard",
+        entries: Iterable[Any],
+        combine: Callable[[Any, Any], Optional[Any]],
+    ) -> bool:
+        """
+        Add the values of entries into this leaderboard. Entries with a key
+        already present are combined with the existing entry, and the result
+        is ranked in place of it. combine returns None when there is nothing
+        to add. If no entries overlap, this is the same as merge().
+        Return True if the leaderboard changed.
+        """
+        # entries are read twice if none of them overlap
+        entries = list(entries)
+        combined = []
+        for entry in entries:
+            existing = self._entries.get(self.key(entry))
+            if existing is not None:
+                new_entry = combine(existing, entry)
+                if new_entry is not None:
+                    combined.append(new_entry)
+
+        if not combined:
+            return self.merge(entries)
+
+        changed = False
+        for new_entry in combined:
+            if self.offer(new_entry):
+                changed = True
+        return changed
+
+    def admits(
+        self: "leaderboard", value: int, key: Optional[Hashable] = None
+    ) -> bool:
+        """
+        Return True if an entry with this value, and this key if set, would
+        be kept. This allows callers to skip building entries which would be
+        rejected.
+        """
+        if not self._entries:
+            return True
+
+        if self.top_k:
+            if key is not None and key in self._entries:
+                return value > self._values[key]
+            if len(self._entries) < self.top_k:
+                return True
+            return value > self._floor()
+
+        if value > self._best:
+            return True
+        if value < self._best or (key is not None and key in self._entries):
+            return False
+        return self.zero_ties or value > 0
+
+    def best(self: "leaderboard") -> Optional[int]:
+        """
+        Return the highest value on the leaderboard, or None if it is empty.
+        """
+        if not self._entries:
+            return None
+        if self.top_k:
+            return max(self._values.values())
+        return self._best
+
+    def get(self: "leaderboard", key: Hashable) -> Optional[Any]:
+        """
+        Return the entry with this key, or None if it isn't present.
+        """
+        return self._entries.get(key)
+
+    def is_larger(self: "leaderboard", entries: list[Any]) -> bool:
+        """
+        Return True if the first entry in entries, which is the leader of
+        another leaderboard, has a higher value than this leaderboard.
+        Leaders without a key (i.e. place holder entries) are never larger.
+        """
+        if not entries:
+            return False
+        if not self._entries:
+            return True
+        if not self.key(entries[0]) or not self.key(self.to_list()[0]):
+            return False
+        return self.metric(entries[0]) > self.best()  # type: ignore
+
+    def merge(
+        self: "leaderboard",
+        entries: Iterable[Any],
+        combine: Optional[Callable[[Any, Any], Optional[Any]]] = None,
+    ) -> bool:
+        """
+        Offer each of entries to this leaderboard, keeping the higher values.
+        Return True if the leaderboard changed.
+        """
+        changed = False
+        for entry in entries:
+            if self.offer(entry, combine):
+                changed = True
+        return changed
+
+    def offer(
+        self: "leaderboard",
+        entry: Any,
+        combine: Optional[Callable[[Any, Any], Optional[Any]]] = None,
+    ) -> bool:
+        """
+        Offer an entry to the leaderboard. If an entry with the same key is
+        already present, and combine is set, the two entries are combined
+        in place, else the offered entry is ignored.
+        Return True if the leaderboard changed.
+        """
+        key = self.key(entry)
+        value = self.metric(entry)
+
+        if self.top_k:
+            return self._offer_top_k(key, value, entry, combine)
+
+        if not self._entries or value > self._best:
+            self._best = value
+            self._entries = {key: entry}
+            return True
+
+        if value < self._best:
+            return False
+
+        if key in self._entries:
+            if not combine:
+                return False
+            new_entry = combine(self._entries[key], entry)
+            if new_entry is None:
+                return False
+            if self.metric(new_entry) > self._best:
+                self._best = self.metric(new_entry)
+                self._entries = {key: new_entry}
+            else:
+                self._entries[key] = new_entry
+            return True
+
+        if not self.zero_ties and value <= 0:
+            return False
+
+        self._entries[key] = entry
+        return True
+
+    def _floor(self: "leaderboard") -> int:
+        """
+        Return the lowest value kept in top_k mode, popping any stale heap
+        items from the top of the heap first.
+        """
+        heap = self._heap
+        while True:
+            value, neg_seq, key = heap[0]
+            if self._seqs.get(key) == -neg_seq and self._values[key] == value:
+                return value
+            heapq.heappop(heap)
+
+    def _push_top_k(
+        self: "leaderboard", key: Hashable, value: int, entry: Any
+    ) -> None:
+        """
+        Keep an entry in top_k mode. Entries which are already kept keep
+        their offer sequence number, so ties are still evicted most recently
+        offered first. The heap is rebuilt from the kept entries when stale
+        items outnumber them, to bound its size.
+        """
+        seq = self._seqs.get(key)
+        if seq is None:
+            self._seq += 1
+            seq = self._seqs[key] = self._seq
+        self._entries[key] = entry
+        self._values[key] = value
+        heapq.heappush(self._heap, (value, -seq, key))
+
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [
+                (v, -self._seqs[k], k) for k, v in self._values.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _offer_top_k(
+        self: "leaderboard",
+        key: Hashable,
+        value: int,
+        entry: Any,
+        combine: Optional[Callable[[Any, Any], Optional[Any]]],
+    ) -> bool:
+        """
+        Offer an entry to a top_k leaderboard. Offers lower than every kept
+        entry of a full leaderboard are rejected in O(1), and accepted offers
+        cost O(log top_k) amortised.
+        """
+        if key in self._entries:
+            existing = self._entries[key]
+            if combine:
+                new_entry = combine(existing, entry)
+                if new_entry is None:
+                    return False
+            elif value > self._values[key]:
+                new_entry = entry
+            else:
+                return False
+            self._push_top_k(key, self.metric(new_entry), new_entry)
+            return True
+
+        if len(self._entries) >= self.top_k:
+            if value <= self._floor():
+                return False
+
+            # Evict the most recently offered entry with the lowest value
+            _, _, old_key = heapq.heappop(self._heap)
+            del self._entries[old_key]
+            del self._seqs[old_key]
+            del self._values[old_key]
+
+        self._push_top_k(key, value, entry)
+        return True
+
+    def to_list(self: "leaderboard") -> list[Any]:
+        """
+        Return the entries on the leaderboard. In top_k mode the entries are
+        sorted from highest to lowest value, ties keep their offered order.
+        """
+        if self.top_k:
+            return sorted(
+                self._entries.values(), key=self.metric, reverse=True
+            )
+        return list(self._entries.values())
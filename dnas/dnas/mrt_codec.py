@@ -0,0 +1,378 @@
+import functools
+import itertools
+import struct
+import sys
+from array import array
+from typing import Iterable, Optional, Tuple, Union
+
+from dnas.mrt_entry import mrt_entry
+from dnas.mrt_stats import mrt_stats
+
+
+class mrt_codec:
+    """
+    A compact, versioned, binary format for MRT stats objs, which is much
+    quicker to encode and decode than the JSON format, see
+    mrt_stats.to_json().
+
+    The format is a header, a table of the stat sections, a string table,
+    then an array of 64 bit ints:
+    * Every str is stored once in the string table, as the length of each
+      str then the strs themselves, and is referred to by its index.
+    * Everything else is stored in the int array, including the string
+      indexes, and each list or set is prefixed by its length.
+    * The ASNs in AS paths and origin ASN sets are stored as ints, any
+      which aren't a plain number (such as an AS set) are stored as the
+      negative string index - 1.
+    * Each stat is a named section of the int array, so that a stat can be
+      decoded without decoding the others, and stats which this version
+      doesn't know are skipped.
+    All values are little endian.
+    """
+
+    MAGIC = b"DNASSTAT"
+    VERSION = 1
+
+    """
+    Magic number, version, number of stat sections, number of strs, number
+    of ints in the meta data at the start of the int array, number of ints:
+    """
+    HEADER = struct.Struct("<8sHHIII")
+
+    # The MED of an entry with no MED, from old JSON data
+    NO_MED = -(2**63)
+
+    @staticmethod
+    def decode(
+        data: bytes,
+        stats: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> mrt_stats:
+        """
+        Return a new MRT stats obj from data in the binary format. Only the
+        stats listed in stats are decoded, or all of them if stats is None,
+        the others are left empty. If lazy is True, the MRT entries of each
+        stat are only decoded when it is first accessed.
+        """
+        load_stats = mrt_stats.select_stats(stats)
+        strs, sections, ints, meta_len = mrt_codec.unpack(data)
+
+        mrt_s = mrt_stats()
+        (
+            mrt_s.total_upd,
+            mrt_s.total_advt,
+            mrt_s.total_withd,
+            mrt_s.total_skipped,
+            timestamp,
+            count,
+        ) = ints[0:6]
+        mrt_s.timestamp = strs[timestamp]
+        p = 6 + count
+        mrt_s.archive_list = set(strs[i] for i in ints[6:p])
+        mrt_s.file_list = [strs[i] for i in ints[p + 1 : p + 1 + ints[p]]]
+
+        for stat, (start, end) in sections.items():
+            if stat not in load_stats:
+                continue
+            if lazy:
+                mrt_s.set_lazy(
+                    stat,
+                    functools.partial(
+                        mrt_codec.decode_entries, strs, ints, start
+                    ),
+                )
+            else:
+                setattr(
+                    mrt_s, stat, mrt_codec.decode_entries(strs, ints, start)
+                )
+
+        return mrt_s
+
+    @staticmethod
+    def decode_entries(
+        strs: list[str], ints: array, p: int
+    ) -> list[mrt_entry]:
+        """
+        Return the MRT entries of the stat section which starts at p in ints.
+        """
+        entries = []
+        p += 1
+        for _ in range(ints[p - 1]):
+            (
+                advt,
+                updates,
+                withdraws,
+                med,
+                filename,
+                peer_asn,
+                prefix,
+                timestamp,
+                count,
+            ) = ints[p : p + 9]
+            p += 9
+
+            next_hop: Union[str, list[str]]
+            if count < 0:
+                next_hop = strs[ints[p]]
+                p += 1
+            else:
+                next_hop = [strs[i] for i in ints[p : p + count]]
+                p += count
+
+            count = ints[p]
+            as_path = [
+                str(asn) if asn >= 0 else strs[-1 - asn]
+                for asn in ints[p + 1 : p + 1 + count]
+            ]
+            p += 1 + count
+
+            count = ints[p]
+            comm_set = [strs[i] for i in ints[p + 1 : p + 1 + count]]
+            p += 1 + count
+
+            count = ints[p]
+            origin_asns = set(
+                str(asn) if asn >= 0 else strs[-1 - asn]
+                for asn in ints[p + 1 : p + 1 + count]
+            )
+            p += 1 + count
+
+            count = ints[p]
+            unknown_attrs = set(ints[p + 1 : p + 1 + count])
+            p += 1 + count
+
+            entries.append(
+                mrt_entry(
+                    advt=advt,
+                    as_path=as_path,
+                    comm_set=comm_set,
+                    filename=strs[filename],
+                    med=None if med == mrt_codec.NO_MED else med,  # type: ignore
+                    next_hop=next_hop,
+                    origin_asns=origin_asns,
+                    peer_asn=strs[peer_asn],
+                    prefix=strs[prefix],
+                    timestamp=strs[timestamp],
+                    unknown_attrs=unknown_attrs,
+                    updates=updates,
+                    withdraws=withdraws,
+                )
+            )
+
+        return entries
+
+    @staticmethod
+    def encode(mrt_s: mrt_stats) -> bytes:
+        """
+        Return the MRT stats obj mrt_s in the binary format.
+        """
+        if not mrt_s:
+            raise ValueError(f"Missing required arguments: mrt_s={mrt_s}")
+
+        if type(mrt_s) != mrt_stats:
+            raise TypeError(f"mrt_s is not a stats object: {type(mrt_s)}")
+
+        # The index of each str in the string table
+        strs: dict[str, int] = {}
+        ints = array("q")
+
+        ints.extend(
+            (
+                mrt_s.total_upd,
+                mrt_s.total_advt,
+                mrt_s.total_withd,
+                mrt_s.total_skipped,
+                strs.setdefault(mrt_s.timestamp, len(strs)),
+                len(mrt_s.archive_list),
+            )
+        )
+        ints.extend(strs.setdefault(s, len(strs)) for s in mrt_s.archive_list)
+        ints.append(len(mrt_s.file_list))
+        ints.extend(strs.setdefault(s, len(strs)) for s in mrt_s.file_list)
+        meta_len = len(ints)
+
+        sections = array("I")
+        for stat in mrt_stats.LEADERBOARDS:
+            sections.extend((strs.setdefault(stat, len(strs)), len(ints)))
+            mrt_codec.encode_entries(getattr(mrt_s, stat), strs, ints)
+
+        for s in strs:
+            if type(s) != str:
+                raise TypeError(f"Expected a str, got {type(s)}: {s}")
+        data = [s.encode("utf-8") for s in strs]
+        lengths = array("I", [len(s) for s in data])
+
+        if sys.byteorder != "little":
+            for values in (sections, lengths, ints):
+                values.byteswap()
+
+        return b"".join(
+            [
+                mrt_codec.HEADER.pack(
+                    mrt_codec.MAGIC,
+                    mrt_codec.VERSION,
+                    len(sections) // 2,
+                    len(strs),
+                    meta_len,
+                    len(ints),
+                ),
+                sections.tobytes(),
+                lengths.tobytes(),
+                *data,
+                ints.tobytes(),
+            ]
+        )
+
+    @staticmethod
+    def encode_asn(asn: str, strs: dict[str, int]) -> int:
+        """
+        Return an ASN as an int, or as the negative string index - 1 if it
+        isn't a plain number which is stored as the same str.
+        """
+        if (
+            type(asn) == str
+            and asn.isdigit()
+            and asn.isascii()
+            and len(asn) < 19
+            and (asn[0] != "0" or asn == "0")
+        ):
+            return int(asn)
+        return -1 - strs.setdefault(asn, len(strs))
+
+    @staticmethod
+    def encode_entries(
+        entries: list[mrt_entry], strs: dict[str, int], ints: array
+    ) -> None:
+        """
+        Append the stat section of entries to ints, adding their strs to the
+        string table strs.
+        """
+        ints.append(len(entries))
+        for mrt_e in entries:
+            ints.extend(
+                (
+                    mrt_e.advt,
+                    mrt_e.updates,
+                    mrt_e.withdraws,
+                    mrt_codec.NO_MED if mrt_e.med is None else mrt_e.med,
+                    strs.setdefault(mrt_e.filename, len(strs)),
+                    strs.setdefault(mrt_e.peer_asn, len(strs)),
+                    strs.setdefault(mrt_e.prefix, len(strs)),
+                    strs.setdefault(mrt_e.timestamp, len(strs)),
+                )
+            )
+
+            if type(mrt_e.next_hop) == str:
+                ints.extend((-1, strs.setdefault(mrt_e.next_hop, len(strs))))
+            else:
+                ints.append(len(mrt_e.next_hop))
+                ints.extend(
+                    strs.setdefault(s, len(strs)) for s in mrt_e.next_hop
+                )
+
+            ints.append(len(mrt_e.as_path))
+            ints.extend(
+                mrt_codec.encode_asn(asn, strs) for asn in mrt_e.as_path
+            )
+
+            ints.append(len(mrt_e.comm_set))
+            ints.extend(strs.setdefault(s, len(strs)) for s in mrt_e.comm_set)
+
+            ints.append(len(mrt_e.origin_asns))
+            ints.extend(
+                mrt_codec.encode_asn(asn, strs) for asn in mrt_e.origin_asns
+            )
+
+            ints.append(len(mrt_e.unknown_attrs))
+            ints.extend(mrt_e.unknown_attrs)
+
+    @staticmethod
+    def is_encoded(data: bytes) -> bool:
+        """
+        Return True if data is an MRT stats obj in the binary format, rather
+        than JSON.
+        """
+        return data[: len(mrt_codec.MAGIC)] == mrt_codec.MAGIC
+
+    @staticmethod
+    def unpack(
+        data: bytes,
+    ) -> Tuple[list[str], dict[str, Tuple[int, int]], array, int]:
+        """
+        Return the string table, the start and end in the int array of each
+        stat section by name, the int array, and the number of ints in the
+        meta data, from data in the binary format.
+        """
+        if not data:
+            raise ValueError(f"Missing required arguments: data={data!r}")
+
+        if type(data) != bytes:
+            raise TypeError(f"data is not bytes: {type(data)}")
+
+        if len(data) < mrt_codec.HEADER.size or not mrt_codec.is_encoded(data):
+            raise ValueError("data isn't an MRT stats obj in binary format")
+
+        (
+            _,
+            version,
+            no_sections,
+            no_strs,
+            meta_len,
+            no_ints,
+        ) = mrt_codec.HEADER.unpack_from(data, 0)
+        if version > mrt_codec.VERSION:
+            raise ValueError(
+                f"Unsupported MRT stats binary format version {version}, "
+                f"the latest supported version is {mrt_codec.VERSION}"
+            )
+
+        p = mrt_codec.HEADER.size
+        sections = array("I")
+        sections.frombytes(data[p : p + (no_sections * 2 * 4)])
+        p += no_sections * 2 * 4
+        lengths = array("I")
+        lengths.frombytes(data[p : p + (no_strs * 4)])
+        p += no_strs * 4
+        if sys.byteorder != "little":
+            sections.byteswap()
+            lengths.byteswap()
+
+        """
+        The strs are nearly always ASCII, then they can be sliced from one
+        decoded str, rather than decoding each of them:
+        """
+        offsets = list(itertools.accumulate(lengths, initial=0))
+        blob = data[p : p + offsets[-1]]
+        p += offsets[-1]
+        text = blob.decode("utf-8")
+        if len(text) == len(blob):
+            strs = [
+                sys.intern(text[a:b]) for a, b in zip(offsets, offsets[1:])
+            ]
+        else:
+            strs = [
+                sys.intern(blob[a:b].decode("utf-8"))
+                for a, b in zip(offsets, offsets[1:])
+            ]
+
+        ints = array("q")
+        ints.frombytes(data[p : p + (no_ints * 8)])
+        if len(ints) != no_ints:
+            raise ValueError(
+                f"Truncated MRT stats binary data, expected {no_ints} ints "
+                f"but found {len(ints)}"
+            )
+        if sys.byteorder != "little":
+            ints.byteswap()
+
+        starts = list(sections[1::2])
+        ends = starts[1:] + [no_ints]
+        return (
+            strs,
+            {
+                strs[name]: (start, end)
+                for name, start, end in zip(sections[0::2], starts, ends)
+            },
+            ints,
+            meta_len,
+        )
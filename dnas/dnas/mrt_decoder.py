@@ -0,0 +1,1123 @@
+import bz2
+import errno
+import gzip
+import logging
+import os
+import socket
+import struct
+from collections import deque
+from io import BufferedReader
+from typing import Deque, NamedTuple, NoReturn, Optional, Tuple, Union
+
+import mrtparse  # type: ignore
+from dnas.bogon_attr import bogon_attr
+from dnas.bz2_reader import bz2_reader
+from dnas.config import config as cfg
+from dnas.ip_prefix import ip_prefix
+from dnas.mrt_format_error import MrtFormatError
+from dnas.mrt_shm import mrt_shm
+
+
+class bgp_update(NamedTuple):
+    """
+    A lightweight representation of one BGP UPDATE message from a BGP4MP MRT
+    record, holding only the fields which mrt_parser uses to generate stats.
+    """
+
+    # POSIX timestamp from the MRT header
+    timestamp: int
+    peer_asn: str
+    # IPv4 prefixes withdrawn in the BGP UPDATE body, packed by ip_prefix
+    withdrawn: list[int]
+    # IPv4/IPv6 prefixes withdrawn via MP_UNREACH_NLRI, packed by ip_prefix
+    mp_withdrawn: list[int]
+    # True when the UPDATE contained any path attributes
+    has_attrs: bool
+    # The first AS_PATH segment, None when the AS_PATH attr was absent
+    as_path: Optional[list[str]]
+    # The NEXT_HOP (str) or MP_REACH_NLRI next-hop (list), None when absent
+    next_hop: Union[None, str, list[str]]
+    med: int
+    comm_set: list[str]
+    # IPv4 prefixes advertised in the BGP UPDATE body, packed by ip_prefix
+    nlri: list[int]
+    # IPv4/IPv6 prefixes advertised via MP_REACH_NLRI, packed by ip_prefix
+    mp_nlri: list[int]
+    unknown_attrs: set[int]
+
+
+class mrt_decoder:
+    """
+    Native decoder for BGP4MP UPDATE messages in MRT files.
+
+    Unlike mrtparse this doesn't build a dict for every field of every MRT
+    record, it uses struct offsets into a read buffer and only decodes the
+    BGP path attributes which have been requested. It is pure Python so that
+    it can be JIT'ed by PyPy.
+    """
+
+    # MRT types
+    BGP4MP = 16
+    BGP4MP_ET = 17
+
+    TABLE_DUMP_V2 = 13
+
+    # All the MRT types defined in RFC 6396, including the deprecated types
+    MRT_TYPES = frozenset([11, 12, 13, 16, 17, 32, 33, 48, 49])
+
+    """
+    The maximum length of an MRT record. A larger length in an MRT header
+    means the header is corrupt, rather than the record being huge:
+    """
+    MAX_RECORD_LEN = 16777216
+
+    # BGP4MP subtypes
+    BGP4MP_MESSAGE = 1
+    BGP4MP_MESSAGE_AS4 = 4
+
+    # TABLE_DUMP_V2 subtypes
+    PEER_INDEX_TABLE = 1
+    RIB_IPV4_UNICAST = 2
+    RIB_IPV6_UNICAST = 4
+    RIB_IPV4_UNICAST_ADDPATH = 8
+    RIB_IPV6_UNICAST_ADDPATH = 10
+    RIB_SUBTYPES = (
+        RIB_IPV4_UNICAST,
+        RIB_IPV6_UNICAST,
+        RIB_IPV4_UNICAST_ADDPATH,
+        RIB_IPV6_UNICAST_ADDPATH,
+    )
+
+    # BGP message type
+    BGP_UPDATE = 2
+
+    # BGP path attribute types
+    AS_PATH = 2
+    NEXT_HOP = 3
+    MULTI_EXIT_DISC = 4
+    COMMUNITY = 8
+    MP_REACH_NLRI = 14
+    MP_UNREACH_NLRI = 15
+    LARGE_COMMUNITY = 32
+
+    # The path attributes decoded by default, this is all which mrt_parser uses
+    ALL_ATTRS = frozenset(
+        [
+            AS_PATH,
+            NEXT_HOP,
+            MULTI_EXIT_DISC,
+            COMMUNITY,
+            MP_REACH_NLRI,
+            MP_UNREACH_NLRI,
+            LARGE_COMMUNITY,
+        ]
+    )
+
+    # Supported SAFIs for MP_REACH_NLRI / MP_UNREACH_NLRI (unicast/multicast)
+    MP_SAFIS = (1, 2)
+
+    # Number of bytes to read from the MRT file at a time
+    READ_SIZE = 1048576
+
+    MRT_HDR = struct.Struct(">IHHI")
+
+    def __init__(
+        self: "mrt_decoder",
+        filename: str,
+        attrs: Union[None, set[int], frozenset[int]] = None,
+        peers: Optional[list[str]] = None,
+        start: int = 0,
+        end: int = 0,
+        shm: Optional[mrt_shm] = None,
+    ) -> None:
+        """
+        Only the MRT records from byte offset start, up to byte offset end
+        (or the end of the file if end is 0), are decoded. The offsets must
+        be the start of MRT records in an uncompressed MRT file, e.g. from an
+        mrt_index. If shm is specified the MRT file filename has been
+        decompressed into that shared memory segment, which is read instead.
+        """
+        if not filename:
+            raise ValueError("MRT filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        if type(start) != int or type(end) != int:
+            raise TypeError(
+                f"start and end must be ints: {type(start)}, {type(end)}"
+            )
+
+        if start < 0 or end < 0 or (end and end < start):
+            raise ValueError(f"Invalid offset range: {start} to {end}")
+
+        if attrs is None:
+            self.attrs = mrt_decoder.ALL_ATTRS
+        else:
+            if type(attrs) not in (set, frozenset):
+                raise TypeError(f"attrs is not a set: {type(attrs)}")
+            self.attrs = frozenset(attrs)
+
+        self.buf = b""
+        # Offset of the end of the MRT records to decode, 0 for the whole file
+        self.end = end
+        # Decoded RIB entries which haven't been returned yet
+        self.entries: Deque[bgp_update] = deque()
+        self.f: Union[
+            bz2.BZ2File, bz2_reader, gzip.GzipFile, BufferedReader, mrt_shm
+        ]
+        self.filename = filename
+        # Offset of the read buffer in the (decompressed) MRT file
+        self.offset = 0
+        # Peer ASNs from the TABLE_DUMP_V2 PEER_INDEX_TABLE
+        self.peers = peers if peers else []
+        self.pos = 0
+        # Offset of the MRT record the last BGP UPDATE was decoded from
+        self.record_offset = 0
+        # Number of malformed MRT records which were skipped
+        self.skipped = 0
+        # Each packed prefix seen in the MRT file, see ip_prefix.intern()
+        self.prefixes: dict[int, int] = {}
+
+        # Magic Number
+        GZIP_MAGIC = b"\x1f\x8b"
+        BZ2_MAGIC = b"\x42\x5a\x68"
+
+        if shm:
+            self.f = shm
+            self.f.seek(start)
+            self.offset = start
+            return
+
+        f = open(filename, "rb")
+        hdr = f.read(max(len(BZ2_MAGIC), len(GZIP_MAGIC)))
+        f.close()
+
+        if start or end:
+            if hdr.startswith(BZ2_MAGIC) or hdr.startswith(GZIP_MAGIC):
+                raise ValueError(
+                    f"Offset ranges are only supported for uncompressed MRT "
+                    f"files: {filename}"
+                )
+            self.f = open(filename, "rb")
+            self.f.seek(start)
+            self.offset = start
+        elif hdr.startswith(BZ2_MAGIC):
+            self.f = bz2_reader.open_file(filename)
+        elif hdr.startswith(GZIP_MAGIC):
+            self.f = gzip.GzipFile(filename, "rb")
+        else:
+            self.f = open(filename, "rb")
+
+    def close(self: "mrt_decoder") -> NoReturn:
+        """
+        Close the open MRT file.
+        """
+        self.f.close()
+        raise StopIteration
+
+    def __iter__(self: "mrt_decoder") -> "mrt_decoder":
+        return self
+
+    def __next__(self: "mrt_decoder") -> bgp_update:
+        """
+        Return the next BGP UPDATE in the MRT file. For TABLE_DUMP_V2 files
+        each RIB entry is returned as a BGP UPDATE advertising the RIB prefix.
+        MRT records which aren't a BGP4MP UPDATE message or a RIB entry, or
+        which are malformed, are skipped.
+        """
+        while True:
+            if self.entries:
+                return self.entries.popleft()
+
+            if self.end and self.offset + self.pos >= self.end:
+                self.close()
+
+            if not self.fill(12):
+                if len(self.buf) - self.pos:
+                    self.skip(
+                        self.offset + self.pos,
+                        f"Invalid MRT header length "
+                        f"{len(self.buf) - self.pos} < 12 bytes",
+                    )
+                self.close()
+
+            ts, mrt_t, mrt_st, length = mrt_decoder.MRT_HDR.unpack_from(
+                self.buf, self.pos
+            )
+
+            # Resync on the next valid MRT header if this one is corrupt
+            if (
+                mrt_t not in mrt_decoder.MRT_TYPES
+                or length > mrt_decoder.MAX_RECORD_LEN
+            ):
+                offset = self.offset + self.pos
+                if not self.resync():
+                    self.skip(offset, "Invalid MRT header, unable to resync")
+                    self.close()
+                self.skip(
+                    offset,
+                    f"Invalid MRT header, resynced at offset "
+                    f"{self.offset + self.pos}",
+                )
+                continue
+
+            if not self.fill(12 + length):
+                self.skip(
+                    self.offset + self.pos,
+                    f"Invalid MRT data length "
+                    f"{len(self.buf) - self.pos - 12} < {length} bytes",
+                )
+                self.close()
+
+            self.record_offset = self.offset + self.pos
+            start = self.pos + 12
+            end = start + length
+            self.pos = end
+
+            if mrt_t == mrt_decoder.TABLE_DUMP_V2:
+                try:
+                    if mrt_st == mrt_decoder.PEER_INDEX_TABLE:
+                        self.peers = mrt_decoder.decode_peer_index(
+                            self.buf, start, end
+                        )
+                    elif mrt_st in mrt_decoder.RIB_SUBTYPES:
+                        self.entries.extend(
+                            self.decode_rib(self.buf, start, end, ts, mrt_st)
+                        )
+                except (IndexError, MrtFormatError, struct.error) as e:
+                    self.skip(
+                        self.record_offset,
+                        f"Malformed TABLE_DUMP_V2 record: {e}",
+                    )
+                continue
+
+            if mrt_t != mrt_decoder.BGP4MP and mrt_t != mrt_decoder.BGP4MP_ET:
+                continue
+
+            if (
+                mrt_st != mrt_decoder.BGP4MP_MESSAGE
+                and mrt_st != mrt_decoder.BGP4MP_MESSAGE_AS4
+            ):
+                continue
+
+            # Skip the microsecond timestamp
+            if mrt_t == mrt_decoder.BGP4MP_ET:
+                start += 4
+
+            try:
+                upd = self.decode_bgp4mp(
+                    self.buf,
+                    start,
+                    end,
+                    ts,
+                    2 if mrt_st == mrt_decoder.BGP4MP_MESSAGE else 4,
+                )
+            except (IndexError, MrtFormatError, struct.error) as e:
+                self.skip(self.record_offset, f"Malformed BGP4MP record: {e}")
+                continue
+
+            if upd:
+                return upd
+
+    def fill(self: "mrt_decoder", n: int) -> bool:
+        """
+        Ensure there are at least n unread bytes in the read buffer.
+        Return False if the end of the MRT file is reached first.
+        """
+        while len(self.buf) - self.pos < n:
+            data = self.f.read(max(mrt_decoder.READ_SIZE, n))
+            if not data:
+                return False
+            self.buf = self.buf[self.pos :] + data
+            self.offset += self.pos
+            self.pos = 0
+        return True
+
+    def resync(self: "mrt_decoder") -> bool:
+        """
+        Move the read position forward to the next valid MRT header, after a
+        corrupt MRT header. A valid MRT header must be followed by another
+        valid MRT header or the end of the MRT file, so that an MRT header
+        isn't matched inside the data of an MRT record. Return False if the
+        end of the MRT file is reached first.
+        """
+        # Offset of the candidate MRT header from the read position
+        i = 1
+        while self.fill(i + 12):
+            p = self.pos + i
+            _, mrt_t, _, length = mrt_decoder.MRT_HDR.unpack_from(self.buf, p)
+            if mrt_decoder.valid_header(mrt_t, length):
+                if self.fill(i + 12 + length + 12):
+                    p = self.pos + i + 12 + length
+                    _, mrt_t, _, length = mrt_decoder.MRT_HDR.unpack_from(
+                        self.buf, p
+                    )
+                    if mrt_decoder.valid_header(mrt_t, length):
+                        self.pos += i
+                        return True
+                elif len(self.buf) - self.pos == i + 12 + length:
+                    self.pos += i
+                    return True
+            i += 1
+        return False
+
+    def skip(self: "mrt_decoder", offset: int, reason: str) -> None:
+        """
+        Count and log a malformed MRT record at offset which is skipped.
+        """
+        self.skipped += 1
+        logging.warning(
+            f"Skipping MRT record at offset {offset} in {self.filename}: "
+            f"{reason}"
+        )
+
+    @staticmethod
+    def valid_header(mrt_t: int, length: int) -> bool:
+        """
+        Return True if an MRT header with type mrt_t and length could be
+        valid, else False.
+        """
+        return (
+            mrt_t in mrt_decoder.MRT_TYPES
+            and length <= mrt_decoder.MAX_RECORD_LEN
+        )
+
+    def decode_bgp4mp(
+        self: "mrt_decoder",
+        buf: bytes,
+        p: int,
+        end: int,
+        ts: int,
+        as_len: int,
+    ) -> Optional[bgp_update]:
+        """
+        Decode the BGP4MP message in buf[p:end]. Return None if it doesn't
+        contain a BGP UPDATE.
+        """
+        if as_len == 2:
+            peer_asn = str(struct.unpack_from(">H", buf, p)[0])
+        else:
+            peer_asn = str(struct.unpack_from(">I", buf, p)[0])
+
+        # Skip the peer AS, local AS and interface index
+        p += as_len * 2 + 2
+        afi = struct.unpack_from(">H", buf, p)[0]
+        p += 2
+        if afi == 1:
+            p += 8
+        elif afi == 2:
+            p += 32
+        else:
+            raise MrtFormatError(f"Unsupported AFI {afi}")
+
+        # BGP message header: marker (16), length (2), type (1)
+        if end - p < 19:
+            raise MrtFormatError("Truncated BGP message header")
+        if buf[p + 18] != mrt_decoder.BGP_UPDATE:
+            return None
+        bgp_end = p + struct.unpack_from(">H", buf, p + 16)[0]
+        if bgp_end > end:
+            raise MrtFormatError(
+                f"BGP message length {bgp_end - p} exceeds MRT record length "
+                f"{end - p}"
+            )
+        p += 19
+
+        withd_len = struct.unpack_from(">H", buf, p)[0]
+        p += 2
+        withdrawn = self.decode_nlri(buf, p, p + withd_len, 1)
+        p += withd_len
+
+        attr_len = struct.unpack_from(">H", buf, p)[0]
+        p += 2
+        attr_end = p + attr_len
+        if attr_end > bgp_end:
+            raise MrtFormatError(
+                f"Path attributes length {attr_len} exceeds BGP message length"
+            )
+
+        (
+            as_path,
+            next_hop,
+            med,
+            comm_set,
+            mp_nlri,
+            mp_withdrawn,
+            unknown_attrs,
+        ) = self.decode_attrs(buf, p, attr_end, as_len)
+
+        return bgp_update(
+            timestamp=ts,
+            peer_asn=peer_asn,
+            withdrawn=withdrawn,
+            mp_withdrawn=mp_withdrawn,
+            has_attrs=attr_len > 0,
+            as_path=as_path,
+            next_hop=next_hop,
+            med=med,
+            comm_set=comm_set,
+            nlri=self.decode_nlri(buf, attr_end, bgp_end, 1),
+            mp_nlri=mp_nlri,
+            unknown_attrs=unknown_attrs,
+        )
+
+    def decode_rib(
+        self: "mrt_decoder",
+        buf: bytes,
+        p: int,
+        end: int,
+        ts: int,
+        mrt_st: int,
+    ) -> list[bgp_update]:
+        """
+        Decode the RIB_IPV4_UNICAST / RIB_IPV6_UNICAST record in buf[p:end].
+        Return a BGP UPDATE per RIB entry, each advertising the RIB prefix.
+        """
+        if (
+            mrt_st == mrt_decoder.RIB_IPV4_UNICAST
+            or mrt_st == mrt_decoder.RIB_IPV4_UNICAST_ADDPATH
+        ):
+            afi = 1
+        else:
+            afi = 2
+        add_path = (
+            mrt_st == mrt_decoder.RIB_IPV4_UNICAST_ADDPATH
+            or mrt_st == mrt_decoder.RIB_IPV6_UNICAST_ADDPATH
+        )
+
+        # Skip the sequence number
+        p += 4
+        pfx_end = p + 1 + ((buf[p] + 7) // 8)
+        prefixes = self.decode_prefixes(buf, p, pfx_end, afi, False)
+        p = pfx_end
+        nlri = prefixes if afi == 1 else []
+        mp_nlri = prefixes if afi == 2 else []
+
+        entry_count = struct.unpack_from(">H", buf, p)[0]
+        p += 2
+
+        entries = []
+        for _ in range(entry_count):
+            # Peer index (2), originated time (4), optional path ID (4)
+            peer_idx = struct.unpack_from(">H", buf, p)[0]
+            p += 10 if add_path else 6
+            attr_len = struct.unpack_from(">H", buf, p)[0]
+            p += 2
+            attr_end = p + attr_len
+            if attr_end > end:
+                raise MrtFormatError(
+                    f"RIB entry attributes length {attr_len} exceeds MRT "
+                    f"record length"
+                )
+
+            if not self.peers:
+                peer_asn = ""
+            elif peer_idx < len(self.peers):
+                peer_asn = self.peers[peer_idx]
+            else:
+                raise MrtFormatError(
+                    f"Peer index {peer_idx} not in peer index table"
+                )
+
+            # RIB entries always use 4 byte ASNs, see RFC6396 4.3.4.
+            (
+                as_path,
+                next_hop,
+                med,
+                comm_set,
+                _,
+                _,
+                unknown_attrs,
+            ) = self.decode_attrs(buf, p, attr_end, 4, afi)
+
+            entries.append(
+                bgp_update(
+                    timestamp=ts,
+                    peer_asn=peer_asn,
+                    withdrawn=[],
+                    mp_withdrawn=[],
+                    has_attrs=attr_len > 0,
+                    as_path=as_path,
+                    next_hop=next_hop,
+                    med=med,
+                    comm_set=comm_set,
+                    nlri=nlri,
+                    mp_nlri=mp_nlri,
+                    unknown_attrs=unknown_attrs,
+                )
+            )
+            p = attr_end
+
+        return entries
+
+    def decode_attrs(
+        self: "mrt_decoder",
+        buf: bytes,
+        p: int,
+        attr_end: int,
+        as_len: int,
+        rib_afi: int = 0,
+    ) -> Tuple[
+        Optional[list[str]],
+        Union[None, str, list[str]],
+        int,
+        list[str],
+        list[int],
+        list[int],
+        set[int],
+    ]:
+        """
+        Decode the requested BGP path attributes in buf[p:attr_end].
+        rib_afi is the AFI of the RIB entry when decoding TABLE_DUMP_V2
+        attributes, or 0 when decoding a BGP UPDATE.
+        Return the AS path, next-hop, MED, communities, MP_REACH_NLRI prefixes,
+        MP_UNREACH_NLRI prefixes, and unknown attributes.
+        """
+        as_path: Optional[list[str]] = None
+        comm_set: list[str] = []
+        med = cfg.MISSING_MED
+        mp_nlri: list[int] = []
+        mp_withdrawn: list[int] = []
+        unknown_attrs: set[int] = set()
+        attrs = self.attrs
+        next_hop: Union[None, str, list[str]] = None
+
+        while p < attr_end:
+            flags = buf[p]
+            attr_t = buf[p + 1]
+            # Extended length
+            if flags & 0x10:
+                length = struct.unpack_from(">H", buf, p + 2)[0]
+                p += 4
+            else:
+                length = buf[p + 2]
+                p += 3
+            v_end = p + length
+            if v_end > attr_end:
+                raise MrtFormatError(
+                    f"Path attribute {attr_t} length {length} exceeds path "
+                    f"attributes length"
+                )
+
+            if attr_t not in attrs:
+                if attr_t not in mrt_decoder.ALL_ATTRS:
+                    if bogon_attr.is_unknown(attr_t):
+                        unknown_attrs.add(attr_t)
+                p = v_end
+                continue
+
+            if attr_t == mrt_decoder.AS_PATH:
+                # Only the first path segment is used
+                if length:
+                    seg_len = buf[p + 1]
+                    if p + 2 + (seg_len * as_len) > v_end:
+                        raise MrtFormatError("Truncated AS_PATH segment")
+                    if as_len == 2:
+                        asns = struct.unpack_from(f">{seg_len}H", buf, p + 2)
+                    else:
+                        asns = struct.unpack_from(f">{seg_len}I", buf, p + 2)
+                    as_path = [str(asn) for asn in asns]
+                else:
+                    as_path = []
+
+            elif attr_t == mrt_decoder.NEXT_HOP:
+                if length == 4 or length == 16:
+                    next_hop = mrt_decoder.decode_addr(buf, p, length * 8)
+
+            elif attr_t == mrt_decoder.MULTI_EXIT_DISC:
+                if length != 4:
+                    raise MrtFormatError(f"Invalid MED length {length}")
+                med = struct.unpack_from(">I", buf, p)[0]
+
+            elif attr_t == mrt_decoder.COMMUNITY:
+                if length % 4:
+                    raise MrtFormatError(f"Invalid COMMUNITY length {length}")
+                vals = iter(
+                    struct.unpack_from(">" + "H" * (length // 2), buf, p)
+                )
+                comm_set.extend([f"{hi}:{lo}" for hi, lo in zip(vals, vals)])
+
+            elif attr_t == mrt_decoder.LARGE_COMMUNITY:
+                if length % 12:
+                    raise MrtFormatError(
+                        f"Invalid LARGE_COMMUNITY length {length}"
+                    )
+                vals = iter(
+                    struct.unpack_from(">" + "I" * (length // 4), buf, p)
+                )
+                comm_set.extend(
+                    [
+                        f"{ga}:{ld1}:{ld2}"
+                        for ga, ld1, ld2 in zip(vals, vals, vals)
+                    ]
+                )
+
+            elif attr_t == mrt_decoder.MP_REACH_NLRI:
+                if rib_afi:
+                    """
+                    RIB entries only include the next-hop length and next-hop
+                    address fields of MP_REACH_NLRI, see RFC6396 4.3.4.
+                    """
+                    nh_len = buf[p]
+                    nh_bits = 32 if rib_afi == 1 else 128
+                    if nh_len < nh_bits // 8 or p + 1 + nh_len > v_end:
+                        raise MrtFormatError(
+                            f"Invalid MP_REACH_NLRI next-hop length {nh_len}"
+                        )
+                    next_hop = [mrt_decoder.decode_addr(buf, p + 1, nh_bits)]
+                    if rib_afi == 2 and nh_len == 32:
+                        next_hop.append(
+                            mrt_decoder.decode_addr(buf, p + 17, nh_bits)
+                        )
+                    p = v_end
+                    continue
+
+                mp_afi, mp_safi, nh_len = struct.unpack_from(">HBB", buf, p)
+                if (mp_afi == 1 or mp_afi == 2) and (
+                    mp_safi in mrt_decoder.MP_SAFIS
+                ):
+                    nh_bits = 32 if mp_afi == 1 else 128
+                    nh_p = p + 4
+                    if nh_len < nh_bits // 8 or nh_p + nh_len >= v_end:
+                        raise MrtFormatError(
+                            f"Invalid MP_REACH_NLRI next-hop length {nh_len}"
+                        )
+                    next_hop = [mrt_decoder.decode_addr(buf, nh_p, nh_bits)]
+                    # RFC2545 global and link-local next-hops
+                    if mp_afi == 2 and nh_len == 32:
+                        next_hop.append(
+                            mrt_decoder.decode_addr(buf, nh_p + 16, nh_bits)
+                        )
+                    # Skip the next-hop(s) and the reserved byte
+                    mp_nlri = self.decode_nlri(
+                        buf, nh_p + nh_len + 1, v_end, mp_afi
+                    )
+
+            elif attr_t == mrt_decoder.MP_UNREACH_NLRI:
+                mp_afi, mp_safi = struct.unpack_from(">HB", buf, p)
+                if (mp_afi == 1 or mp_afi == 2) and (
+                    mp_safi in mrt_decoder.MP_SAFIS
+                ):
+                    mp_withdrawn = self.decode_nlri(buf, p + 3, v_end, mp_afi)
+
+            p = v_end
+
+        return (
+            as_path,
+            next_hop,
+            med,
+            comm_set,
+            mp_nlri,
+            mp_withdrawn,
+            unknown_attrs,
+        )
+
+    @staticmethod
+    def decode_peer_index(buf: bytes, p: int, end: int) -> list[str]:
+        """
+        Return the list of peer ASNs from the PEER_INDEX_TABLE in buf[p:end].
+        """
+        # Skip the collector BGP ID
+        p += 4
+        view_len = struct.unpack_from(">H", buf, p)[0]
+        p += 2 + view_len
+        peer_count = struct.unpack_from(">H", buf, p)[0]
+        p += 2
+
+        peers = []
+        for _ in range(peer_count):
+            peer_type = buf[p]
+            # Skip the peer type, peer BGP ID, and the peer IPv4/IPv6 address
+            p += 21 if peer_type & 0x01 else 9
+            if peer_type & 0x02:
+                peers.append(str(struct.unpack_from(">I", buf, p)[0]))
+                p += 4
+            else:
+                peers.append(str(struct.unpack_from(">H", buf, p)[0]))
+                p += 2
+
+        if p > end:
+            raise MrtFormatError(
+                f"PEER_INDEX_TABLE length {p} exceeds MRT record length {end}"
+            )
+
+        return peers
+
+    @staticmethod
+    def get_peer_index(
+        filename: str, shm: Optional[mrt_shm] = None
+    ) -> list[str]:
+        """
+        Return the list of peer ASNs from the PEER_INDEX_TABLE at the start of
+        a TABLE_DUMP_V2 MRT file, or the shared memory segment shm it has been
+        decompressed into. Only the first MRT record is read. shm is left
+        attached, with its read position back at the start.
+        """
+        decoder = mrt_decoder(filename, shm=shm)
+        peers: list[str] = []
+        if decoder.fill(12):
+            ts, mrt_t, mrt_st, length = mrt_decoder.MRT_HDR.unpack_from(
+                decoder.buf, 0
+            )
+            if (
+                mrt_t == mrt_decoder.TABLE_DUMP_V2
+                and mrt_st == mrt_decoder.PEER_INDEX_TABLE
+                and decoder.fill(12 + length)
+            ):
+                peers = mrt_decoder.decode_peer_index(
+                    decoder.buf, 12, 12 + length
+                )
+        if shm:
+            shm.seek(0)
+        else:
+            decoder.f.close()
+        return peers
+
+    @staticmethod
+    def decode_addr(buf: bytes, p: int, plen: int) -> str:
+        """
+        Return the IP address string for an IPv4 (32 bit) or IPv6 (128 bit)
+        address at offset p in buf.
+        """
+        if plen == 32:
+            return "%d.%d.%d.%d" % (buf[p], buf[p + 1], buf[p + 2], buf[p + 3])
+        else:
+            return socket.inet_ntop(socket.AF_INET6, buf[p : p + 16])
+
+    def decode_nlri(
+        self: "mrt_decoder", buf: bytes, p: int, end: int, afi: int
+    ) -> list[int]:
+        """
+        Return the list of packed prefixes in the NLRI encoded in buf[p:end].
+        """
+        if p >= end:
+            return []
+
+        try:
+            prefixes = self.decode_prefixes(buf, p, end, afi, False)
+            # Duplicate prefixes probably means ADD-PATH is in use
+            if len(prefixes) != len(set(prefixes)):
+                raise MrtFormatError("Duplicate prefixes in NLRI")
+        except MrtFormatError:
+            prefixes = self.decode_prefixes(buf, p, end, afi, True)
+        return prefixes
+
+    def decode_prefixes(
+        self: "mrt_decoder",
+        buf: bytes,
+        p: int,
+        end: int,
+        afi: int,
+        add_path: bool,
+    ) -> list[int]:
+        """
+        Decode the prefixes in buf[p:end], with or without ADD-PATH path IDs,
+        into packed prefixes. Any host bits which are set in a prefix (such
+        as "192.168.0.0/9") are masked, rather than discarding the whole MRT
+        record, see mrtparse_decoder.decode_prefix().
+        """
+        max_len = 32 if afi == 1 else 128
+        version = 4 if afi == 1 else 6
+        interned = self.prefixes
+        prefixes = []
+        while p < end:
+            if add_path:
+                p += 4
+            if p >= end:
+                raise MrtFormatError("Truncated NLRI")
+            plen = buf[p]
+            p += 1
+            if plen > max_len:
+                raise MrtFormatError(f"Invalid prefix length {plen}")
+            n = (plen + 7) // 8
+            if p + n > end:
+                raise MrtFormatError("Truncated NLRI prefix")
+            addr = (int.from_bytes(buf[p : p + n], "big") >> (-plen % 8)) << (
+                max_len - plen
+            )
+            prefixes.append(
+                ip_prefix.intern(ip_prefix.pack(addr, plen, version), interned)
+            )
+            p += n
+        return prefixes
+
+
+class mrtparse_decoder:
+    """
+    Decoder for BGP4MP UPDATE messages in MRT files using mrtparse, which
+    returns them in the same format as the native mrt_decoder. mrtparse
+    decodes every field of every MRT record so this is much slower, it's
+    kept to cross check the native decoder.
+    """
+
+    def __init__(
+        self: "mrtparse_decoder",
+        filename: str,
+        attrs: Union[None, set[int], frozenset[int]] = None,
+        start: int = 0,
+        end: int = 0,
+        shm: Optional[mrt_shm] = None,
+    ) -> None:
+        """
+        Only the MRT records from byte offset start, up to byte offset end
+        (or the end of the file if end is 0), are decoded, and shm is read
+        instead of filename if it's specified, see mrt_decoder. Only the
+        path attributes in attrs are returned, like mrt_decoder, although
+        mrtparse still decodes all of them.
+        """
+        if not filename:
+            raise ValueError("MRT filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        if type(start) != int or type(end) != int:
+            raise TypeError(
+                f"start and end must be ints: {type(start)}, {type(end)}"
+            )
+
+        if start < 0 or end < 0 or (end and end < start):
+            raise ValueError(f"Invalid offset range: {start} to {end}")
+
+        if attrs is None:
+            self.attrs = mrt_decoder.ALL_ATTRS
+        else:
+            if type(attrs) not in (set, frozenset):
+                raise TypeError(f"attrs is not a set: {type(attrs)}")
+            self.attrs = frozenset(attrs)
+
+        # Offset of the end of the MRT records to decode, 0 for the whole file
+        self.end = end
+        self.filename = filename
+        # Offset of the next MRT record in the (decompressed) MRT file
+        self.offset = start
+        # Each packed prefix seen in the MRT file, see ip_prefix.intern()
+        self.prefixes: dict[int, int] = {}
+        # The open MRT file which mrtparse reads from
+        self.f: Union[bz2.BZ2File, gzip.GzipFile, BufferedReader, mrt_shm]
+        if shm:
+            self.f = shm
+            self.f.seek(start)
+            self.reader = mrtparse.Reader(self.f)
+        elif start or end:
+            self.f = open(filename, "rb")
+            self.f.seek(start)
+            self.reader = mrtparse.Reader(self.f)
+        else:
+            self.reader = mrtparse.Reader(filename)
+            self.f = self.reader.f
+        # Offset of the MRT record the last BGP UPDATE was decoded from
+        self.record_offset = 0
+        # Number of malformed MRT records which were skipped
+        self.skipped = 0
+
+    def close(self: "mrtparse_decoder") -> NoReturn:
+        """
+        Close the open MRT file.
+        """
+        self.f.close()
+        raise StopIteration
+
+    def __iter__(self: "mrtparse_decoder") -> "mrtparse_decoder":
+        return self
+
+    def __next__(self: "mrtparse_decoder") -> bgp_update:
+        """
+        Return the next BGP UPDATE in the MRT file. MRT records which aren't
+        a BGP4MP UPDATE message, or which are malformed, are skipped.
+        """
+        while True:
+            if self.end and self.offset >= self.end:
+                self.close()
+
+            try:
+                mrt_e = next(self.reader)
+            except StopIteration:
+                self.close()
+            offset = self.offset
+
+            # Only a truncated MRT header at the end of the file
+            if mrt_e.err == mrtparse.MRT_ERR_C["MRT Header Error"]:
+                self.skip(offset, mrt_e.err_msg)
+                mrt_e.err = None
+                continue
+
+            """
+            mrtparse reads the whole MRT record using the length in the MRT
+            header, even if it's malformed, so the next record is always at
+            the next offset.
+            """
+            self.offset += 12 + mrt_e.data["length"]
+
+            if mrt_e.err:
+                """
+                Only count malformed BGP UPDATE messages, mrtparse can't
+                decode some of the other BGP messages (e.g. an OPEN with
+                unknown capabilities) which aren't used anyway.
+                """
+                bgp_msg = mrt_e.data.get("bgp_message", {})
+                if mrt_decoder.BGP_UPDATE in bgp_msg.get("type", {}):
+                    self.skip(offset, mrt_e.err_msg)
+                # The error isn't reset by mrtparse
+                mrt_e.err = None
+                continue
+
+            try:
+                upd = self.decode(mrt_e.data)
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                self.skip(offset, f"Malformed BGP4MP record: {repr(e)}")
+                continue
+
+            if upd:
+                self.record_offset = offset
+                return upd
+
+    def decode(self: "mrtparse_decoder", data: dict) -> Optional[bgp_update]:
+        """
+        Return the BGP UPDATE from the data of an MRT record decoded by
+        mrtparse, or None if it isn't a BGP4MP UPDATE message.
+        """
+        """
+        Some RIPE UPDATE MRTs contain the BGP state change events,
+        whereas Route-Views don't.
+        Yay!
+        """
+        s_type = next(iter(data["subtype"]))
+        if s_type != 1 and s_type != 4:  # 1 BGP4MP_MESSAGE
+            return None  # 4 BGP4MP_MESSAGE_AS4
+
+        """
+        I'm not sure why but some MRT files contain a BGP message with
+        no actual UPDATE, but they are an UPDATE, i.e. not a KEEPALIVE.
+        Yay!
+        """
+        if "bgp_message" not in data:
+            return None
+
+        """
+        Some RIPE UPDATE MRTs contain all the BGP messages types
+        (OPEN, KEEPALIVE, etc), whereas Route-Views don't.
+        Yay!
+        """
+        bgp_msg = data["bgp_message"]
+        if next(iter(bgp_msg["type"])) != 2:  # UPDATE
+            return None
+
+        as_path = None
+        comm_set: list[str] = []
+        med = cfg.MISSING_MED
+        mp_nlri: list[int] = []
+        mp_withdrawn: list[int] = []
+        next_hop = None
+        unknown_attrs: set[int] = set()
+
+        """
+        Some RIPE MRTs don't always contain "withdraw_routes" key,
+        whereas all Route-Views MRTs do.
+        The key may be present, but empty. Yay!
+        These are IPv4 withdraws, IPv6 withdraws are in attrib
+        MP_UNREACH_NLRI.
+        """
+        withdrawn = [
+            self.decode_prefix(route)
+            for route in bgp_msg.get("withdrawn_routes", [])
+        ]
+
+        for attr in bgp_msg.get("path_attributes", []):
+            attr_t = next(iter(attr["type"]))
+
+            if attr_t not in self.attrs:
+                # Unknown attribute type
+                if attr_t not in mrt_decoder.ALL_ATTRS:
+                    if bogon_attr.is_unknown(attr_t):
+                        unknown_attrs.add(attr_t)
+                continue
+
+            # AS_PATH
+            if attr_t == 2:
+                if attr["value"]:
+                    as_path = attr["value"][0]["value"]
+                else:
+                    as_path = []
+
+            # NEXT_HOP
+            elif attr_t == 3:
+                next_hop = attr["value"]
+
+            # MULTI_EXIT_DISC
+            elif attr_t == 4:
+                med = int(attr["value"])
+
+            # COMMUNITY or LARGE_COMMUNITY
+            elif attr_t == 8 or attr_t == 32:
+                comm_set.extend(attr["value"])
+
+            # MP_REACH_NLRI
+            elif attr_t == 14:
+                """
+                IPV6_UNICAST:
+                if 2 in attr["value"]["afi"] and
+                1 in attr["value"]["safi"]
+                ^ This is always the case.
+                """
+                next_hop = attr["value"]["next_hop"]
+                mp_nlri = [
+                    self.decode_prefix(nlri) for nlri in attr["value"]["nlri"]
+                ]
+
+            # MP_UNREACH_NLRI
+            elif attr_t == 15:
+                mp_withdrawn = [
+                    self.decode_prefix(route)
+                    for route in attr["value"].get("withdrawn_routes", [])
+                ]
+
+        return bgp_update(
+            timestamp=next(iter(data["timestamp"])),
+            peer_asn=data["peer_as"],
+            withdrawn=withdrawn,
+            mp_withdrawn=mp_withdrawn,
+            has_attrs=bool(bgp_msg.get("path_attributes")),
+            as_path=as_path,
+            next_hop=next_hop,
+            med=med,
+            comm_set=comm_set,
+            nlri=[
+                self.decode_prefix(nlri) for nlri in bgp_msg.get("nlri", [])
+            ],
+            mp_nlri=mp_nlri,
+            unknown_attrs=unknown_attrs,
+        )
+
+    def decode_prefix(self: "mrtparse_decoder", route: dict) -> int:
+        """
+        Return the interned packed prefix of an mrtparse NLRI / withdrawn
+        route, with any host bits which are set masked.
+        """
+        return ip_prefix.intern(
+            ip_prefix.from_str(
+                route["prefix"] + "/" + str(route["length"]), False
+            ),
+            self.prefixes,
+        )
+
+    def skip(self: "mrtparse_decoder", offset: int, reason: str) -> None:
+        """
+        Count and log a malformed MRT record at offset which is skipped.
+        """
+        self.skipped += 1
+        logging.warning(
+            f"Skipping MRT record at offset {offset} in {self.filename}: "
+            f"{reason}"
+        )
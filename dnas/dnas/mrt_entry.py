@@ -1,6 +1,7 @@
 import datetime
 import json
-from typing import Any
+import sys
+from typing import Any, Optional, Union
 
 from dnas.config import config as cfg
 
@@ -9,37 +10,121 @@ class mrt_entry:
     """
     An MRT Entry object contains the parsed BGP data which is a single data
     point for one of the stats in an MRT Stats object.
+
+    A leak can produce hundreds of thousands of entries, so they are slotted
+    rather than each having a dict of attributes. While parsing, entries
+    made from the same UPDATE share its AS path, communities, next-hop and
+    unknown attributes as tuples and a frozenset, see thaw().
     """
 
+    __slots__ = (
+        "advt",
+        "as_path",
+        "comm_set",
+        "filename",
+        "med",
+        "next_hop",
+        "origin_asns",
+        "peer_asn",
+        "prefix",
+        "timestamp",
+        "updates",
+        "withdraws",
+        "unknown_attrs",
+    )
+
     def __init__(
         self,
         advt: int = 0,
-        as_path: list[str] = [],
-        comm_set: list[str] = [],
+        as_path: Optional[list[str]] = None,
+        comm_set: Optional[list[str]] = None,
         filename: str = "",
         med: int = cfg.MISSING_MED,
-        next_hop: str = "",
+        next_hop: Union[str, list[str]] = "",
         prefix: str = "",
-        origin_asns: set[str] = set(),
+        origin_asns: Optional[set[str]] = None,
         peer_asn: str = "",
-        unknown_attrs: set[int] = set(),
+        unknown_attrs: Optional[set[int]] = None,
         timestamp: str = "",
         updates: int = 0,
         withdraws: int = 0,
     ) -> None:
         self.advt = advt
-        self.as_path = as_path
-        self.comm_set = comm_set
+        self.as_path = as_path if as_path is not None else []
+        self.comm_set = comm_set if comm_set is not None else []
         self.filename = filename
         self.med = med
         self.next_hop = next_hop
-        self.origin_asns = origin_asns
+        self.origin_asns = origin_asns if origin_asns is not None else set()
         self.peer_asn = peer_asn
         self.prefix = prefix
         self.timestamp = timestamp
         self.updates = updates
         self.withdraws = withdraws
-        self.unknown_attrs = unknown_attrs
+        self.unknown_attrs = (
+            unknown_attrs if unknown_attrs is not None else set()
+        )
+
+    @staticmethod
+    def add_bogon_asns(s_e: "mrt_entry", m_e: "mrt_entry") -> "mrt_entry":
+        """
+        Return a new MRT entry with the downstream bogon origin ASNs of two
+        entries for the same ASN added together.
+        """
+        return mrt_entry(
+            as_path=s_e.as_path,
+            origin_asns=s_e.origin_asns.union(m_e.origin_asns),
+            filename=s_e.filename,
+            timestamp=s_e.timestamp,
+        )
+
+    @staticmethod
+    def add_counters(s_e: "mrt_entry", m_e: "mrt_entry") -> "mrt_entry":
+        """
+        Return a new MRT entry with the advertisement, update and withdraw
+        counters of two entries for the same prefix / ASN added together.
+        """
+        return mrt_entry(
+            advt=(s_e.advt + m_e.advt),
+            filename=m_e.filename,
+            origin_asns=s_e.origin_asns,
+            peer_asn=s_e.peer_asn,
+            prefix=s_e.prefix,
+            timestamp=m_e.timestamp,
+            updates=(s_e.updates + m_e.updates),
+            withdraws=(s_e.withdraws + m_e.withdraws),
+        )
+
+    @staticmethod
+    def add_origin_asns(
+        s_e: "mrt_entry", m_e: "mrt_entry"
+    ) -> Optional["mrt_entry"]:
+        """
+        Return a new MRT entry with the origin ASNs of two entries for the
+        same prefix added together, or None if they have the same origins.
+        """
+        if s_e.origin_asns == m_e.origin_asns:
+            return None
+        return mrt_entry(
+            filename=m_e.filename,
+            origin_asns=s_e.origin_asns.union(m_e.origin_asns),
+            prefix=s_e.prefix,
+            timestamp=m_e.timestamp,
+        )
+
+    @staticmethod
+    def add_unknown_attrs(s_e: "mrt_entry", m_e: "mrt_entry") -> "mrt_entry":
+        """
+        Return a new MRT entry with the unknown attributes and origin ASNs of
+        two entries for the same prefix added together.
+        """
+        return mrt_entry(
+            origin_asns=s_e.origin_asns.union(m_e.origin_asns),
+            prefix=s_e.prefix,
+            unknown_attrs=s_e.unknown_attrs.union(m_e.unknown_attrs),
+            filename=s_e.filename,
+            timestamp=s_e.timestamp,
+        )
 
     def equal_to(
         self: "mrt_entry", mrt_e: "mrt_entry", meta: bool = False
@@ -99,6 +184,18 @@ class mrt_entry:
 
         return True
 
+    @staticmethod
+    def freeze(value: Any) -> Any:
+        """
+        Return value as a hashable value, lists are returned as tuples and
+        sets as frozensets.
+        """
+        if isinstance(value, (list, tuple)):
+            return tuple(mrt_entry.freeze(v) for v in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(mrt_entry.freeze(v) for v in value)
+        return value
+
     def from_json(self: "mrt_entry", json_str: str) -> None:
         """
         Parse a JSON str into this MRT stats entry obj.
@@ -110,33 +207,79 @@ class mrt_entry:
             raise TypeError(f"json_str is not a string: {type(json_str)}")
 
         json_data = json.loads(json_str)
+        """
+        The same ASNs, communities, filenames and timestamps are repeated
+        across many entries, only keep one copy of each str:
+        """
         self.advt = json_data["advt"]
-        self.as_path = json_data["as_path"]
-        self.comm_set = json_data["comm_set"]
+        self.as_path = mrt_entry.intern_list(json_data["as_path"])
+        self.comm_set = mrt_entry.intern_list(json_data["comm_set"])
         """
         Convert between JSON "null" and empty string ""
         In the past we used str or None (which was serialsed as null),
         not str only.
         """
         self.filename = (
-            json_data["filename"] if ("filename" in json_data) else ""
+            sys.intern(json_data["filename"])
+            if json_data.get("filename")
+            else ""
         )
         self.med = json_data["med"] if ("med" in json_data) else None
         self.next_hop = json_data["next_hop"] if json_data["next_hop"] else ""
         self.prefix = json_data["prefix"] if json_data["prefix"] else ""
-        self.origin_asns = set(json_data["origin_asns"])
-        self.peer_asn = json_data["peer_asn"] if json_data["peer_asn"] else ""
+        self.origin_asns = set(mrt_entry.intern_list(json_data["origin_asns"]))
+        self.peer_asn = (
+            sys.intern(json_data["peer_asn"]) if json_data["peer_asn"] else ""
+        )
         self.unknown_attrs = (
             set(json_data["unknown_attrs"])
             if ("unknown_attrs" in json_data)
             else set()
         )
         self.timestamp = (
-            json_data["timestamp"] if json_data["timestamp"] else ""
+            sys.intern(json_data["timestamp"])
+            if json_data["timestamp"]
+            else ""
         )
         self.updates = json_data["updates"]
         self.withdraws = json_data["withdraws"]
 
+    @staticmethod
+    def from_tuple(values: tuple) -> "mrt_entry":
+        """
+        Return a new MRT entry obj from a tuple of its values, see to_tuple().
+        """
+        (
+            advt,
+            as_path,
+            comm_set,
+            filename,
+            med,
+            next_hop,
+            origin_asns,
+            peer_asn,
+            prefix,
+            unknown_attrs,
+            timestamp,
+            updates,
+            withdraws,
+        ) = values
+        return mrt_entry(
+            advt=advt,
+            as_path=as_path,
+            comm_set=comm_set,
+            filename=filename,
+            med=med,
+            next_hop=next_hop,
+            origin_asns=origin_asns,
+            peer_asn=peer_asn,
+            prefix=prefix,
+            unknown_attrs=unknown_attrs,
+            timestamp=timestamp,
+            updates=updates,
+            withdraws=withdraws,
+        )
+
     @staticmethod
     def gen_timestamp() -> str:
         """
@@ -144,6 +287,63 @@ class mrt_entry:
         """
         return datetime.datetime.now().strftime(cfg.TIME_FORMAT)
 
+    def get_key(self: "mrt_entry", meta: bool = False) -> tuple:
+        """
+        Return a hashable key of the values of this MRT entry obj, two
+        entries have the same key when they are equal_to() each other, so
+        entries can be compared using sets and dicts. Including meta data
+        like filename is optional.
+        """
+        key = (
+            self.advt,
+            mrt_entry.freeze(self.as_path),
+            mrt_entry.freeze(self.comm_set),
+            self.med,
+            mrt_entry.freeze(self.next_hop),
+            mrt_entry.freeze(self.origin_asns),
+            self.peer_asn,
+            self.prefix,
+            mrt_entry.freeze(self.unknown_attrs),
+            self.timestamp,
+            self.updates,
+            self.withdraws,
+        )
+        if meta:
+            return key + (self.filename,)
+        return key
+
+    @staticmethod
+    def intern_list(values: list) -> list:
+        """
+        Return a list of values, with each str value interned.
+        """
+        return [sys.intern(v) if type(v) == str else v for v in values]
+
+    @staticmethod
+    def merge_origin_asns(
+        s_e: "mrt_entry", m_e: "mrt_entry"
+    ) -> Optional["mrt_entry"]:
+        """
+        Merge the origin ASNs of m_e into s_e, which is an entry for the same
+        prefix. Return s_e, or None if it already had all the origins.
+        """
+        if s_e.origin_asns == m_e.origin_asns:
+            return None
+        s_e.origin_asns = s_e.origin_asns.union(m_e.origin_asns)
+        return s_e
+
+    def thaw(self: "mrt_entry") -> None:
+        """
+        Give this entry its own AS path, communities, next-hop and unknown
+        attributes, as lists and a set, in place of the tuples and frozenset
+        it shares with the other entries made from the same UPDATE.
+        """
+        self.as_path = list(self.as_path)
+        self.comm_set = list(self.comm_set)
+        if type(self.next_hop) == tuple:
+            self.next_hop = list(self.next_hop)
+        self.unknown_attrs = set(self.unknown_attrs)
+
     def to_dict(self: "mrt_entry") -> dict[str, Any]:
         """
         Return this MRT entry obj as a dict.
@@ -173,6 +373,27 @@ class mrt_entry:
         json_data = self.to_dict()
         return json.dumps(json_data, indent=indent)
 
+    def to_tuple(self: "mrt_entry") -> tuple:
+        """
+        Return the values of this MRT entry obj as a tuple, without the names
+        of the attributes, in the same order as to_dict().
+        """
+        return (
+            self.advt,
+            self.as_path,
+            self.comm_set,
+            self.filename,
+            self.med,
+            self.next_hop,
+            self.origin_asns,
+            self.peer_asn,
+            self.prefix,
+            self.unknown_attrs,
+            self.timestamp,
+            self.updates,
+            self.withdraws,
+        )
+
     def print(self: "mrt_entry") -> None:
         """
         Ugly print this MRT stats entry.
@@ -0,0 +1,14 @@
+class MrtFormatError(Exception):
+    """
+    Exception for invalid MRT formatted data.
+    """
+
+    def __init__(self: "MrtFormatError", message: str = "") -> None:
+        Exception.__init__(self)
+        self.message = message
+
+    def __str__(self: "MrtFormatError") -> str:
+        if self.message:
+            return self.message
+        else:
+            return "MrtFormatError"
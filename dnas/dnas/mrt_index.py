@@ -0,0 +1,371 @@
+import bisect
+import bz2
+import errno
+import gzip
+import logging
+import os
+import shutil
+import struct
+from array import array
+from multiprocessing.pool import Pool
+from typing import Optional, Tuple, Union
+
+from dnas.bz2_reader import bz2_reader
+from dnas.config import config as cfg
+from dnas.mrt_shm import mrt_shm
+from dnas.mrt_walker import mrt_walker
+
+
+class mrt_index:
+    """
+    Index of the MRT records in an uncompressed MRT file, stored in a sidecar
+    file next to it. It holds the offset, length, type, subtype and timestamp
+    of every MRT record, in native byte order as it's only read locally.
+
+    A compressed MRT file is decompressed once, into cfg.SPLIT_DIR, before
+    it is indexed. Each parser process then reads a range of MRT records
+    straight from the one decompressed copy, rather than from a chunk file
+    of its own. Both are reused if the MRT file is parsed again.
+    """
+
+    # Index file format
+    MAGIC = b"DNASIDX1"
+    HEADER = struct.Struct("<8sQQ")
+    EXT = ".idx"
+
+    # Extension of the decompressed copy of a compressed MRT file
+    MRT_EXT = ".mrt"
+
+    # Magic Number
+    GZIP_MAGIC = b"\x1f\x8b"
+    BZ2_MAGIC = b"\x42\x5a\x68"
+
+    # Number of bytes to decompress at a time
+    READ_SIZE = 1048576
+
+    """
+    Roughly the largest ratio of the uncompressed to compressed size of a bz2
+    or gzip MRT file, used to estimate the uncompressed size, see
+    est_size():
+    """
+    BZ2_RATIO = 16
+    GZIP_RATIO = 8
+
+    def __init__(self: "mrt_index", filename: str) -> None:
+        if not filename:
+            raise ValueError("MRT filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        self.filename = filename
+        self.mrt_path, self.index_path = mrt_index.get_paths(filename)
+        # Size of the uncompressed MRT file, including any truncated record
+        self.size = 0
+
+        self.lengths = array("I")
+        self.offsets = array("Q")
+        self.subtypes = array("H")
+        self.timestamps = array("I")
+        self.types = array("H")
+
+    def __len__(self: "mrt_index") -> int:
+        return len(self.offsets)
+
+    def build(
+        self: "mrt_index", copy: bool = True, pool: Optional[Pool] = None
+    ) -> None:
+        """
+        Index the MRT records, decompressing a compressed MRT file to mrt_path
+        first, across the pool of processes pool if one is passed. If copy is
+        False a compressed MRT file is indexed without being decompressed to
+        disk, then only the offsets of the MRT records in the decompressed
+        data are known. The index isn't written to disk, see to_file().
+        """
+        if self.mrt_path != self.filename and copy:
+            with open(self.filename, "rb") as f:
+                hdr = f.read(len(mrt_index.BZ2_MAGIC))
+
+            src: Union[bz2.BZ2File, bz2_reader, gzip.GzipFile]
+            if hdr.startswith(mrt_index.BZ2_MAGIC):
+                src = bz2_reader.open_file(self.filename, pool=pool)
+            else:
+                src = gzip.GzipFile(self.filename, "rb")
+
+            """
+            Replace the file in one step, so a partial copy is never used. A
+            truncated compressed MRT file raises EOFError, rather than part
+            of it being indexed:
+            """
+            tmp_path = self.mrt_path + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(src, f, mrt_index.READ_SIZE)
+            except EOFError:
+                os.remove(tmp_path)
+                raise
+            finally:
+                src.close()
+            os.replace(tmp_path, self.mrt_path)
+            logging.debug(f"Decompressed {self.filename} to {self.mrt_path}")
+
+        walker = mrt_walker(self.mrt_path if copy else self.filename)
+        self.add_records(walker)
+
+        if copy:
+            self.size = os.path.getsize(self.mrt_path)
+        else:
+            # Including any bytes of a truncated MRT record
+            self.size = walker.offset + len(walker.buf)
+
+        logging.debug(f"Indexed {len(self)} MRT records in {self.filename}")
+
+    def add_records(self: "mrt_index", walker: mrt_walker) -> None:
+        """
+        Replace the index with the MRT records found by walker.
+        """
+        self.lengths = array("I")
+        self.offsets = array("Q")
+        self.subtypes = array("H")
+        self.timestamps = array("I")
+        self.types = array("H")
+        for mrt_h in walker:
+            self.offsets.append(mrt_h.offset)
+            self.lengths.append(mrt_h.length)
+            self.types.append(mrt_h.type)
+            self.subtypes.append(mrt_h.subtype)
+            self.timestamps.append(mrt_h.timestamp)
+
+    def build_shm(self: "mrt_index", pool: Optional[Pool] = None) -> mrt_shm:
+        """
+        Index the MRT records, decompressing the MRT file into a new shared
+        memory segment instead of to mrt_path, across the pool of processes
+        pool if one is passed. The index isn't written to disk, and the
+        caller must unlink() the returned segment.
+        """
+        shm = mrt_shm.create(self.filename, pool)
+        # The walker closes the segment it reads
+        self.add_records(
+            mrt_walker(self.filename, shm=mrt_shm(shm.name, shm.size))
+        )
+        self.size = shm.size
+        logging.debug(f"Indexed {len(self)} MRT records in {self.filename}")
+        return shm
+
+    def from_file(self: "mrt_index") -> bool:
+        """
+        Load the index from the index file. Return False if it doesn't exist,
+        is invalid, or is older than the MRT file it indexes.
+        """
+        if not os.path.isfile(self.index_path) or not os.path.isfile(
+            self.mrt_path
+        ):
+            return False
+
+        if os.path.getmtime(self.filename) > os.path.getmtime(
+            self.mrt_path
+        ) or os.path.getmtime(self.mrt_path) > os.path.getmtime(
+            self.index_path
+        ):
+            return False
+
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+
+        if len(data) < mrt_index.HEADER.size:
+            return False
+
+        magic, size, count = mrt_index.HEADER.unpack_from(data, 0)
+        if magic != mrt_index.MAGIC or size != os.path.getsize(self.mrt_path):
+            return False
+
+        arrays = (
+            self.offsets,
+            self.lengths,
+            self.types,
+            self.subtypes,
+            self.timestamps,
+        )
+        if len(data) != mrt_index.HEADER.size + count * sum(
+            values.itemsize for values in arrays
+        ):
+            return False
+
+        p = mrt_index.HEADER.size
+        for values in arrays:
+            del values[:]
+            n = count * values.itemsize
+            values.frombytes(data[p : p + n])
+            p += n
+
+        self.size = size
+        return True
+
+    @staticmethod
+    def get(filename: str, pool: Optional[Pool] = None) -> "mrt_index":
+        """
+        Return the index of the MRT file filename, loaded from the index file
+        if it's up to date, else built and written to the index file. A
+        compressed MRT file is decompressed across the pool of processes pool
+        if one is passed.
+        """
+        index = mrt_index(filename)
+        if index.from_file():
+            logging.debug(f"Loaded {index.index_path}")
+            return index
+
+        index.build(pool=pool)
+        index.to_file()
+        return index
+
+    @staticmethod
+    def est_size(filename: str) -> int:
+        """
+        Return the uncompressed size of the MRT file filename, without
+        decompressing it. The size of a gzip file is stored at the end of it
+        (modulo 2^32), the size of a bz2 file is estimated from its
+        compressed size.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}"
+            )
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        size = os.path.getsize(filename)
+        with open(filename, "rb") as f:
+            hdr = f.read(len(mrt_index.BZ2_MAGIC))
+            if hdr.startswith(mrt_index.BZ2_MAGIC):
+                return size * mrt_index.BZ2_RATIO
+            elif hdr.startswith(mrt_index.GZIP_MAGIC):
+                f.seek(-4, os.SEEK_END)
+                gz_size = struct.unpack("<I", f.read(4))[0]
+                # The stored size wraps around for files of 4GB or more
+                if gz_size < size:
+                    return size * mrt_index.GZIP_RATIO
+                return gz_size
+
+        return size
+
+    @staticmethod
+    def get_paths(filename: str) -> Tuple[str, str]:
+        """
+        Return the path of the uncompressed MRT file and its index file, for
+        the MRT file filename. An uncompressed MRT file isn't copied.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}"
+            )
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        with open(filename, "rb") as f:
+            hdr = f.read(len(mrt_index.BZ2_MAGIC))
+
+        if hdr.startswith(mrt_index.BZ2_MAGIC) or hdr.startswith(
+            mrt_index.GZIP_MAGIC
+        ):
+            mrt_dir = (
+                cfg.SPLIT_DIR if cfg.SPLIT_DIR else os.path.dirname(filename)
+            )
+            mrt_path = os.path.join(
+                mrt_dir, os.path.basename(filename) + mrt_index.MRT_EXT
+            )
+        else:
+            mrt_path = filename
+
+        return mrt_path, mrt_path + mrt_index.EXT
+
+    def ranges(
+        self: "mrt_index", no_chunks: int, by_time: bool = False
+    ) -> list[Tuple[int, int]]:
+        """
+        Return up to no_chunks contiguous byte ranges of the uncompressed MRT
+        file, which start and end on MRT records. Together they cover the
+        whole file. The ranges are of roughly equal size, or if by_time is
+        True, cover roughly equal time windows.
+        """
+        if not no_chunks or not isinstance(no_chunks, int) or no_chunks < 1:
+            raise ValueError(
+                f"Number of chunks must be a positive integer, not "
+                f"{no_chunks}"
+            )
+
+        cuts = [0]
+        if by_time and len(self):
+            """
+            MRT records are mostly, but not strictly, in time order. Cut at
+            the first MRT record at or after the start of each time window:
+            """
+            first_ts = min(self.timestamps)
+            duration = max(self.timestamps) - first_ts + 1
+            j = 0
+            for i in range(1, no_chunks):
+                window_ts = first_ts + (duration * i) // no_chunks
+                while j < len(self) and self.timestamps[j] < window_ts:
+                    j += 1
+                if j < len(self) and self.offsets[j] > cuts[-1]:
+                    cuts.append(self.offsets[j])
+        else:
+            for i in range(1, no_chunks):
+                j = bisect.bisect_left(
+                    self.offsets, (self.size * i) // no_chunks
+                )
+                if j < len(self) and self.offsets[j] > cuts[-1]:
+                    cuts.append(self.offsets[j])
+        cuts.append(self.size)
+
+        return [
+            (start, end) for start, end in zip(cuts, cuts[1:]) if end > start
+        ]
+
+    def range_times(
+        self: "mrt_index", start: int, end: int
+    ) -> Tuple[int, int]:
+        """
+        Return the first and last timestamp of the MRT records in the byte
+        range start to end, or (0, 0) if it doesn't contain any.
+        """
+        timestamps = self.timestamps[
+            bisect.bisect_left(self.offsets, start) : bisect.bisect_left(
+                self.offsets, end
+            )
+        ]
+        if not timestamps:
+            return 0, 0
+        return min(timestamps), max(timestamps)
+
+    def remove(self: "mrt_index") -> None:
+        """
+        Delete the index file, and the decompressed copy of the MRT file.
+        """
+        if os.path.isfile(self.index_path):
+            os.remove(self.index_path)
+        if self.mrt_path != self.filename and os.path.isfile(self.mrt_path):
+            os.remove(self.mrt_path)
+
+    def to_file(self: "mrt_index") -> None:
+        """
+        Write the index to the index file.
+        """
+        # Replace the file in one step, it could be loaded at the same time
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                mrt_index.HEADER.pack(mrt_index.MAGIC, self.size, len(self))
+            )
+            self.offsets.tofile(f)
+            self.lengths.tofile(f)
+            self.types.tofile(f)
+            self.subtypes.tofile(f)
+            self.timestamps.tofile(f)
+        os.replace(tmp_path, self.index_path)
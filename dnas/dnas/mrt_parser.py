@@ -1,19 +1,20 @@
 import datetime
 import errno
 import logging
-import operator
 import os
 import traceback
+from typing import Optional, Tuple, Union
 
-import mrtparse  # type: ignore
-from dnas.bogon_asn import bogon_asn
-from dnas.bogon_attr import bogon_attr
-from dnas.bogon_ip import bogon_ip
+from dnas.asn_classifier import asn_classifier
 from dnas.config import config as cfg
 from dnas.mrt_archives import mrt_archives
-from dnas.mrt_entry import mrt_entry
+from dnas.mrt_decoder import mrt_decoder, mrtparse_decoder
+from dnas.mrt_format_error import MrtFormatError
+from dnas.mrt_index import mrt_index
+from dnas.mrt_shm import mrt_shm
 from dnas.mrt_stats import mrt_stats
-from dnas.unallocated_asn import unallocated_asn
+from dnas.mrt_walker import mrt_walker
+from dnas.stat_collector import parse_state, stat_collectors
 
 
 class mrt_parser:
@@ -34,18 +35,19 @@ class mrt_parser:
         if type(filename) != str:
             raise TypeError(f"filename is not a string: {type(filename)}")
 
-        _ = mrtparse.Reader(filename)
-        d = next(_).data["timestamp"]
-        ts = next(iter(d))
+        # Only the first MRT header is read
+        walker = mrt_walker(filename)
+        try:
+            mrt_h = next(walker)
+        except StopIteration:
+            raise MrtFormatError(f"No valid MRT records in {filename}")
+        finally:
+            walker.close()
+
         # Use the MRT file format timestamp:
-        timestamp = datetime.datetime.utcfromtimestamp(ts).strftime(
+        return datetime.datetime.utcfromtimestamp(mrt_h.timestamp).strftime(
             cfg.TIME_FORMAT
         )
-        try:
-            _.close()
-        except StopIteration:
-            pass
-        return timestamp
 
     @staticmethod
     def posix_to_ts(posix: int) -> str:
@@ -61,31 +63,11 @@ class mrt_parser:
         )
 
     @staticmethod
-    def parse_rib_dump(filename: str) -> "mrt_stats":
-        """
-        Take filename of RIB dump MRT as input and return an MRT stats obj.
+    def get_mrt_paths(filename: str) -> Tuple[str, str]:
         """
-        if not filename:
-            raise ValueError(
-                f"Missing required arguments: filename={filename}."
-            )
-
-        mrt_s = mrt_stats()
-
-        """
-        for _, mrt_e in enumerate(mrt_entries):
-            if "prefix" not in mrt_e.data:
-                continue #### FIX ME - Skip the peer table record at the start?
-        """
-
-        raise NotImplementedError
-
-        return mrt_s
-
-    @staticmethod
-    def parse_upd_dump(filename: str) -> "mrt_stats":
-        """
-        Take filename of UPDATE dump MRT as input and return an MRT stats obj.
+        Return the original MRT filename and the path to read the MRT data
+        from. If filename is a chunk of a split MRT file, the original
+        filename is the full MRT file it was split from.
         """
         if not filename:
             raise ValueError(
@@ -95,26 +77,6 @@ class mrt_parser:
         if type(filename) != str:
             raise TypeError(f"filename is not a string: {type(filename)}")
 
-        """
-        We will see the same data again and again, so cache "seen" data to
-        speed up parsing
-        """
-        unalloc_asn = unallocated_asn()
-        prefix_unalloc_origin: list[mrt_entry] = []
-        non_bogon_asns: dict[str, None] = {}
-        bogon_origin_asns: list[mrt_entry] = []
-        bogon_prefix_entries: list[mrt_entry] = []
-        highest_med_prefixes: list[mrt_entry] = []
-        invalid_len_entries: list[mrt_entry] = []
-        longest_as_path: list[mrt_entry] = []
-        longest_comm_set: list[mrt_entry] = []
-        most_bogon_asns: dict[str, set] = {}
-        most_unknown_attrs: list[mrt_entry] = []
-        origin_asns_prefix: dict[str, set] = {}
-        upd_prefix: dict[str, dict] = {}
-        advt_per_origin_asn: dict[str, int] = {}
-        upd_peer_asn: dict[str, dict] = {}
-
         # If parsing a chunk of an MRT file, try to work out the orig filename
         orig_filename = ""
         if cfg.SPLIT_DIR:
@@ -125,955 +87,367 @@ class mrt_parser:
             # Else, assume parsing a full MRT file
             orig_filename = filename
 
-        file_ts = mrt_parser.get_timestamp(orig_filename)
-
-        mrt_s = mrt_stats()
-        mrt_s.timestamp = file_ts
-        mrt_s.file_list.append(orig_filename)
-
         if cfg.SPLIT_DIR and (orig_filename != filename):
-            mrt_entries = mrtparse.Reader(
-                os.path.join(cfg.SPLIT_DIR, os.path.basename(filename))
-            )
+            mrt_path = os.path.join(cfg.SPLIT_DIR, os.path.basename(filename))
         else:
-            mrt_entries = mrtparse.Reader(filename)
-
-        mrt_a = mrt_archives()
-        strip_comm = mrt_a.get_arch_option(orig_filename, "STRIP_COMM")
+            mrt_path = filename
 
-        # Sometimes the MRT files contain corrupt BGP UPDATES
-        try:
-            for _, mrt_e in enumerate(mrt_entries):
-                """
-                Some RIPE UPDATE MRTs contain the BGP state change events,
-                whereas Route-Views don't.
-                Yay!
-                """
-                s_type = next(iter(mrt_e.data["subtype"]))
-                if (
-                    s_type != 1 and s_type != 4  # 1 BGP4MP_MESSAGE
-                ):  # 4 BGP4MP_MESSAGE_AS4
-                    continue
-
-                """
-                I'm not sure why but some MRT files contain a BGP message with
-                no actual UPDATE, but they are an UPDATE, i.e. not a KEEPALIVE.
-                Yay!
-                """
-                if "bgp_message" not in mrt_e.data:
-                    continue
-
-                """
-                Some RIPE UPDATE MRTs contain all the BGP messages types
-                (OPEN, KEEPALIVE, etc), whereas Route-Views don't.
-                Yay!
-                """
-                if (
-                    next(iter(mrt_e.data["bgp_message"]["type"])) != 2
-                ):  # UPDATE
-                    continue
-                mrt_s.total_upd += 1
-
-                ts = mrt_parser.posix_to_ts(
-                    next(iter(mrt_e.data["timestamp"].items()))[0]
-                )  # E.g., 1486801684
-
-                is_unalloc_origin = False
-                bogon_prefixes: list[str] = []
-                comm_set: list[str] = []
-                invalid_len: list[str] = []
-                med = cfg.MISSING_MED
-                prefixes: list[str] = []
-                unknown_attrs: set[int] = set()
-
-                peer_asn = mrt_e.data["peer_as"]
-                if peer_asn not in upd_peer_asn:
-                    upd_peer_asn[peer_asn] = {
-                        "advt": 0,
-                        "withdraws": 0,
-                    }
-
-                """
-                Some RIPE MRTs don't always contain "withdraw_routes" key,
-                whereas all Route-Views MRTs do.
-                The key may be present, but empty. Yay!
-                These are IPv4 withdraws, IPv6 withdraws are in attrib
-                MP_UNREACH_NLRI.
-                """
-                if withdrawn_routes := mrt_e.data["bgp_message"].get(
-                    "withdrawn_routes"
-                ):
-                    upd_peer_asn[peer_asn]["withdraws"] += 1
-                    mrt_s.total_withd += 1
+        return orig_filename, mrt_path
 
-                    for withdrawn_route in withdrawn_routes:
-                        prefix = (
-                            withdrawn_route["prefix"]
-                            + "/"
-                            + str(withdrawn_route["length"])
-                        )
-                        if prefix not in upd_prefix:
-                            upd_prefix[prefix] = {
-                                "advt": 0,
-                                "withdraws": 1,
-                            }
-                            origin_asns_prefix[prefix] = set()
-                        else:
-                            upd_prefix[prefix]["withdraws"] += 1
-
-                if path_attributes := mrt_e.data["bgp_message"].get(
-                    "path_attributes"
-                ):
-                    upd_peer_asn[peer_asn]["advt"] += 1
-                    mrt_s.total_advt += 1
-
-                    for attr in path_attributes:
-                        attr_t = next(iter(attr["type"]))
+    @staticmethod
+    def preload() -> None:
+        """
+        Load the lookup tables used when parsing MRT files, if they aren't
+        already loaded. When they are loaded before the parser processes are
+        forked, the processes share them rather than each loading a copy.
+        """
+        asn_classifier.load()
 
-                        # AS_PATH
-                        if attr_t == 2:
-                            if attr["value"]:
-                                as_path = attr["value"][0]["value"]
-                                origin_asn = as_path[-1]
-                                if origin_asn not in advt_per_origin_asn:
-                                    advt_per_origin_asn[origin_asn] = 1
-                                else:
-                                    advt_per_origin_asn[origin_asn] += 1
-                                if unalloc_asn.is_unallocated(int(origin_asn)):
-                                    is_unalloc_origin = True
-                            else:
-                                logging.error(f"No AS Path: {mrt_e.data}")
+    @staticmethod
+    def parse_rib_dump(
+        filename: str,
+        stats: Optional[list[str]] = None,
+        offset_range: Optional[Tuple[int, int]] = None,
+        shm_name: str = "",
+        file_ts: str = "",
+        strip_comm: Optional[str] = None,
+    ) -> "mrt_stats":
+        """
+        Take filename of RIB dump MRT as input and return an MRT stats obj.
+        The RIB entries are streamed one MRT record at a time, each entry is
+        treated as an advertisement of the RIB prefix by the RIB peer. Only
+        the list of stats is generated, see gen_stats(), and only the path
+        attributes they need are decoded. If offset_range is specified, only
+        that range of the uncompressed MRT file is parsed, see mrt_index,
+        which is read from the shared memory segment shm_name if it's
+        specified, see mrt_index.build_shm(). See gen_stats() for file_ts and
+        strip_comm.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}."
+            )
 
-                        # NEXT_HOP
-                        elif attr_t == 3:
-                            next_hop = attr["value"]
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
 
-                        # MULTI_EXIT_DISC
-                        elif attr_t == 4:
-                            med = int(attr["value"])
+        if shm_name and not offset_range:
+            raise ValueError(
+                f"An offset range is required to parse shared memory segment "
+                f"{shm_name}"
+            )
 
-                        # COMMUNITY or LARGE_COMMUNITY
-                        elif attr_t == 8 or attr_t == 32:
-                            if strip_comm:
-                                c: str
-                                comm_set.extend(
-                                    [
-                                        c
-                                        for c in attr["value"]
-                                        if not c.startswith(strip_comm)
-                                    ]
-                                )
-                            else:
-                                comm_set.extend(attr["value"])
+        # Only the path attributes the stats need are decoded
+        attrs = stat_collectors.get_attrs(
+            stats if stats is not None else cfg.MRT_STATS, rib=True
+        )
 
-                        # MP_REACH_NLRI
-                        elif attr_t == 14:
-                            """
-                            IPV6_UNICAST:
-                            if 2 in attr["value"]["afi"] and
-                            1 in attr["value"]["safi"]
-                            ^ This is always the case.
-                            """
-                            next_hop = attr["value"]["next_hop"]
-                            for nlri in attr["value"]["nlri"]:
-                                prefixes.append(
-                                    nlri["prefix"] + "/" + str(nlri["length"])
-                                )
+        start, end = offset_range if offset_range else (0, 0)
+        if offset_range:
+            orig_filename = filename
+            mrt_path = mrt_index(filename).mrt_path
+        else:
+            orig_filename, mrt_path = mrt_parser.get_mrt_paths(filename)
 
-                        # MP_UNREACH_NLRI
-                        elif attr_t == 15:
-                            """
-                            IPV6_UNICAST:
-                            if 2 in attr["value"]["afi"] and
-                            1 in attr["value"]["safi"]
-                            ^ This is always the case.
-                            """
-                            if withdrawn_routes := attr["value"].get(
-                                "withdrawn_routes"
-                            ):
-                                upd_peer_asn[peer_asn]["withdraws"] += 1
-                                mrt_s.total_withd += 1
+        shm = None
+        if shm_name:
+            # The decompressed MRT file is only in the shared memory segment
+            mrt_path = filename
+            shm = mrt_shm(shm_name)
 
-                            for withdrawn_route in withdrawn_routes:
-                                prefix = (
-                                    withdrawn_route["prefix"]
-                                    + "/"
-                                    + str(withdrawn_route["length"])
-                                )
-                                if prefix not in upd_prefix:
-                                    upd_prefix[prefix] = {
-                                        "advt": 0,
-                                        "withdraws": 1,
-                                    }
-                                    origin_asns_prefix[prefix] = set()
-                                else:
-                                    upd_prefix[prefix]["withdraws"] += 1
+        """
+        The peer index table is the first record in a RIB dump, it isn't in
+        the chunks of a split RIB dump, so read it from the start of the
+        uncompressed file or the original file.
+        """
+        peers = mrt_decoder.get_peer_index(
+            mrt_path if offset_range else orig_filename, shm=shm
+        )
 
-                        # Unknown attribute type
-                        elif bogon_attr.is_unknown(attr_t):
-                            unknown_attrs.add(attr_t)
+        return mrt_parser.gen_stats(
+            mrt_decoder(
+                mrt_path,
+                attrs=attrs,
+                peers=peers,
+                start=start,
+                end=end,
+                shm=shm,
+            ),
+            orig_filename,
+            rib=True,
+            stats=stats,
+            file_ts=file_ts,
+            strip_comm=strip_comm,
+        )
 
-                    """
-                    Note that IPv6 prefix advertisements will be encoded as an
-                    NLRI attribute of a MP_REACH_NLRI update as above.
-                    """
-                    for prefix in prefixes:
-                        if bogon_ip.is_v6_bogon(prefix):
-                            bogon_prefixes.append(prefix)
+    @staticmethod
+    def parse_upd_dump(
+        filename: str,
+        engine: str = "",
+        stats: Optional[list[str]] = None,
+        offset_range: Optional[Tuple[int, int]] = None,
+        shm_name: str = "",
+        file_ts: str = "",
+        strip_comm: Optional[str] = None,
+    ) -> "mrt_stats":
+        """
+        Take filename of UPDATE dump MRT as input and return an MRT stats obj.
+        The BGP UPDATEs are decoded using the native mrt_decoder or mrtparse,
+        as specified by engine, or cfg.MRT_ENGINE if engine isn't specified.
+        Only the list of stats is generated, see gen_stats(), and only the
+        path attributes they need are decoded. If offset_range is specified,
+        only that range of the uncompressed MRT file is parsed, see
+        mrt_index, which is read from the shared memory segment shm_name if
+        it's specified, see mrt_index.build_shm(). See gen_stats() for
+        file_ts and strip_comm.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}."
+            )
 
-                        if prefix not in upd_prefix:
-                            upd_prefix[prefix] = {
-                                "advt": 1,
-                                "withdraws": 0,
-                            }
-                            origin_asns_prefix[prefix] = set([origin_asn])
-                        else:
-                            upd_prefix[prefix]["advt"] += 1
-                            origin_asns_prefix[prefix].add(origin_asn)
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
 
-                        if (
-                            int(prefix.split("/")[1]) > 56
-                            or int(prefix.split("/")[1]) < 16
-                        ):
-                            invalid_len.append(prefix)
+        if not engine:
+            engine = cfg.MRT_ENGINE
 
-                    """
-                    IPv4 prefix advertisements are encoded in the NLRI field of
-                    a BGP UPDATE message, not as a multi-protocol attribute.
-                    """
-                    if len(mrt_e.data["bgp_message"]["nlri"]) > 0:
-                        for nlri in mrt_e.data["bgp_message"]["nlri"]:
-                            prefix = nlri["prefix"] + "/" + str(nlri["length"])
-                            prefixes.append(prefix)
+        if engine not in cfg.MRT_ENGINES:
+            raise ValueError(
+                f"Unknown MRT engine {engine}, must be one of "
+                f"{cfg.MRT_ENGINES}"
+            )
 
-                            if bogon_ip.is_v4_bogon(prefix):
-                                bogon_prefixes.append(prefix)
+        if shm_name and not offset_range:
+            raise ValueError(
+                f"An offset range is required to parse shared memory segment "
+                f"{shm_name}"
+            )
 
-                            if prefix not in upd_prefix:
-                                upd_prefix[prefix] = {
-                                    "advt": 1,
-                                    "withdraws": 0,
-                                }
-                                origin_asns_prefix[prefix] = set([origin_asn])
-                            else:
-                                upd_prefix[prefix]["advt"] += 1
-                                origin_asns_prefix[prefix].add(origin_asn)
+        # Only the path attributes the stats need are decoded
+        attrs = stat_collectors.get_attrs(
+            stats if stats is not None else cfg.MRT_STATS
+        )
 
-                            if (
-                                int(prefix.split("/")[1]) > 24
-                                or int(prefix.split("/")[1]) < 8
-                            ):
-                                invalid_len.append(prefix)
+        start, end = offset_range if offset_range else (0, 0)
+        if offset_range:
+            orig_filename = filename
+            mrt_path = mrt_index(filename).mrt_path
+        else:
+            orig_filename, mrt_path = mrt_parser.get_mrt_paths(filename)
+
+        shm = None
+        if shm_name:
+            # The decompressed MRT file is only in the shared memory segment
+            mrt_path = filename
+            shm = mrt_shm(shm_name)
+
+        updates: Union[mrt_decoder, mrtparse_decoder]
+        if engine == "native":
+            updates = mrt_decoder(
+                mrt_path, attrs=attrs, start=start, end=end, shm=shm
+            )
+        else:
+            updates = mrtparse_decoder(
+                mrt_path, attrs=attrs, start=start, end=end, shm=shm
+            )
 
-                # Nothing further to do if this UPDATE was a withdraw
-                if not prefixes:
-                    continue
+        return mrt_parser.gen_stats(
+            updates,
+            orig_filename,
+            stats=stats,
+            file_ts=file_ts,
+            strip_comm=strip_comm,
+        )
 
-                """
-                Keep unique prefixes only, with additional origin ASNs for the
-                same prefix
-                """
-                if origin_asn not in non_bogon_asns:
-                    if bogon_asn.is_bogon(int(origin_asn)):
-                        for prefix in prefixes:
-                            for mrt_e in bogon_origin_asns:
-                                if prefix == mrt_e.prefix:
-                                    if origin_asn not in mrt_e.origin_asns:
-                                        mrt_e.origin_asns.add(origin_asn)
-                                    break
-                            else:
-                                bogon_origin_asns.append(
-                                    mrt_entry(
-                                        as_path=as_path,
-                                        comm_set=comm_set,
-                                        filename=orig_filename,
-                                        med=med,
-                                        next_hop=next_hop,
-                                        origin_asns=set([origin_asn]),
-                                        peer_asn=peer_asn,
-                                        prefix=prefix,
-                                        timestamp=ts,
-                                        unknown_attrs=unknown_attrs.copy(),
-                                    )
-                                )
-                    else:
-                        non_bogon_asns[origin_asn] = None
+    @staticmethod
+    def add_partials(partial: bytes, merge_data: bytes) -> bytes:
+        """
+        Add two compact partial MRT stats together, see mrt_stats.add(), and
+        return the result as a compact partial, see mrt_stats.to_partial().
+        """
+        mrt_s = mrt_stats.from_partial(partial)
+        mrt_s.add(mrt_stats.from_partial(merge_data))
+        return mrt_s.to_partial()
 
-                """
-                When the origin ASN is a bogon, find the first non-bogon ASN
-                """
-                if origin_asn not in non_bogon_asns:
-                    i = -1
-                    while bogon_asn.is_bogon(int(as_path[i])):
-                        i -= 1
-                        if i + len(as_path) < 0:
-                            break
-                    else:
-                        if as_path[i] not in most_bogon_asns:
-                            most_bogon_asns[as_path[i]] = set([origin_asn])
-                        else:
-                            most_bogon_asns[as_path[i]].add(origin_asn)
+    @staticmethod
+    def parse_partial(args: tuple) -> bytes:
+        """
+        Parse an MRT file, or a range of it, and return the MRT stats as a
+        compact partial, see mrt_stats.to_partial(). args are the arguments of
+        parse_rib_dump() if filename (the first one) is a RIB dump, else of
+        parse_upd_dump().
+        """
+        mrt_a = mrt_archives()
+        if mrt_a.is_rib_from_filename(args[0]):
+            return mrt_parser.parse_rib_dump(*args).to_partial()
+        else:
+            return mrt_parser.parse_upd_dump(*args).to_partial()
 
-                """
-                Keep unique prefixes only, with additional origin ASNs for the
-                same prefix being appended to existing matching prefix
-                """
-                for prefix in bogon_prefixes:
-                    for mrt_e in bogon_prefix_entries:
-                        if prefix == mrt_e.prefix:
-                            if origin_asn not in mrt_e.origin_asns:
-                                mrt_e.origin_asns.add(origin_asn)
-                            break
-                    else:
-                        bogon_prefix_entries.append(
-                            mrt_entry(
-                                as_path=as_path,
-                                comm_set=comm_set,
-                                filename=orig_filename,
-                                med=med,
-                                next_hop=next_hop,
-                                origin_asns=set([origin_asn]),
-                                peer_asn=peer_asn,
-                                prefix=prefix,
-                                timestamp=ts,
-                                unknown_attrs=unknown_attrs.copy(),
-                            )
-                        )
+    @staticmethod
+    def gen_stats(
+        updates: Union[mrt_decoder, mrtparse_decoder],
+        orig_filename: str,
+        rib: bool = False,
+        stats: Optional[list[str]] = None,
+        file_ts: str = "",
+        strip_comm: Optional[str] = None,
+    ) -> "mrt_stats":
+        """
+        Generate an MRT stats obj from the BGP UPDATEs decoded from the MRT
+        file orig_filename (or a chunk of it). If rib is True the UPDATEs are
+        RIB entries, which only generate the stats which aren't based on the
+        number of advertisements or withdraws. Only the list of stats is
+        generated, or cfg.MRT_STATS if stats isn't specified, or all stats if
+        both are empty. The MRT entries of the stats only include the path
+        attributes which were decoded, e.g. when longest_comm_set isn't
+        generated the communities of UPDATEs aren't needed, so they might not
+        have been decoded, see stat_collectors.get_attrs().
+
+        Malformed MRT records are skipped by the decoder, and UPDATEs which
+        can't be parsed are skipped here, each is counted in total_skipped.
+
+        file_ts is the timestamp of the MRT file and strip_comm is the
+        STRIP_COMM option of its MRT archive. They are looked up from
+        orig_filename if they aren't specified, when parsing a chunk of the
+        MRT file they can be looked up once for all the chunks instead.
+        """
+        if not orig_filename:
+            raise ValueError(
+                f"Missing required arguments: orig_filename={orig_filename}."
+            )
 
-                """
-                Keep prefixes with the highest MED
-                """
-                if not highest_med_prefixes:
-                    highest_med_prefixes = [
-                        mrt_entry(
-                            as_path=as_path,
-                            comm_set=comm_set,
-                            filename=orig_filename,
-                            med=med,
-                            next_hop=next_hop,
-                            origin_asns=set([origin_asn]),
-                            peer_asn=peer_asn,
-                            prefix=prefix,
-                            timestamp=ts,
-                            unknown_attrs=unknown_attrs.copy(),
-                        )
-                        for prefix in prefixes
-                    ]
-                else:
-                    if med == highest_med_prefixes[0].med:
-                        known_prefixes = [
-                            mrt_e.prefix for mrt_e in highest_med_prefixes
-                        ]
-                        for prefix in prefixes:
-                            if prefix not in known_prefixes:
-                                highest_med_prefixes.append(
-                                    mrt_entry(
-                                        as_path=as_path,
-                                        comm_set=comm_set,
-                                        filename=orig_filename,
-                                        med=med,
-                                        next_hop=next_hop,
-                                        origin_asns=set([origin_asn]),
-                                        peer_asn=peer_asn,
-                                        prefix=prefix,
-                                        timestamp=ts,
-                                        unknown_attrs=unknown_attrs.copy(),
-                                    )
-                                )
+        if type(orig_filename) != str:
+            raise TypeError(
+                f"orig_filename is not a string: {type(orig_filename)}"
+            )
 
-                    elif med > highest_med_prefixes[0].med:
-                        highest_med_prefixes = [
-                            mrt_entry(
-                                as_path=as_path,
-                                comm_set=comm_set,
-                                filename=orig_filename,
-                                med=med,
-                                next_hop=next_hop,
-                                origin_asns=set([origin_asn]),
-                                peer_asn=peer_asn,
-                                prefix=prefix,
-                                timestamp=ts,
-                                unknown_attrs=unknown_attrs.copy(),
-                            )
-                            for prefix in prefixes
-                        ]
+        if stats is None:
+            stats = cfg.MRT_STATS
 
-                """
-                Keep prefixes with the longest AS Path
-                """
-                if not longest_as_path:
-                    longest_as_path = [
-                        mrt_entry(
-                            as_path=as_path,
-                            comm_set=comm_set,
-                            filename=orig_filename,
-                            med=med,
-                            next_hop=next_hop,
-                            origin_asns=set([origin_asn]),
-                            peer_asn=peer_asn,
-                            prefix=prefix,
-                            timestamp=ts,
-                            unknown_attrs=unknown_attrs.copy(),
-                        )
-                        for prefix in prefixes
-                    ]
-                else:
-                    if len(as_path) == len(longest_as_path[0].as_path):
-                        known_prefixes = [
-                            mrt_e.prefix for mrt_e in longest_as_path
-                        ]
-                        for prefix in prefixes:
-                            if prefix not in known_prefixes:
-                                longest_as_path.append(
-                                    mrt_entry(
-                                        as_path=as_path,
-                                        comm_set=comm_set,
-                                        filename=orig_filename,
-                                        next_hop=next_hop,
-                                        origin_asns=set([origin_asn]),
-                                        peer_asn=peer_asn,
-                                        prefix=prefix,
-                                        timestamp=ts,
-                                        unknown_attrs=unknown_attrs.copy(),
-                                    )
-                                )
+        if not file_ts:
+            file_ts = mrt_parser.get_timestamp(orig_filename)
 
-                    elif len(as_path) > len(longest_as_path[0].as_path):
-                        longest_as_path = [
-                            mrt_entry(
-                                as_path=as_path,
-                                comm_set=comm_set,
-                                filename=orig_filename,
-                                med=med,
-                                next_hop=next_hop,
-                                origin_asns=set([origin_asn]),
-                                peer_asn=peer_asn,
-                                prefix=prefix,
-                                timestamp=ts,
-                                unknown_attrs=unknown_attrs.copy(),
-                            )
-                            for prefix in prefixes
-                        ]
+        mrt_s = mrt_stats()
+        mrt_s.timestamp = file_ts
+        mrt_s.file_list.append(orig_filename)
 
-                """
-                Keep prefixes with the longest community set
-                """
-                if not longest_comm_set:
-                    longest_comm_set = [
-                        mrt_entry(
-                            as_path=as_path,
-                            comm_set=comm_set,
-                            filename=orig_filename,
-                            med=med,
-                            next_hop=next_hop,
-                            origin_asns=set([origin_asn]),
-                            peer_asn=peer_asn,
-                            prefix=prefix,
-                            timestamp=ts,
-                            unknown_attrs=unknown_attrs.copy(),
-                        )
-                        for prefix in prefixes
-                    ]
-                else:
-                    if len(comm_set) == len(longest_comm_set[0].comm_set):
-                        known_prefixes = [
-                            mrt_e.prefix for mrt_e in longest_comm_set
-                        ]
-                        for prefix in prefixes:
-                            if prefix not in known_prefixes:
-                                longest_comm_set.append(
-                                    mrt_entry(
-                                        as_path=as_path,
-                                        comm_set=comm_set,
-                                        filename=orig_filename,
-                                        med=med,
-                                        next_hop=next_hop,
-                                        origin_asns=set([origin_asn]),
-                                        peer_asn=peer_asn,
-                                        prefix=prefix,
-                                        timestamp=ts,
-                                        unknown_attrs=unknown_attrs.copy(),
-                                    )
-                                )
+        if strip_comm is None:
+            mrt_a = mrt_archives()
+            strip_comm = mrt_a.get_arch_option(orig_filename, "STRIP_COMM")
 
-                    elif len(comm_set) > len(longest_comm_set[0].comm_set):
-                        longest_comm_set = [
-                            mrt_entry(
-                                as_path=as_path,
-                                comm_set=comm_set,
-                                filename=orig_filename,
-                                med=med,
-                                next_hop=next_hop,
-                                origin_asns=set([origin_asn]),
-                                peer_asn=peer_asn,
-                                prefix=prefix,
-                                timestamp=ts,
-                                unknown_attrs=unknown_attrs.copy(),
-                            )
-                            for prefix in prefixes
-                        ]
+        state = parse_state(orig_filename, file_ts, rib)
+        collectors = [
+            collector(mrt_s, state)
+            for collector in stat_collectors.get_collectors(stats, rib)
+        ]
+        """
+        The bound observe methods of the active collectors, split into those
+        which observe every UPDATE and those which only observe UPDATEs that
+        advertise prefixes.
+        """
+        observe_all = [c.observe for c in collectors if not c.ADVERTISED_ONLY]
+        observe_advt = [c.observe for c in collectors if c.ADVERTISED_ONLY]
+        posix = -1
+
+        for upd in updates:
+            # Sometimes the MRT files contain corrupt BGP UPDATES
+            try:
+                if not rib:
+                    mrt_s.total_upd += 1
+
+                state.upd = upd
+                # Consecutive UPDATEs often have the same timestamp
+                if upd.timestamp != posix:
+                    posix = upd.timestamp
+                    state.ts = mrt_parser.posix_to_ts(posix)
+                state.comm_set = ()
+                state.prefixes = []
+                state.unknown_attrs = frozenset(upd.unknown_attrs)
+
+                if upd.withdrawn:
+                    mrt_s.total_withd += 1
 
-                """
-                Keep prefixes with an unallocated origin ASN
-                """
-                if not prefix_unalloc_origin and is_unalloc_origin:
-                    prefix_unalloc_origin = [
-                        mrt_entry(
-                            as_path=as_path,
-                            comm_set=comm_set,
-                            filename=orig_filename,
-                            med=med,
-                            next_hop=next_hop,
-                            origin_asns=set([origin_asn]),
-                            peer_asn=peer_asn,
-                            prefix=prefix,
-                            timestamp=ts,
-                            unknown_attrs=unknown_attrs.copy(),
-                        )
-                        for prefix in prefixes
-                    ]
-                elif is_unalloc_origin:
-                    known_prefixes = [
-                        mrt_e.prefix for mrt_e in prefix_unalloc_origin
-                    ]
-                    for prefix in prefixes:
-                        if prefix not in known_prefixes:
-                            prefix_unalloc_origin.append(
-                                mrt_entry(
-                                    as_path=as_path,
-                                    comm_set=comm_set,
-                                    filename=orig_filename,
-                                    med=med,
-                                    next_hop=next_hop,
-                                    origin_asns=set([origin_asn]),
-                                    peer_asn=peer_asn,
-                                    prefix=prefix,
-                                    timestamp=ts,
-                                    unknown_attrs=unknown_attrs.copy(),
+                if upd.has_attrs:
+                    if not rib:
+                        mrt_s.total_advt += 1
+
+                    if upd.as_path is not None:
+                        if upd.as_path:
+                            state.as_path = tuple(upd.as_path)
+                            if upd.as_path[-1] != state.origin_asn:
+                                state.origin_asn = upd.as_path[-1]
+                                state.origin_flags = asn_classifier.classify(
+                                    state.origin_asn
                                 )
-                            )
                         else:
-                            for mrt_e in prefix_unalloc_origin:
-                                if mrt_e.prefix == prefix:
-                                    if origin_asn not in mrt_e.origin_asns:
-                                        mrt_e.origin_asns.add(origin_asn)
-                                    break
+                            logging.error(f"No AS Path: {upd}")
 
-                """
-                Keep unique prefixes only, with additional origin ASNs for the
-                same prefix being appended to existing matching prefix:
-                """
-                for prefix in invalid_len:
-                    for mrt_e in invalid_len_entries:
-                        if prefix == mrt_e.prefix:
-                            if origin_asn not in mrt_e.origin_asns:
-                                mrt_e.origin_asns.add(origin_asn)
-                            break
-                    else:
-                        invalid_len_entries.append(
-                            mrt_entry(
-                                as_path=as_path,
-                                comm_set=comm_set,
-                                filename=orig_filename,
-                                med=med,
-                                next_hop=next_hop,
-                                origin_asns=set([origin_asn]),
-                                peer_asn=peer_asn,
-                                prefix=prefix,
-                                timestamp=ts,
-                                unknown_attrs=unknown_attrs.copy(),
-                            )
-                        )
-
-                """
-                Keep unique prefixes only, with additional unknown attrs for
-                the same prefix being appended to existing matching prefix
-                """
-                if unknown_attrs:
-                    for prefix in prefixes:
-                        for mrt_e in most_unknown_attrs:
-                            if mrt_e.prefix == prefix:
-                                mrt_e.unknown_attrs.update(unknown_attrs)
-                                break
+                    if upd.next_hop is not None:
+                        if type(upd.next_hop) == str:
+                            state.next_hop = upd.next_hop
                         else:
-                            most_unknown_attrs.append(
-                                mrt_entry(
-                                    as_path=as_path,
-                                    comm_set=comm_set,
-                                    filename=orig_filename,
-                                    next_hop=next_hop,
-                                    origin_asns=set([origin_asn]),
-                                    peer_asn=peer_asn,
-                                    prefix=prefix,
-                                    timestamp=ts,
-                                    unknown_attrs=unknown_attrs.copy(),
-                                )
-                            )
-
-        except KeyError as e:
-            logging.error(
-                f"Skipped unparsable entry in {filename} due to KeyError:\n"
-                f"{traceback.format_exc()}"
-            )
-
-        # Only get the prefixes with the most bogon origin ASNs
-        for mrt_e in bogon_origin_asns:
-            if not mrt_s.bogon_origin_asns:
-                mrt_s.bogon_origin_asns = [mrt_e]
-            else:
-                if (
-                    len(mrt_e.origin_asns)
-                    == len(mrt_s.bogon_origin_asns[0].origin_asns)
-                    and mrt_e.origin_asns
-                ):
-                    mrt_s.bogon_origin_asns.append(mrt_e)
-                elif len(mrt_e.origin_asns) > len(
-                    mrt_s.bogon_origin_asns[0].origin_asns
-                ):
-                    mrt_s.bogon_origin_asns = [mrt_e]
-
-        # Only get the bogons prefixes with the most origin ASNs
-        for mrt_e in bogon_prefix_entries:
-            if not mrt_s.bogon_prefixes:
-                mrt_s.bogon_prefixes = [mrt_e]
-            else:
-                if (
-                    len(mrt_e.origin_asns)
-                    == len(mrt_s.bogon_prefixes[0].origin_asns)
-                    and mrt_e.origin_asns
-                ):
-                    mrt_s.bogon_prefixes.append(mrt_e)
-                elif len(mrt_e.origin_asns) > len(
-                    mrt_s.bogon_prefixes[0].origin_asns
-                ):
-                    mrt_s.bogon_prefixes = [mrt_e]
-
-        mrt_s.highest_med_prefixes = highest_med_prefixes.copy()
-
-        # Only get the invalid mask lengths with the most origin ASNs
-        for mrt_e in invalid_len_entries:
-            if not mrt_s.invalid_len:
-                mrt_s.invalid_len = [mrt_e]
-            else:
-                if (
-                    len(mrt_e.origin_asns)
-                    == len(mrt_s.invalid_len[0].origin_asns)
-                    and mrt_e.origin_asns
-                ):
-                    mrt_s.invalid_len.append(mrt_e)
-                elif len(mrt_e.origin_asns) > len(
-                    mrt_s.invalid_len[0].origin_asns
-                ):
-                    mrt_s.invalid_len = [mrt_e]
-
-        mrt_s.longest_as_path = longest_as_path.copy()
-
-        mrt_s.longest_comm_set = longest_comm_set.copy()
-
-        # Only get the prefixes with the most unregistered ASNs
-        for mrt_e in prefix_unalloc_origin:
-            if not mrt_s.most_unreg_origins:
-                mrt_s.most_unreg_origins = [mrt_e]
-            else:
-                if (
-                    len(mrt_e.origin_asns)
-                    == len(mrt_s.most_unreg_origins[0].origin_asns)
-                    and mrt_e.origin_asns
-                ):
-                    mrt_s.most_unreg_origins.append(mrt_e)
-                elif len(mrt_e.origin_asns) > len(
-                    mrt_s.most_unreg_origins[0].origin_asns
-                ):
-                    mrt_s.most_unreg_origins = [mrt_e]
-
-        # Only get the ASNs originating the most bogon downstream ASNs
-        bogon_asn_count = 0
-        for asn in most_bogon_asns:
-            if len(most_bogon_asns[asn]) > bogon_asn_count:
-                bogon_asn_count = len(most_bogon_asns[asn])
-                mrt_s.most_bogon_asns = [
-                    mrt_entry(
-                        as_path=[asn],
-                        origin_asns=most_bogon_asns[asn],
-                        filename=orig_filename,
-                        timestamp=file_ts,
-                    )
-                ]
-            elif len(most_bogon_asns[asn]) == bogon_asn_count:
-                mrt_s.most_bogon_asns.append(
-                    mrt_entry(
-                        as_path=[asn],
-                        origin_asns=most_bogon_asns[asn],
-                        filename=orig_filename,
-                        timestamp=file_ts,
-                    )
-                )
-
-        most_updates = 0
-        most_upd_prefixes = []
-        for prefix in upd_prefix:
-            if not mrt_s.most_advt_prefixes:
-                mrt_s.most_advt_prefixes = [
-                    mrt_entry(
-                        advt=upd_prefix[prefix]["advt"],
-                        filename=orig_filename,
-                        prefix=prefix,
-                        timestamp=file_ts,
-                    )
-                ]
-            else:
-                if (
-                    upd_prefix[prefix]["advt"]
-                    == mrt_s.most_advt_prefixes[0].advt
-                    and mrt_s.most_advt_prefixes[0].advt > 0
-                ):
-                    mrt_s.most_advt_prefixes.append(
-                        mrt_entry(
-                            advt=upd_prefix[prefix]["advt"],
-                            filename=orig_filename,
-                            prefix=prefix,
-                            timestamp=file_ts,
-                        )
-                    )
-                elif (
-                    upd_prefix[prefix]["advt"]
-                    > mrt_s.most_advt_prefixes[0].advt
-                ):
-                    mrt_s.most_advt_prefixes = [
-                        mrt_entry(
-                            advt=upd_prefix[prefix]["advt"],
-                            filename=orig_filename,
-                            prefix=prefix,
-                            timestamp=file_ts,
-                        )
-                    ]
-
-            if not mrt_s.most_withd_prefixes:
-                mrt_s.most_withd_prefixes = [
-                    mrt_entry(
-                        filename=orig_filename,
-                        prefix=prefix,
-                        timestamp=file_ts,
-                        withdraws=upd_prefix[prefix]["withdraws"],
-                    )
-                ]
-            else:
-                if (
-                    upd_prefix[prefix]["withdraws"]
-                    == mrt_s.most_withd_prefixes[0].withdraws
-                    and mrt_s.most_withd_prefixes[0].withdraws > 0
-                ):
-                    mrt_s.most_withd_prefixes.append(
-                        mrt_entry(
-                            filename=orig_filename,
-                            prefix=prefix,
-                            timestamp=file_ts,
-                            withdraws=upd_prefix[prefix]["withdraws"],
-                        )
-                    )
-                elif (
-                    upd_prefix[prefix]["withdraws"]
-                    > mrt_s.most_withd_prefixes[0].withdraws
-                ):
-                    mrt_s.most_withd_prefixes = [
-                        mrt_entry(
-                            filename=orig_filename,
-                            prefix=prefix,
-                            timestamp=file_ts,
-                            withdraws=upd_prefix[prefix]["withdraws"],
+                            state.next_hop = tuple(upd.next_hop)
+
+                    if strip_comm:
+                        c: str
+                        state.comm_set = tuple(
+                            [
+                                c
+                                for c in upd.comm_set
+                                if not c.startswith(strip_comm)
+                            ]
                         )
-                    ]
+                    else:
+                        state.comm_set = tuple(upd.comm_set)
 
-            if (
-                upd_prefix[prefix]["advt"] + upd_prefix[prefix]["withdraws"]
-            ) > most_updates:
-                most_updates = (
-                    upd_prefix[prefix]["advt"]
-                    + upd_prefix[prefix]["withdraws"]
-                )
-                most_upd_prefixes = [prefix]
-            elif (
-                upd_prefix[prefix]["advt"] + upd_prefix[prefix]["withdraws"]
-            ) == most_updates:
-                most_upd_prefixes.append(prefix)
+                    if upd.mp_withdrawn:
+                        mrt_s.total_withd += 1
 
-        mrt_s.most_upd_prefixes = [
-            mrt_entry(
-                filename=orig_filename,
-                prefix=prefix,
-                timestamp=file_ts,
-                updates=most_updates,
-            )
-            for prefix in most_upd_prefixes
-        ]
-
-        most_updates = 0
-        most_upd_asns = []
-        for asn in upd_peer_asn:
-            if not mrt_s.most_advt_peer_asn:
-                mrt_s.most_advt_peer_asn = [
-                    mrt_entry(
-                        advt=upd_peer_asn[asn]["advt"],
-                        filename=orig_filename,
-                        peer_asn=asn,
-                        timestamp=file_ts,
-                    )
-                ]
-            else:
-                if (
-                    upd_peer_asn[asn]["advt"]
-                    == mrt_s.most_advt_peer_asn[0].advt
-                    and mrt_s.most_advt_peer_asn[0].advt > 0
-                ):
-                    mrt_s.most_advt_peer_asn.append(
-                        mrt_entry(
-                            advt=upd_peer_asn[asn]["advt"],
-                            filename=orig_filename,
-                            peer_asn=asn,
-                            timestamp=file_ts,
-                        )
-                    )
-                elif (
-                    upd_peer_asn[asn]["advt"]
-                    > mrt_s.most_advt_peer_asn[0].advt
-                ):
-                    mrt_s.most_advt_peer_asn = [
-                        mrt_entry(
-                            advt=upd_peer_asn[asn]["advt"],
-                            filename=orig_filename,
-                            peer_asn=asn,
-                            timestamp=file_ts,
-                        )
-                    ]
+                    """
+                    IPv6 prefix advertisements are encoded as an NLRI
+                    attribute of a MP_REACH_NLRI update, IPv4 prefix
+                    advertisements are encoded in the NLRI field of a BGP
+                    UPDATE message.
+                    """
+                    state.prefixes = upd.mp_nlri + upd.nlri
 
-            if not mrt_s.most_withd_peer_asn:
-                mrt_s.most_withd_peer_asn = [
-                    mrt_entry(
-                        filename=orig_filename,
-                        peer_asn=asn,
-                        timestamp=file_ts,
-                        withdraws=upd_peer_asn[asn]["withdraws"],
-                    )
-                ]
-            else:
-                if (
-                    upd_peer_asn[asn]["withdraws"]
-                    == mrt_s.most_withd_peer_asn[0].withdraws
-                    and mrt_s.most_withd_peer_asn[0].withdraws > 0
-                ):
-                    mrt_s.most_withd_peer_asn.append(
-                        mrt_entry(
-                            filename=orig_filename,
-                            peer_asn=asn,
-                            timestamp=file_ts,
-                            withdraws=upd_peer_asn[asn]["withdraws"],
-                        )
-                    )
-                elif (
-                    upd_peer_asn[asn]["withdraws"]
-                    > mrt_s.most_withd_peer_asn[0].withdraws
-                ):
-                    mrt_s.most_withd_peer_asn = [
-                        mrt_entry(
-                            filename=orig_filename,
-                            peer_asn=asn,
-                            timestamp=file_ts,
-                            withdraws=upd_peer_asn[asn]["withdraws"],
-                        )
-                    ]
+                for observe in observe_all:
+                    observe()
 
-            if (
-                upd_peer_asn[asn]["advt"] + upd_peer_asn[asn]["withdraws"]
-            ) > most_updates:
-                most_updates = (
-                    upd_peer_asn[asn]["advt"] + upd_peer_asn[asn]["withdraws"]
-                )
-                most_upd_asns = [asn]
-            elif (
-                upd_peer_asn[asn]["advt"] + upd_peer_asn[asn]["withdraws"]
-            ) == most_updates:
-                most_upd_asns.append(asn)
+                # Nothing further to do if this UPDATE was a withdraw
+                if not state.prefixes:
+                    continue
 
-        mrt_s.most_upd_peer_asn = [
-            mrt_entry(
-                filename=orig_filename,
-                peer_asn=asn,
-                timestamp=file_ts,
-                updates=most_updates,
-            )
-            for asn in most_upd_asns
-        ]
+                for observe in observe_advt:
+                    observe()
 
-        for prefix in origin_asns_prefix:
-            if not mrt_s.most_origin_asns:
-                mrt_s.most_origin_asns.append(
-                    mrt_entry(
-                        filename=orig_filename,
-                        origin_asns=origin_asns_prefix[prefix],
-                        prefix=prefix,
-                        timestamp=file_ts,
-                    )
+            except (IndexError, KeyError, TypeError, ValueError):
+                mrt_s.total_skipped += 1
+                logging.error(
+                    f"Skipped unparsable UPDATE from MRT record at offset "
+                    f"{updates.record_offset} in {orig_filename}:\n"
+                    f"{traceback.format_exc()}"
                 )
-            else:
-                if len(origin_asns_prefix[prefix]) > len(
-                    mrt_s.most_origin_asns[0].origin_asns
-                ):
-                    mrt_s.most_origin_asns = [
-                        mrt_entry(
-                            filename=orig_filename,
-                            origin_asns=origin_asns_prefix[prefix],
-                            prefix=prefix,
-                            timestamp=file_ts,
-                        )
-                    ]
-                elif len(origin_asns_prefix[prefix]) == len(
-                    mrt_s.most_origin_asns[0].origin_asns
-                ):
-                    mrt_s.most_origin_asns.append(
-                        mrt_entry(
-                            filename=orig_filename,
-                            origin_asns=origin_asns_prefix[prefix],
-                            prefix=prefix,
-                            timestamp=file_ts,
-                        )
-                    )
 
-        advt_per_orig_asn_sorted = sorted(
-            advt_per_origin_asn.items(), key=operator.itemgetter(1)
-        )
-        mrt_s.most_advt_origin_asn = [
-            mrt_entry(
-                advt=x[1],
-                filename=orig_filename,
-                origin_asns=set([x[0]]),
-                timestamp=file_ts,
+        mrt_s.total_skipped += updates.skipped
+        if mrt_s.total_skipped:
+            logging.warning(
+                f"Skipped {mrt_s.total_skipped} malformed records in "
+                f"{orig_filename}, skipped/parsed ratio is "
+                f"{mrt_s.skipped_ratio():.6f}"
             )
-            for x in advt_per_orig_asn_sorted
-            if x[1] == advt_per_orig_asn_sorted[-1][1]
-        ]
 
-        # Only get the prefixes with the most unknown attributes
-        for mrt_e in most_unknown_attrs:
-            if not mrt_s.most_unknown_attrs:
-                mrt_s.most_unknown_attrs = [mrt_e]
-            else:
-                if (
-                    len(mrt_e.unknown_attrs)
-                    == len(mrt_s.most_unknown_attrs[0].unknown_attrs)
-                    and mrt_e.unknown_attrs
-                ):
-                    mrt_s.most_unknown_attrs.append(mrt_e)
-                elif len(mrt_e.unknown_attrs) > len(
-                    mrt_s.most_unknown_attrs[0].unknown_attrs
-                ):
-                    mrt_s.most_unknown_attrs = [mrt_e]
+        for collector in collectors:
+            collector.finalize()
 
         return mrt_s
 
     @staticmethod
     def mrt_count(filename: str) -> int:
         """
-        Return the total number of MRT records in an MRT file.
+        Return the total number of MRT records in an MRT file. Only the MRT
+        headers are read, the MRT records aren't decoded.
         """
         if not filename:
             raise ValueError("MRT filename missing")
@@ -1083,7 +457,4 @@ class mrt_parser:
                 errno.ENOENT, os.strerror(errno.ENOENT), filename
             )
 
-        i = 0
-        for _ in mrtparse.Reader(filename):
-            i += 1
-        return i
+        return mrt_walker(filename).walk().total
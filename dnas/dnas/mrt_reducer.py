@@ -0,0 +1,185 @@
+import functools
+import threading
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Callable, Optional, Tuple
+
+from dnas.mrt_parser import mrt_parser
+from dnas.mrt_stats import mrt_stats
+
+
+class mrt_reducer:
+    """
+    Add together the MRT stats of the ranges of an MRT file, as they are
+    parsed in a pool of parser processes.
+
+    Each task returns a compact partial, see mrt_stats.to_partial(). The
+    partials are added together in the pool, see mrt_parser.add_partials(),
+    as a binary tree: the partials of tasks 0 and 1 are added together as
+    soon as both have arrived, as are 2 and 3, and so on, then the sums of
+    those, until only one partial is left, which is decoded in this process.
+    MRT stats aren't always the same when added in a different order, so the
+    shape of the tree only depends on the number of tasks, not the order in
+    which they finish.
+    """
+
+    def __init__(self: "mrt_reducer", pool: Pool) -> None:
+        if not pool:
+            raise ValueError(f"Missing required arguments: pool={pool}")
+
+        # Set once every task has been started, see close()
+        self.closed = False
+        # Number of tasks started
+        self.count = 0
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
+        # Tasks started in the pool which haven't returned
+        self.outstanding = 0
+        # Partials waiting to be added, by (tree level, index in the level)
+        self.partials: dict[Tuple[int, int], bytes] = {}
+        self.pool = pool
+
+    def add_next(self: "mrt_reducer", level: int, index: int) -> None:
+        """
+        Start adding the partial at level and index to its neighbour in the
+        tree, if both have arrived. Must be called with the lock held.
+        """
+        while not self.error:
+            left = (level, index - (index % 2))
+            right = (level, left[1] + 1)
+            if left in self.partials and right in self.partials:
+                self.outstanding += 1
+                try:
+                    self.start(
+                        level + 1,
+                        left[1] // 2,
+                        mrt_parser.add_partials,
+                        (self.partials.pop(left), self.partials.pop(right)),
+                    )
+                except ValueError as e:
+                    # The pool has been stopped
+                    self.outstanding -= 1
+                    self.error = e
+                return
+
+            """
+            Once every task has been started, the last partial of a level
+            with an odd number of them has no neighbour, and moves up the
+            tree as it is, until it reaches the top:
+            """
+            size = self.level_size(level)
+            if (
+                not self.closed
+                or size == 1
+                or right[1] < size
+                or left not in self.partials
+            ):
+                return
+            self.partials[(level + 1, left[1] // 2)] = self.partials.pop(left)
+            level, index = level + 1, left[1] // 2
+
+    def apply(
+        self: "mrt_reducer", func: Callable[..., bytes], args: tuple
+    ) -> AsyncResult:
+        """
+        Start func(*args) in the pool, which returns a partial to be added to
+        the others. Return the result of the task.
+        """
+        with self.lock:
+            if self.closed:
+                raise ValueError("Reducer is closed, no tasks can be added")
+            index = self.count
+            self.count += 1
+            self.outstanding += 1
+            return self.start(0, index, func, args)
+
+    def close(self: "mrt_reducer") -> None:
+        """
+        Mark that every task has been started, the reduction is done once
+        they have all returned and been added together.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            for level, index in list(self.partials):
+                if (level, index) in self.partials:
+                    self.add_next(level, index)
+            self.is_done()
+
+    def fail(self: "mrt_reducer", e: BaseException) -> None:
+        """
+        Record the first error from a task, it's raised by get().
+        """
+        with self.lock:
+            if not self.error:
+                self.error = e
+            self.outstanding -= 1
+            self.is_done()
+
+    def fold(
+        self: "mrt_reducer", level: int, index: int, partial: bytes
+    ) -> None:
+        """
+        Store a partial which has arrived from the pool at level and index in
+        the tree, and add it to its neighbour if it's there.
+        """
+        with self.lock:
+            self.outstanding -= 1
+            self.partials[(level, index)] = partial
+            self.add_next(level, index)
+            self.is_done()
+
+    def get(self: "mrt_reducer") -> mrt_stats:
+        """
+        Wait for every task to return, and return the MRT stats of them all
+        added together. The first error from a task is raised.
+        """
+        self.close()
+        self.done.wait()
+        if self.error:
+            raise self.error
+        if not self.partials:
+            return mrt_stats()
+        return mrt_stats.from_partial(next(iter(self.partials.values())))
+
+    def is_done(self: "mrt_reducer") -> None:
+        """
+        Signal get() once every task has returned and the partials have been
+        added together. Must be called with the lock held.
+        """
+        if self.closed and not self.outstanding:
+            self.done.set()
+
+    def level_size(self: "mrt_reducer", level: int) -> int:
+        """
+        Return the number of partials at level of the tree.
+        """
+        size = self.count
+        for _ in range(level):
+            size = (size + 1) // 2
+        return size
+
+    def ready(self: "mrt_reducer") -> bool:
+        """
+        Return True if every task has been started and has returned.
+        """
+        return self.done.is_set()
+
+    def start(
+        self: "mrt_reducer",
+        level: int,
+        index: int,
+        func: Callable[..., bytes],
+        args: tuple,
+    ) -> AsyncResult:
+        """
+        Start func(*args) in the pool, the partial it returns is stored at
+        level and index in the tree.
+        """
+        return self.pool.apply_async(
+            func,
+            args,
+            callback=functools.partial(self.fold, level, index),
+            error_callback=self.fail,
+        )
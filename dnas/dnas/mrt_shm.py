@@ -0,0 +1,206 @@
+import bz2
+import errno
+import gzip
+import logging
+import os
+from io import BufferedReader
+from multiprocessing import shared_memory
+from multiprocessing.pool import Pool
+from typing import Optional, Union
+
+from dnas.bz2_reader import bz2_reader
+
+
+class mrt_shm:
+    """
+    A decompressed MRT file held in a shared memory segment, which is read
+    like an uncompressed MRT file.
+
+    The segment is created once by create(), then any process can attach to
+    it by name, so that the parser processes read the MRT records straight
+    from memory rather than from a decompressed copy on disk. The process
+    which created the segment must unlink() it.
+    """
+
+    # Magic Number
+    GZIP_MAGIC = b"\x1f\x8b"
+    BZ2_MAGIC = b"\x42\x5a\x68"
+
+    # Number of bytes to decompress at a time
+    READ_SIZE = 1048576
+
+    def __init__(self: "mrt_shm", name: str, size: int = 0) -> None:
+        """
+        Attach to the existing shared memory segment name. Only the first
+        size bytes are read, or the whole segment if size is 0.
+        """
+        if not name:
+            raise ValueError("Shared memory segment name missing")
+
+        if type(name) != str:
+            raise TypeError(f"name is not a string: {type(name)}")
+
+        if type(size) != int or size < 0:
+            raise ValueError(f"Invalid shared memory size: {size}")
+
+        self.closed = False
+        self.name = name
+        self.pos = 0
+        self.shm = shared_memory.SharedMemory(name)
+        """
+        The segment can be rounded up to a whole number of pages, so its
+        size isn't always the size of the MRT data:
+        """
+        self.size = size if size else self.shm.size
+        if self.size > self.shm.size:
+            self.shm.close()
+            raise ValueError(
+                f"Size {size} is larger than shared memory segment {name} "
+                f"({self.shm.size})"
+            )
+        buf = self.shm.buf
+        if buf is None:
+            raise ValueError(f"Shared memory segment {name} is closed")
+        self.buf = buf[: self.size]
+
+    def close(self: "mrt_shm") -> None:
+        """
+        Detach from the shared memory segment, it isn't removed.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.buf.release()
+        self.shm.close()
+
+    def __enter__(self: "mrt_shm") -> "mrt_shm":
+        return self
+
+    def __exit__(self: "mrt_shm", *args: object) -> None:
+        self.close()
+
+    @staticmethod
+    def create(filename: str, pool: Optional[Pool] = None) -> "mrt_shm":
+        """
+        Decompress the MRT file filename into a new shared memory segment,
+        and return it attached. A bz2 MRT file is decompressed across the
+        pool of processes pool if one is passed.
+        """
+        if not filename:
+            raise ValueError("MRT filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        with open(filename, "rb") as f:
+            hdr = f.read(len(mrt_shm.BZ2_MAGIC))
+
+        src: Union[bz2.BZ2File, bz2_reader, gzip.GzipFile, BufferedReader]
+        if hdr.startswith(mrt_shm.BZ2_MAGIC):
+            src = bz2_reader.open_file(filename, pool=pool)
+        elif hdr.startswith(mrt_shm.GZIP_MAGIC):
+            src = gzip.GzipFile(filename, "rb")
+        else:
+            src = open(filename, "rb")
+
+        """
+        The decompressed size isn't known in advance. The pages of the
+        segment are only allocated as they are written, and each block is
+        freed once it's copied, so the data is only held in memory once. A
+        truncated compressed MRT file raises EOFError before the segment is
+        created:
+        """
+        blocks = []
+        try:
+            while True:
+                block = src.read(mrt_shm.READ_SIZE)
+                if not block:
+                    break
+                blocks.append(block)
+        finally:
+            src.close()
+
+        size = sum(len(block) for block in blocks)
+        # A shared memory segment can't be empty
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        name = shm.name
+        shm.close()
+
+        mrt_s = mrt_shm(name, size)
+        p = 0
+        blocks.reverse()
+        while blocks:
+            block = blocks.pop()
+            mrt_s.buf[p : p + len(block)] = block
+            p += len(block)
+
+        logging.debug(
+            f"Decompressed {filename} into shared memory segment {name} "
+            f"({size} bytes)"
+        )
+        return mrt_s
+
+    @staticmethod
+    def from_bytes(data: Union[bytes, memoryview]) -> "mrt_shm":
+        """
+        Copy data into a new shared memory segment, and return it attached.
+        """
+        # A shared memory segment can't be empty
+        if not len(data):
+            raise ValueError("No data to copy into shared memory")
+
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        name = shm.name
+        shm.close()
+
+        mrt_s = mrt_shm(name, len(data))
+        mrt_s.buf[:] = data
+        return mrt_s
+
+    def read(self: "mrt_shm", size: int = -1) -> bytes:
+        """
+        Return up to size bytes from the read position, or all of the
+        remaining bytes if size is negative. Return b"" at the end.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        end = self.size if size < 0 else min(self.pos + size, self.size)
+        data = bytes(self.buf[self.pos : end])
+        self.pos = max(self.pos, end)
+        return data
+
+    def seek(self: "mrt_shm", offset: int, whence: int = os.SEEK_SET) -> int:
+        """
+        Move the read position, like a file object.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        if whence == os.SEEK_CUR:
+            offset += self.pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+
+        self.pos = offset
+        return self.pos
+
+    def tell(self: "mrt_shm") -> int:
+        return self.pos
+
+    def unlink(self: "mrt_shm") -> None:
+        """
+        Remove the shared memory segment, once no process needs it.
+        """
+        self.close()
+        self.shm.unlink()
@@ -3,35 +3,42 @@ import errno
 import gzip
 import logging
 import os
+import struct
 from io import BufferedReader
-from typing import NoReturn, Tuple, Union
+from multiprocessing.pool import Pool
+from typing import BinaryIO, Iterator, NoReturn, Optional, Tuple, Union
 
+from dnas.bz2_reader import bz2_reader
+from dnas.config import config as cfg
 from dnas.mrt_archives import mrt_archives
-
-
-class MrtFormatError(Exception):
-    """
-    Exception for invalid MRT formatted data.
-    """
-
-    def __init__(self: "MrtFormatError", message: str = "") -> None:
-        Exception.__init__(self)
-        self.message = message
-
-    def __str__(self: "MrtFormatError") -> str:
-        if self.message:
-            return self.message
-        else:
-            return "MrtFormatError"
+from dnas.mrt_format_error import MrtFormatError
+from dnas.mrt_index import mrt_index
 
 
 class mrt_splitter:
     """
     Splitter for MRT files.
     Copy-pasta of the original mrtparser lib to split an MRT file into N files.
+
+    Large blocks are read from the (decompressed) MRT file into a read
+    buffer, and each MRT record is returned as a memoryview of it, so that
+    the MRT records aren't copied until they are written to a chunk. A bz2
+    MRT file is decompressed across the pool of processes pool, if one is
+    passed.
     """
 
-    def __init__(self: "mrt_splitter", filename: str) -> None:
+    # Number of bytes to read from the MRT file at a time
+    READ_SIZE = 1048576
+
+    # Size of the write buffer of each chunk file
+    WRITE_SIZE = 1048576
+
+    # Length field of the MRT header
+    MRT_LEN = struct.Struct(">I")
+
+    def __init__(
+        self: "mrt_splitter", filename: str, pool: Optional[Pool] = None
+    ) -> None:
         if not filename:
             raise ValueError("MRT filename missing")
 
@@ -43,9 +50,15 @@ class mrt_splitter:
                 errno.ENOENT, os.strerror(errno.ENOENT), filename
             )
 
-        self.data: bytearray
-        self.f: Union[bz2.BZ2File, gzip.GzipFile, BufferedReader]
+        # Byte range and first/last timestamp of each contiguous chunk
+        self.chunk_ranges: list[Tuple[int, int]] = []
+        self.chunk_times: list[Tuple[int, int]] = []
+        self.buf = b""
+        self.data: memoryview
+        self.f: Union[bz2.BZ2File, bz2_reader, gzip.GzipFile, BufferedReader]
         self.filename = filename
+        self.pool = pool
+        self.pos = 0
 
         # Magic Number
         GZIP_MAGIC = b"\x1f\x8b"
@@ -56,7 +69,7 @@ class mrt_splitter:
         f.close()
 
         if hdr.startswith(BZ2_MAGIC):
-            self.f = bz2.BZ2File(filename, "rb")
+            self.f = bz2_reader.open_file(filename, pool=pool)
             logging.debug("Assuming BZ2 file")
         elif hdr.startswith(GZIP_MAGIC):
             self.f = gzip.GzipFile(filename, "rb")
@@ -77,36 +90,121 @@ class mrt_splitter:
 
     def __next__(self: "mrt_splitter") -> "mrt_splitter":
         """
-        Move to the next entry in the MRT file.
+        Move to the next entry in the MRT file. The entry data is only valid
+        until the next call.
         """
-        try:
-            mrt_entry = bytearray(self.f.read(12))
-        except EOFError:
-            self.close()
-            raise
-
-        if len(mrt_entry) == 0:
-            self.close()
-        elif len(mrt_entry) < 12:
+        if self.f.closed:
+            raise StopIteration
+
+        if not self.fill(12):
+            remaining = len(self.buf) - self.pos
+            if remaining == 0:
+                self.close()
             raise MrtFormatError(
-                f"Invalid MRT header length {len(mrt_entry)} < 12 bytes"
+                f"Invalid MRT header length {remaining} < 12 bytes"
             )
 
-        val = 0
-        length = 0
-        for i in mrt_entry[-4:]:
-            length = (length << 8) + i
+        length = mrt_splitter.MRT_LEN.unpack_from(self.buf, self.pos + 8)[0]
 
-        mrt_entry += bytes(self.f.read(length))
-        self.data = mrt_entry
+        # A truncated MRT record is returned as it is
+        self.fill(12 + length)
+        end = min(self.pos + 12 + length, len(self.buf))
+        self.data = memoryview(self.buf)[self.pos : end]
+        self.pos = end
 
         return self
 
+    def chunks(self: "mrt_splitter", size: int) -> Iterator[memoryview]:
+        """
+        Yield the rest of the MRT file in chunks of whole MRT records, of up
+        to size bytes unless one MRT record is larger. A truncated MRT record
+        at the end of the MRT file is yielded in a chunk of its own. Only one
+        chunk is held in memory at a time, each is only valid until the next
+        one is read.
+        """
+        if not size or not isinstance(size, int) or size < 12:
+            raise ValueError(
+                f"Chunk size must be an integer of at least 12, not {size}"
+            )
+
+        while True:
+            at_end = not self.fill(size)
+            if self.pos == len(self.buf):
+                self.f.close()
+                return
+
+            limit = min(self.pos + size, len(self.buf))
+            end = self.pos
+            while end + 12 <= limit:
+                length = mrt_splitter.MRT_LEN.unpack_from(self.buf, end + 8)[0]
+                if end + 12 + length > limit:
+                    break
+                end += 12 + length
+
+            if end == self.pos:
+                if at_end:
+                    end = len(self.buf)
+                else:
+                    # One MRT record which is larger than size
+                    length = mrt_splitter.MRT_LEN.unpack_from(
+                        self.buf, self.pos + 8
+                    )[0]
+                    self.fill(12 + length)
+                    end = min(self.pos + 12 + length, len(self.buf))
+
+            chunk = memoryview(self.buf)[self.pos : end]
+            self.pos = end
+            yield chunk
+
+    def copy(self: "mrt_splitter", size: int, f: BinaryIO) -> int:
+        """
+        Copy the next size bytes of the MRT file to f, or the rest of the MRT
+        file if size is negative, without splitting it into MRT records.
+        Return the number of bytes copied.
+        """
+        copied = 0
+        while size < 0 or copied < size:
+            if self.pos == len(self.buf) and not self.fill(1):
+                break
+            end = len(self.buf)
+            if size >= 0:
+                end = min(end, self.pos + size - copied)
+            f.write(memoryview(self.buf)[self.pos : end])
+            copied += end - self.pos
+            self.pos = end
+        return copied
+
+    def fill(self: "mrt_splitter", n: int) -> bool:
+        """
+        Ensure there are at least n unread bytes in the read buffer.
+        Return False if the end of the MRT file is reached first. A truncated
+        compressed MRT file raises EOFError.
+        """
+        while len(self.buf) - self.pos < n:
+            try:
+                data = self.f.read(max(mrt_splitter.READ_SIZE, n))
+            except EOFError:
+                self.f.close()
+                raise
+            if not data:
+                return False
+            # Views of the old buffer returned by __next__ remain valid
+            self.buf = self.buf[self.pos :] + data
+            self.pos = 0
+        return True
+
     def split(
-        self: "mrt_splitter", no_chunks: int, outdir: str
+        self: "mrt_splitter", no_chunks: int, outdir: str, mode: str = ""
     ) -> Tuple[int, list[str]]:
         """
-        Split the MRT data into N equal sized chunks written to disk.
+        Split the MRT data into N chunks written to disk, using the split mode
+        mode, or cfg.SPLIT_MODE if mode isn't specified:
+        "contiguous" chunks are contiguous ranges of MRT records of roughly
+        equal size, "time" chunks are contiguous ranges of MRT records which
+        cover roughly equal time windows, "round_robin" deals the MRT records
+        out to each chunk in turn.
+        The byte range and first/last timestamp of each contiguous chunk are
+        stored in chunk_ranges and chunk_times.
         Return the total number of MRT entries and the list of chunk filenames.
         """
         if not self.f:
@@ -118,14 +216,51 @@ class mrt_splitter:
                 f"integer, not {no_chunks}"
             )
 
+        if not mode:
+            mode = cfg.SPLIT_MODE
+
+        if mode not in cfg.SPLIT_MODES:
+            raise ValueError(
+                f"Unknown split mode {mode}, must be one of {cfg.SPLIT_MODES}"
+            )
+
         # If no output dir is specified, write to the input directory:
         if not outdir:
             outdir = os.path.dirname(self.filename)
 
+        """
+        The chunk boundaries of contiguous chunks are found from the MRT
+        headers, before the MRT records are split. A compressed MRT file is
+        only decompressed once, to a copy on disk which is indexed and then
+        split, and the copy is removed afterwards unless it already existed:
+        """
+        offset_ranges: list[Tuple[int, int]] = []
+        mrt_copy = ""
+        if mode != "round_robin":
+            index = mrt_index(self.filename)
+            if index.mrt_path != self.filename and not os.path.isfile(
+                index.mrt_path
+            ):
+                mrt_copy = index.mrt_path
+            index.build(pool=self.pool)
+            offset_ranges = index.ranges(no_chunks, by_time=(mode == "time"))
+            self.chunk_ranges = offset_ranges
+            self.chunk_times = [
+                index.range_times(start, end) for start, end in offset_ranges
+            ]
+            self.f.close()
+            self.f = open(index.mrt_path, "rb")
+            self.buf = b""
+            self.pos = 0
+
         # Skip the peer table which is the first entry in the RIB dump
+        offset = 0
+        peer_table = 0
         mrt_a = mrt_archives()
         if mrt_a.is_rib_from_filename(self.filename):
             next(self)
+            offset = len(self.data)
+            peer_table = 1
 
         chunk_filenames = []
         chunk_fds = []
@@ -137,16 +272,35 @@ class mrt_splitter:
                 outdir, os.path.basename(self.filename) + "_" + str(i)
             )
             logging.debug(f"Opening {chunk_outpath} for output")
-            f = open(chunk_outpath, "wb")
+            f = open(chunk_outpath, "wb", buffering=mrt_splitter.WRITE_SIZE)
             chunk_fds.append(f)
 
-        for idx, entry in enumerate(self):
-            chunk_fds[idx % no_chunks].write(entry.data)
-            total = idx + 1
+        if mode == "round_robin":
+            for idx, entry in enumerate(self):
+                chunk_fds[idx % no_chunks].write(entry.data)
+                total = idx + 1
+        else:
+            """
+            Each chunk is a contiguous byte range of the MRT file, which is
+            copied in blocks without splitting it into MRT records. The last
+            chunk also gets any trailing bytes which weren't indexed:
+            """
+            for chunk, (start, end) in enumerate(offset_ranges):
+                if chunk == len(offset_ranges) - 1:
+                    offset += self.copy(-1, chunk_fds[chunk])
+                elif end > offset:
+                    offset += self.copy(end - offset, chunk_fds[chunk])
+            total = max(len(index) - peer_table, 0)
+            self.f.close()
+            if mrt_copy:
+                os.remove(mrt_copy)
 
         for i in range(0, len(chunk_fds)):
             chunk_fds[i].close()
 
-        logging.debug(f"Split {total} mrt_entries into {no_chunks} files.")
+        logging.debug(
+            f"Split {total} mrt_entries into {no_chunks} files using "
+            f"{mode} mode."
+        )
 
         return total, chunk_filenames
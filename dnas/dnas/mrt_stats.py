@@ -1,7 +1,11 @@
 import datetime
+import functools
 import json
+import pickle
+from typing import Callable, Hashable, Iterable, Optional, Tuple
 
 from dnas.config import config as cfg
+from dnas.leaderboard import leaderboard
 from dnas.mrt_archive import mrt_archive
 from dnas.mrt_entry import mrt_entry
 
@@ -12,6 +16,143 @@ class mrt_stats:
     This stores the stats from a parsed data source (i.e. a BGP MRT dump).
     """
 
+    """
+    Each stat is a leaderboard of the MRT entries with the highest metric,
+    which are unique by key. For each stat this is (metric, key, zero_ties,
+    the function to add two entries with the same key together, and the
+    function to merge two entries with the same key together):
+    """
+    LEADERBOARDS: dict[
+        str,
+        Tuple[
+            Callable[[mrt_entry], int],
+            Callable[[mrt_entry], Hashable],
+            bool,
+            Optional[Callable[[mrt_entry, mrt_entry], Optional[mrt_entry]]],
+            Optional[Callable[[mrt_entry, mrt_entry], Optional[mrt_entry]]],
+        ],
+    ] = {
+        "bogon_origin_asns": (
+            lambda e: len(e.origin_asns),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_origin_asns,
+            None,
+        ),
+        "bogon_prefixes": (
+            lambda e: len(e.origin_asns),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_origin_asns,
+            None,
+        ),
+        "highest_med_prefixes": (
+            lambda e: e.med,
+            lambda e: e.prefix,
+            True,
+            None,
+            None,
+        ),
+        "invalid_len": (
+            lambda e: len(e.origin_asns),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_origin_asns,
+            None,
+        ),
+        "longest_as_path": (
+            lambda e: len(e.as_path),
+            lambda e: e.prefix,
+            True,
+            None,
+            None,
+        ),
+        "longest_comm_set": (
+            lambda e: len(e.comm_set),
+            lambda e: e.prefix,
+            True,
+            None,
+            None,
+        ),
+        "most_advt_prefixes": (
+            lambda e: e.advt,
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_bogon_asns": (
+            lambda e: len(e.origin_asns),
+            lambda e: tuple(e.as_path),
+            False,
+            mrt_entry.add_bogon_asns,
+            None,
+        ),
+        "most_upd_prefixes": (
+            lambda e: e.updates,
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_withd_prefixes": (
+            lambda e: e.withdraws,
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_advt_origin_asn": (
+            lambda e: e.advt,
+            lambda e: frozenset(e.origin_asns),
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_advt_peer_asn": (
+            lambda e: e.advt,
+            lambda e: e.peer_asn,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_upd_peer_asn": (
+            lambda e: e.updates,
+            lambda e: e.peer_asn,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_withd_peer_asn": (
+            lambda e: e.withdraws,
+            lambda e: e.peer_asn,
+            False,
+            mrt_entry.add_counters,
+            None,
+        ),
+        "most_origin_asns": (
+            lambda e: len(e.origin_asns),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_origin_asns,
+            mrt_entry.merge_origin_asns,
+        ),
+        "most_unknown_attrs": (
+            lambda e: len(e.unknown_attrs),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_unknown_attrs,
+            None,
+        ),
+        "most_unreg_origins": (
+            lambda e: len(e.origin_asns),
+            lambda e: e.prefix,
+            False,
+            mrt_entry.add_origin_asns,
+            None,
+        ),
+    }
+
     def __init__(self: "mrt_stats") -> None:
         self.archive_list: set[str] = (
             set()
@@ -38,6 +179,22 @@ class mrt_stats:
         self.total_upd: int = 0  # All updates received/parsed
         self.total_advt: int = 0  # Updates signalling prefix advertisement
         self.total_withd: int = 0  # Updates signalling prefix withdrawal
+        self.total_skipped: int = 0  # Malformed records/updates skipped
+        # Loaders of the stats not decoded yet, see set_lazy()
+        self.__lazy_stats: dict[str, Callable[[], list[mrt_entry]]] = {}
+
+    def __getattr__(self: "mrt_stats", name: str) -> list[mrt_entry]:
+        """
+        Decode a stat which is loaded lazily, see set_lazy(), the first time
+        it's accessed. This is only called for attributes which aren't set.
+        """
+        if name == "_mrt_stats__lazy_stats" or name not in self.__lazy_stats:
+            raise AttributeError(
+                f"'mrt_stats' object has no attribute '{name}'"
+            )
+        entries = self.__lazy_stats.pop(name)()
+        setattr(self, name, entries)
+        return entries
 
     def add(self: "mrt_stats", merge_data: "mrt_stats") -> bool:
         """
@@ -65,917 +222,10 @@ class mrt_stats:
 
         changed = False
 
-        # Prefixes with most bogon origin ASN
-        tmp: list[mrt_entry] = []
-        for u_e in merge_data.bogon_origin_asns[:]:
-            for res_e in self.bogon_origin_asns:
-                if (
-                    res_e.prefix == u_e.prefix
-                    and res_e.origin_asns != u_e.origin_asns
-                ):
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.bogon_origin_asns[0].origin_asns
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.bogon_origin_asns
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.bogon_origin_asns.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.bogon_origin_asns[0].origin_asns
-                ):
-                    self.bogon_origin_asns = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.bogon_origin_asns:
-                if self.bogon_origin_asns:
-                    if (
-                        len(merge_data.bogon_origin_asns[0].origin_asns)
-                        == len(self.bogon_origin_asns[0].origin_asns)
-                        and len(self.bogon_origin_asns[0].origin_asns) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.bogon_origin_asns
-                        ]
-                        for mrt_e in merge_data.bogon_origin_asns:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.bogon_origin_asns.append(mrt_e)
-                                changed = True
-                    elif len(
-                        merge_data.bogon_origin_asns[0].origin_asns
-                    ) > len(self.bogon_origin_asns[0].origin_asns):
-                        self.bogon_origin_asns = (
-                            merge_data.bogon_origin_asns.copy()
-                        )
-                        changed = True
-                else:
-                    self.bogon_origin_asns = (
-                        merge_data.bogon_origin_asns.copy()
-                    )
-                    changed = True
-
-        # Bogons prefixes with most origin ASNs
-        tmp = []
-        for u_e in merge_data.bogon_prefixes[:]:
-            for res_e in self.bogon_prefixes:
-                if (
-                    res_e.prefix == u_e.prefix
-                    and res_e.origin_asns != u_e.origin_asns
-                ):
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.bogon_prefixes[0].origin_asns
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.bogon_prefixes
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.bogon_prefixes.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.bogon_prefixes[0].origin_asns
-                ):
-                    self.bogon_prefixes = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.bogon_prefixes:
-                if self.bogon_prefixes:
-                    if (
-                        len(merge_data.bogon_prefixes[0].origin_asns)
-                        == len(self.bogon_prefixes[0].origin_asns)
-                        and len(self.bogon_prefixes[0].origin_asns) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.bogon_prefixes
-                        ]
-                        for mrt_e in merge_data.bogon_prefixes:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.bogon_prefixes.append(mrt_e)
-                                changed = True
-                    elif len(merge_data.bogon_prefixes[0].origin_asns) > len(
-                        self.bogon_prefixes[0].origin_asns
-                    ):
-                        self.bogon_prefixes = merge_data.bogon_prefixes.copy()
-                        changed = True
-                else:
-                    self.bogon_prefixes = merge_data.bogon_prefixes.copy()
-                    changed = True
-
-        # Prefixes with most unregistered origin ASN
-        tmp = []
-        for u_e in merge_data.most_unreg_origins[:]:
-            for res_e in self.most_unreg_origins:
-                if (
-                    res_e.prefix == u_e.prefix
-                    and res_e.origin_asns != u_e.origin_asns
-                ):
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.most_unreg_origins[0].origin_asns
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_unreg_origins
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.most_unreg_origins.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.most_unreg_origins[0].origin_asns
-                ):
-                    self.most_unreg_origins = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_unreg_origins:
-                if self.most_unreg_origins:
-                    if (
-                        len(merge_data.most_unreg_origins[0].origin_asns)
-                        == len(self.most_unreg_origins[0].origin_asns)
-                        and len(self.most_unreg_origins[0].origin_asns) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_unreg_origins
-                        ]
-                        for mrt_e in merge_data.most_unreg_origins:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_unreg_origins.append(mrt_e)
-                                changed = True
-                    elif len(
-                        merge_data.most_unreg_origins[0].origin_asns
-                    ) > len(self.most_unreg_origins[0].origin_asns):
-                        self.most_unreg_origins = (
-                            merge_data.most_unreg_origins.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_unreg_origins = (
-                        merge_data.most_unreg_origins.copy()
-                    )
-                    changed = True
-
-        # Highest MED
-        if merge_data.highest_med_prefixes:
-            if self.highest_med_prefixes:
-                if (
-                    merge_data.highest_med_prefixes[0].med
-                    == self.highest_med_prefixes[0].med
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.highest_med_prefixes
-                    ]
-                    s_med = self.highest_med_prefixes[0].med
-                    for mrt_e in merge_data.highest_med_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.highest_med_prefixes.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.highest_med_prefixes[0].med
-                    > self.highest_med_prefixes[0].med
-                ):
-                    self.highest_med_prefixes = (
-                        merge_data.highest_med_prefixes.copy()
-                    )
-                    changed = True
-            else:
-                self.highest_med_prefixes = (
-                    merge_data.highest_med_prefixes.copy()
-                )
+        for stat in mrt_stats.LEADERBOARDS:
+            if self.add_stat(stat, merge_data):
                 changed = True
 
-        # Invalid prefix length with most origin ASNs
-        tmp = []
-        for u_e in merge_data.invalid_len[:]:
-            for res_e in self.invalid_len:
-                if (
-                    res_e.prefix == u_e.prefix
-                    and res_e.origin_asns != u_e.origin_asns
-                ):
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.invalid_len[0].origin_asns
-                ):
-                    s_prefixes = [mrt_e.prefix for mrt_e in self.invalid_len]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.invalid_len.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.invalid_len[0].origin_asns
-                ):
-                    self.invalid_len = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.invalid_len:
-                if self.invalid_len:
-                    if (
-                        len(merge_data.invalid_len[0].origin_asns)
-                        == len(self.invalid_len[0].origin_asns)
-                        and len(self.invalid_len[0].origin_asns) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.invalid_len
-                        ]
-                        for mrt_e in merge_data.invalid_len:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.invalid_len.append(mrt_e)
-                                changed = True
-                    elif len(merge_data.invalid_len[0].origin_asns) > len(
-                        self.invalid_len[0].origin_asns
-                    ):
-                        self.invalid_len = merge_data.invalid_len.copy()
-                        changed = True
-                else:
-                    self.invalid_len = merge_data.invalid_len.copy()
-                    changed = True
-
-        # Longest AS path
-        if merge_data.longest_as_path:
-            if self.longest_as_path:
-                if len(merge_data.longest_as_path[0].as_path) == len(
-                    self.longest_as_path[0].as_path
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.longest_as_path
-                    ]
-                    s_paths = [mrt_e.as_path for mrt_e in self.longest_as_path]
-                    for mrt_e in merge_data.longest_as_path:
-                        if mrt_e.prefix in s_prefixes:
-                            if mrt_e.as_path not in s_paths:
-                                self.longest_as_path.append(mrt_e)
-                                changed = True
-                        else:
-                            self.longest_as_path.append(mrt_e)
-                            changed = True
-                elif len(merge_data.longest_as_path[0].as_path) > len(
-                    self.longest_as_path[0].as_path
-                ):
-                    self.longest_as_path = merge_data.longest_as_path.copy()
-                    changed = True
-            else:
-                self.longest_as_path = merge_data.longest_as_path.copy()
-                changed = True
-
-        # Longest community set
-        if merge_data.longest_comm_set:
-            if self.longest_comm_set:
-                if len(merge_data.longest_comm_set[0].comm_set) == len(
-                    self.longest_comm_set[0].comm_set
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.longest_comm_set
-                    ]
-                    s_comms = [
-                        mrt_e.comm_set for mrt_e in self.longest_comm_set
-                    ]
-                    for mrt_e in merge_data.longest_comm_set:
-                        if mrt_e.prefix in s_prefixes:
-                            if mrt_e.comm_set not in s_comms:
-                                self.longest_comm_set.append(mrt_e)
-                                changed = True
-                        else:
-                            self.longest_comm_set.append(mrt_e)
-                            changed = True
-                elif len(merge_data.longest_comm_set[0].comm_set) > len(
-                    self.longest_comm_set[0].comm_set
-                ):
-                    self.longest_comm_set = merge_data.longest_comm_set.copy()
-                    changed = True
-            else:
-                self.longest_comm_set = merge_data.longest_comm_set.copy()
-                changed = True
-
-        # Most advertisements per prefix
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_advt_prefixes[:]:
-            for res_e in self.most_advt_prefixes:
-                if res_e.prefix == u_e.prefix:
-                    tmp.append(
-                        mrt_entry(
-                            advt=(res_e.advt + u_e.advt),
-                            filename=u_e.filename,
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.advt == self.most_advt_prefixes[0].advt:
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_advt_prefixes
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.most_advt_prefixes.append(tmp_e)
-                        changed = True
-                elif tmp_e.advt > self.most_advt_prefixes[0].advt:
-                    self.most_advt_prefixes = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_advt_prefixes:
-                if self.most_advt_prefixes:
-                    if (
-                        merge_data.most_advt_prefixes[0].advt
-                        == self.most_advt_prefixes[0].advt
-                        and self.most_advt_prefixes[0].advt > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_advt_prefixes
-                        ]
-                        for mrt_e in merge_data.most_advt_prefixes:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_advt_prefixes.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_advt_prefixes[0].advt
-                        > self.most_advt_prefixes[0].advt
-                    ):
-                        self.most_advt_prefixes = (
-                            merge_data.most_advt_prefixes.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_advt_prefixes = (
-                        merge_data.most_advt_prefixes.copy()
-                    )
-                    changed = True
-
-        # Most bogon ASNs per origin ASN
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_bogon_asns[:]:
-            for res_e in self.most_bogon_asns:
-                if res_e.as_path == u_e.as_path:
-                    tmp.append(
-                        mrt_entry(
-                            as_path=res_e.as_path,
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            filename=res_e.filename,
-                            timestamp=res_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.most_bogon_asns[0].origin_asns
-                ):
-                    s_asns = [mrt_e.as_path for mrt_e in self.most_bogon_asns]
-                    if tmp_e.as_path not in s_asns:
-                        self.most_bogon_asns.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.most_bogon_asns[0].origin_asns
-                ):
-                    self.most_bogon_asns = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_bogon_asns:
-                if self.most_bogon_asns:
-                    if (
-                        len(merge_data.most_bogon_asns[0].origin_asns)
-                        == len(self.most_bogon_asns[0].origin_asns)
-                        and len(self.most_bogon_asns[0].origin_asns) > 0
-                    ):
-                        s_asns = [
-                            mrt_e.as_path for mrt_e in self.most_bogon_asns
-                        ]
-                        for mrt_e in merge_data.most_bogon_asns:
-                            if mrt_e.as_path not in s_asns:
-                                self.most_bogon_asns.append(mrt_e)
-                                changed = True
-                    elif len(merge_data.most_bogon_asns[0].origin_asns) > len(
-                        self.most_bogon_asns[0].origin_asns
-                    ):
-                        self.most_bogon_asns = (
-                            merge_data.most_bogon_asns.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_bogon_asns = merge_data.most_bogon_asns.copy()
-                    changed = True
-
-        # Most updates per prefix
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_upd_prefixes[:]:
-            for res_e in self.most_upd_prefixes:
-                if res_e.prefix == u_e.prefix:
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                            updates=(res_e.updates + u_e.updates),
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.updates == self.most_upd_prefixes[0].updates:
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_upd_prefixes
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.most_upd_prefixes.append(tmp_e)
-                        changed = True
-                elif tmp_e.updates > self.most_upd_prefixes[0].updates:
-                    self.most_upd_prefixes = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_upd_prefixes:
-                if self.most_upd_prefixes:
-                    if (
-                        merge_data.most_upd_prefixes[0].updates
-                        == self.most_upd_prefixes[0].updates
-                        and self.most_upd_prefixes[0].updates > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_upd_prefixes
-                        ]
-                        for mrt_e in merge_data.most_upd_prefixes:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_upd_prefixes.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_upd_prefixes[0].updates
-                        > self.most_upd_prefixes[0].updates
-                    ):
-                        self.most_upd_prefixes = (
-                            merge_data.most_upd_prefixes.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_upd_prefixes = (
-                        merge_data.most_upd_prefixes.copy()
-                    )
-                    changed = True
-
-        # Most withdraws per prefix
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_withd_prefixes[:]:
-            for res_e in self.most_withd_prefixes:
-                if res_e.prefix == u_e.prefix:
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            prefix=res_e.prefix,
-                            timestamp=u_e.timestamp,
-                            withdraws=(res_e.withdraws + u_e.withdraws),
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.withdraws == self.most_withd_prefixes[0].withdraws:
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_withd_prefixes
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.most_withd_prefixes.append(tmp_e)
-                        changed = True
-                elif tmp_e.withdraws > self.most_withd_prefixes[0].withdraws:
-                    self.most_withd_prefixes = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_withd_prefixes:
-                if self.most_withd_prefixes:
-                    if (
-                        merge_data.most_withd_prefixes[0].withdraws
-                        == self.most_withd_prefixes[0].withdraws
-                        and self.most_withd_prefixes[0].withdraws > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_withd_prefixes
-                        ]
-                        for mrt_e in merge_data.most_withd_prefixes:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_withd_prefixes.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_withd_prefixes[0].withdraws
-                        > self.most_withd_prefixes[0].withdraws
-                    ):
-                        self.most_withd_prefixes = (
-                            merge_data.most_withd_prefixes.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_withd_prefixes = (
-                        merge_data.most_withd_prefixes.copy()
-                    )
-                    changed = True
-
-        # Most advertisement per origin ASN
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_advt_origin_asn[:]:
-            for res_e in self.most_advt_origin_asn:
-                if res_e.origin_asns == u_e.origin_asns:
-                    tmp.append(
-                        mrt_entry(
-                            advt=(res_e.advt + u_e.advt),
-                            filename=u_e.filename,
-                            origin_asns=res_e.origin_asns,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.advt == self.most_advt_origin_asn[0].advt:
-                    s_origin_asns = [
-                        mrt_e.origin_asns
-                        for mrt_e in self.most_advt_origin_asn
-                    ]
-                    if tmp_e.origin_asns not in s_origin_asns:
-                        self.most_advt_origin_asn.append(tmp_e)
-                        changed = True
-                elif tmp_e.advt > self.most_advt_origin_asn[0].advt:
-                    self.most_advt_origin_asn = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_advt_origin_asn:
-                if self.most_advt_origin_asn:
-                    if (
-                        merge_data.most_advt_origin_asn[0].advt
-                        == self.most_advt_origin_asn[0].advt
-                        and self.most_advt_origin_asn[0].advt > 0
-                    ):
-                        s_origin_asns = [
-                            mrt_e.origin_asns
-                            for mrt_e in self.most_advt_origin_asn
-                        ]
-                        for mrt_e in merge_data.most_advt_origin_asn:
-                            if mrt_e.origin_asns not in s_origin_asns:
-                                self.most_advt_origin_asn.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_advt_origin_asn[0].advt
-                        > self.most_advt_origin_asn[0].advt
-                    ):
-                        self.most_advt_origin_asn = (
-                            merge_data.most_advt_origin_asn.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_advt_origin_asn = (
-                        merge_data.most_advt_origin_asn.copy()
-                    )
-                    changed = True
-
-        # Most advertisement per peer ASN
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_advt_peer_asn[:]:
-            for res_e in self.most_advt_peer_asn:
-                if res_e.peer_asn == u_e.peer_asn:
-                    tmp.append(
-                        mrt_entry(
-                            advt=(res_e.advt + u_e.advt),
-                            filename=u_e.filename,
-                            peer_asn=res_e.peer_asn,
-                            timestamp=u_e.timestamp,
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.advt == self.most_advt_peer_asn[0].advt:
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_advt_peer_asn
-                    ]
-                    if tmp_e.peer_asn not in s_peer_asns:
-                        self.most_advt_peer_asn.append(tmp_e)
-                        changed = True
-                elif tmp_e.advt > self.most_advt_peer_asn[0].advt:
-                    self.most_advt_peer_asn = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_advt_peer_asn:
-                if self.most_advt_peer_asn:
-                    if (
-                        merge_data.most_advt_peer_asn[0].advt
-                        == self.most_advt_peer_asn[0].advt
-                        and self.most_advt_peer_asn[0].advt > 0
-                    ):
-                        s_peer_asns = [
-                            mrt_e.peer_asn for mrt_e in self.most_advt_peer_asn
-                        ]
-                        for mrt_e in merge_data.most_advt_peer_asn:
-                            if mrt_e.peer_asn not in s_peer_asns:
-                                self.most_advt_peer_asn.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_advt_peer_asn[0].advt
-                        > self.most_advt_peer_asn[0].advt
-                    ):
-                        self.most_advt_peer_asn = (
-                            merge_data.most_advt_peer_asn.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_advt_peer_asn = (
-                        merge_data.most_advt_peer_asn.copy()
-                    )
-                    changed = True
-
-        # Most updates per peer ASN
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_upd_peer_asn[:]:
-            for res_e in self.most_upd_peer_asn:
-                if res_e.peer_asn == u_e.peer_asn:
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            peer_asn=res_e.peer_asn,
-                            timestamp=u_e.timestamp,
-                            updates=(res_e.updates + u_e.updates),
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.updates == self.most_upd_peer_asn[0].updates:
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_upd_peer_asn
-                    ]
-                    if tmp_e.peer_asn not in s_peer_asns:
-                        self.most_upd_peer_asn.append(tmp_e)
-                        changed = True
-                elif tmp_e.updates > self.most_upd_peer_asn[0].updates:
-                    self.most_upd_peer_asn = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_upd_peer_asn:
-                if self.most_upd_peer_asn:
-                    if (
-                        merge_data.most_upd_peer_asn[0].updates
-                        == self.most_upd_peer_asn[0].updates
-                        and self.most_upd_peer_asn[0].updates > 0
-                    ):
-                        s_peer_asns = [
-                            mrt_e.peer_asn for mrt_e in self.most_upd_peer_asn
-                        ]
-                        for mrt_e in merge_data.most_upd_peer_asn:
-                            if mrt_e.peer_asn not in s_peer_asns:
-                                self.most_upd_peer_asn.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_upd_peer_asn[0].updates
-                        > self.most_upd_peer_asn[0].updates
-                    ):
-                        self.most_upd_peer_asn = (
-                            merge_data.most_upd_peer_asn.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_upd_peer_asn = (
-                        merge_data.most_upd_peer_asn.copy()
-                    )
-                    changed = True
-
-        # Most withdraws per peer ASN
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_withd_peer_asn[:]:
-            for res_e in self.most_withd_peer_asn:
-                if res_e.peer_asn == u_e.peer_asn:
-                    tmp.append(
-                        mrt_entry(
-                            filename=u_e.filename,
-                            peer_asn=res_e.peer_asn,
-                            timestamp=u_e.timestamp,
-                            withdraws=(res_e.withdraws + u_e.withdraws),
-                        )
-                    )
-
-        if tmp:
-            for tmp_e in tmp:
-                if tmp_e.withdraws == self.most_withd_peer_asn[0].withdraws:
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_withd_peer_asn
-                    ]
-                    if tmp_e.peer_asn not in s_peer_asns:
-                        self.most_withd_peer_asn.append(tmp_e)
-                        changed = True
-                elif tmp_e.withdraws > self.most_withd_peer_asn[0].withdraws:
-                    self.most_withd_peer_asn = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_withd_peer_asn:
-                if self.most_withd_peer_asn:
-                    if (
-                        merge_data.most_withd_peer_asn[0].withdraws
-                        == self.most_withd_peer_asn[0].withdraws
-                        and self.most_withd_peer_asn[0].withdraws > 0
-                    ):
-                        s_peer_asns = [
-                            mrt_e.peer_asn
-                            for mrt_e in self.most_withd_peer_asn
-                        ]
-                        for mrt_e in merge_data.most_withd_peer_asn:
-                            if mrt_e.peer_asn not in s_peer_asns:
-                                self.most_withd_peer_asn.append(mrt_e)
-                                changed = True
-                    elif (
-                        merge_data.most_withd_peer_asn[0].withdraws
-                        > self.most_withd_peer_asn[0].withdraws
-                    ):
-                        self.most_withd_peer_asn = (
-                            merge_data.most_withd_peer_asn.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_withd_peer_asn = (
-                        merge_data.most_withd_peer_asn.copy()
-                    )
-                    changed = True
-
-        # Most origin ASNs per prefix
-        tmp = []
-
-        self_prefixes: dict[str, None] = {}
-        for mrt_e in self.most_origin_asns:
-            self_prefixes[mrt_e.prefix] = None
-        # ^ This is a hack to speed up this section up:
-        for mrt_e in merge_data.most_origin_asns:
-            if mrt_e.prefix not in self_prefixes:
-                continue
-            for s_e in self.most_origin_asns:
-                if (
-                    s_e.prefix == mrt_e.prefix
-                    and s_e.origin_asns != mrt_e.origin_asns
-                ):
-                    tmp.append(
-                        mrt_entry(
-                            filename=mrt_e.filename,
-                            origin_asns=s_e.origin_asns.union(
-                                mrt_e.origin_asns
-                            ),
-                            prefix=s_e.prefix,
-                            timestamp=mrt_e.timestamp,
-                        )
-                    )
-                    break
-
-        if tmp:
-            for tmp_e in tmp:
-                if len(tmp_e.origin_asns) == len(
-                    self.most_origin_asns[0].origin_asns
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_origin_asns
-                    ]
-                    if tmp_e.prefix not in s_prefixes:
-                        self.most_origin_asns.append(tmp_e)
-                        changed = True
-                elif len(tmp_e.origin_asns) > len(
-                    self.most_origin_asns[0].origin_asns
-                ):
-                    self.most_origin_asns = [tmp_e]
-                    changed = True
-        else:
-            if merge_data.most_origin_asns:
-                if self.most_origin_asns:
-                    if (
-                        len(merge_data.most_origin_asns[0].origin_asns)
-                        == len(self.most_origin_asns[0].origin_asns)
-                        and len(self.most_origin_asns[0].origin_asns) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_origin_asns
-                        ]
-                        for mrt_e in merge_data.most_origin_asns:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_origin_asns.append(mrt_e)
-                                changed = True
-                    elif len(merge_data.most_origin_asns[0].origin_asns) > len(
-                        self.most_origin_asns[0].origin_asns
-                    ):
-                        self.most_origin_asns = (
-                            merge_data.most_origin_asns.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_origin_asns = merge_data.most_origin_asns.copy()
-                    changed = True
-
-        # Most unknown attributes per prefix
-        tmp = []
-        # If stats from a rib dump are being added this wont be present:
-        for u_e in merge_data.most_unknown_attrs:
-            for res_e in self.most_unknown_attrs:
-                if res_e.prefix == u_e.prefix:
-                    tmp.append(
-                        mrt_entry(
-                            origin_asns=res_e.origin_asns.union(
-                                u_e.origin_asns
-                            ),
-                            prefix=res_e.prefix,
-                            unknown_attrs=res_e.unknown_attrs.union(
-                                u_e.unknown_attrs
-                            ),
-                            filename=res_e.filename,
-                            timestamp=res_e.timestamp,
-                        )
-                    )
-
-        for tmp_e in tmp:
-            if len(tmp_e.unknown_attrs) == len(
-                self.most_unknown_attrs[0].unknown_attrs
-            ):
-                s_prefixes = [
-                    mrt_e.prefix for mrt_e in self.most_unknown_attrs
-                ]
-                if tmp_e.prefix not in s_prefixes:
-                    self.most_unknown_attrs.append(tmp_e)
-                    changed = True
-            elif len(tmp_e.unknown_attrs) > len(
-                self.most_unknown_attrs[0].unknown_attrs
-            ):
-                self.most_unknown_attrs = [tmp_e]
-                changed = True
-        else:
-            if merge_data.most_unknown_attrs:
-                if self.most_unknown_attrs:
-                    if (
-                        len(merge_data.most_unknown_attrs[0].unknown_attrs)
-                        == len(self.most_unknown_attrs[0].unknown_attrs)
-                        and len(self.most_unknown_attrs[0].unknown_attrs) > 0
-                    ):
-                        s_prefixes = [
-                            mrt_e.prefix for mrt_e in self.most_unknown_attrs
-                        ]
-                        for mrt_e in merge_data.most_unknown_attrs:
-                            if mrt_e.prefix not in s_prefixes:
-                                self.most_unknown_attrs.append(mrt_e)
-                                changed = True
-                    elif len(
-                        merge_data.most_unknown_attrs[0].unknown_attrs
-                    ) > len(self.most_unknown_attrs[0].unknown_attrs):
-                        self.most_unknown_attrs = (
-                            merge_data.most_unknown_attrs.copy()
-                        )
-                        changed = True
-                else:
-                    self.most_unknown_attrs = (
-                        merge_data.most_unknown_attrs.copy()
-                    )
-                    changed = True
-
         # If stats from a rib dump are being added, these will be 0:
         if merge_data.total_upd:
             self.total_upd += merge_data.total_upd
@@ -989,14 +239,44 @@ class mrt_stats:
             self.total_withd += merge_data.total_withd
             changed = True
 
+        if merge_data.total_skipped:
+            self.total_skipped += merge_data.total_skipped
+            changed = True
+
         if changed:
+            files = set(self.file_list)
             for filename in merge_data.file_list:
-                if filename not in self.file_list:
+                if filename not in files:
+                    files.add(filename)
                     self.file_list.append(filename)
             self.timestamp = merge_data.timestamp
 
         return changed
 
+    def add_stat(
+        self: "mrt_stats", stat: str, merge_data: "mrt_stats"
+    ) -> bool:
+        """
+        Add the entries of a single stat in merge_data into this object, the
+        same as add() does for every stat. Return True if the stat changed.
+        """
+        if stat not in mrt_stats.LEADERBOARDS:
+            raise ValueError(f"Unknown stat {stat}")
+
+        lb = self.get_leaderboard(stat)
+        add_func = mrt_stats.LEADERBOARDS[stat][3]
+        """
+        Entries for the same key are added together. If there are none,
+        this is the same as a merge.
+        """
+        if add_func:
+            changed = lb.add(getattr(merge_data, stat), add_func)
+        else:
+            changed = lb.merge(getattr(merge_data, stat))
+        if changed:
+            setattr(self, stat, lb.to_list())
+        return changed
+
     def add_archive(self: "mrt_stats", name: str) -> None:
         """
         Add the name of an MRT archive to the list if it isn't already present.
@@ -1005,6 +285,18 @@ class mrt_stats:
             raise ValueError(f"name is required for")
         self.archive_list.add(name)
 
+    @staticmethod
+    def entries_from_json(json_entries: list[str]) -> list[mrt_entry]:
+        """
+        Return the MRT entries parsed from a list of JSON strs, one per entry.
+        """
+        entries = []
+        for json_e in json_entries:
+            mrt_e = mrt_entry()
+            mrt_e.from_json(json_e)
+            entries.append(mrt_e)
+        return entries
+
     def equal_to(
         self: "mrt_stats", mrt_s: "mrt_stats", meta: bool = False
     ) -> bool:
@@ -1018,189 +310,19 @@ class mrt_stats:
         if type(mrt_s) != mrt_stats:
             raise TypeError(f"mrt_s is not a stats object: {type(mrt_s)}")
 
-        if len(self.bogon_origin_asns) != len(mrt_s.bogon_origin_asns):
-            return False
-
-        for self_e in self.bogon_origin_asns:
-            for mrt_e in mrt_s.bogon_origin_asns[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.bogon_origin_asns.remove(mrt_e)
-                    break
-        if mrt_s.bogon_origin_asns:
-            return False
-
-        if len(self.bogon_prefixes) != len(mrt_s.bogon_prefixes):
-            return False
-
-        for self_e in self.bogon_prefixes:
-            for mrt_e in mrt_s.bogon_prefixes[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.bogon_prefixes.remove(mrt_e)
-                    break
-        if mrt_s.bogon_prefixes:
-            return False
-
-        if len(self.highest_med_prefixes) != len(mrt_s.highest_med_prefixes):
-            return False
-
-        for self_e in self.highest_med_prefixes:
-            for mrt_e in mrt_s.highest_med_prefixes[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.highest_med_prefixes.remove(mrt_e)
-                    break
-        if mrt_s.highest_med_prefixes:
-            return False
-
-        if len(self.invalid_len) != len(mrt_s.invalid_len):
-            return False
-
-        if len(self.longest_as_path) != len(mrt_s.longest_as_path):
-            return False
-
-        for self_e in self.longest_as_path:
-            for mrt_e in mrt_s.longest_as_path[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.longest_as_path.remove(mrt_e)
-                    break
-        if mrt_s.longest_as_path:
-            return False
-
-        if len(self.longest_comm_set) != len(mrt_s.longest_comm_set):
-            return False
-
-        for self_e in self.longest_comm_set:
-            for mrt_e in mrt_s.longest_comm_set[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.longest_comm_set.remove(mrt_e)
-                    break
-        if mrt_s.longest_comm_set:
-            return False
-
-        for self_e in self.invalid_len:
-            for mrt_e in mrt_s.invalid_len[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.invalid_len.remove(mrt_e)
-                    break
-        if mrt_s.invalid_len:
-            return False
-
-        if len(self.most_bogon_asns) != len(mrt_s.most_bogon_asns):
-            return False
-
-        for self_e in self.most_bogon_asns:
-            for mrt_e in mrt_s.most_bogon_asns[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_bogon_asns.remove(mrt_e)
-                    break
-        if mrt_s.most_bogon_asns:
-            return False
-
-        if len(self.most_advt_prefixes) != len(mrt_s.most_advt_prefixes):
-            return False
-
-        for self_e in self.most_advt_prefixes:
-            for mrt_e in mrt_s.most_advt_prefixes[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_advt_prefixes.remove(mrt_e)
-                    break
-        if mrt_s.most_advt_prefixes:
-            return False
-
-        if len(self.most_upd_prefixes) != len(mrt_s.most_upd_prefixes):
-            return False
-
-        for self_e in self.most_upd_prefixes:
-            for mrt_e in mrt_s.most_upd_prefixes[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_upd_prefixes.remove(mrt_e)
-                    break
-        if mrt_s.most_upd_prefixes:
-            return False
-
-        if len(self.most_withd_prefixes) != len(mrt_s.most_withd_prefixes):
-            return False
-
-        for self_e in self.most_withd_prefixes:
-            for mrt_e in mrt_s.most_withd_prefixes[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_withd_prefixes.remove(mrt_e)
-                    break
-        if mrt_s.most_withd_prefixes:
-            return False
-
-        if len(self.most_advt_origin_asn) != len(mrt_s.most_advt_origin_asn):
-            return False
-
-        for self_e in self.most_advt_origin_asn:
-            for mrt_e in mrt_s.most_advt_origin_asn[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_advt_origin_asn.remove(mrt_e)
-                    break
-        if mrt_s.most_advt_origin_asn:
-            return False
-
-        if len(self.most_advt_peer_asn) != len(mrt_s.most_advt_peer_asn):
-            return False
-
-        for self_e in self.most_advt_peer_asn:
-            for mrt_e in mrt_s.most_advt_peer_asn[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_advt_peer_asn.remove(mrt_e)
-                    break
-        if mrt_s.most_advt_peer_asn:
-            return False
-
-        if len(self.most_upd_peer_asn) != len(mrt_s.most_upd_peer_asn):
-            return False
-
-        for self_e in self.most_upd_peer_asn:
-            for mrt_e in mrt_s.most_upd_peer_asn[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_upd_peer_asn.remove(mrt_e)
-                    break
-        if mrt_s.most_upd_peer_asn:
-            return False
-
-        if len(self.most_withd_peer_asn) != len(mrt_s.most_withd_peer_asn):
-            return False
-
-        for self_e in self.most_withd_peer_asn:
-            for mrt_e in mrt_s.most_withd_peer_asn[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_withd_peer_asn.remove(mrt_e)
-                    break
-        if mrt_s.most_withd_peer_asn:
-            return False
-
-        if len(self.most_origin_asns) != len(mrt_s.most_origin_asns):
-            return False
-
-        for self_e in self.most_origin_asns:
-            for mrt_e in mrt_s.most_origin_asns[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_origin_asns.remove(mrt_e)
-                    break
-        if mrt_s.most_origin_asns:
-            return False
-
-        if len(self.most_unknown_attrs) != len(mrt_s.most_unknown_attrs):
-            return False
-
-        for self_e in self.most_unknown_attrs:
-            for mrt_e in mrt_s.most_unknown_attrs[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_unknown_attrs.remove(mrt_e)
-                    break
-        if mrt_s.most_unknown_attrs:
-            return False
+        for stat in mrt_stats.LEADERBOARDS:
+            self_entries = getattr(self, stat)
+            mrt_entries = getattr(mrt_s, stat)
+            if len(self_entries) != len(mrt_entries):
+                return False
 
-        for self_e in self.most_unreg_origins:
-            for mrt_e in mrt_s.most_unreg_origins[:]:
-                if self_e.equal_to(mrt_e):
-                    mrt_s.most_unreg_origins.remove(mrt_e)
-                    break
-        if mrt_s.most_unreg_origins:
-            return False
+            for self_e in self_entries:
+                for mrt_e in mrt_entries[:]:
+                    if self_e.equal_to(mrt_e):
+                        mrt_entries.remove(mrt_e)
+                        break
+            if mrt_entries:
+                return False
 
         if self.total_upd != mrt_s.total_upd:
             return False
@@ -1211,6 +333,9 @@ class mrt_stats:
         if self.total_withd != mrt_s.total_withd:
             return False
 
+        if self.total_skipped != mrt_s.total_skipped:
+            return False
+
         if meta:
             if self.file_list != mrt_s.file_list:
                 return False
@@ -1233,11 +358,19 @@ class mrt_stats:
         with open(filename, "r") as f:
             self.from_json(f.read())
 
-    def from_json(self: "mrt_stats", json_str: str) -> None:
+    def from_json(
+        self: "mrt_stats",
+        json_str: str,
+        stats: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> None:
         """
         Parse the JSON string as MRT stats data.
         To provide backward connectivity with old data in Redis, need to check
         if some newer keys are present in the JSON dict stored in Redis.
+        Only the stats listed in stats are loaded, or all of them if stats is
+        None, the others are left empty. If lazy is True, the MRT entries of
+        each stat are only parsed when it is first accessed.
         """
         if not json_str:
             raise ValueError(f"Missing required options: json_str={json_str}")
@@ -1252,135 +385,20 @@ class mrt_stats:
         else:
             self.archive_list = set()
 
-        self.bogon_origin_asns = []
-        if "bogon_origin_asns" in json_dict:
-            for json_e in json_dict["bogon_origin_asns"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.bogon_origin_asns.append(mrt_e)
-        # else:
-        #    self.bogon_origin_asns.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.bogon_prefixes = []
-        if "bogon_prefixes" in json_dict:
-            for json_e in json_dict["bogon_prefixes"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.bogon_prefixes.append(mrt_e)
-        # else:
-        #    self.bogon_prefixes.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.highest_med_prefixes = []
-        if "highest_med_prefixes" in json_dict:
-            for json_e in json_dict["highest_med_prefixes"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.highest_med_prefixes.append(mrt_e)
-        # else:
-        #    self.highest_med_prefixes.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.invalid_len = []
-        if "invalid_len" in json_dict:
-            for json_e in json_dict["invalid_len"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.invalid_len.append(mrt_e)
-        # else:
-        #    self.invalid_len.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.longest_as_path = []
-        for json_e in json_dict["longest_as_path"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.longest_as_path.append(mrt_e)
-
-        self.longest_comm_set = []
-        for json_e in json_dict["longest_comm_set"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.longest_comm_set.append(mrt_e)
-
-        self.most_advt_prefixes = []
-        for json_e in json_dict["most_advt_prefixes"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_advt_prefixes.append(mrt_e)
-
-        self.most_bogon_asns = []
-        if "most_bogon_asns" in json_dict:
-            for json_e in json_dict["most_bogon_asns"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.most_bogon_asns.append(mrt_e)
-        # else:
-        #    self.most_bogon_asns.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.most_upd_prefixes = []
-        for json_e in json_dict["most_upd_prefixes"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_upd_prefixes.append(mrt_e)
-
-        self.most_withd_prefixes = []
-        for json_e in json_dict["most_withd_prefixes"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_withd_prefixes.append(mrt_e)
-
-        self.most_advt_origin_asn = []
-        for json_e in json_dict["most_advt_origin_asn"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_advt_origin_asn.append(mrt_e)
-
-        self.most_advt_peer_asn = []
-        for json_e in json_dict["most_advt_peer_asn"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_advt_peer_asn.append(mrt_e)
-
-        self.most_upd_peer_asn = []
-        for json_e in json_dict["most_upd_peer_asn"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_upd_peer_asn.append(mrt_e)
-
-        self.most_withd_peer_asn = []
-        for json_e in json_dict["most_withd_peer_asn"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_withd_peer_asn.append(mrt_e)
-
-        self.most_origin_asns = []
-        for json_e in json_dict["most_origin_asns"]:
-            mrt_e = mrt_entry()
-            mrt_e.from_json(json_e)
-            self.most_origin_asns.append(mrt_e)
-
-        self.most_unknown_attrs = []
-        if "most_unknown_attrs" in json_dict:
-            for json_e in json_dict["most_unknown_attrs"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.most_unknown_attrs.append(mrt_e)
-        # else:
-        #    self.most_unknown_attrs.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
-
-        self.most_unreg_origins = []
-        if "most_unreg_origins" in json_dict:
-            for json_e in json_dict["most_unreg_origins"]:
-                mrt_e = mrt_entry()
-                mrt_e.from_json(json_e)
-                self.most_unreg_origins.append(mrt_e)
-        # else:
-        #    self.most_unreg_origins.append(mrt_entry())
-        # Breaks report generations -> remove if stable after commenting out
+        load_stats = mrt_stats.select_stats(stats)
+        for stat in mrt_stats.LEADERBOARDS:
+            json_entries = (
+                json_dict.get(stat, []) if stat in load_stats else []
+            )
+            if lazy:
+                self.set_lazy(
+                    stat,
+                    functools.partial(
+                        mrt_stats.entries_from_json, json_entries
+                    ),
+                )
+            else:
+                setattr(self, stat, mrt_stats.entries_from_json(json_entries))
 
         self.file_list = json_dict["file_list"]
 
@@ -1398,6 +416,41 @@ class mrt_stats:
         if "total_withd" in json_dict:
             self.total_withd = int(json_dict["total_withd"])
 
+        self.total_skipped = 0
+        if "total_skipped" in json_dict:
+            self.total_skipped = int(json_dict["total_skipped"])
+
+    @staticmethod
+    def from_partial(data: bytes) -> "mrt_stats":
+        """
+        Return a new MRT stats obj from the compact partial data, see
+        to_partial().
+        """
+        if not data:
+            raise ValueError(f"Missing required options: data={data!r}")
+
+        if type(data) != bytes:
+            raise TypeError(f"data is not bytes: {type(data)}")
+
+        values = pickle.loads(data)
+        mrt_s = mrt_stats()
+        mrt_s.archive_list = set(values[0])
+        for stat, entries in zip(mrt_stats.LEADERBOARDS, values[1]):
+            setattr(
+                mrt_s,
+                stat,
+                [mrt_entry.from_tuple(mrt_e) for mrt_e in entries],
+            )
+        (
+            mrt_s.total_upd,
+            mrt_s.total_advt,
+            mrt_s.total_withd,
+            mrt_s.total_skipped,
+            mrt_s.file_list,
+            mrt_s.timestamp,
+        ) = values[2:]
+        return mrt_s
+
     @staticmethod
     def gen_ts_from_ymd(ymd: str) -> str:
         """
@@ -1456,6 +509,25 @@ class mrt_stats:
         """
         return "GLOBAL"
 
+    def get_leaderboard(self: "mrt_stats", stat: str) -> leaderboard:
+        """
+        Return a leaderboard of the entries for one of the stats in this obj.
+        """
+        if not stat:
+            raise ValueError(f"Missing required arguments: stat={stat}")
+
+        if stat not in mrt_stats.LEADERBOARDS:
+            raise ValueError(f"Unknown stat: {stat}")
+
+        metric, key, zero_ties, _, _ = mrt_stats.LEADERBOARDS[stat]
+        return leaderboard(
+            metric=metric,
+            key=key,
+            entries=getattr(self, stat),
+            top_k=cfg.LEADERBOARD_TOP_K,
+            zero_ties=zero_ties,
+        )
+
     def get_diff(self: "mrt_stats", mrt_s: "mrt_stats") -> "mrt_stats":
         """
         Generate an mrt_stats obj with entries unique to mrt_s.
@@ -1468,185 +540,18 @@ class mrt_stats:
             raise TypeError(f"mrt_s is not a stats object: {type(mrt_s)}")
 
         diff = mrt_stats()
-        diff.bogon_origin_asns = []
-        diff.bogon_prefixes = []
-        diff.highest_med_prefixes = []
-        diff.invalid_len = []
-        diff.longest_as_path = []
-        diff.longest_comm_set = []
-        diff.most_advt_prefixes = []
-        diff.most_bogon_asns = []
-        diff.most_upd_prefixes = []
-        diff.most_withd_prefixes = []
-        diff.most_advt_origin_asn = []
-        diff.most_advt_peer_asn = []
-        diff.most_upd_peer_asn = []
-        diff.most_withd_peer_asn = []
-        diff.most_origin_asns = []
-        diff.most_unknown_attrs = []
-        diff.most_unreg_origins = []
-
-        for mrt_e in mrt_s.bogon_origin_asns:
-            found = False
-            for self_e in self.bogon_origin_asns:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.bogon_origin_asns.append(mrt_e)
-
-        for mrt_e in mrt_s.bogon_prefixes:
-            found = False
-            for self_e in self.bogon_prefixes:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.bogon_prefixes.append(mrt_e)
-
-        for mrt_e in mrt_s.highest_med_prefixes:
-            found = False
-            for self_e in self.highest_med_prefixes:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.highest_med_prefixes.append(mrt_e)
-
-        for mrt_e in mrt_s.invalid_len:
-            found = False
-            for self_e in self.invalid_len:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.invalid_len.append(mrt_e)
-
-        for mrt_e in mrt_s.invalid_len:
-            found = False
-            for self_e in self.invalid_len:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.invalid_len.append(mrt_e)
-
-        for mrt_e in mrt_s.longest_as_path:
-            found = False
-            for self_e in self.longest_as_path:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.longest_as_path.append(mrt_e)
-
-        for mrt_e in mrt_s.longest_comm_set:
-            found = False
-            for self_e in self.longest_comm_set:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.longest_comm_set.append(mrt_e)
-
-        for mrt_e in mrt_s.most_advt_prefixes:
-            found = False
-            for self_e in self.most_advt_prefixes:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_advt_prefixes.append(mrt_e)
-
-        for mrt_e in mrt_s.most_bogon_asns:
-            found = False
-            for self_e in self.most_bogon_asns:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_bogon_asns.append(mrt_e)
-
-        for mrt_e in mrt_s.most_upd_prefixes:
-            found = False
-            for self_e in self.most_upd_prefixes:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_upd_prefixes.append(mrt_e)
-
-        for mrt_e in mrt_s.most_withd_prefixes:
-            found = False
-            for self_e in self.most_withd_prefixes:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_withd_prefixes.append(mrt_e)
-
-        for mrt_e in mrt_s.most_advt_origin_asn:
-            found = False
-            for self_e in self.most_advt_origin_asn:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_advt_origin_asn.append(mrt_e)
-
-        for mrt_e in mrt_s.most_advt_peer_asn:
-            found = False
-            for self_e in self.most_advt_peer_asn:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_advt_peer_asn.append(mrt_e)
-
-        for mrt_e in mrt_s.most_upd_peer_asn:
-            found = False
-            for self_e in self.most_upd_peer_asn:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_upd_peer_asn.append(mrt_e)
-
-        for mrt_e in mrt_s.most_withd_peer_asn:
-            found = False
-            for self_e in self.most_withd_peer_asn:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_withd_peer_asn.append(mrt_e)
-
-        for mrt_e in mrt_s.most_origin_asns:
-            found = False
-            for self_e in self.most_origin_asns:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_origin_asns.append(mrt_e)
-
-        for mrt_e in mrt_s.most_unknown_attrs:
-            found = False
-            for self_e in self.most_unknown_attrs:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_unknown_attrs.append(mrt_e)
-
-        for mrt_e in mrt_s.most_unreg_origins:
-            found = False
-            for self_e in self.most_unreg_origins:
-                if self_e.equal_to(mrt_e):
-                    found = True
-                    break
-            if not found:
-                diff.most_unreg_origins.append(mrt_e)
+
+        for stat in mrt_stats.LEADERBOARDS:
+            self_keys = {s_e.get_key() for s_e in getattr(self, stat)}
+            setattr(
+                diff,
+                stat,
+                [
+                    mrt_e
+                    for mrt_e in getattr(mrt_s, stat)
+                    if mrt_e.get_key() not in self_keys
+                ],
+            )
 
         if mrt_s.total_upd != self.total_upd:
             diff.total_upd = mrt_s.total_upd
@@ -1657,6 +562,9 @@ class mrt_stats:
         if mrt_s.total_withd != self.total_withd:
             diff.total_withd = mrt_s.total_withd
 
+        if mrt_s.total_skipped != self.total_skipped:
+            diff.total_skipped = mrt_s.total_skipped
+
         return diff
 
     def get_diff_larger(self: "mrt_stats", mrt_s: "mrt_stats") -> "mrt_stats":
@@ -1673,316 +581,11 @@ class mrt_stats:
             raise TypeError(f"mrt_s is not a stats object: {type(mrt_s)}")
 
         diff = mrt_stats()
-        diff.bogon_origin_asns = []
-        diff.bogon_prefixes = []
-        diff.highest_med_prefixes = []
-        diff.invalid_len = []
-        diff.longest_as_path = []
-        diff.longest_comm_set = []
-        diff.most_advt_prefixes = []
-        diff.most_bogon_asns = []
-        diff.most_upd_prefixes = []
-        diff.most_withd_prefixes = []
-        diff.most_advt_origin_asn = []
-        diff.most_advt_peer_asn = []
-        diff.most_upd_peer_asn = []
-        diff.most_withd_peer_asn = []
-        diff.most_origin_asns = []
-        diff.most_unknown_attrs = []
-        diff.most_unreg_origins = []
-
         updated = False
 
-        # Prefixes with most bogon origin ASNs
-        if mrt_s.bogon_origin_asns:
-            if self.bogon_origin_asns:
-                if (
-                    mrt_s.bogon_origin_asns[0].prefix
-                    and self.bogon_origin_asns[0].prefix
-                ):
-                    if len(mrt_s.bogon_origin_asns[0].origin_asns) > len(
-                        self.bogon_origin_asns[0].origin_asns
-                    ):
-                        diff.bogon_origin_asns = mrt_s.bogon_origin_asns.copy()
-                        updated = True
-            else:
-                diff.bogon_origin_asns = mrt_s.bogon_origin_asns.copy()
-                updated = True
-
-        # Bogons prefixes with more origin ASNs
-        if mrt_s.bogon_prefixes:
-            if self.bogon_prefixes:
-                if (
-                    mrt_s.bogon_prefixes[0].prefix
-                    and self.bogon_prefixes[0].prefix
-                ):
-                    if len(mrt_s.bogon_prefixes[0].origin_asns) > len(
-                        self.bogon_prefixes[0].origin_asns
-                    ):
-                        diff.bogon_prefixes = mrt_s.bogon_prefixes.copy()
-                        updated = True
-            else:
-                diff.bogon_prefixes = mrt_s.bogon_prefixes.copy()
-                updated = True
-
-        # Highest MED
-        if mrt_s.highest_med_prefixes:
-            if self.highest_med_prefixes:
-                if (
-                    mrt_s.highest_med_prefixes[0].prefix
-                    and self.highest_med_prefixes[0].prefix
-                ):
-                    if (
-                        mrt_s.highest_med_prefixes[0].med
-                        > self.highest_med_prefixes[0].med
-                    ):
-                        diff.highest_med_prefixes = (
-                            mrt_s.highest_med_prefixes.copy()
-                        )
-                        updated = True
-            else:
-                diff.highest_med_prefixes = mrt_s.highest_med_prefixes.copy()
-                updated = True
-
-        # Invalid length prefixes with more origin ASNs
-        if mrt_s.invalid_len:
-            if self.invalid_len:
-                if mrt_s.invalid_len[0].prefix and self.invalid_len[0].prefix:
-                    if len(mrt_s.invalid_len[0].origin_asns) > len(
-                        self.invalid_len[0].origin_asns
-                    ):
-                        diff.invalid_len = mrt_s.invalid_len.copy()
-                        updated = True
-            else:
-                diff.invalid_len = mrt_s.invalid_len.copy()
-                updated = True
-
-        # Longer AS path
-        if mrt_s.longest_as_path:
-            if self.longest_as_path:
-                if len(mrt_s.longest_as_path[0].as_path) > len(
-                    self.longest_as_path[0].as_path
-                ):
-                    diff.longest_as_path = mrt_s.longest_as_path.copy()
-                    updated = True
-            else:
-                diff.longest_as_path = mrt_s.longest_as_path.copy()
-                updated = True
-
-        # Longer community set
-        if mrt_s.longest_comm_set:
-            if self.longest_comm_set:
-                if len(mrt_s.longest_comm_set[0].comm_set) > len(
-                    self.longest_comm_set[0].comm_set
-                ):
-                    diff.longest_comm_set = mrt_s.longest_comm_set.copy()
-                    updated = True
-            else:
-                diff.longest_comm_set = mrt_s.longest_comm_set.copy()
-                updated = True
-
-        # More advertisements per prefix
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_advt_prefixes:
-            if self.most_advt_prefixes:
-                if (
-                    mrt_s.most_advt_prefixes[0].prefix
-                    and self.most_advt_prefixes[0].prefix
-                ):
-                    if (
-                        mrt_s.most_advt_prefixes[0].advt
-                        > self.most_advt_prefixes[0].advt
-                    ):
-                        diff.most_advt_prefixes = (
-                            mrt_s.most_advt_prefixes.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_advt_prefixes = mrt_s.most_advt_prefixes.copy()
-                updated = True
-
-        # Origin ASNs with most bogon downstream origin ASNs
-        if mrt_s.most_bogon_asns:
-            if self.most_bogon_asns:
-                if (
-                    mrt_s.most_bogon_asns[0].as_path
-                    and self.most_bogon_asns[0].as_path
-                ):
-                    if len(mrt_s.most_bogon_asns[0].origin_asns) > len(
-                        self.most_bogon_asns[0].origin_asns
-                    ):
-                        diff.most_bogon_asns = mrt_s.most_bogon_asns.copy()
-                        updated = True
-            else:
-                diff.most_bogon_asns = mrt_s.most_bogon_asns.copy()
-                updated = True
-
-        # More updates per prefix
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_upd_prefixes:
-            if self.most_upd_prefixes:
-                if (
-                    mrt_s.most_upd_prefixes[0].prefix
-                    and self.most_upd_prefixes[0].prefix
-                ):
-                    if (
-                        mrt_s.most_upd_prefixes[0].updates
-                        > self.most_upd_prefixes[0].updates
-                    ):
-                        diff.most_upd_prefixes = mrt_s.most_upd_prefixes.copy()
-                        updated = True
-            else:
-                diff.most_upd_prefixes = mrt_s.most_upd_prefixes.copy()
-                updated = True
-
-        # More withdraws per prefix
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_withd_prefixes:
-            if self.most_withd_prefixes:
-                if (
-                    mrt_s.most_withd_prefixes[0].prefix
-                    and self.most_withd_prefixes[0].prefix
-                ):
-                    if (
-                        mrt_s.most_withd_prefixes[0].withdraws
-                        > self.most_withd_prefixes[0].withdraws
-                    ):
-                        diff.most_withd_prefixes = (
-                            mrt_s.most_withd_prefixes.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_withd_prefixes = mrt_s.most_withd_prefixes.copy()
-                updated = True
-
-        # More advertisement per origin ASN
-        # If stats from a rib dump are being compare this wont be present:
-        if mrt_s.most_advt_origin_asn:
-            if self.most_advt_origin_asn:
-                if (
-                    mrt_s.most_advt_origin_asn[0].origin_asns
-                    and self.most_advt_origin_asn[0].origin_asns
-                ):
-                    if (
-                        mrt_s.most_advt_origin_asn[0].advt
-                        > self.most_advt_origin_asn[0].advt
-                    ):
-                        diff.most_advt_origin_asn = (
-                            mrt_s.most_advt_origin_asn.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_advt_origin_asn = mrt_s.most_advt_origin_asn.copy()
-                updated = True
-
-        # More advertisement per peer ASN
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_advt_peer_asn:
-            if self.most_advt_peer_asn:
-                if (
-                    mrt_s.most_advt_peer_asn[0].peer_asn
-                    and self.most_advt_peer_asn[0].peer_asn
-                ):
-                    if (
-                        mrt_s.most_advt_peer_asn[0].advt
-                        > self.most_advt_peer_asn[0].advt
-                    ):
-                        diff.most_advt_peer_asn = (
-                            mrt_s.most_advt_peer_asn.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_advt_peer_asn = mrt_s.most_advt_peer_asn.copy()
-                updated = True
-
-        # More updates per peer ASN
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_upd_peer_asn:
-            if self.most_upd_peer_asn:
-                if (
-                    mrt_s.most_upd_peer_asn[0].peer_asn
-                    and self.most_upd_peer_asn[0].peer_asn
-                ):
-                    if (
-                        mrt_s.most_upd_peer_asn[0].updates
-                        > self.most_upd_peer_asn[0].updates
-                    ):
-                        diff.most_upd_peer_asn = mrt_s.most_upd_peer_asn.copy()
-                        updated = True
-            else:
-                diff.most_upd_peer_asn = mrt_s.most_upd_peer_asn.copy()
-                updated = True
-
-        # More withdraws per peer ASN
-        # If stats from a rib dump are being compared this wont be present:
-        if mrt_s.most_withd_peer_asn:
-            if self.most_withd_peer_asn:
-                if (
-                    mrt_s.most_withd_peer_asn[0].peer_asn
-                    and self.most_withd_peer_asn[0].peer_asn
-                ):
-                    if (
-                        mrt_s.most_withd_peer_asn[0].withdraws
-                        > self.most_withd_peer_asn[0].withdraws
-                    ):
-                        diff.most_withd_peer_asn = (
-                            mrt_s.most_withd_peer_asn.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_withd_peer_asn = mrt_s.most_withd_peer_asn.copy()
-                updated = True
-
-        # More origin ASNs per prefix
-        if mrt_s.most_origin_asns:
-            if self.most_origin_asns:
-                if (
-                    mrt_s.most_origin_asns[0].prefix
-                    and self.most_origin_asns[0].prefix
-                ):
-                    if len(mrt_s.most_origin_asns[0].origin_asns) > len(
-                        self.most_origin_asns[0].origin_asns
-                    ):
-                        diff.most_origin_asns = mrt_s.most_origin_asns.copy()
-                        updated = True
-            else:
-                diff.most_origin_asns = mrt_s.most_origin_asns.copy()
-                updated = True
-
-        # Prefixes with most unknown attributes
-        if mrt_s.most_unknown_attrs:
-            if self.most_unknown_attrs:
-                if (
-                    mrt_s.most_unknown_attrs[0].prefix
-                    and self.most_unknown_attrs[0].prefix
-                ):
-                    if len(mrt_s.most_unknown_attrs[0].unknown_attrs) > len(
-                        self.most_unknown_attrs[0].unknown_attrs
-                    ):
-                        diff.most_unknown_attrs = (
-                            mrt_s.most_unknown_attrs.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_unknown_attrs = mrt_s.most_unknown_attrs.copy()
-                updated = True
-
-        # Prefixes with most unregistered origin ASNs
-        if mrt_s.most_unreg_origins:
-            if self.most_unreg_origins:
-                if (
-                    mrt_s.most_unreg_origins[0].prefix
-                    and self.most_unreg_origins[0].prefix
-                ):
-                    if len(mrt_s.most_unreg_origins[0].origin_asns) > len(
-                        self.most_unreg_origins[0].origin_asns
-                    ):
-                        diff.most_unreg_origins = (
-                            mrt_s.most_unreg_origins.copy()
-                        )
-                        updated = True
-            else:
-                diff.most_unreg_origins = mrt_s.most_unreg_origins.copy()
+        for stat in mrt_stats.LEADERBOARDS:
+            if self.get_leaderboard(stat).is_larger(getattr(mrt_s, stat)):
+                setattr(diff, stat, getattr(mrt_s, stat).copy())
                 updated = True
 
         # If stats from a rib dump are being compared, these wont be present:
@@ -2001,6 +604,11 @@ class mrt_stats:
             diff.total_withd = mrt_s.total_withd
             updated = True
 
+        # More malformed records/updates skipped
+        if mrt_s.total_skipped > self.total_skipped:
+            diff.total_skipped = mrt_s.total_skipped
+            updated = True
+
         if updated:
             ### FIXME - this needs to an accumulating file list
             ###diff.file_list.extend(self.file_list)
@@ -2034,29 +642,15 @@ class mrt_stats:
         Check if an mrt_stats object is empty. Don't check meta data like
         file list or timestamp.
         """
+        # Checked first, so a lazily loaded obj's stats aren't all decoded
         if (
-            not self.bogon_origin_asns
-            and not self.bogon_prefixes
-            and not self.highest_med_prefixes
-            and not self.invalid_len
-            and not self.longest_as_path
-            and not self.longest_comm_set
-            and not self.most_advt_prefixes
-            and not self.most_bogon_asns
-            and not self.most_upd_prefixes
-            and not self.most_withd_prefixes
-            and not self.most_advt_origin_asn
-            and not self.most_advt_peer_asn
-            and not self.most_upd_peer_asn
-            and not self.most_withd_peer_asn
-            and not self.most_origin_asns
-            and not self.most_unknown_attrs
-            and not self.most_unreg_origins
-            and not self.file_list
+            not self.file_list
             and not self.timestamp
             and not self.total_upd
             and not self.total_advt
             and not self.total_withd
+            and not self.total_skipped
+            and not any(getattr(self, stat) for stat in mrt_stats.LEADERBOARDS)
         ):
             return True
         else:
@@ -2082,523 +676,91 @@ class mrt_stats:
         all prefixes in this object will be dropped, and this object will now
         contain 192.168.2.0/24 only.
         """
-        if not merge_data:
-            raise ValueError(
-                f"Missing required options: merge_data={merge_data}"
-            )
-
-        if type(merge_data) != mrt_stats:
-            raise TypeError(
-                f"merge_data is not a stats object: {type(merge_data)}"
-            )
-
-        changed = False
-
-        # Prefixes with most bogon origin ASNs
-        if merge_data.bogon_origin_asns:
-            if self.bogon_origin_asns:
-                if (
-                    len(merge_data.bogon_origin_asns[0].origin_asns)
-                    == len(self.bogon_origin_asns[0].origin_asns)
-                    and len(self.bogon_origin_asns[0].origin_asns) > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.bogon_origin_asns
-                    ]
-                    for mrt_e in merge_data.bogon_origin_asns:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.bogon_origin_asns.append(mrt_e)
-                            changed = True
-                elif len(merge_data.bogon_origin_asns[0].origin_asns) > len(
-                    self.bogon_origin_asns[0].origin_asns
-                ):
-                    self.bogon_origin_asns = (
-                        merge_data.bogon_origin_asns.copy()
-                    )
-                    changed = True
-            else:
-                self.bogon_origin_asns = merge_data.bogon_origin_asns.copy()
-                changed = True
-
-        # Bogons prefixes with most origin ASNs
-        if merge_data.bogon_prefixes:
-            if self.bogon_prefixes:
-                if (
-                    len(merge_data.bogon_prefixes[0].origin_asns)
-                    == len(self.bogon_prefixes[0].origin_asns)
-                    and len(self.bogon_prefixes[0].origin_asns) > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.bogon_prefixes
-                    ]
-                    for mrt_e in merge_data.bogon_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.bogon_prefixes.append(mrt_e)
-                            changed = True
-                elif len(merge_data.bogon_prefixes[0].origin_asns) > len(
-                    self.bogon_prefixes[0].origin_asns
-                ):
-                    self.bogon_prefixes = merge_data.bogon_prefixes.copy()
-                    changed = True
-            else:
-                self.bogon_prefixes = merge_data.bogon_prefixes.copy()
-                changed = True
-
-        # Highest MED
-        if merge_data.highest_med_prefixes:
-            if self.highest_med_prefixes:
-                if (
-                    merge_data.highest_med_prefixes[0].med
-                    == self.highest_med_prefixes[0].med
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.highest_med_prefixes
-                    ]
-                    med = self.highest_med_prefixes[0].med
-                    for mrt_e in merge_data.highest_med_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.highest_med_prefixes.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.highest_med_prefixes[0].med
-                    > self.highest_med_prefixes[0].med
-                ):
-                    self.highest_med_prefixes = (
-                        merge_data.highest_med_prefixes.copy()
-                    )
-                    changed = True
-            else:
-                self.highest_med_prefixes = (
-                    merge_data.highest_med_prefixes.copy()
-                )
-                changed = True
-
-        # Invalid length prefixes with most origin ASNs
-        if merge_data.invalid_len:
-            if self.invalid_len:
-                if (
-                    len(merge_data.invalid_len[0].origin_asns)
-                    == len(self.invalid_len[0].origin_asns)
-                    and len(self.invalid_len[0].origin_asns) > 0
-                ):
-                    s_prefixes = [mrt_e.prefix for mrt_e in self.invalid_len]
-                    for mrt_e in merge_data.invalid_len:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.invalid_len.append(mrt_e)
-                            changed = True
-                elif len(merge_data.invalid_len[0].origin_asns) > len(
-                    self.invalid_len[0].origin_asns
-                ):
-                    self.invalid_len = merge_data.invalid_len.copy()
-                    changed = True
-            else:
-                self.invalid_len = merge_data.invalid_len.copy()
-                changed = True
-
-        # Longest AS path
-        if merge_data.longest_as_path:
-            if self.longest_as_path:
-                if len(merge_data.longest_as_path[0].as_path) == len(
-                    self.longest_as_path[0].as_path
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.longest_as_path
-                    ]
-                    s_paths = [mrt_e.as_path for mrt_e in self.longest_as_path]
-                    for mrt_e in merge_data.longest_as_path:
-                        if mrt_e.prefix in s_prefixes:
-                            if mrt_e.as_path not in s_paths:
-                                self.longest_as_path.append(mrt_e)
-                                changed = True
-                        else:
-                            self.longest_as_path.append(mrt_e)
-                            changed = True
-                elif len(merge_data.longest_as_path[0].as_path) > len(
-                    self.longest_as_path[0].as_path
-                ):
-                    self.longest_as_path = merge_data.longest_as_path.copy()
-                    changed = True
-            else:
-                self.longest_as_path = merge_data.longest_as_path.copy()
-                changed = True
-
-        # Longest community set
-        if merge_data.longest_comm_set:
-            if self.longest_comm_set:
-                if len(merge_data.longest_comm_set[0].comm_set) == len(
-                    self.longest_comm_set[0].comm_set
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.longest_comm_set
-                    ]
-                    s_comms = [
-                        mrt_e.comm_set for mrt_e in self.longest_comm_set
-                    ]
-                    for mrt_e in merge_data.longest_comm_set:
-                        if mrt_e.prefix in s_prefixes:
-                            if mrt_e.comm_set not in s_comms:
-                                self.longest_comm_set.append(mrt_e)
-                                changed = True
-                        else:
-                            self.longest_comm_set.append(mrt_e)
-                            changed = True
-                elif len(merge_data.longest_comm_set[0].comm_set) > len(
-                    self.longest_comm_set[0].comm_set
-                ):
-                    self.longest_comm_set = merge_data.longest_comm_set.copy()
-                    changed = True
-            else:
-                self.longest_comm_set = merge_data.longest_comm_set.copy()
-                changed = True
-
-        """
-        Most advertisements per prefix
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_advt_prefixes:
-            if self.most_advt_prefixes:
-                if (
-                    merge_data.most_advt_prefixes[0].advt
-                    == self.most_advt_prefixes[0].advt
-                    and self.most_advt_prefixes[0].advt > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_advt_prefixes
-                    ]
-                    for mrt_e in merge_data.most_advt_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.most_advt_prefixes.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_advt_prefixes[0].advt
-                    > self.most_advt_prefixes[0].advt
-                ):
-                    self.most_advt_prefixes = (
-                        merge_data.most_advt_prefixes.copy()
-                    )
-                    changed = True
-            else:
-                self.most_advt_prefixes = merge_data.most_advt_prefixes.copy()
-                changed = True
-
-        # Origin ASNs with most downstream bogon origin ASNs
-        if merge_data.most_bogon_asns:
-            if self.most_bogon_asns:
-                if (
-                    len(merge_data.most_bogon_asns[0].origin_asns)
-                    == len(self.most_bogon_asns[0].origin_asns)
-                    and len(self.most_bogon_asns[0].origin_asns) > 0
-                ):
-                    s_asns = [mrt_e.as_path for mrt_e in self.most_bogon_asns]
-                    for mrt_e in merge_data.most_bogon_asns:
-                        if mrt_e.as_path not in s_asns:
-                            self.most_bogon_asns.append(mrt_e)
-                            changed = True
-                elif len(merge_data.most_bogon_asns[0].origin_asns) > len(
-                    self.most_bogon_asns[0].origin_asns
-                ):
-                    self.most_bogon_asns = merge_data.most_bogon_asns.copy()
-                    changed = True
-            else:
-                self.most_bogon_asns = merge_data.most_bogon_asns.copy()
-                changed = True
+        return self.merge_many([merge_data])[0]
 
+    def merge_many(
+        self: "mrt_stats", stats_list: list["mrt_stats"]
+    ) -> list[bool]:
         """
-        Most updates per prefix
-        If stats from a rib dump are being merged this wont be present:
+        Merge each MRT stats obj in stats_list into this one, in order, the
+        same as calling merge() for each of them. The leaderboard of each
+        stat is only built once, and every obj is merged into it in one pass,
+        rather than the entry lists being rebuilt for every obj.
+        Return a list of whether each obj changed this one.
         """
-        if merge_data.most_upd_prefixes:
-            if self.most_upd_prefixes:
-                if (
-                    merge_data.most_upd_prefixes[0].updates
-                    == self.most_upd_prefixes[0].updates
-                    and self.most_upd_prefixes[0].updates > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_upd_prefixes
-                    ]
-                    for mrt_e in merge_data.most_upd_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.most_upd_prefixes.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_upd_prefixes[0].updates
-                    > self.most_upd_prefixes[0].updates
-                ):
-                    self.most_upd_prefixes = (
-                        merge_data.most_upd_prefixes.copy()
-                    )
-                    changed = True
-            else:
-                self.most_upd_prefixes = merge_data.most_upd_prefixes.copy()
-                changed = True
+        if type(stats_list) != list:
+            raise TypeError(f"stats_list is not a list: {type(stats_list)}")
 
-        """
-        Most withdraws per prefix
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_withd_prefixes:
-            if self.most_withd_prefixes:
-                if (
-                    merge_data.most_withd_prefixes[0].withdraws
-                    == self.most_withd_prefixes[0].withdraws
-                    and self.most_withd_prefixes[0].withdraws > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_withd_prefixes
-                    ]
-                    for mrt_e in merge_data.most_withd_prefixes:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.most_withd_prefixes.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_withd_prefixes[0].withdraws
-                    > self.most_withd_prefixes[0].withdraws
-                ):
-                    self.most_withd_prefixes = (
-                        merge_data.most_withd_prefixes.copy()
-                    )
-                    changed = True
-            else:
-                self.most_withd_prefixes = (
-                    merge_data.most_withd_prefixes.copy()
+        for merge_data in stats_list:
+            if not merge_data:
+                raise ValueError(
+                    f"Missing required options: merge_data={merge_data}"
                 )
-                changed = True
 
-        """
-        Most advertisement per origin ASN
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_advt_origin_asn:
-            if self.most_advt_origin_asn:
-                if (
-                    merge_data.most_advt_origin_asn[0].advt
-                    == self.most_advt_origin_asn[0].advt
-                    and self.most_advt_origin_asn[0].advt > 0
-                ):
-                    s_origin_asns = [
-                        mrt_e.origin_asns
-                        for mrt_e in self.most_advt_origin_asn
-                    ]
-                    for mrt_e in merge_data.most_advt_origin_asn:
-                        if mrt_e.origin_asns not in s_origin_asns:
-                            self.most_advt_origin_asn.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_advt_origin_asn[0].advt
-                    > self.most_advt_origin_asn[0].advt
-                ):
-                    self.most_advt_origin_asn = (
-                        merge_data.most_advt_origin_asn.copy()
-                    )
-                    changed = True
-            else:
-                self.most_advt_origin_asn = (
-                    merge_data.most_advt_origin_asn.copy()
+            if type(merge_data) != mrt_stats:
+                raise TypeError(
+                    f"merge_data is not a stats object: {type(merge_data)}"
                 )
-                changed = True
 
-        """
-        Most advertisement per peer ASN
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_advt_peer_asn:
-            if self.most_advt_peer_asn:
-                if (
-                    merge_data.most_advt_peer_asn[0].advt
-                    == self.most_advt_peer_asn[0].advt
-                    and self.most_advt_peer_asn[0].advt > 0
-                ):
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_advt_peer_asn
-                    ]
-                    for mrt_e in merge_data.most_advt_peer_asn:
-                        if mrt_e.peer_asn not in s_peer_asns:
-                            self.most_advt_peer_asn.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_advt_peer_asn[0].advt
-                    > self.most_advt_peer_asn[0].advt
-                ):
-                    self.most_advt_peer_asn = (
-                        merge_data.most_advt_peer_asn.copy()
-                    )
-                    changed = True
-            else:
-                self.most_advt_peer_asn = merge_data.most_advt_peer_asn.copy()
-                changed = True
-
-        """
-        Most updates per peer ASN
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_upd_peer_asn:
-            if self.most_upd_peer_asn:
-                if (
-                    merge_data.most_upd_peer_asn[0].updates
-                    == self.most_upd_peer_asn[0].updates
-                    and self.most_upd_peer_asn[0].updates > 0
-                ):
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_upd_peer_asn
-                    ]
-                    for mrt_e in merge_data.most_upd_peer_asn:
-                        if mrt_e.peer_asn not in s_peer_asns:
-                            self.most_upd_peer_asn.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_upd_peer_asn[0].updates
-                    > self.most_upd_peer_asn[0].updates
-                ):
-                    self.most_upd_peer_asn = (
-                        merge_data.most_upd_peer_asn.copy()
-                    )
+        # Only the leaderboards which changed are written back
+        dirty = set()
+        lbs: dict[str, leaderboard] = {}
+        files = set(self.file_list)
+        merged = []
+
+        for merge_data in stats_list:
+            changed = False
+
+            for stat, lb_def in mrt_stats.LEADERBOARDS.items():
+                entries = getattr(merge_data, stat)
+                if not entries:
+                    continue
+                if stat not in lbs:
+                    lbs[stat] = self.get_leaderboard(stat)
+                if lbs[stat].merge(entries, lb_def[4]):
+                    dirty.add(stat)
                     changed = True
-            else:
-                self.most_upd_peer_asn = merge_data.most_upd_peer_asn.copy()
-                changed = True
 
-        """
-        Most withdraws per peer ASN
-        If stats from a rib dump are being merged this wont be present:
-        """
-        if merge_data.most_withd_peer_asn:
-            if self.most_withd_peer_asn:
-                if (
-                    merge_data.most_withd_peer_asn[0].withdraws
-                    == self.most_withd_peer_asn[0].withdraws
-                    and self.most_withd_peer_asn[0].withdraws > 0
-                ):
-                    s_peer_asns = [
-                        mrt_e.peer_asn for mrt_e in self.most_withd_peer_asn
-                    ]
-                    for mrt_e in merge_data.most_withd_peer_asn:
-                        if mrt_e.peer_asn not in s_peer_asns:
-                            self.most_withd_peer_asn.append(mrt_e)
-                            changed = True
-                elif (
-                    merge_data.most_withd_peer_asn[0].withdraws
-                    > self.most_withd_peer_asn[0].withdraws
-                ):
-                    self.most_withd_peer_asn = (
-                        merge_data.most_withd_peer_asn.copy()
-                    )
+            """
+            Most updates parsed
+            If stats from a rib dump are being merged, these wont be present:
+            """
+            if merge_data.total_upd:
+                if merge_data.total_upd > self.total_upd:
+                    self.total_upd = merge_data.total_upd
                     changed = True
-            else:
-                self.most_withd_peer_asn = (
-                    merge_data.most_withd_peer_asn.copy()
-                )
-                changed = True
 
-        # Most origin ASNs per prefix
-        if merge_data.most_origin_asns:
-            if self.most_origin_asns:
-                if (
-                    len(merge_data.most_origin_asns[0].origin_asns)
-                    == len(self.most_origin_asns[0].origin_asns)
-                    and len(self.most_origin_asns[0].origin_asns) > 0
-                ):
-                    for mrt_e in merge_data.most_origin_asns:
-                        for s_e in self.most_origin_asns:
-                            if mrt_e.prefix == s_e.prefix:
-                                if mrt_e.origin_asns != s_e.origin_asns:
-                                    s_e.origin_asns = s_e.origin_asns.union(
-                                        mrt_e.origin_asns
-                                    )
-                                    changed = True
-                                break
-                        else:
-                            self.most_origin_asns.append(mrt_e)
-                            changed = True
-                elif len(merge_data.most_origin_asns[0].origin_asns) > len(
-                    self.most_origin_asns[0].origin_asns
-                ):
-                    self.most_origin_asns = merge_data.most_origin_asns.copy()
+            # Most updates announcing prefixes
+            if merge_data.total_advt:
+                if merge_data.total_advt > self.total_advt:
+                    self.total_advt = merge_data.total_advt
                     changed = True
-            else:
-                self.most_origin_asns = merge_data.most_origin_asns.copy()
-                changed = True
 
-        # Prefixes with most unknown attributes
-        if merge_data.most_unknown_attrs:
-            if self.most_unknown_attrs:
-                if (
-                    len(merge_data.most_unknown_attrs[0].unknown_attrs)
-                    == len(self.most_unknown_attrs[0].unknown_attrs)
-                    and len(self.most_unknown_attrs[0].unknown_attrs) > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_unknown_attrs
-                    ]
-                    for mrt_e in merge_data.most_unknown_attrs:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.most_unknown_attrs.append(mrt_e)
-                            changed = True
-                elif len(merge_data.most_unknown_attrs[0].unknown_attrs) > len(
-                    self.most_unknown_attrs[0].unknown_attrs
-                ):
-                    self.most_unknown_attrs = (
-                        merge_data.most_unknown_attrs.copy()
-                    )
+            # Most updates withdrawing prefixes
+            if merge_data.total_withd:
+                if merge_data.total_withd > self.total_withd:
+                    self.total_withd = merge_data.total_withd
                     changed = True
-            else:
-                self.most_unknown_attrs = merge_data.most_unknown_attrs.copy()
-                changed = True
 
-        # Prefixes with most unregistered origin ASNs
-        if merge_data.most_unreg_origins:
-            if self.most_unreg_origins:
-                if (
-                    len(merge_data.most_unreg_origins[0].origin_asns)
-                    == len(self.most_unreg_origins[0].origin_asns)
-                    and len(self.most_unreg_origins[0].origin_asns) > 0
-                ):
-                    s_prefixes = [
-                        mrt_e.prefix for mrt_e in self.most_unreg_origins
-                    ]
-                    for mrt_e in merge_data.most_unreg_origins:
-                        if mrt_e.prefix not in s_prefixes:
-                            self.most_unreg_origins.append(mrt_e)
-                            changed = True
-                elif len(merge_data.most_unreg_origins[0].origin_asns) > len(
-                    self.most_unreg_origins[0].origin_asns
-                ):
-                    self.most_unreg_origins = (
-                        merge_data.most_unreg_origins.copy()
-                    )
+            # Most malformed records / updates skipped
+            if merge_data.total_skipped:
+                if merge_data.total_skipped > self.total_skipped:
+                    self.total_skipped = merge_data.total_skipped
                     changed = True
-            else:
-                self.most_unreg_origins = merge_data.most_unreg_origins.copy()
-                changed = True
 
-        """
-        Most updates parsed
-        If stats from a rib dump are being merged, these wont be present:
-        """
-        if merge_data.total_upd:
-            if merge_data.total_upd > self.total_upd:
-                self.total_upd = merge_data.total_upd
-                changed = True
+            if changed:
+                for filename in merge_data.file_list:
+                    if filename not in files:
+                        files.add(filename)
+                        self.file_list.append(filename)
+                self.timestamp = merge_data.timestamp
 
-        # Most updates announcing prefixes
-        if merge_data.total_advt:
-            if merge_data.total_advt > self.total_advt:
-                self.total_advt = merge_data.total_advt
-                changed = True
-
-        # Most updates withdrawing prefixes
-        if merge_data.total_withd:
-            if merge_data.total_withd > self.total_withd:
-                self.total_withd = merge_data.total_withd
-                changed = True
+            merged.append(changed)
 
-        if changed:
-            for filename in merge_data.file_list:
-                if filename not in self.file_list:
-                    self.file_list.append(filename)
-            self.timestamp = merge_data.timestamp
+        for stat in dirty:
+            setattr(self, stat, lbs[stat].to_list())
 
-        return changed
+        return merged
 
     def merge_archives(self: "mrt_stats", mrt_s: "mrt_stats"):
         """
@@ -2912,11 +1074,57 @@ class mrt_stats:
             print(f"total_advt: {self.total_advt}")
         if self.total_withd:
             print(f"total_withd: {self.total_withd}")
+        if self.total_skipped:
+            print(f"total_skipped: {self.total_skipped}")
         if self.file_list:
             print(f"file_list: {self.file_list}")
         if self.timestamp:
             print(f"timestamp: {self.timestamp}")
 
+    @staticmethod
+    def select_stats(stats: Optional[Iterable[str]] = None) -> set[str]:
+        """
+        Return the set of stats to load from a list of stat names, or all the
+        stats if stats is None.
+        """
+        if stats is None:
+            return set(mrt_stats.LEADERBOARDS)
+
+        if isinstance(stats, str):
+            raise TypeError(f"stats is not a list of stats: {stats}")
+
+        selected = set(stats)
+        for stat in selected:
+            if stat not in mrt_stats.LEADERBOARDS:
+                raise ValueError(f"Unknown stat: {stat}")
+        return selected
+
+    def set_lazy(
+        self: "mrt_stats", stat: str, loader: Callable[[], list[mrt_entry]]
+    ) -> None:
+        """
+        Set the MRT entries of stat to be decoded by loader when the stat is
+        first accessed, rather than now.
+        """
+        if stat not in mrt_stats.LEADERBOARDS:
+            raise ValueError(f"Unknown stat: {stat}")
+
+        if not callable(loader):
+            raise TypeError(f"loader is not callable: {type(loader)}")
+
+        self.__dict__.pop(stat, None)
+        self.__lazy_stats[stat] = loader
+
+    def skipped_ratio(self: "mrt_stats") -> float:
+        """
+        Return the ratio of malformed records / UPDATEs which were skipped, to
+        the UPDATEs which were parsed. This is 0 if no UPDATEs were parsed,
+        e.g. for RIB dumps.
+        """
+        if not self.total_upd:
+            return 0.0
+        return self.total_skipped / self.total_upd
+
     def to_file(self: "mrt_stats", filename: str) -> None:
         """
         Serialise the MRT stats obj to JSON, save JSON as text file.
@@ -2938,63 +1146,43 @@ class mrt_stats:
         """
         json_data = {
             "archive_list": list(self.archive_list),
-            "bogon_origin_asns": [
-                mrt_e.to_json() for mrt_e in self.bogon_origin_asns
-            ],
-            "bogon_prefixes": [
-                mrt_e.to_json() for mrt_e in self.bogon_prefixes
-            ],
-            "highest_med_prefixes": [
-                mrt_e.to_json() for mrt_e in self.highest_med_prefixes
-            ],
-            "invalid_len": [mrt_e.to_json() for mrt_e in self.invalid_len],
-            "longest_as_path": [
-                mrt_e.to_json() for mrt_e in self.longest_as_path
-            ],
-            "longest_comm_set": [
-                mrt_e.to_json() for mrt_e in self.longest_comm_set
-            ],
-            "most_advt_prefixes": [
-                mrt_e.to_json() for mrt_e in self.most_advt_prefixes
-            ],
-            "most_bogon_asns": [
-                mrt_e.to_json() for mrt_e in self.most_bogon_asns
-            ],
-            "most_upd_prefixes": [
-                mrt_e.to_json() for mrt_e in self.most_upd_prefixes
-            ],
-            "most_withd_prefixes": [
-                mrt_e.to_json() for mrt_e in self.most_withd_prefixes
-            ],
-            "most_advt_origin_asn": [
-                mrt_e.to_json() for mrt_e in self.most_advt_origin_asn
-            ],
-            "most_advt_peer_asn": [
-                mrt_e.to_json() for mrt_e in self.most_advt_peer_asn
-            ],
-            "most_upd_peer_asn": [
-                mrt_e.to_json() for mrt_e in self.most_upd_peer_asn
-            ],
-            "most_withd_peer_asn": [
-                mrt_e.to_json() for mrt_e in self.most_withd_peer_asn
-            ],
-            "most_origin_asns": [
-                mrt_e.to_json() for mrt_e in self.most_origin_asns
-            ],
-            "most_unknown_attrs": [
-                mrt_e.to_json() for mrt_e in self.most_unknown_attrs
-            ],
-            "most_unreg_origins": [
-                mrt_e.to_json() for mrt_e in self.most_unreg_origins
-            ],
+            **{
+                stat: [mrt_e.to_json() for mrt_e in getattr(self, stat)]
+                for stat in mrt_stats.LEADERBOARDS
+            },
             "total_upd": self.total_upd,
             "total_advt": self.total_advt,
             "total_withd": self.total_withd,
+            "total_skipped": self.total_skipped,
             "file_list": self.file_list,
             "timestamp": self.timestamp,
         }
         return json.dumps(json_data, indent=indent)
 
+    def to_partial(self: "mrt_stats") -> bytes:
+        """
+        Serialise the MRT stats obj to a compact partial, to pass between
+        processes. Each MRT entry is a tuple of its values, see
+        mrt_entry.to_tuple(), rather than a pickled object with the names of
+        all its attributes.
+        """
+        return pickle.dumps(
+            (
+                list(self.archive_list),
+                [
+                    [mrt_e.to_tuple() for mrt_e in getattr(self, stat)]
+                    for stat in mrt_stats.LEADERBOARDS
+                ],
+                self.total_upd,
+                self.total_advt,
+                self.total_withd,
+                self.total_skipped,
+                self.file_list,
+                self.timestamp,
+            ),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
     def ts_ymd(self: "mrt_stats") -> str:
         """
         Return only the YMD from this obj's timestamp raw e.g. YYYYMMDD
@@ -0,0 +1,195 @@
+import bz2
+import errno
+import gzip
+import logging
+import os
+from io import BufferedReader
+from typing import NamedTuple, Optional, Tuple, Union
+
+from dnas.mrt_decoder import mrt_decoder
+from dnas.mrt_shm import mrt_shm
+
+
+class mrt_header(NamedTuple):
+    """
+    The 12 byte header of one MRT record.
+    """
+
+    # Offset of the MRT record in the (decompressed) MRT file
+    offset: int
+    # POSIX timestamp
+    timestamp: int
+    type: int
+    subtype: int
+    # Length of the MRT record data, excluding the header
+    length: int
+
+
+class mrt_walker:
+    """
+    Walk the MRT records in an MRT file by reading only their 12 byte headers
+    and skipping the record data, nothing is decoded.
+
+    This is much faster than decoding the MRT file, to count the MRT records,
+    check their types, or get the timestamps, of a downloaded MRT file.
+    """
+
+    # Number of bytes to read from the MRT file at a time
+    READ_SIZE = 1048576
+
+    def __init__(
+        self: "mrt_walker",
+        filename: str,
+        keep_offsets: bool = False,
+        shm: Optional[mrt_shm] = None,
+    ) -> None:
+        """
+        If shm is specified the MRT file filename has been decompressed into
+        that shared memory segment, which is read instead.
+        """
+        if not filename:
+            raise ValueError("MRT filename missing")
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), filename
+            )
+
+        self.buf = b""
+        # Number of MRT records by (type, subtype)
+        self.counts: dict[Tuple[int, int], int] = {}
+        # True when an MRT header with an invalid type or length was found
+        self.corrupt = False
+        self.f: Union[bz2.BZ2File, gzip.GzipFile, BufferedReader, mrt_shm]
+        self.filename = filename
+        self.first_ts = 0
+        self.keep_offsets = keep_offsets
+        self.last_ts = 0
+        # Offset of the read buffer in the (decompressed) MRT file
+        self.offset = 0
+        # Offset of each MRT record, if keep_offsets is True
+        self.offsets: list[int] = []
+        self.pos = 0
+        self.total = 0
+        # True when the MRT file ends part way through an MRT record
+        self.truncated = False
+
+        # Magic Number
+        GZIP_MAGIC = b"\x1f\x8b"
+        BZ2_MAGIC = b"\x42\x5a\x68"
+
+        if shm:
+            self.f = shm
+            return
+
+        f = open(filename, "rb")
+        hdr = f.read(max(len(BZ2_MAGIC), len(GZIP_MAGIC)))
+        f.close()
+
+        if hdr.startswith(BZ2_MAGIC):
+            self.f = bz2.BZ2File(filename, "rb")
+        elif hdr.startswith(GZIP_MAGIC):
+            self.f = gzip.GzipFile(filename, "rb")
+        else:
+            self.f = open(filename, "rb")
+
+    def close(self: "mrt_walker") -> None:
+        """
+        Close the open MRT file.
+        """
+        self.f.close()
+
+    def __iter__(self: "mrt_walker") -> "mrt_walker":
+        return self
+
+    def __next__(self: "mrt_walker") -> mrt_header:
+        """
+        Return the header of the next MRT record in the MRT file. Stop at the
+        end of the MRT file, or at the first truncated or corrupt MRT record.
+        """
+        if self.f.closed:
+            raise StopIteration
+
+        if len(self.buf) - self.pos < 12:
+            self.buf = self.buf[self.pos :] + self.f.read(mrt_walker.READ_SIZE)
+            self.offset += self.pos
+            self.pos = 0
+
+            if len(self.buf) < 12:
+                if self.buf:
+                    self.stop_truncated(
+                        self.offset,
+                        f"Invalid MRT header length {len(self.buf)} < 12 "
+                        f"bytes",
+                    )
+                self.close()
+                raise StopIteration
+
+        ts, mrt_t, mrt_st, length = mrt_decoder.MRT_HDR.unpack_from(
+            self.buf, self.pos
+        )
+        offset = self.offset + self.pos
+
+        if not mrt_decoder.valid_header(mrt_t, length):
+            self.corrupt = True
+            logging.warning(
+                f"Invalid MRT header at offset {offset} in {self.filename}: "
+                f"type {mrt_t}, length {length}"
+            )
+            self.close()
+            raise StopIteration
+
+        # Skip the MRT record data, without buffering it when it's not read
+        remaining = 12 + length - (len(self.buf) - self.pos)
+        if remaining <= 0:
+            self.pos += 12 + length
+        else:
+            self.offset += len(self.buf)
+            self.buf = b""
+            self.pos = 0
+            while remaining:
+                data = self.f.read(min(remaining, mrt_walker.READ_SIZE))
+                if not data:
+                    self.stop_truncated(
+                        offset,
+                        f"Invalid MRT data length {length - remaining} < "
+                        f"{length} bytes",
+                    )
+                    self.close()
+                    raise StopIteration
+                remaining -= len(data)
+                self.offset += len(data)
+
+        if not self.total:
+            self.first_ts = ts
+        self.last_ts = ts
+        self.total += 1
+        key = (mrt_t, mrt_st)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if self.keep_offsets:
+            self.offsets.append(offset)
+
+        return mrt_header(offset, ts, mrt_t, mrt_st, length)
+
+    def stop_truncated(self: "mrt_walker", offset: int, reason: str) -> None:
+        """
+        Record and log that the MRT file is truncated, at the MRT record at
+        offset.
+        """
+        self.truncated = True
+        logging.warning(
+            f"Truncated MRT record at offset {offset} in "
+            f"{self.filename}: {reason}"
+        )
+
+    def walk(self: "mrt_walker") -> "mrt_walker":
+        """
+        Walk all the MRT records in the MRT file, then return this walker
+        with the counts and timestamps of the whole MRT file.
+        """
+        for _ in self:
+            pass
+        return self
@@ -2,8 +2,9 @@ import base64
 import gzip
 import json
 import logging
-from typing import Any, Iterable, Union
+from typing import Any, Iterable, Optional, Union
 
+from dnas.mrt_codec import mrt_codec
 from dnas.mrt_stats import mrt_stats
 from dnas.redis_auth import redis_auth  # type: ignore
 from dnas.twitter_msg import twitter_msg
@@ -66,14 +67,14 @@ class redis_db:
         self.r.close()
 
     @staticmethod
-    def compress(data: str) -> str:
+    def compress(data: Union[str, bytes]) -> str:
         """
         Gzip compress the import data (result in compressed binary data)
         Return a base85 encoded string of the compressed binary data.
         """
-        compressed = gzip.compress(
-            data=bytes(data, encoding="utf-8"), compresslevel=9
-        )
+        if isinstance(data, str):
+            data = bytes(data, encoding="utf-8")
+        compressed = gzip.compress(data=data, compresslevel=9)
         b85 = base64.b85encode(compressed)
         return b85.decode("utf-8")
 
@@ -83,14 +84,21 @@ class redis_db:
         Take in a base85 encoded string, decompress it to the original gzip
         binary data, and then decompress that to the original string
         """
+        return redis_db.decompress_bytes(data).decode("utf-8")
+
+    @staticmethod
+    def decompress_bytes(data: str) -> bytes:
+        """
+        Take in a base85 encoded string, and decompress it to the original
+        gzip binary data, and then decompress that to the original bytes.
+        """
         try:
             compressed = base64.b85decode(data)
         except ValueError:
             raise redis_db.RedisDecompressionFailure(
                 f"Failed to decode base85 str to binary: {data}"
             )
-        uncompressed = gzip.decompress(compressed)
-        return uncompressed.decode("utf-8")
+        return gzip.decompress(compressed)
 
     def del_from_queue(
         self: "redis_db", key: str, elem: str, compression: bool = True
@@ -333,22 +341,11 @@ class redis_db:
 
         t = self.r.type(key).decode("utf-8")
         if t == "string":
-            val = self.r.get(key)
-            if val:
-                if compression:
-                    try:
-                        return redis_db.decompress(val.decode("utf-8"))
-                    except self.RedisDecompressionFailure as e:
-                        raise self.RedisGetFailure(
-                            f"Failed to decompress value stored under key "
-                            f"{key}: {e}"
-                        )
-                else:
-                    return val.decode("utf-8")
-            else:
-                raise ValueError(
-                    f"Couldn't decode data stored under key {key}"
-                )
+            data = self.get_bytes(key, compression=compression)
+            if mrt_codec.is_encoded(data):
+                # MRT stats stored in the binary format are returned as JSON
+                return mrt_codec.decode(data).to_json()
+            return data.decode("utf-8")
         elif t == "list":
             if compression:
                 try:
@@ -369,6 +366,34 @@ class redis_db:
         else:
             raise TypeError(f"Unknown redis data type stored under {key}: {t}")
 
+    def get_bytes(
+        self: "redis_db", key: str, compression: bool = True
+    ) -> bytes:
+        """
+        Return the bytes stored in "key" from Redis, which must be a string
+        value, or b"" if the key doesn't exist.
+        """
+        if not key:
+            raise ValueError(f"Missing required arguments: key={key}")
+
+        val = self.r.get(key)
+        if val is None:
+            logging.debug(f"Key {key} doesn't exist in Redis")
+            return b""
+
+        if not val:
+            raise ValueError(f"Couldn't decode data stored under key {key}")
+
+        if not compression:
+            return val
+
+        try:
+            return redis_db.decompress_bytes(val.decode("utf-8"))
+        except self.RedisDecompressionFailure as e:
+            raise self.RedisGetFailure(
+                f"Failed to decompress value stored under key {key}: {e}"
+            )
+
     def get_keys(self: "redis_db", pattern: str) -> list[str]:
         """
         Return list of Redis keys that match search pattern.
@@ -413,22 +438,31 @@ class redis_db:
         return msgs
 
     def get_stats(
-        self: "redis_db", key: str, compression: bool = True
+        self: "redis_db",
+        key: str,
+        compression: bool = True,
+        stats: Optional[Iterable[str]] = None,
     ) -> Union[None, "mrt_stats"]:
         """
-        Return MRT stats from Redis as JSON, and return as an MRT stats object.
+        Return MRT stats from Redis, stored in the binary format or as JSON,
+        as an MRT stats object.
+        Only the stats listed in stats are loaded, or all of them if stats is
+        None, the others are left empty. The MRT entries of each stat are
+        only decoded when it is first accessed.
         """
         if not key:
             raise ValueError(f"Missing required arguments: key={key}")
 
-        json_str = self.get(key, compression=compression)
-        assert type(json_str) == str
-        if not json_str:
+        data = self.get_bytes(key, compression=compression)
+        if not data:
             logging.debug(f"Empty day stats key {key}")
             return None
 
+        if mrt_codec.is_encoded(data):
+            return mrt_codec.decode(data, stats=stats, lazy=True)
+
         mrt_s = mrt_stats()
-        mrt_s.from_json(json_str)
+        mrt_s.from_json(data.decode("utf-8"), stats=stats, lazy=True)
         return mrt_s
 
     def ping(self: "redis_db") -> None:
@@ -455,6 +489,23 @@ class redis_db:
         else:
             self.r.set(key, value)
 
+    def set_stats(
+        self: "redis_db", key: str, mrt_s: mrt_stats, compression: bool = True
+    ) -> None:
+        """
+        Store an MRT stats object in Redis under key, in the binary format.
+        """
+        if not key or not mrt_s:
+            raise ValueError(
+                f"Missing required arguments: key={key}, mrt_s={mrt_s}"
+            )
+
+        data = mrt_codec.encode(mrt_s)
+        if compression:
+            self.r.set(key, redis_db.compress(data))
+        else:
+            self.r.set(key, data)
+
     def to_file(self: "redis_db", filename: str, compression: bool = True):
         """
         Dump the entire redis DB to a JSON file.
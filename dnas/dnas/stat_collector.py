@@ -0,0 +1,728 @@
+import abc
+from typing import Optional, Union
+
+from dnas.asn_classifier import asn_classifier
+from dnas.bogon_ip import bogon_ip
+from dnas.config import config as cfg
+from dnas.ip_prefix import ip_prefix
+from dnas.leaderboard import leaderboard
+from dnas.mrt_decoder import bgp_update, mrt_decoder
+from dnas.mrt_entry import mrt_entry
+from dnas.mrt_stats import mrt_stats
+
+
+class parse_state:
+    """
+    The state of an MRT file being parsed, which is shared by all the stat
+    collectors. It's updated in place for each BGP UPDATE, the AS path,
+    origin ASN and next-hop are carried over from the previous UPDATE when
+    an UPDATE doesn't contain them.
+
+    The AS path, communities, next-hop and unknown attributes are tuples and
+    a frozenset, so that the MRT entries made from the same UPDATE can share
+    them without one entry changing the others, see entry().
+    """
+
+    def __init__(
+        self: "parse_state",
+        filename: str,
+        file_ts: str,
+        rib: bool = False,
+    ) -> None:
+        self.filename = filename
+        self.file_ts = file_ts
+        self.rib = rib
+
+        self.as_path: tuple[str, ...] = ()
+        self.comm_set: tuple[str, ...] = ()
+        self.next_hop: Union[str, tuple[str, ...]] = ""
+        self.origin_asn: str = ""
+        # The asn_classifier flags of the origin ASN
+        self.origin_flags: int = 0
+        # The advertised prefixes of this UPDATE, IPv6 then IPv4
+        self.prefixes: list[int] = []
+        self.ts: str = ""
+        self.unknown_attrs: frozenset[int] = frozenset()
+        # The UPDATE being parsed, set before the collectors observe it
+        self.upd: bgp_update
+
+    def entry(self: "parse_state", prefix: int, med: bool = True) -> mrt_entry:
+        """
+        Return a new MRT entry for a prefix advertised by this UPDATE. If med
+        is False the MED of this UPDATE isn't stored in the entry. The entry
+        shares the tuples and frozenset of this UPDATE, the entries which are
+        kept must be thawed once parsing is finished, see mrt_entry.thaw().
+        """
+        return mrt_entry(
+            as_path=self.as_path,  # type: ignore
+            comm_set=self.comm_set,  # type: ignore
+            filename=self.filename,
+            med=self.upd.med if med else cfg.MISSING_MED,
+            next_hop=self.next_hop,  # type: ignore
+            origin_asns=set([self.origin_asn]),
+            peer_asn=self.upd.peer_asn,
+            prefix=ip_prefix.to_str(prefix),
+            timestamp=self.ts,
+            unknown_attrs=self.unknown_attrs,  # type: ignore
+        )
+
+
+class stat_collector(abc.ABC):
+    """
+    A stat collector generates one or more of the stats in an MRT stats obj.
+    It observes each BGP UPDATE in an MRT file, then the stats are written to
+    the MRT stats obj when the file is finalized. Only the collectors of the
+    stats which are enabled are run when parsing an MRT file. Collectors
+    don't merge stats, the MRT stats objs of the chunks of an MRT file are
+    added together by mrt_stats, using the functions of each stat in
+    mrt_stats.LEADERBOARDS.
+
+    A collector can only generate the stats which mrt_stats already has: a
+    field, a LEADERBOARDS entry, and a place in its JSON and binary formats
+    (see mrt_codec). A new stat must be added to mrt_stats first, then a
+    collector for it registered, see stat_collectors.register().
+    """
+
+    # The stats generated by this collector
+    STATS: tuple[str, ...] = ()
+    """
+    The BGP path attributes this collector reads, only the attributes of the
+    active collectors are decoded, see stat_collectors.get_attrs().
+    """
+    ATTRS: frozenset[int] = frozenset()
+    # If False this collector isn't run when parsing RIB dumps
+    RIB = True
+    """
+    If True, this collector only observes UPDATEs which advertise prefixes.
+    Withdraw only UPDATEs aren't passed to it.
+    """
+    ADVERTISED_ONLY = True
+
+    def __init__(
+        self: "stat_collector", mrt_s: mrt_stats, state: parse_state
+    ) -> None:
+        self.mrt_s = mrt_s
+        self.state = state
+
+    @abc.abstractmethod
+    def finalize(self: "stat_collector") -> None:
+        """
+        Write the stats collected from all observed UPDATEs to the MRT stats
+        obj.
+        """
+
+    @abc.abstractmethod
+    def observe(self: "stat_collector") -> None:
+        """
+        Collect the stats from the current UPDATE in the parse state.
+        """
+
+
+class prefix_entries_collector(stat_collector):
+    """
+    Base collector for the stats which keep a unique MRT entry per prefix,
+    with the origin ASNs of each UPDATE for the same prefix being added to the
+    existing entry.
+    """
+
+    # The attributes stored in each MRT entry, see parse_state.entry()
+    ATTRS = frozenset([mrt_decoder.AS_PATH, mrt_decoder.NEXT_HOP])
+
+    def __init__(
+        self: "prefix_entries_collector", mrt_s: mrt_stats, state: parse_state
+    ) -> None:
+        super().__init__(mrt_s, state)
+        self.entries: dict[int, mrt_entry] = {}
+
+    def add_prefixes(
+        self: "prefix_entries_collector", prefixes: list[int]
+    ) -> None:
+        """
+        Add an entry for each prefix, or the origin ASN to the existing entry.
+        """
+        for prefix in prefixes:
+            if prefix in self.entries:
+                self.entries[prefix].origin_asns.add(self.state.origin_asn)
+            else:
+                self.entries[prefix] = self.state.entry(prefix)
+
+    def finalize(self: "prefix_entries_collector") -> None:
+        stat = self.STATS[0]
+        lb = self.mrt_s.get_leaderboard(stat)
+        lb.merge(self.entries.values())
+        entries = lb.to_list()
+        for entry in entries:
+            entry.thaw()
+        setattr(self.mrt_s, stat, entries)
+
+
+class bogon_origin_asns_collector(prefix_entries_collector):
+    """
+    Prefixes originated by a bogon ASN.
+    """
+
+    STATS = ("bogon_origin_asns",)
+
+    def observe(self: "bogon_origin_asns_collector") -> None:
+        if self.state.origin_flags & asn_classifier.BOGON:
+            self.add_prefixes(self.state.prefixes)
+
+
+class bogon_prefixes_collector(prefix_entries_collector):
+    """
+    Bogon prefixes.
+    """
+
+    STATS = ("bogon_prefixes",)
+
+    def observe(self: "bogon_prefixes_collector") -> None:
+        self.add_prefixes(bogon_ip.get_bogons(self.state.prefixes))
+
+
+class invalid_len_collector(prefix_entries_collector):
+    """
+    Prefixes which are too long or too short to be accepted in the DFZ.
+    """
+
+    STATS = ("invalid_len",)
+
+    def observe(self: "invalid_len_collector") -> None:
+        upd = self.state.upd
+        invalid_len = [
+            prefix
+            for prefix in upd.mp_nlri
+            if ip_prefix.length(prefix) > 56 or ip_prefix.length(prefix) < 16
+        ] + [
+            prefix
+            for prefix in upd.nlri
+            if ip_prefix.length(prefix) > 24 or ip_prefix.length(prefix) < 8
+        ]
+        if invalid_len:
+            self.add_prefixes(invalid_len)
+
+
+class most_unreg_origins_collector(prefix_entries_collector):
+    """
+    Prefixes originated by an unallocated ASN. Only UPDATEs with an AS path
+    are checked, not those using the AS path of a previous UPDATE.
+    """
+
+    STATS = ("most_unreg_origins",)
+
+    def observe(self: "most_unreg_origins_collector") -> None:
+        if (
+            self.state.origin_flags & asn_classifier.UNALLOCATED
+            and self.state.upd.as_path
+        ):
+            self.add_prefixes(self.state.prefixes)
+
+
+class most_unknown_attrs_collector(prefix_entries_collector):
+    """
+    Prefixes with the most unknown attributes, the unknown attributes of each
+    UPDATE for the same prefix are added to the existing entry.
+    """
+
+    STATS = ("most_unknown_attrs",)
+
+    def observe(self: "most_unknown_attrs_collector") -> None:
+        unknown_attrs = self.state.unknown_attrs
+        if not unknown_attrs:
+            return
+
+        for prefix in self.state.prefixes:
+            if prefix in self.entries:
+                entry = self.entries[prefix]
+                # The frozenset is shared, so it's replaced not updated
+                entry.unknown_attrs = entry.unknown_attrs | unknown_attrs
+            else:
+                self.entries[prefix] = self.state.entry(prefix, med=False)
+
+
+class most_bogon_asns_collector(stat_collector):
+    """
+    The ASNs which are downstream of the most bogon origin ASNs, which is the
+    first non-bogon ASN in the AS path of a bogon origin ASN.
+    """
+
+    STATS = ("most_bogon_asns",)
+    ATTRS = frozenset([mrt_decoder.AS_PATH])
+
+    def __init__(
+        self: "most_bogon_asns_collector",
+        mrt_s: mrt_stats,
+        state: parse_state,
+    ) -> None:
+        super().__init__(mrt_s, state)
+        self.bogon_asns: dict[str, set] = {}
+
+    def finalize(self: "most_bogon_asns_collector") -> None:
+        lb = self.mrt_s.get_leaderboard("most_bogon_asns")
+        for asn in self.bogon_asns:
+            if lb.admits(len(self.bogon_asns[asn])):
+                lb.offer(
+                    mrt_entry(
+                        as_path=[asn],
+                        origin_asns=self.bogon_asns[asn],
+                        filename=self.state.filename,
+                        timestamp=self.state.file_ts,
+                    )
+                )
+        self.mrt_s.most_bogon_asns = lb.to_list()
+
+    def observe(self: "most_bogon_asns_collector") -> None:
+        if not self.state.origin_flags & asn_classifier.BOGON:
+            return
+
+        as_path = self.state.as_path
+        origin_asn = self.state.origin_asn
+
+        path_flags = asn_classifier.classify_path(as_path)
+        i = -1
+        while path_flags[i] & asn_classifier.BOGON:
+            i -= 1
+            if i + len(as_path) < 0:
+                break
+        else:
+            if as_path[i] not in self.bogon_asns:
+                self.bogon_asns[as_path[i]] = set([origin_asn])
+            else:
+                self.bogon_asns[as_path[i]].add(origin_asn)
+
+
+class highest_value_collector(stat_collector):
+    """
+    Base collector for the stats which keep the prefixes with the highest
+    value of an UPDATE attribute, offered straight to the stat's leaderboard.
+    """
+
+    # The attributes stored in each MRT entry, see parse_state.entry()
+    ATTRS = prefix_entries_collector.ATTRS
+
+    def __init__(
+        self: "highest_value_collector", mrt_s: mrt_stats, state: parse_state
+    ) -> None:
+        super().__init__(mrt_s, state)
+        self.lb: leaderboard = mrt_s.get_leaderboard(self.STATS[0])
+
+    def finalize(self: "highest_value_collector") -> None:
+        entries = self.lb.to_list()
+        for entry in entries:
+            entry.thaw()
+        setattr(self.mrt_s, self.STATS[0], entries)
+
+    def offer_prefixes(self: "highest_value_collector", value: int) -> None:
+        """
+        Offer each prefix of the current UPDATE, with value, to the stat's
+        leaderboard.
+        """
+        for prefix in self.state.prefixes:
+            if self.lb.admits(value):
+                self.lb.offer(self.state.entry(prefix))
+
+
+class highest_med_prefixes_collector(highest_value_collector):
+    """
+    Prefixes with the highest MED.
+    """
+
+    STATS = ("highest_med_prefixes",)
+    ATTRS = highest_value_collector.ATTRS | set([mrt_decoder.MULTI_EXIT_DISC])
+
+    def observe(self: "highest_med_prefixes_collector") -> None:
+        if self.lb.admits(self.state.upd.med):
+            self.offer_prefixes(self.state.upd.med)
+
+
+class longest_as_path_collector(highest_value_collector):
+    """
+    Prefixes with the longest AS path.
+    """
+
+    STATS = ("longest_as_path",)
+
+    def observe(self: "longest_as_path_collector") -> None:
+        if self.lb.admits(len(self.state.as_path)):
+            self.offer_prefixes(len(self.state.as_path))
+
+
+class longest_comm_set_collector(highest_value_collector):
+    """
+    Prefixes with the longest community set.
+    """
+
+    STATS = ("longest_comm_set",)
+    ATTRS = highest_value_collector.ATTRS | set(
+        [mrt_decoder.COMMUNITY, mrt_decoder.LARGE_COMMUNITY]
+    )
+
+    def observe(self: "longest_comm_set_collector") -> None:
+        if self.lb.admits(len(self.state.comm_set)):
+            self.offer_prefixes(len(self.state.comm_set))
+
+
+class most_advt_origin_asn_collector(stat_collector):
+    """
+    The origin ASNs with the most UPDATEs which contain an AS path.
+    """
+
+    STATS = ("most_advt_origin_asn",)
+    ATTRS = frozenset([mrt_decoder.AS_PATH])
+    RIB = False
+    ADVERTISED_ONLY = False
+
+    def __init__(
+        self: "most_advt_origin_asn_collector",
+        mrt_s: mrt_stats,
+        state: parse_state,
+    ) -> None:
+        super().__init__(mrt_s, state)
+        self.advt_per_origin_asn: dict[str, int] = {}
+
+    def finalize(self: "most_advt_origin_asn_collector") -> None:
+        lb = self.mrt_s.get_leaderboard("most_advt_origin_asn")
+        for asn in self.advt_per_origin_asn:
+            if lb.admits(self.advt_per_origin_asn[asn]):
+                lb.offer(
+                    mrt_entry(
+                        advt=self.advt_per_origin_asn[asn],
+                        filename=self.state.filename,
+                        origin_asns=set([asn]),
+                        timestamp=self.state.file_ts,
+                    )
+                )
+        self.mrt_s.most_advt_origin_asn = lb.to_list()
+
+    def observe(self: "most_advt_origin_asn_collector") -> None:
+        upd = self.state.upd
+        if upd.has_attrs and upd.as_path:
+            origin_asn = self.state.origin_asn
+            if origin_asn not in self.advt_per_origin_asn:
+                self.advt_per_origin_asn[origin_asn] = 1
+            else:
+                self.advt_per_origin_asn[origin_asn] += 1
+
+
+class most_origin_asns_collector(stat_collector):
+    """
+    Prefixes with the most origin ASNs. Withdrawn prefixes are included with
+    no origin ASNs.
+
+    A RIB record contains all the entries for a single prefix, so when
+    parsing a RIB dump, once the next prefix is seen the origin ASNs of the
+    last prefix are complete and don't need to be stored any more.
+    """
+
+    STATS = ("most_origin_asns",)
+    ATTRS = frozenset([mrt_decoder.AS_PATH])
+    ADVERTISED_ONLY = False
+
+    def __init__(
+        self: "most_origin_asns_collector",
+        mrt_s: mrt_stats,
+        state: parse_state,
+    ) -> None:
+        super().__init__(mrt_s, state)
+        self.lb: leaderboard = mrt_s.get_leaderboard("most_origin_asns")
+        self.origin_asns_prefix: dict[int, set] = {}
+        self.rib_prefix: Optional[int] = None
+
+    def finalize(self: "most_origin_asns_collector") -> None:
+        for prefix in self.origin_asns_prefix:
+            self.offer(prefix, self.origin_asns_prefix[prefix])
+        self.mrt_s.most_origin_asns = self.lb.to_list()
+
+    def observe(self: "most_origin_asns_collector") -> None:
+        state = self.state
+        origin_asns_prefix = self.origin_asns_prefix
+
+        if state.rib:
+            if not state.prefixes:
+                return
+            if state.prefixes[0] != self.rib_prefix:
+                if self.rib_prefix is not None:
+                    self.offer(
+                        self.rib_prefix,
+                        origin_asns_prefix.pop(self.rib_prefix),
+                    )
+                self.rib_prefix = state.prefixes[0]
+                origin_asns_prefix[self.rib_prefix] = set()
+            origin_asns_prefix[self.rib_prefix].add(state.origin_asn)
+            return
+
+        upd = state.upd
+        for prefix in upd.withdrawn:
+            if prefix not in origin_asns_prefix:
+                origin_asns_prefix[prefix] = set()
+
+        if upd.has_attrs:
+            for prefix in upd.mp_withdrawn:
+                if prefix not in origin_asns_prefix:
+                    origin_asns_prefix[prefix] = set()
+
+        for prefix in state.prefixes:
+            if prefix not in origin_asns_prefix:
+                origin_asns_prefix[prefix] = set([state.origin_asn])
+            else:
+                origin_asns_prefix[prefix].add(state.origin_asn)
+
+    def offer(
+        self: "most_origin_asns_collector", prefix: int, origin_asns: set[str]
+    ) -> None:
+        """
+        Offer prefix to the most_origin_asns leaderboard, only building an
+        MRT entry if it has the same or more origin ASNs than the prefixes
+        already on the leaderboard.
+        """
+        if self.lb.admits(len(origin_asns)):
+            self.lb.offer(
+                mrt_entry(
+                    filename=self.state.filename,
+                    origin_asns=origin_asns,
+                    prefix=ip_prefix.to_str(prefix),
+                    timestamp=self.state.file_ts,
+                )
+            )
+
+
+class counters_collector(stat_collector):
+    """
+    Base collector for the stats which count the advertisements and
+    withdraws of each key (a prefix or peer ASN), and keep the keys with the
+    most advertisements, withdraws, and updates (advertisements plus
+    withdraws).
+    """
+
+    RIB = False
+    ADVERTISED_ONLY = False
+
+    def __init__(
+        self: "counters_collector", mrt_s: mrt_stats, state: parse_state
+    ) -> None:
+        super().__init__(mrt_s, state)
+        # The [advertisements, withdraws] of each key
+        self.counters: dict[Union[int, str], list[int]] = {}
+
+    def finalize(self: "counters_collector") -> None:
+        stat_advt, stat_upd, stat_withd = self.STATS
+        most_advt = self.mrt_s.get_leaderboard(stat_advt)
+        most_withd = self.mrt_s.get_leaderboard(stat_withd)
+        most_upd = self.mrt_s.get_leaderboard(stat_upd)
+        for key, (advt, withdraws) in self.counters.items():
+            if most_advt.admits(advt):
+                entry = self.key_entry(key)
+                entry.advt = advt
+                most_advt.offer(entry)
+            if most_withd.admits(withdraws):
+                entry = self.key_entry(key)
+                entry.withdraws = withdraws
+                most_withd.offer(entry)
+            if most_upd.admits(advt + withdraws):
+                entry = self.key_entry(key)
+                entry.updates = advt + withdraws
+                most_upd.offer(entry)
+        setattr(self.mrt_s, stat_advt, most_advt.to_list())
+        setattr(self.mrt_s, stat_withd, most_withd.to_list())
+        setattr(self.mrt_s, stat_upd, most_upd.to_list())
+
+    @abc.abstractmethod
+    def key_entry(
+        self: "counters_collector", key: Union[int, str]
+    ) -> mrt_entry:
+        """
+        Return a new MRT entry for key, without any counters.
+        """
+
+
+class prefix_counters_collector(counters_collector):
+    """
+    Prefixes with the most advertisements, updates, and withdraws.
+    """
+
+    STATS = ("most_advt_prefixes", "most_upd_prefixes", "most_withd_prefixes")
+
+    def key_entry(
+        self: "prefix_counters_collector", key: Union[int, str]
+    ) -> mrt_entry:
+        return mrt_entry(
+            filename=self.state.filename,
+            prefix=ip_prefix.to_str(key),  # type: ignore
+            timestamp=self.state.file_ts,
+        )
+
+    def observe(self: "prefix_counters_collector") -> None:
+        counters = self.counters
+        upd = self.state.upd
+
+        # IPv4 withdraws
+        for prefix in upd.withdrawn:
+            if prefix not in counters:
+                counters[prefix] = [0, 1]
+            else:
+                counters[prefix][1] += 1
+
+        if not upd.has_attrs:
+            return
+
+        # IPv6 withdraws
+        for prefix in upd.mp_withdrawn:
+            if prefix not in counters:
+                counters[prefix] = [0, 1]
+            else:
+                counters[prefix][1] += 1
+
+        for prefix in self.state.prefixes:
+            if prefix not in counters:
+                counters[prefix] = [1, 0]
+            else:
+                counters[prefix][0] += 1
+
+
+class peer_counters_collector(counters_collector):
+    """
+    Peer ASNs with the most UPDATEs advertising prefixes, withdrawing
+    prefixes, and both. An UPDATE with IPv4 and IPv6 withdraws counts as two
+    withdraws.
+    """
+
+    STATS = ("most_advt_peer_asn", "most_upd_peer_asn", "most_withd_peer_asn")
+
+    def key_entry(
+        self: "peer_counters_collector", key: Union[int, str]
+    ) -> mrt_entry:
+        return mrt_entry(
+            filename=self.state.filename,
+            peer_asn=key,  # type: ignore
+            timestamp=self.state.file_ts,
+        )
+
+    def observe(self: "peer_counters_collector") -> None:
+        upd = self.state.upd
+        if upd.peer_asn not in self.counters:
+            self.counters[upd.peer_asn] = [0, 0]
+        counters = self.counters[upd.peer_asn]
+
+        if upd.withdrawn:
+            counters[1] += 1
+
+        if upd.has_attrs:
+            counters[0] += 1
+            if upd.mp_withdrawn:
+                counters[1] += 1
+
+
+class stat_collectors:
+    """
+    The registry of stat collectors, which maps each stat in an MRT stats obj
+    to the collector which generates it.
+    """
+
+    """
+    The BGP path attributes which are always decoded, the advertised and
+    withdrawn prefixes are needed to count the UPDATEs in every MRT stats obj.
+    """
+    ATTRS = frozenset([mrt_decoder.MP_REACH_NLRI, mrt_decoder.MP_UNREACH_NLRI])
+
+    COLLECTORS: list[type[stat_collector]] = [
+        bogon_origin_asns_collector,
+        bogon_prefixes_collector,
+        highest_med_prefixes_collector,
+        invalid_len_collector,
+        longest_as_path_collector,
+        longest_comm_set_collector,
+        prefix_counters_collector,
+        most_bogon_asns_collector,
+        most_advt_origin_asn_collector,
+        peer_counters_collector,
+        most_origin_asns_collector,
+        most_unknown_attrs_collector,
+        most_unreg_origins_collector,
+    ]
+
+    @staticmethod
+    def get_collectors(
+        stats: Optional[list[str]] = None, rib: bool = False
+    ) -> list[type[stat_collector]]:
+        """
+        Return the collectors which generate the list of stats, or all stats
+        if stats is empty. If rib is True, only the collectors which are run
+        when parsing RIB dumps are returned.
+        """
+        if stats is None:
+            stats = []
+
+        if type(stats) != list:
+            raise TypeError(f"stats is not a list: {type(stats)}")
+
+        for stat in stats:
+            if stat not in stat_collectors.names():
+                raise ValueError(
+                    f"Unknown stat {stat}, must be one of "
+                    f"{stat_collectors.names()}"
+                )
+
+        return [
+            collector
+            for collector in stat_collectors.COLLECTORS
+            if (not stats or any(stat in stats for stat in collector.STATS))
+            and (collector.RIB or not rib)
+        ]
+
+    @staticmethod
+    def get_attrs(
+        stats: Optional[list[str]] = None, rib: bool = False
+    ) -> frozenset[int]:
+        """
+        Return the BGP path attributes which must be decoded to generate the
+        list of stats, or all stats if stats is empty, see get_collectors().
+        """
+        attrs = stat_collectors.ATTRS
+        for collector in stat_collectors.get_collectors(stats, rib):
+            attrs = attrs | collector.ATTRS
+        return attrs
+
+    @staticmethod
+    def names() -> list[str]:
+        """
+        Return the names of all the stats which have a registered collector.
+        """
+        return [
+            stat
+            for collector in stat_collectors.COLLECTORS
+            for stat in collector.STATS
+        ]
+
+    @staticmethod
+    def register(collector: type[stat_collector]) -> None:
+        """
+        Register a collector for one or more stats, replacing the collectors
+        already registered for the same stats. The stats must already be in
+        mrt_stats.LEADERBOARDS, see stat_collector. A collector which would
+        replace one that also generates other stats isn't registered, as
+        those stats would no longer be generated.
+        """
+        if not issubclass(collector, stat_collector):
+            raise TypeError(f"collector is not a stat collector: {collector}")
+
+        for stat in collector.STATS:
+            if stat not in mrt_stats.LEADERBOARDS:
+                raise ValueError(f"Unknown stat {stat}")
+
+        if not collector.ATTRS <= mrt_decoder.ALL_ATTRS:
+            raise ValueError(
+                f"Unknown path attributes "
+                f"{set(collector.ATTRS - mrt_decoder.ALL_ATTRS)}, must be in "
+                f"{set(mrt_decoder.ALL_ATTRS)}"
+            )
+
+        stats = set(collector.STATS)
+        for c in stat_collectors.COLLECTORS:
+            if stats & set(c.STATS) and not set(c.STATS) <= stats:
+                raise ValueError(
+                    f"{collector.__name__} would replace {c.__name__}, which "
+                    f"also generates {sorted(set(c.STATS) - stats)}"
+                )
+
+        stat_collectors.COLLECTORS = [
+            c for c in stat_collectors.COLLECTORS if not stats & set(c.STATS)
+        ] + [collector]
@@ -1,6 +1,4 @@
-import logging
-
-from dnas.config import config as cfg
+from typing import Tuple
 
 
 class unallocated_asn:
@@ -8,29 +6,44 @@ class unallocated_asn:
     Class to check if an ASN is unallocated by IANA to any RIR.
     """
 
-    unallocated_ranges: list[range] = []
-
     def __init__(self: "unallocated_asn") -> None:
         """
-        Load the unallocated ASN ranges
+        Load the ASN classifier, if it isn't already loaded.
         """
+        # asn_classifier imports this module to compile the ranges
+        from dnas.asn_classifier import asn_classifier
 
-        with open(cfg.unallocated_asns_file, "r") as unallocated_asns:
-            for asn_tuple in unallocated_asns.readlines():
-                min_asn, max_asn = map(int, asn_tuple.strip("()\n").split(","))
-                self.unallocated_ranges.append(range(min_asn, max_asn + 1))
-        logging.debug(
-            f"Loaded {len(self.unallocated_ranges)} unallocated ASN tuples"
-        )
+        asn_classifier.load()
 
     def is_unallocated(self: "unallocated_asn", asn: int) -> bool:
         """
         Return True if ASN is unallocated, else False.
         """
+        from dnas.asn_classifier import asn_classifier
+
         if type(asn) != int:
             raise TypeError(f"{asn} is not an int: {type(asn)}")
 
-        for unallocated_range in self.unallocated_ranges:
-            if asn in unallocated_range:
-                return True
-        return False
+        return asn_classifier.is_unallocated(asn)
+
+    @staticmethod
+    def load_ranges(filename: str) -> list[Tuple[int, int]]:
+        """
+        Return the first and last ASN of each unallocated ASN range in
+        filename, as written by update_asn_allocations.py. These are
+        compiled into the asn_classifier index.
+        """
+        if not filename:
+            raise ValueError(
+                f"Missing required arguments: filename={filename}"
+            )
+
+        if type(filename) != str:
+            raise TypeError(f"filename is not a string: {type(filename)}")
+
+        ranges = []
+        with open(filename, "r") as unallocated_asns:
+            for asn_tuple in unallocated_asns.readlines():
+                min_asn, max_asn = map(int, asn_tuple.strip("()\n").split(","))
+                ranges.append((min_asn, max_asn))
+        return ranges
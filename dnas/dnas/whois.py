@@ -1,7 +1,7 @@
 import logging
 import subprocess
 
-from dnas.bogon_asn import bogon_asn
+from dnas.asn_classifier import asn_classifier
 
 
 class whois:
@@ -13,7 +13,7 @@ class whois:
         if type(asn) != int:
             raise TypeError(f"asn is not string: {type(asn)}")
 
-        if bogon_asn.is_bogon(asn):
+        if asn_classifier.is_bogon(asn):
             return ""
 
         cmd = ["whois", f"AS{str(asn)}"]
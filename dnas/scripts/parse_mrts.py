@@ -2,13 +2,19 @@
 
 import argparse
 import datetime
+import gc
 import glob
 import logging
 import multiprocessing
 import os
 import sys
+import threading
 import time
-from multiprocessing import Pool
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Deque, NamedTuple, Optional, Sequence, Tuple
 
 # Accommodate the use of the dnas library, even when the library isn't installed
 sys.path.append(
@@ -19,10 +25,139 @@ from dnas.config import config as cfg
 from dnas.log import log
 from dnas.mrt_archive import mrt_archive
 from dnas.mrt_archives import mrt_archives
+from dnas.mrt_index import mrt_index
 from dnas.mrt_parser import mrt_parser
+from dnas.mrt_reducer import mrt_reducer
+from dnas.mrt_shm import mrt_shm
 from dnas.mrt_splitter import MrtFormatError, mrt_splitter
 from dnas.mrt_stats import mrt_stats
 from dnas.redis_db import redis_db
+from dnas.stat_collector import stat_collectors
+
+
+class parse_job(NamedTuple):
+    """
+    An MRT file which has been prepared for parsing, see prepare_file().
+    """
+
+    filename: str
+    # Parse the MRT file using the pool of parser processes
+    multi: bool
+    # The MRT file is too small to be valid, and isn't parsed
+    skip: bool
+    # Index of the decompressed copy of the MRT file on disk
+    mrt_idx: Optional[mrt_index]
+    # Byte ranges of the decompressed copy, None parses the whole MRT file
+    offset_ranges: Sequence[Optional[Tuple[int, int]]]
+    # Uncompressed size of the MRT file
+    size: int
+    file_ts: str
+    strip_comm: str
+    # Adds the MRT stats of each range together, as they are parsed
+    reducer: Optional[mrt_reducer]
+    # Shared memory segments of chunks which may not have been parsed yet
+    segments: Deque[mrt_shm]
+    # Limits the shared memory segments of this and other MRT files
+    budget: Optional["shm_budget"] = None
+
+
+class shm_budget:
+    """
+    Keep the shared memory segments of every streamed MRT file which may not
+    have been parsed yet, see stream_file(), within limit bytes in total.
+    parse_files() shares one between all the MRT files it's preparing and
+    parsing at the same time, not only the MRT file being streamed.
+    """
+
+    def __init__(self: "shm_budget", limit: int) -> None:
+        if type(limit) != int:
+            raise TypeError(f"limit is not an int: {type(limit)}")
+
+        if limit <= 0:
+            raise ValueError(f"limit must be greater than 0, not {limit}")
+
+        self.limit = limit
+        # The segments are removed by the preparer thread and the main thread
+        self.lock = threading.Lock()
+        """
+        Segments in the order they were created, with the task parsing each
+        one and the segments of the job it belongs to. A job is copied by
+        _replace(), but its segments aren't:
+        """
+        self.pending: Deque[Tuple[AsyncResult, mrt_shm, Deque[mrt_shm]]] = (
+            deque()
+        )
+        # Total size of the segments
+        self.size = 0
+
+    def add(
+        self: "shm_budget", job: parse_job, shm: mrt_shm, result: AsyncResult
+    ) -> None:
+        """
+        Add a segment of job, which is being parsed by the task result.
+        """
+        with self.lock:
+            job.segments.append(shm)
+            self.pending.append((result, shm, job.segments))
+            self.size += shm.size
+
+    def remove(self: "shm_budget", job: parse_job) -> None:
+        """
+        Remove the segments of job which are left, once it has been parsed.
+        """
+        with self.lock:
+            self.pending = deque(
+                p for p in self.pending if p[2] is not job.segments
+            )
+            while job.segments:
+                shm = job.segments.popleft()
+                self.size -= shm.size
+                shm.unlink()
+
+    def reserve(self: "shm_budget", size: int) -> None:
+        """
+        Wait for the oldest segments to be parsed, and remove them, until a
+        new segment of size bytes would fit within the limit.
+        """
+        while True:
+            with self.lock:
+                if self.size + size <= self.limit or not self.pending:
+                    return
+                result = self.pending[0][0]
+            result.wait()
+            with self.lock:
+                if self.pending and self.pending[0][0] is result:
+                    _, shm, segments = self.pending.popleft()
+                    segments.remove(shm)
+                    self.size -= shm.size
+                    shm.unlink()
+
+
+def can_start(parsing: Sequence[parse_job]) -> bool:
+    """
+    Return True if the next prepared MRT file can be started, given the MRT
+    files being parsed, oldest first. Files are started while the pool has
+    room in its queue, cfg.PARSE_QUEUE ranges of cfg.SPLIT_SIZE per parser
+    process, unless the oldest file has been parsed, then its stats are
+    stored first.
+    """
+    if not parsing:
+        return True
+
+    queue_size = cfg.PARSE_QUEUE * multiprocessing.cpu_count() * cfg.SPLIT_SIZE
+    queued = sum(job.size for job in parsing)
+    return queued < queue_size and not is_done(parsing[0])
+
+
+def cleanup_file(job: parse_job) -> None:
+    """
+    Remove the decompressed copy of a prepared MRT file and its index, and
+    any shared memory segments.
+    """
+    if job.budget:
+        job.budget.remove(job)
+    if job.mrt_idx:
+        job.mrt_idx.remove()
 
 
 def continuous(args: dict) -> None:
@@ -42,6 +177,9 @@ def continuous(args: dict) -> None:
 
     mrt_a = mrt_archives()
     min_interval = cfg.DFT_INTERVAL
+    # The parser processes are started once, and reused for every MRT file
+    pool = new_pool() if args["multi"] else None
+    bz2_pool = new_bz2_pool() if args["multi"] else None
 
     while True:
         delta = datetime.timedelta(minutes=90)
@@ -94,11 +232,114 @@ def continuous(args: dict) -> None:
 
         if filelist:
             logging.debug(f"Checking for {len(filelist)} files: {filelist}")
-            parse_files(filelist=filelist, args=args)
+            parse_files(
+                filelist=filelist, args=args, pool=pool, bz2_pool=bz2_pool
+            )
 
         time.sleep(min_interval)
 
 
+def finish_file(
+    job: parse_job, stats: Optional[list[str]] = None
+) -> "mrt_stats":
+    """
+    Return the mrt_stats of a prepared MRT file, once the parser processes
+    have finished parsing it (see start_file()), or by parsing it in this
+    process if multi is False. The MRT file is cleaned up afterwards, see
+    cleanup_file().
+    """
+    if stats is None:
+        stats = []
+
+    try:
+        if job.skip:
+            return mrt_stats()
+
+        if not job.multi:
+            mrt_a = mrt_archives()
+            if mrt_a.is_rib_from_filename(job.filename):
+                return mrt_parser.parse_rib_dump(job.filename, stats=stats)
+            else:
+                return mrt_parser.parse_upd_dump(job.filename, stats=stats)
+
+        if not job.reducer:
+            return mrt_stats()
+        return job.reducer.get()
+    finally:
+        cleanup_file(job)
+
+
+def is_done(job: parse_job) -> bool:
+    """
+    Return True if the parser processes have finished parsing a started MRT
+    file, see start_file().
+    """
+    return not job.reducer or job.reducer.ready()
+
+
+def is_parsed(
+    filename: str, rdb: redis_db, mrt_a: mrt_archives, args: dict
+) -> bool:
+    """
+    Return True if the MRT file has already been parsed into its day stats
+    in Redis, and it shouldn't be parsed again. It's deleted if args["remove"]
+    is True.
+    """
+    logging.info(f"Checking file {filename}")
+    day_key = mrt_a.get_day_key(filename)
+    day_stats = rdb.get_stats(day_key)
+
+    if day_stats:
+        if filename in day_stats.file_list and not args["overwrite"]:
+            logging.info(f"Skipping {filename}, already in {day_key}")
+            if args["remove"]:
+                logging.debug(f"Deleting {filename}")
+                os.remove(filename)
+            return True
+
+    return False
+
+
+def new_pool() -> Pool:
+    """
+    Start a pool of parser processes, one per CPU core. The lookup tables
+    used by the parser are loaded and then frozen before the processes are
+    forked, so that the processes share them, see gc.freeze(). The pages are
+    only shared under CPython, PyPy has no gc.freeze(). A process which isn't
+    forked, or a PyPy process, loads them once when it starts.
+    """
+    mrt_parser.preload()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    """
+    The processes must share one resource tracker, otherwise each one would
+    remove the shared memory segments it attached to, see mrt_shm, when it
+    stops:
+    """
+    resource_tracker.ensure_running()
+    return multiprocessing.Pool(
+        multiprocessing.cpu_count(), initializer=mrt_parser.preload
+    )
+
+
+def new_bz2_pool() -> Optional[Pool]:
+    """
+    Start a pool of cfg.BZ2_PROCS processes which decompress the blocks of
+    bz2 MRT files in parallel, see bz2_reader, or return None if bz2 files
+    are decompressed in a single process.
+
+    It's separate from the parser pool, otherwise the blocks of the next
+    file would be queued behind the parse tasks of the files before it, and
+    the next file couldn't be prepared until they had all been parsed. It
+    must be started in the main thread, it's used in the preparer thread of
+    parse_files().
+    """
+    procs = cfg.BZ2_PROCS if cfg.BZ2_PROCS else multiprocessing.cpu_count()
+    if procs < 2:
+        return None
+    return multiprocessing.Pool(procs)
+
+
 def parse_args() -> dict:
     """
     Parse the CLI args to this script.
@@ -226,160 +467,277 @@ def parse_args() -> dict:
         action="store_true",
         required=False,
     )
+    parser.add_argument(
+        "--stats",
+        help="Only generate these stats, for targeted reprocessing. All stats "
+        "are generated if neither this nor MRT_STATS in the config are set. "
+        "The stats aren't stored in Redis unless all stats are generated.",
+        type=str,
+        nargs="+",
+        choices=stat_collectors.names(),
+        default=cfg.MRT_STATS,
+        required=False,
+    )
 
     return vars(parser.parse_args())
 
 
-def parse_file(
-    filename: str, keep_chunks: bool = False, multi: bool = True
-) -> "mrt_stats":
+def parse_error(filename: str, e: Exception) -> None:
     """
-    Split and parse an individual MRT file, return the mrt_stats.
+    Log an MRT file which couldn't be parsed. A truncated MRT file is
+    deleted, so that it can be downloaded again.
     """
-    if not filename:
-        raise ValueError(f"Missing required arguments: filename={filename}.")
-
-    if type(filename) != str:
-        raise TypeError(f"filename is not a string: {type(filename)}")
-
-    mrt_a = mrt_archives()
-    logging.info(f"Processing {filename}...")
-
-    fs = os.path.getsize(filename)
-    if fs > cfg.MAX_MRT_SIZE:
-        logging.warning(
-            f"File size of {filename} ({(fs/ 1000 / 1000):0.4}MBs) is greater "
-            f"than max size ({cfg.MAX_MRT_SIZE}MB), forcing single process "
-            "parsing"
-        )
-        multi = False
-    elif fs < 64:
+    if isinstance(e, EOFError):
+        logging.error(f"Unable to split {filename}, unexpected EOF: {e}")
+        os.remove(filename)
+        logging.error(f"Deleted {filename}")
+    else:
         logging.error(
-            f"Skipping file {filename}. File size ({fs} bytes) is less "
-            f"than the minimum required size ({cfg.MIN_MRT_SIZE}). This is "
-            f"assumed to be an invalid file."
+            f"Couldn't parse file {filename} due to formatting error: "
+            f"{str(e)}"
         )
-        return mrt_stats()
 
-    if multi:
-        no_cpu = multiprocessing.cpu_count()
-        Pool = multiprocessing.Pool(no_cpu)
 
-        splitter = mrt_splitter(filename)
-        num_entries, file_chunks = splitter.split(
-            no_chunks=no_cpu, outdir=cfg.SPLIT_DIR
+def parse_files(
+    filelist: list[str],
+    args: dict,
+    pool: Optional[Pool] = None,
+    bz2_pool: Optional[Pool] = None,
+) -> None:
+    """
+    Parse a list of MRT files and store the stats of each one in Redis.
+    Every file is parsed using the pool of parser processes pool, or one new
+    pool for all of them if pool isn't specified. Likewise bz2 files are
+    decompressed using bz2_pool, or one new pool, see new_bz2_pool().
+
+    The files are parsed in a pipeline of three stages:
+    * A preparer thread decompresses and indexes up to cfg.PARSE_AHEAD of
+      the next files (or streams them into the pool, see stream_file(),
+      within cfg.MAX_MRT_MEMORY for all the files), and splits each file
+      into ranges by size, see prepare_file().
+    * The ranges of as many files as it takes to keep every parser process
+      busy are queued in the pool, see start_file() and can_start().
+    * Once the oldest file has been parsed, its stats are merged and stored
+      in Redis, see finish_file(), so the stats are stored in order.
+    With --no-multi each file is parsed in this process by finish_file().
+    """
+    if not filelist or not args:
+        raise ValueError(
+            f"Missing required arguments: filelist={filelist}, args={args}"
         )
-        try:
-            splitter.close()
-        except StopIteration:
-            pass
 
-        if mrt_a.is_rib_from_filename(filename):
-            mrt_chunks = Pool.map(mrt_parser.parse_rib_dump, file_chunks)
-        else:
-            mrt_chunks = Pool.map(mrt_parser.parse_upd_dump, file_chunks)
+    if type(filelist) != list:
+        raise TypeError(f"filelist is not a list: {type(filelist)}")
+
+    """
+    A file listed twice is only parsed once, the decompressed copy of a file
+    is shared and would be removed while it's still being parsed:
+    """
+    filelist = list(dict.fromkeys(filelist))
 
-        Pool.close()
+    rdb = redis_db()
+    mrt_a = mrt_archives()
+    parse_pool = pool
+    if not pool and args["multi"]:
+        parse_pool = new_pool()
+    decomp_pool = bz2_pool
+    if not bz2_pool and args["multi"]:
+        decomp_pool = new_bz2_pool()
+
+    files = iter(enumerate(filelist))
+    # Shared memory of all the streamed files being prepared and parsed
+    budget = shm_budget(cfg.MAX_MRT_MEMORY)
+    # Files being prepared, and files being parsed, in order
+    preparing: Deque[Tuple[int, str, Future]] = deque()
+    parsing: Deque[Tuple[int, parse_job]] = deque()
 
-        if not keep_chunks:
-            for i in range(0, len(file_chunks)):
-                if cfg.SPLIT_DIR:
-                    os.remove(
-                        os.path.join(
-                            cfg.SPLIT_DIR, os.path.basename(file_chunks[i])
+    logging.info(f"Done 0/{len(filelist)}")
+    with ThreadPoolExecutor(max_workers=1) as preparer:
+        try:
+            while True:
+                while len(preparing) <= cfg.PARSE_AHEAD:
+                    idx, file = next(files, (-1, ""))
+                    if not file:
+                        break
+                    if is_parsed(file, rdb, mrt_a, args):
+                        continue
+                    preparing.append(
+                        (
+                            idx,
+                            file,
+                            preparer.submit(
+                                prepare_file,
+                                file,
+                                args["multi"],
+                                parse_pool,
+                                args["stats"],
+                                decomp_pool,
+                                budget,
+                            ),
                         )
                     )
-                else:
-                    os.remove(file_chunks[i])
 
-        mrt_s = mrt_stats()
-        for chunk in mrt_chunks:
-            mrt_s.add(chunk)
+                if not preparing and not parsing:
+                    break
+
+                if preparing and can_start([job for _, job in parsing]):
+                    idx, file, future = preparing.popleft()
+                    try:
+                        job = future.result()
+                        start_file(job, args["stats"])
+                        parsing.append((idx, job))
+                    except (EOFError, MrtFormatError) as e:
+                        parse_error(file, e)
+                    continue
 
-    else:
-        if mrt_a.is_rib_from_filename(filename):
-            mrt_s = mrt_parser.parse_rib_dump(filename)
-        else:
-            mrt_s = mrt_parser.parse_upd_dump(filename)
+                idx, job = parsing.popleft()
+                try:
+                    mrt_s = finish_file(job, args["stats"])
+                except (EOFError, MrtFormatError) as e:
+                    parse_error(job.filename, e)
+                    continue
+                store_stats(job.filename, mrt_s, rdb, mrt_a, args)
+                logging.info(f"Done {idx+1}/{len(filelist)}")
+        finally:
+            for _, _, future in preparing:
+                if not future.cancel() and not future.exception():
+                    cleanup_file(future.result())
+            for _, job in parsing:
+                cleanup_file(job)
+
+    if parse_pool and not pool:
+        parse_pool.close()
+        parse_pool.join()
+    if decomp_pool and not bz2_pool:
+        decomp_pool.close()
+        decomp_pool.join()
+    rdb.close()
 
-    return mrt_s
 
+def parser_args(
+    job: parse_job,
+    stats: list[str],
+    offset_range: Optional[Tuple[int, int]],
+    shm_name: str = "",
+) -> tuple:
+    """
+    Return the arguments for mrt_parser.parse_partial(), to parse the offset
+    range of a prepared MRT file, or of the shared memory segment shm_name,
+    or the whole MRT file if offset_range is None.
+    """
+    args: tuple = (
+        job.filename,
+        stats,
+        offset_range,
+        shm_name,
+        job.file_ts,
+        job.strip_comm,
+    )
+    mrt_a = mrt_archives()
+    if mrt_a.is_rib_from_filename(job.filename):
+        return args
+    # The default MRT engine
+    return args[:1] + ("",) + args[1:]
 
-def parse_files(filelist: list[str], args: dict) -> None:
+
+def plan_file(filename: str) -> Tuple[int, int]:
     """
-    A wrapper around the single file parsing function parse_file(), which
-    accepts a list of files to parse.
+    Return the number of ranges the MRT file filename is parsed in by the
+    parser processes, and its (estimated) uncompressed size, see
+    mrt_index.est_size() and split_count(). A file smaller than
+    cfg.MIN_MRT_SIZE is assumed to be invalid and has 0 ranges, its size is
+    the file size.
     """
-    if not filelist or not args:
-        raise ValueError(
-            f"Missing required arguments: filelist={filelist}, args={args}"
-        )
+    fs = os.path.getsize(filename)
+    if fs < cfg.MIN_MRT_SIZE:
+        return 0, fs
 
-    if type(filelist) != list:
-        raise TypeError(f"filelist is not a list: {type(filelist)}")
+    size = mrt_index.est_size(filename)
+    return split_count(size), size
 
-    rdb = redis_db()
-    mrt_a = mrt_archives()
 
-    logging.info(f"Done 0/{len(filelist)}")
-    for idx, file in enumerate(filelist):
-        logging.info(f"Checking file {file}")
-
-        arch = mrt_a.arch_from_file_path(file)
-        day_key = mrt_a.get_day_key(file)
-        day_stats = rdb.get_stats(day_key)
-
-        if day_stats:
-            if file in day_stats.file_list and not args["overwrite"]:
-                logging.info(f"Skipping {file}, already in {day_key}")
-                if args["remove"]:
-                    logging.debug(f"Deleting {file}")
-                    os.remove(file)
-                continue
+def prepare_file(
+    filename: str,
+    multi: bool = True,
+    pool: Optional[Pool] = None,
+    stats: Optional[list[str]] = None,
+    bz2_pool: Optional[Pool] = None,
+    budget: Optional[shm_budget] = None,
+) -> parse_job:
+    """
+    Prepare an MRT file to be parsed by the parser processes, see
+    start_file(). By default (cfg.SPLIT_SHM) the MRT file is streamed into
+    the pool of parser processes pool in bounded memory, see stream_file().
+    Else the MRT file is decompressed and indexed once on disk (or the index
+    from a previous run is reused), each process then parses a range of the
+    MRT records from the one uncompressed copy, see cfg.SPLIT_SIZE. A bz2
+    MRT file is decompressed in parallel across bz2_pool, see
+    new_bz2_pool(). The shared memory of a streamed MRT file is limited by
+    budget, or cfg.MAX_MRT_MEMORY for this MRT file alone if budget isn't
+    specified, see shm_budget.
+    """
+    if not filename:
+        raise ValueError(f"Missing required arguments: filename={filename}.")
 
-        try:
-            mrt_s = parse_file(filename=file, multi=args["multi"])
-        except MrtFormatError as e:
-            logging.error(
-                f"Couldn't parse file {file} due to formatting error: "
-                f"{str(e)}"
-            )
-            continue
-        except EOFError as e:
-            logging.error(f"Unable to split {file}, unexpected EOF: {e}")
-            os.remove(file)
-            logging.error(f"Deleted {file}")
-            continue
+    if type(filename) != str:
+        raise TypeError(f"filename is not a string: {type(filename)}")
 
-        if day_stats:
-            if day_stats.add(mrt_s):
-                if arch:
-                    day_stats.add_archive(arch.NAME)
-                else:
-                    logging.warning(
-                        f"Unable to add archive name to stats object"
-                    )
-                logging.info(f"Added {file} to {day_key}")
-            elif file not in day_stats.file_list:
-                logging.info(f"Added {file} to {day_key} file list")
-                day_stats.file_list.append(file)
-            rdb.set(day_key, day_stats.to_json())
+    if stats is None:
+        stats = []
 
-        else:
-            if arch:
-                mrt_s.add_archive(arch.NAME)
-            else:
-                logging.warning(f"Unable to add archive name to stats object")
-            rdb.set(day_key, mrt_s.to_json())
-            logging.info(f"Created new entry {day_key} from {file}")
+    mrt_a = mrt_archives()
+    logging.info(f"Processing {filename}...")
 
-        if args["remove"]:
-            logging.debug(f"Deleting {file}")
-            os.remove(file)
+    job = parse_job(filename, False, False, None, [], 0, "", "", None, deque())
+    ranges, size = plan_file(filename)
+    if not ranges:
+        logging.error(
+            f"Skipping file {filename}. File size ({size} bytes) is less "
+            f"than the minimum required size ({cfg.MIN_MRT_SIZE}). This is "
+            f"assumed to be an invalid file."
+        )
+        return job._replace(skip=True)
 
-        logging.info(f"Done {idx+1}/{len(filelist)}")
+    if not multi:
+        return job
 
-    rdb.close()
+    """
+    Look up the file timestamp and archive options once, rather than in
+    each process:
+    """
+    job = job._replace(
+        multi=True,
+        file_ts=mrt_parser.get_timestamp(filename),
+        strip_comm=mrt_a.get_arch_option(filename, "STRIP_COMM"),
+        reducer=mrt_reducer(pool) if pool else None,
+    )
+
+    # A small MRT file is parsed whole by one process, straight from the file
+    if ranges == 1:
+        return job._replace(offset_ranges=[None], size=size)
+
+    if cfg.SPLIT_SHM:
+        if not pool:
+            raise ValueError(
+                f"A pool of parser processes is required to stream {filename}"
+            )
+        job = job._replace(
+            budget=budget if budget else shm_budget(cfg.MAX_MRT_MEMORY)
+        )
+        try:
+            return job._replace(size=stream_file(job, stats, bz2_pool))
+        except BaseException:
+            cleanup_file(job)
+            raise
+
+    index = mrt_index.get(filename, bz2_pool)
+    return job._replace(
+        mrt_idx=index,
+        offset_ranges=index.ranges(
+            split_count(index.size), by_time=(cfg.SPLIT_MODE == "time")
+        ),
+        size=index.size,
+    )
 
 
 def process_day(args: dict) -> None:
@@ -561,6 +919,166 @@ def process_range(args: dict) -> None:
     parse_files(filelist=filelist, args=args)
 
 
+def split_count(size: int) -> int:
+    """
+    Return the number of ranges of about cfg.SPLIT_SIZE an MRT file of size
+    uncompressed bytes is split into. A small MRT file is parsed whole, as 1
+    range, the overhead of decompressing and splitting it first would
+    outweigh parsing it in parallel.
+    """
+    if size <= cfg.SPLIT_SIZE:
+        return 1
+    return -(-size // cfg.SPLIT_SIZE)
+
+
+def start_file(job: parse_job, stats: Optional[list[str]] = None) -> None:
+    """
+    Start parsing each range of a prepared MRT file in the pool of parser
+    processes, see finish_file(). The stats of the ranges are added together
+    in the pool as they are parsed, see mrt_reducer. Only the list of stats
+    is generated, or all stats if stats is empty. A streamed MRT file has
+    already been started, see stream_file().
+    """
+    if not job.multi or job.skip or not job.offset_ranges or not job.reducer:
+        return
+
+    if stats is None:
+        stats = []
+
+    for offset_range in job.offset_ranges:
+        job.reducer.apply(
+            mrt_parser.parse_partial,
+            (parser_args(job, stats, offset_range),),
+        )
+    job.reducer.close()
+
+
+def stream_file(
+    job: parse_job,
+    stats: Optional[list[str]] = None,
+    bz2_pool: Optional[Pool] = None,
+) -> int:
+    """
+    Split a prepared MRT file into chunks of about cfg.SPLIT_SIZE as it's
+    decompressed (across bz2_pool if it's a bz2 file), copy each chunk into
+    a shared memory segment, and start parsing it in the pool of parser
+    processes straight away, see mrt_reducer. Before a chunk would take the
+    segments waiting to be parsed, of this and the other MRT files sharing
+    the job's budget, over cfg.MAX_MRT_MEMORY bytes, wait for the oldest to
+    be parsed, so that any number of MRT files of any size are parsed in
+    bounded memory, see shm_budget. Return the uncompressed size of the MRT
+    file.
+    """
+    reducer = job.reducer
+    if not reducer:
+        raise ValueError(f"No reducer to add the stats of {job.filename}")
+
+    budget = job.budget
+    if not budget:
+        raise ValueError(f"No shared memory budget for {job.filename}")
+
+    if stats is None:
+        stats = []
+
+    # Enough chunks to keep every parser process busy, of at least 1MB
+    chunk_size = max(
+        min(
+            cfg.SPLIT_SIZE,
+            budget.limit // (4 * multiprocessing.cpu_count()),
+        ),
+        1048576,
+    )
+    mrt_a = mrt_archives()
+    splitter = mrt_splitter(job.filename, bz2_pool)
+
+    # The peer table of a RIB dump is copied to the start of every chunk
+    peer_table = b""
+    if mrt_a.is_rib_from_filename(job.filename):
+        try:
+            next(splitter)
+        except StopIteration:
+            reducer.close()
+            return 0
+        peer_table = bytes(splitter.data)
+
+    chunks = 0
+    size = len(peer_table)
+    for chunk in splitter.chunks(chunk_size):
+        budget.reserve(len(peer_table) + len(chunk))
+        shm = mrt_shm.from_bytes(peer_table + chunk)
+        try:
+            result = reducer.apply(
+                mrt_parser.parse_partial,
+                (
+                    parser_args(
+                        job, stats, (len(peer_table), shm.size), shm.name
+                    ),
+                ),
+            )
+        except BaseException:
+            shm.unlink()
+            raise
+        budget.add(job, shm, result)
+        chunks += 1
+        size += len(chunk)
+
+    reducer.close()
+    logging.debug(f"Streamed {chunks} chunks of {job.filename}")
+    return size
+
+
+def store_stats(
+    filename: str,
+    mrt_s: "mrt_stats",
+    rdb: redis_db,
+    mrt_a: mrt_archives,
+    args: dict,
+) -> None:
+    """
+    Add the stats of an MRT file to its day stats in Redis. The MRT file is
+    deleted afterwards if args["remove"] is True.
+
+    The stats of a targeted run, when args["stats"] is set, aren't stored.
+    Only the path attributes of those stats were decoded, so the MRT entries
+    are incomplete (e.g. no MED or communities), and adding the file to the
+    day stats would stop a later full run from parsing it, see is_parsed().
+    """
+    if args["stats"]:
+        logging.warning(
+            f"Not storing the stats of {filename}, only {args['stats']} were "
+            f"generated"
+        )
+        return
+
+    arch = mrt_a.arch_from_file_path(filename)
+    day_key = mrt_a.get_day_key(filename)
+    day_stats = rdb.get_stats(day_key)
+
+    if day_stats:
+        if day_stats.add(mrt_s):
+            if arch:
+                day_stats.add_archive(arch.NAME)
+            else:
+                logging.warning(f"Unable to add archive name to stats object")
+            logging.info(f"Added {filename} to {day_key}")
+        elif filename not in day_stats.file_list:
+            logging.info(f"Added {filename} to {day_key} file list")
+            day_stats.file_list.append(filename)
+        rdb.set_stats(day_key, day_stats)
+
+    else:
+        if arch:
+            mrt_s.add_archive(arch.NAME)
+        else:
+            logging.warning(f"Unable to add archive name to stats object")
+        rdb.set_stats(day_key, mrt_s)
+        logging.info(f"Created new entry {day_key} from {filename}")
+
+    if args["remove"]:
+        logging.debug(f"Deleting {filename}")
+        os.remove(filename)
+
+
 def main():
     args = parse_args()
     log.setup(
@@ -5,7 +5,7 @@ import logging
 import os
 import pprint
 import sys
-from typing import Any
+from typing import Any, Optional
 
 # Accommodate the use of the dnas library, even when the library isn't installed
 sys.path.append(
@@ -126,6 +126,17 @@ def parse_args() -> dict[Any, Any]:
         required=False,
         default=None,
     )
+    parser.add_argument(
+        "--fields",
+        help="Only load and print these stats from the mrt stats object, "
+        "when using --daily, --global or --stats. E.g., --fields "
+        "longest_as_path most_upd_prefixes.",
+        type=str,
+        nargs="+",
+        metavar=("stat"),
+        required=False,
+        default=None,
+    )
     parser.add_argument(
         "--find-keys",
         help="Search for keys in redis",
@@ -243,21 +254,25 @@ def print_keys() -> None:
     print(f"{len(keys)} keys in total")
 
 
-def print_stats(key: str, compression: bool) -> None:
+def print_stats(
+    key: str, compression: bool, stats: Optional[list[str]] = None
+) -> None:
     """
     Print an mrt stats object stored in redis, based on the passed key.
     """
     if not key:
         raise ValueError(f"Missing required arguments: key={key}")
 
-    mrt_s = rdb.get_stats(key=key, compression=compression)
+    mrt_s = rdb.get_stats(key=key, compression=compression, stats=stats)
     if mrt_s:
         mrt_s.print()
     else:
         print(f"No stats stored in redis under key {key}")
 
 
-def print_stats_daily(ymd: str, compression: bool) -> None:
+def print_stats_daily(
+    ymd: str, compression: bool, stats: Optional[list[str]] = None
+) -> None:
     """
     Print the mrt stats object from a specific day stored in redis.
     """
@@ -265,7 +280,7 @@ def print_stats_daily(ymd: str, compression: bool) -> None:
         raise ValueError(f"Missing required arguments: ymd={ymd}")
 
     mrt_s = rdb.get_stats(
-        key=mrt_stats.gen_daily_key(ymd), compression=compression
+        key=mrt_stats.gen_daily_key(ymd), compression=compression, stats=stats
     )
     if mrt_s:
         mrt_s.print()
@@ -300,12 +315,14 @@ def print_stats_diff(keys: list[str], compression: bool) -> None:
         print(f"Stats objects are equal")
 
 
-def print_stats_global(compression: bool) -> None:
+def print_stats_global(
+    compression: bool, stats: Optional[list[str]] = None
+) -> None:
     """
     Print the global stats object stored in redis.
     """
     mrt_s = rdb.get_stats(
-        key=mrt_stats.gen_global_key(), compression=compression
+        key=mrt_stats.gen_global_key(), compression=compression, stats=stats
     )
     if mrt_s:
         mrt_s.print()
@@ -354,7 +371,9 @@ def main():
         wipe()
 
     if args["daily"]:
-        print_stats_daily(ymd=args["daily"], compression=compression)
+        print_stats_daily(
+            ymd=args["daily"], compression=compression, stats=args["fields"]
+        )
 
     if args["delete"]:
         delete(key=args["delete"])
@@ -366,7 +385,7 @@ def main():
         find_keys(pattern=args["find_keys"])
 
     if args["global"]:
-        print_stats_global(compression=compression)
+        print_stats_global(compression=compression, stats=args["fields"])
 
     if args["keys"]:
         print_keys()
@@ -384,7 +403,9 @@ def main():
         )
 
     if args["stats"]:
-        print_stats(key=args["stats"], compression=compression)
+        print_stats(
+            key=args["stats"], compression=compression, stats=args["fields"]
+        )
 
     rdb.close()
 
@@ -44,6 +44,8 @@ def gen_day_stats(
     day_stats = mrt_stats()
     day_stats.timestamp = mrt_stats.gen_ts_from_ymd(ymd)
     day_keys = []
+    # (redis key, archive, stats type, stats obj) of each archive to merge
+    arch_keys = []
 
     for arch in mrt_a.archives:
         if enabled and not arch.ENABLED:
@@ -53,37 +55,34 @@ def gen_day_stats(
         if rib:
             day_key = arch.gen_rib_key(ymd)
             arch_stats = rdb.get_stats(day_key)
-
             if arch_stats:
-                if day_stats.merge(arch_stats):
-                    day_keys.append(day_key)
-                    logging.info(
-                        f"Compiling {day_key} RIB stats into daily stats for "
-                        f"{ymd}"
-                    )
-                else:
-                    logging.info(
-                        f"No contribution from {day_key} RIB to daily stats "
-                        f"for {ymd}"
-                    )
+                arch_keys.append((day_key, arch, "RIB", arch_stats))
 
         if update:
             day_key = arch.gen_upd_key(ymd)
             arch_stats = rdb.get_stats(day_key)
-
             if arch_stats:
-                if day_stats.merge(arch_stats):
-                    day_stats.add_archive(arch.NAME)
-                    day_keys.append(day_key)
-                    logging.info(
-                        f"Compiling {day_key} UPDATE stats into daily stats "
-                        f"for {ymd}"
-                    )
-                else:
-                    logging.info(
-                        f"No contribution from {day_key} UPDATE to daily stats "
-                        f"for {ymd}"
-                    )
+                arch_keys.append((day_key, arch, "UPDATE", arch_stats))
+
+    """
+    Merge the stats of every archive in one pass, in the same order they
+    would be merged one by one:
+    """
+    merged = day_stats.merge_many([arch_s for _, _, _, arch_s in arch_keys])
+    for (day_key, arch, stats_type, _), changed in zip(arch_keys, merged):
+        if changed:
+            if stats_type == "UPDATE":
+                day_stats.add_archive(arch.NAME)
+            day_keys.append(day_key)
+            logging.info(
+                f"Compiling {day_key} {stats_type} stats into daily stats "
+                f"for {ymd}"
+            )
+        else:
+            logging.info(
+                f"No contribution from {day_key} {stats_type} to daily stats "
+                f"for {ymd}"
+            )
 
     """
     Overwrite the list of MRT files this stats object is made with,
@@ -97,12 +96,12 @@ def gen_day_stats(
             f"No existing global stats obj for day {ymd}, "
             f"storing compiled stats under {day_key}"
         )
-        rdb.set(day_key, day_stats.to_json())
+        rdb.set_stats(day_key, day_stats)
     else:
         logging.debug(f"Retrieved existing day stats from {day_key}")
         if db_day_stats.merge(day_stats):
             db_day_stats.merge_archives(day_stats)
-            rdb.set(day_key, db_day_stats.to_json())
+            rdb.set_stats(day_key, db_day_stats)
             logging.info(
                 f"Merged {ymd} stats with existing day stats under "
                 f"{day_key}"
@@ -154,7 +153,7 @@ def gen_diff(ymd: str) -> None:
             )
         else:
             logging.info(f"Storing new diff stats for {ymd} under {diff_key}")
-        rdb.set(diff_key, new_diff.to_json())
+        rdb.set_stats(diff_key, new_diff)
 
     else:
         if new_diff.is_empty():
@@ -165,7 +164,7 @@ def gen_diff(ymd: str) -> None:
             logging.info(
                 f"Overwitten existing diff for {ymd} under {diff_key}"
             )
-            rdb.set(diff_key, new_diff.to_json())
+            rdb.set_stats(diff_key, new_diff)
 
     rdb.close()
 
@@ -341,14 +340,14 @@ def upd_global_with_day(ymd: str) -> None:
             f"No existing gobal stats in redis, creating new entry with day "
             f"stats for {ymd}"
         )
-        rdb.set(global_key, day_stats.to_json())
+        rdb.set_stats(global_key, day_stats)
 
     # Else there are global stats and day stats to merge
     else:
         if global_stats.merge(day_stats):
             global_stats.merge_archives(day_stats)
             logging.info(f"Global stats merged with day stats from {ymd}")
-            rdb.set(global_key, global_stats.to_json())
+            rdb.set_stats(global_key, global_stats)
         else:
             logging.info(
                 f"No update to global stats with day stats from {ymd}"
@@ -19,6 +19,7 @@ from dnas.config import config as cfg
 from dnas.log import log
 from dnas.mrt_parser import mrt_parser
 from dnas.mrt_stats import mrt_stats
+from dnas.mrt_walker import mrt_walker
 
 
 class MrtType(str, Enum):
@@ -39,30 +40,59 @@ def check_rib_dump(filename: str) -> None:
             errno.ENOENT, os.strerror(errno.ENOENT), filename
         )
 
-    mrt_entries = mrtparse.Reader(filename)
-    for idx, mrt_e in enumerate(mrt_entries):
-        rib_type = list(mrt_e.data["type"].keys())[0]
-        if rib_type != mrtparse.MRT_T["TABLE_DUMP_V2"]:
+    # Only the MRT headers are read, the MRT records aren't decoded
+    walker = mrt_walker(filename)
+    for idx, mrt_h in enumerate(walker):
+        if mrt_h.type != mrtparse.MRT_T["TABLE_DUMP_V2"]:
             logging.error(
                 f"Entry {idx} in {filename} is not type TABLE_DUMP_V2: "
-                f"{mrt_e.data['type']}"
+                f"{mrt_h.type}"
             )
-            logging.error(mrt_e.data)
+            logging.error(mrt_h)
+            walker.close()
             return
 
         # RIB dumps can contain both AFIs (v4 and v6)
-        rib_subtype = list(mrt_e.data["subtype"].keys())[0]
-        if rib_subtype not in mrtparse.TD_V2_ST:
+        if mrt_h.subtype not in mrtparse.TD_V2_ST:
             logging.error(
                 f"Entry {idx} in {filename} is not type PEER_INDEX_TABLE or "
-                f"RIB_IPV4_UNICAST or RIB_IPV6_UNICAST: {mrt_e.data['subtype']}"
+                f"RIB_IPV4_UNICAST or RIB_IPV6_UNICAST: {mrt_h.subtype}"
             )
-            logging.error(mrt_e.data)
+            logging.error(mrt_h)
+            walker.close()
             return
 
+    if not check_walked(walker):
+        return
+
     logging.info(f"{filename} appears to be a valid RIB dump MRT file.")
 
 
+def check_walked(walker: mrt_walker) -> bool:
+    """
+    Check that an MRT file was walked to the end, without a truncated or
+    corrupt MRT record.
+    """
+    if walker.truncated:
+        logging.error(
+            f"{walker.filename} is truncated after {walker.total} entries"
+        )
+        return False
+
+    if walker.corrupt:
+        logging.error(
+            f"{walker.filename} has a corrupt entry after {walker.total} "
+            f"entries"
+        )
+        return False
+
+    logging.info(
+        f"{walker.filename} has {walker.total} entries from "
+        f"{walker.first_ts} to {walker.last_ts}: {walker.counts}"
+    )
+    return True
+
+
 def check_update_dump(filename: str) -> None:
     """
     Perform some basic checks to determine if this is a valid MRT UPDATE
@@ -76,30 +106,34 @@ def check_update_dump(filename: str) -> None:
             errno.ENOENT, os.strerror(errno.ENOENT), filename
         )
 
-    mrt_entries = mrtparse.Reader(filename)
-    for idx, mrt_e in enumerate(mrt_entries):
-        upd_type = list(mrt_e.data["type"].keys())[0]
+    # Only the MRT headers are read, the MRT records aren't decoded
+    walker = mrt_walker(filename)
+    for idx, mrt_h in enumerate(walker):
         if (
-            upd_type != mrtparse.MRT_T["BGP4MP_ET"]
-            and upd_type != mrtparse.MRT_T["BGP4MP"]
+            mrt_h.type != mrtparse.MRT_T["BGP4MP_ET"]
+            and mrt_h.type != mrtparse.MRT_T["BGP4MP"]
         ):
             logging.error(
                 f"Entry {idx} in {filename} is not type BGP4MP_ET: "
-                f"{mrt_e.data['type']}"
+                f"{mrt_h.type}"
             )
-            logging.error(mrt_e.data)
+            logging.error(mrt_h)
+            walker.close()
             return
 
         # UPDATE dumps can contain both AFIs (v4 and v6)
-        upd_subtype = list(mrt_e.data["subtype"].keys())[0]
-        if upd_subtype not in mrtparse.BGP4MP_ST:
+        if mrt_h.subtype not in mrtparse.BGP4MP_ST:
             logging.error(
                 f"Entry {idx} in {filename} is not type BGP4MP_MESSAGE or "
-                f"BGP4MP_MESSAGE_AS4: {mrt_e.data['subtype']}"
+                f"BGP4MP_MESSAGE_AS4: {mrt_h.subtype}"
             )
-            logging.error(mrt_e.data)
+            logging.error(mrt_h)
+            walker.close()
             return
 
+    if not check_walked(walker):
+        return
+
     logging.info(f"{filename} appears to be a valid UPDATE dump MRT file.")
 
 
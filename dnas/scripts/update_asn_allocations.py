@@ -11,6 +11,7 @@ sys.path.append(
     os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
 )
 
+from dnas.asn_classifier import asn_classifier
 from dnas.config import config as cfg
 from dnas.log import log
 from dnas.mrt_getter import mrt_getter
@@ -96,6 +97,9 @@ def update_asn_stats() -> None:
 
     logging.info(f"Wrote unallocated ASNs to {cfg.unallocated_asns_file}")
 
+    asn_classifier.to_file(cfg.asn_classifier_file)
+    logging.info(f"Wrote ASN classifier to {cfg.asn_classifier_file}")
+
 
 def main():
     args = parse_args()
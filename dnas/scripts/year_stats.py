@@ -20,6 +20,22 @@ from dnas.redis_db import redis_db
 
 rdb = redis_db()
 
+# The stats compared across the year, the others aren't loaded
+YEAR_STATS = (
+    "longest_as_path",
+    "longest_comm_set",
+    "most_advt_prefixes",
+    "most_upd_prefixes",
+    "most_withd_prefixes",
+    "most_advt_origin_asn",
+    "most_advt_peer_asn",
+    "most_upd_peer_asn",
+    "most_withd_peer_asn",
+    "most_origin_asns",
+    "most_unknown_attrs",
+    "most_unreg_origins",
+)
+
 
 def get_year_stats(args: argparse.Namespace) -> dict[Any, Any]:
     """
@@ -67,7 +83,9 @@ def get_year_stats(args: argparse.Namespace) -> dict[Any, Any]:
             logging.debug(f"Getting stats for {ymd}")
 
             mrt_s = rdb.get_stats(
-                key=mrt_stats.gen_daily_key(ymd), compression=args.compression
+                key=mrt_stats.gen_daily_key(ymd),
+                compression=args.compression,
+                stats=YEAR_STATS,
             )
 
             if not mrt_s:
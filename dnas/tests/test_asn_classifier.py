@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+from dnas.asn_classifier import asn_classifier
+from dnas.bogon_asn import bogon_asn
+from dnas.config import config as cfg
+from dnas.unallocated_asn import unallocated_asn
+
+
+class test_asn_classifier(unittest.TestCase):
+    def setUp(self: "test_asn_classifier") -> None:
+        asn_classifier.load()
+
+    def test_classify(self: "test_asn_classifier") -> None:
+        self.assertRaises(TypeError, asn_classifier.classify, 1.23)
+        self.assertRaises(ValueError, asn_classifier.classify, "abc")
+
+        self.assertEqual(asn_classifier.classify(12345), 0)
+        self.assertEqual(asn_classifier.classify(65535), asn_classifier.BOGON)
+        self.assertEqual(
+            asn_classifier.classify("402333"), asn_classifier.UNALLOCATED
+        )
+        self.assertEqual(asn_classifier.classify("4199999999"), 2)
+        self.assertEqual(asn_classifier.classify("4200000000"), 1)
+        self.assertIn("402333", asn_classifier.memo)
+
+        unallocated_ranges = unallocated_asn.load_ranges(
+            cfg.unallocated_asns_file
+        )
+        for asn in [0, 23456, 64495, 64496, 131071, 131072, 402332, 402333]:
+            self.assertEqual(
+                asn_classifier.is_bogon(asn),
+                any(
+                    first <= asn <= last
+                    for first, last in bogon_asn.BOGON_RANGES
+                ),
+            )
+            self.assertEqual(
+                asn_classifier.is_unallocated(asn),
+                any(
+                    first <= asn <= last for first, last in unallocated_ranges
+                ),
+            )
+            # The bogon_asn and unallocated_asn checks use the same index
+            self.assertEqual(
+                asn_classifier.is_bogon(asn), bogon_asn.is_bogon(asn)
+            )
+            self.assertEqual(
+                asn_classifier.is_unallocated(asn),
+                unallocated_asn().is_unallocated(asn),
+            )
+
+    def test_classify_path(self: "test_asn_classifier") -> None:
+        self.assertRaises(TypeError, asn_classifier.classify_path, "123")
+        self.assertEqual(asn_classifier.classify_path([]), [])
+        self.assertEqual(
+            asn_classifier.classify_path(["3356", "65000", "402333"]),
+            [0, asn_classifier.BOGON, asn_classifier.UNALLOCATED],
+        )
+
+    def test_compile(self: "test_asn_classifier") -> None:
+        first, last, flags = asn_classifier.compile()
+        self.assertTrue(first)
+        self.assertEqual(len(first), len(last))
+        self.assertEqual(len(first), len(flags))
+        for i in range(0, len(first)):
+            self.assertTrue(first[i] <= last[i])
+            self.assertTrue(flags[i])
+            if i:
+                self.assertTrue(last[i - 1] < first[i])
+
+    def test_to_file(self: "test_asn_classifier") -> None:
+        self.assertRaises(ValueError, asn_classifier.to_file, "")
+        self.assertRaises(TypeError, asn_classifier.to_file, 123)
+        self.assertRaises(ValueError, asn_classifier.from_file, "")
+        self.assertRaises(TypeError, asn_classifier.from_file, 123)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "asn-classifier.bin")
+            self.assertFalse(asn_classifier.from_file(filename))
+
+            asn_classifier.to_file(filename)
+            self.assertTrue(os.path.isfile(filename))
+            self.assertTrue(asn_classifier.from_file(filename))
+            self.assertEqual(
+                (
+                    asn_classifier.first,
+                    asn_classifier.last,
+                    asn_classifier.flags,
+                ),
+                asn_classifier.compile(),
+            )
+
+            with open(filename, "r+b") as f:
+                f.write(b"X")
+            self.assertFalse(asn_classifier.from_file(filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
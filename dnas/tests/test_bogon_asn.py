@@ -19,6 +19,11 @@ class test_bogon_asn(unittest.TestCase):
         self.assertRaises(TypeError, self.ba.is_bogon, "abc")
         self.assertEqual(self.ba.is_bogon(65535), True)
         self.assertEqual(self.ba.is_bogon(1234567890), False)
+        self.assertEqual(self.ba.is_bogon(0), True)
+        self.assertEqual(self.ba.is_bogon(64495), False)
+        self.assertEqual(self.ba.is_bogon(131071), True)
+        self.assertEqual(self.ba.is_bogon(131072), False)
+        self.assertEqual(self.ba.is_bogon(4294967295), True)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ sys.path.append(
 )
 from dnas.bogon_ip import bogon_ip
 from dnas.config import config
+from dnas.ip_prefix import ip_prefix
 
 
 class test_bogon_ip(unittest.TestCase):
@@ -27,6 +28,77 @@ class test_bogon_ip(unittest.TestCase):
         for net_v6 in self.bi.BOGON_V6_NETS:
             self.assertIsInstance(net_v6, ipaddress.IPv6Network)
 
+        for first, last in [
+            (self.bi.BOGON_V4_FIRST, self.bi.BOGON_V4_LAST),
+            (self.bi.BOGON_V6_FIRST, self.bi.BOGON_V6_LAST),
+        ]:
+            self.assertTrue(first)
+            self.assertEqual(len(first), len(last))
+            self.assertEqual(first, sorted(first))
+            for i in range(1, len(first)):
+                self.assertTrue(last[i - 1] < first[i])
+
+    def test_get_bogons(self: "test_bogon_ip") -> None:
+        self.assertRaises(TypeError, self.bi.get_bogons, "192.168.0.0/24")
+        prefixes = [
+            ip_prefix.from_str(subnet)
+            for subnet in [
+                "11.22.33.0/24",
+                "192.168.0.0/24",
+                "2001:db8:ABCD::/48",
+                "ABCD:ABCD:ABCD:ABCD::/64",
+                "10.0.0.0/8",
+            ]
+        ]
+        self.assertEqual(
+            self.bi.get_bogons(prefixes),
+            [prefixes[1], prefixes[2], prefixes[4]],
+        )
+        self.assertEqual(self.bi.get_bogons([]), [])
+
+    def test_is_bogon_addr(self: "test_bogon_ip") -> None:
+        self.assertRaises(
+            TypeError, self.bi.is_bogon_addr, "10.0.0.0", 8, False
+        )
+        self.assertRaises(ValueError, self.bi.is_bogon_addr, b"\x0a", 8, False)
+        self.assertRaises(ValueError, self.bi.is_bogon_addr, 0, 33, False)
+        self.assertEqual(
+            self.bi.is_bogon_addr(b"\xc0\xa8\x00\x00", 24, False), True
+        )
+        self.assertEqual(self.bi.is_bogon_addr(0xC0A80000, 24, False), True)
+        self.assertEqual(self.bi.is_bogon_addr(0xC0A80000, 15, False), False)
+        self.assertEqual(self.bi.is_bogon_addr(0x0B162100, 24, False), False)
+        self.assertEqual(
+            self.bi.is_bogon_addr(
+                b"\x20\x01\x0d\xb8" + b"\x00" * 12, 48, True
+            ),
+            True,
+        )
+        self.assertEqual(self.bi.is_bogon_addr(0xABCD << 112, 64, True), False)
+
+    def test_is_bogon(self: "test_bogon_ip") -> None:
+        self.assertRaises(TypeError, self.bi.is_bogon, "192.168.0.0/24")
+        for subnet in self.cfg.BOGONS_V4 + self.cfg.BOGONS_V6:
+            self.assertEqual(
+                self.bi.is_bogon(ip_prefix.from_str(subnet)), True
+            )
+        self.assertEqual(
+            self.bi.is_bogon(ip_prefix.from_str("192.168.0.0/24")), True
+        )
+        self.assertEqual(
+            self.bi.is_bogon(ip_prefix.from_str("11.22.33.0/24")), False
+        )
+        self.assertEqual(
+            self.bi.is_bogon(ip_prefix.from_str("192.168.0.0/15")), False
+        )
+        self.assertEqual(
+            self.bi.is_bogon(ip_prefix.from_str("2001:db8:ABCD::/48")), True
+        )
+        self.assertEqual(
+            self.bi.is_bogon(ip_prefix.from_str("ABCD:ABCD:ABCD:ABCD::/64")),
+            False,
+        )
+
     def test_is_v4_bogon(self: "test_bogon_ip") -> None:
         self.assertRaises(ValueError, self.bi.is_v4_bogon, None)
         self.assertRaises(TypeError, self.bi.is_v4_bogon, 123)
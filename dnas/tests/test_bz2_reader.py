@@ -0,0 +1,152 @@
+import bz2
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.bz2_reader import bz2_reader
+from dnas.config import config as cfg
+
+
+class test_bz2_reader(unittest.TestCase):
+    def setUp(self: "test_bz2_reader") -> None:
+        self.bz2_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "SYDNEY/",
+            "sydney.updates.20220601.0415.bz2",
+        )
+        with bz2.BZ2File(self.bz2_filename, "rb") as f:
+            self.data = f.read()
+
+    def test_init(self: "test_bz2_reader") -> None:
+        self.assertRaises(ValueError, bz2_reader, "")
+        self.assertRaises(TypeError, bz2_reader, 1.23)
+        self.assertRaises(ValueError, bz2_reader, self.bz2_filename, -1)
+        self.assertRaises(
+            FileNotFoundError, bz2_reader, "Hq3vN8cYwK1pZ0tRxL5sJ7mDfB2aUe"
+        )
+        self.assertRaises(OSError, bz2_reader, __file__, 2)
+
+        reader = bz2_reader(self.bz2_filename, 2)
+        self.assertTrue(isinstance(reader, bz2_reader))
+        self.assertEqual(reader.filename, self.bz2_filename)
+        self.assertEqual(reader.procs, 2)
+        self.assertFalse(reader.closed)
+        reader.close()
+        self.assertTrue(reader.closed)
+        self.assertRaises(ValueError, reader.read)
+
+    def test_find_magic(self: "test_bz2_reader") -> None:
+        for shift in range(0, 8):
+            data = (bz2_reader.BLOCK_MAGIC << (8 - shift)).to_bytes(8, "big")
+            self.assertEqual(
+                bz2_reader.find_magic(data, bz2_reader.BLOCK_MAGIC),
+                [8 + shift],
+            )
+            self.assertEqual(
+                bz2_reader.find_magic(data, bz2_reader.EOS_MAGIC), []
+            )
+
+    def test_read(self: "test_bz2_reader") -> None:
+        with bz2_reader(self.bz2_filename, 2) as reader:
+            self.assertEqual(reader.read(0), b"")
+            self.assertEqual(reader.read(12), self.data[:12])
+            self.assertEqual(reader.read(), self.data[12:])
+            self.assertEqual(reader.read(12), b"")
+
+        # Multiple concatenated bz2 streams, with different block sizes
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "multi.bz2")
+            with open(filename, "wb") as f:
+                f.write(bz2.compress(self.data, 1))
+                f.write(bz2.compress(self.data[:1000]))
+            with bz2_reader(filename, 2) as reader:
+                data = []
+                while True:
+                    chunk = reader.read(65536)
+                    if not chunk:
+                        break
+                    data.append(chunk)
+                self.assertEqual(b"".join(data), self.data + self.data[:1000])
+
+    def test_truncated(self: "test_bz2_reader") -> None:
+        """
+        The complete bz2 blocks should be returned before an EOFError is
+        raised, like bz2.BZ2File.
+        """
+        with open(self.bz2_filename, "rb") as f:
+            compressed = f.read()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "truncated.bz2")
+            with open(filename, "wb") as f:
+                f.write(compressed[:-50000])
+
+            expected = bz2.BZ2Decompressor().decompress(compressed[:-50000])
+            self.assertTrue(len(expected) > 0)
+
+            with bz2_reader(filename, 2) as reader:
+                self.assertEqual(reader.read(len(expected)), expected)
+                self.assertRaises(EOFError, reader.read, 1)
+
+    def test_open_file(self: "test_bz2_reader") -> None:
+        f = bz2_reader.open_file(self.bz2_filename, 1)
+        self.assertTrue(isinstance(f, bz2.BZ2File))
+        f.close()
+
+        min_size = cfg.BZ2_PARALLEL_MIN_SIZE
+        cfg.BZ2_PARALLEL_MIN_SIZE = 0
+
+        # A pool is never started without one being passed
+        f = bz2_reader.open_file(self.bz2_filename, 2)
+        self.assertTrue(isinstance(f, bz2.BZ2File))
+        f.close()
+
+        with multiprocessing.Pool(2) as pool:
+            f = bz2_reader.open_file(self.bz2_filename, 2, pool)
+            cfg.BZ2_PARALLEL_MIN_SIZE = min_size
+            self.assertTrue(isinstance(f, bz2_reader))
+            self.assertEqual(f.read(), self.data)
+            f.close()
+            # The pool which was passed in isn't stopped
+            self.assertEqual(pool.apply(len, (b"abc",)), 3)
+
+    def test_read_size(self: "test_bz2_reader") -> None:
+        """
+        The compressed file should be read in many small reads, and the
+        compressed data which has been decompressed should be dropped.
+        """
+        read_size = bz2_reader.READ_SIZE
+        bz2_reader.READ_SIZE = 10000
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "multi.bz2")
+            with open(filename, "wb") as f:
+                f.write(bz2.compress(self.data, 1))
+                f.write(bz2.compress(self.data[:1000]))
+
+            with multiprocessing.Pool(2) as pool:
+                for path, expected in (
+                    (self.bz2_filename, self.data),
+                    (filename, self.data + self.data[:1000]),
+                ):
+                    with bz2_reader(path, 2, pool) as reader:
+                        data = []
+                        max_len = 0
+                        while True:
+                            chunk = reader.read(65536)
+                            if not chunk:
+                                break
+                            data.append(chunk)
+                            max_len = max(max_len, len(reader.data))
+                        self.assertEqual(b"".join(data), expected)
+                        self.assertLess(max_len, os.path.getsize(path))
+        bz2_reader.READ_SIZE = read_size
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+from dnas.ip_prefix import ip_prefix
+
+
+class test_ip_prefix(unittest.TestCase):
+    def test_from_str(self: "test_ip_prefix") -> None:
+        self.assertRaises(ValueError, ip_prefix.from_str, None)
+        self.assertRaises(TypeError, ip_prefix.from_str, 123)
+        self.assertRaises(ValueError, ip_prefix.from_str, "555.555.555.0/24")
+        self.assertRaises(ValueError, ip_prefix.from_str, "192.168.0.0/9")
+        self.assertEqual(
+            ip_prefix.from_str("192.168.0.0/9", False),
+            ip_prefix.from_str("192.128.0.0/9"),
+        )
+
+        v4 = ip_prefix.from_str("192.168.0.0/16")
+        self.assertIsInstance(v4, int)
+        self.assertFalse(ip_prefix.is_v6(v4))
+        self.assertEqual(ip_prefix.length(v4), 16)
+        self.assertEqual(ip_prefix.addr(v4), 0xC0A80000)
+
+        v6 = ip_prefix.from_str("2001:db8::/32")
+        self.assertTrue(ip_prefix.is_v6(v6))
+        self.assertEqual(ip_prefix.length(v6), 32)
+        self.assertEqual(ip_prefix.addr(v6), 0x20010DB8 << 96)
+
+        self.assertNotEqual(
+            ip_prefix.from_str("0.0.0.0/0"), ip_prefix.from_str("::/0")
+        )
+
+    def test_pack(self: "test_ip_prefix") -> None:
+        self.assertRaises(ValueError, ip_prefix.pack, 0, 0, 5)
+        self.assertEqual(
+            ip_prefix.pack(0x0A000000, 8, 4), ip_prefix.from_str("10.0.0.0/8")
+        )
+        self.assertEqual(
+            ip_prefix.pack(0x20010DB8 << 96, 32, 6),
+            ip_prefix.from_str("2001:db8::/32"),
+        )
+
+    def test_intern(self: "test_ip_prefix") -> None:
+        prefixes: dict[int, int] = {}
+        a = ip_prefix.intern(ip_prefix.from_str("2001:db8::/32"), prefixes)
+        b = ip_prefix.intern(ip_prefix.from_str("2001:db8::/32"), prefixes)
+        self.assertIs(a, b)
+        self.assertEqual(len(prefixes), 1)
+
+    def test_to_str(self: "test_ip_prefix") -> None:
+        self.assertRaises(TypeError, ip_prefix.to_str, "10.0.0.0/8")
+        for prefix in [
+            "0.0.0.0/0",
+            "10.0.0.0/8",
+            "72.240.130.0/24",
+            "255.255.255.255/32",
+            "::/0",
+            "2606:2800:4a87::/48",
+            "2001:db8:abcd:12::/64",
+        ]:
+            self.assertEqual(
+                ip_prefix.to_str(ip_prefix.from_str(prefix)), prefix
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
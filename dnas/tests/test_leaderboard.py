@@ -0,0 +1,178 @@
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.leaderboard import leaderboard
+from dnas.mrt_entry import mrt_entry
+
+
+class test_leaderboard(unittest.TestCase):
+    def setUp(self: "test_leaderboard") -> None:
+        self.metric = lambda e: e.updates
+        self.key = lambda e: e.prefix
+        self.entries = [
+            mrt_entry(prefix="10.0.0.0/8", updates=5),
+            mrt_entry(prefix="172.16.0.0/12", updates=10),
+            mrt_entry(prefix="192.168.0.0/16", updates=10),
+            mrt_entry(prefix="100.64.0.0/10", updates=1),
+        ]
+
+    def test_init(self: "test_leaderboard") -> None:
+        self.assertRaises(TypeError, leaderboard, 1, self.key)
+        self.assertRaises(TypeError, leaderboard, self.metric, 1)
+        self.assertRaises(
+            TypeError, leaderboard, self.metric, self.key, None, "1"
+        )
+        self.assertRaises(
+            ValueError, leaderboard, self.metric, self.key, None, -1
+        )
+
+        lb = leaderboard(self.metric, self.key)
+        self.assertIsInstance(lb, leaderboard)
+        self.assertFalse(lb)
+        self.assertEqual(lb.best(), None)
+        self.assertEqual(lb.to_list(), [])
+
+        lb = leaderboard(self.metric, self.key, self.entries)
+        self.assertEqual(len(lb), 2)
+        self.assertEqual(lb.best(), 10)
+        self.assertTrue("172.16.0.0/12" in lb)
+        self.assertFalse("10.0.0.0/8" in lb)
+
+    def test_offer(self: "test_leaderboard") -> None:
+        lb = leaderboard(self.metric, self.key)
+        self.assertTrue(lb.offer(self.entries[0]))
+        self.assertTrue(lb.offer(self.entries[1]))
+        self.assertEqual(lb.to_list(), [self.entries[1]])
+        self.assertTrue(lb.offer(self.entries[2]))
+        self.assertFalse(lb.offer(self.entries[2]))
+        self.assertFalse(lb.offer(self.entries[3]))
+        self.assertEqual(lb.to_list(), self.entries[1:3])
+
+        self.assertTrue(lb.admits(11))
+        self.assertTrue(lb.admits(10))
+        self.assertFalse(lb.admits(10, "172.16.0.0/12"))
+        self.assertFalse(lb.admits(9))
+
+        lb = leaderboard(self.metric, self.key, zero_ties=False)
+        lb.offer(mrt_entry(prefix="10.0.0.0/8"))
+        self.assertFalse(lb.admits(0))
+        self.assertFalse(lb.offer(mrt_entry(prefix="172.16.0.0/12")))
+        self.assertEqual(len(lb), 1)
+
+    def test_top_k(self: "test_leaderboard") -> None:
+        lb = leaderboard(self.metric, self.key, self.entries, top_k=3)
+        self.assertEqual(len(lb), 3)
+        self.assertEqual(lb.best(), 10)
+        self.assertEqual(
+            [e.prefix for e in lb.to_list()],
+            ["172.16.0.0/12", "192.168.0.0/16", "10.0.0.0/8"],
+        )
+        self.assertFalse(lb.admits(5))
+        self.assertFalse(lb.offer(mrt_entry(prefix="1.0.0.0/8", updates=5)))
+        self.assertTrue(lb.offer(mrt_entry(prefix="1.0.0.0/8", updates=6)))
+        self.assertEqual(
+            [e.prefix for e in lb.to_list()],
+            ["172.16.0.0/12", "192.168.0.0/16", "1.0.0.0/8"],
+        )
+
+    def test_top_k_rising(self: "test_leaderboard") -> None:
+        # Each offer to the full leaderboard evicts its lowest entry
+        lb = leaderboard(self.metric, self.key, top_k=10)
+        for i in range(10000):
+            self.assertTrue(lb.offer(mrt_entry(prefix=str(i), updates=i)))
+            self.assertLessEqual(len(lb._heap), 2 * len(lb) + 16)
+        self.assertEqual(len(lb), 10)
+        self.assertEqual(
+            [e.updates for e in lb.to_list()], list(range(9999, 9989, -1))
+        )
+        self.assertFalse(lb.admits(9990))
+        self.assertTrue(lb.admits(9991))
+
+        # Rising updates to kept entries, with ties evicted most recent first
+        lb = leaderboard(self.metric, self.key, top_k=3)
+        for prefix in ("a", "b", "c"):
+            lb.offer(mrt_entry(prefix=prefix, updates=1))
+        for i in range(1, 1000):
+            self.assertTrue(
+                lb.offer(
+                    mrt_entry(prefix="a", updates=1), mrt_entry.add_counters
+                )
+            )
+        self.assertLessEqual(len(lb._heap), 2 * len(lb) + 16)
+        self.assertEqual(lb.best(), 1000)
+        self.assertTrue(lb.offer(mrt_entry(prefix="d", updates=2)))
+        self.assertEqual([e.prefix for e in lb.to_list()], ["a", "d", "b"])
+
+    def test_add(self: "test_leaderboard") -> None:
+        lb = leaderboard(self.metric, self.key, self.entries)
+        self.assertTrue(
+            lb.add(
+                [mrt_entry(prefix="192.168.0.0/16", updates=3)],
+                mrt_entry.add_counters,
+            )
+        )
+        self.assertEqual(len(lb), 1)
+        self.assertEqual(lb.to_list()[0].prefix, "192.168.0.0/16")
+        self.assertEqual(lb.to_list()[0].updates, 13)
+
+        # No matching keys, so this is a merge
+        self.assertTrue(
+            lb.add(
+                [mrt_entry(prefix="1.0.0.0/8", updates=13)],
+                mrt_entry.add_counters,
+            )
+        )
+        self.assertEqual(len(lb), 2)
+
+        # A generator of entries is merged the same as a list
+        self.assertTrue(
+            lb.add(
+                (
+                    mrt_entry(prefix=prefix, updates=20)
+                    for prefix in ["2.0.0.0/8", "3.0.0.0/8"]
+                ),
+                mrt_entry.add_counters,
+            )
+        )
+        self.assertEqual(
+            [e.prefix for e in lb.to_list()], ["2.0.0.0/8", "3.0.0.0/8"]
+        )
+
+    def test_merge(self: "test_leaderboard") -> None:
+        lb = leaderboard(self.metric, self.key, self.entries[:2])
+        self.assertFalse(lb.merge(self.entries[3:]))
+        self.assertTrue(lb.merge(self.entries[1:3]))
+        self.assertEqual(lb.to_list(), self.entries[1:3])
+
+        lb = leaderboard(
+            lambda e: len(e.origin_asns),
+            self.key,
+            [mrt_entry(prefix="10.0.0.0/8", origin_asns=set(["1", "2"]))],
+        )
+        self.assertTrue(
+            lb.merge(
+                [mrt_entry(prefix="10.0.0.0/8", origin_asns=set(["3", "4"]))],
+                mrt_entry.merge_origin_asns,
+            )
+        )
+        self.assertEqual(lb.best(), 4)
+
+    def test_is_larger(self: "test_leaderboard") -> None:
+        lb = leaderboard(self.metric, self.key)
+        self.assertFalse(lb.is_larger([]))
+        self.assertTrue(lb.is_larger(self.entries))
+        lb.merge(self.entries)
+        self.assertFalse(lb.is_larger(self.entries[1:]))
+        self.assertTrue(
+            lb.is_larger([mrt_entry(prefix="1.0.0.0/8", updates=11)])
+        )
+        self.assertFalse(lb.is_larger([mrt_entry(updates=11)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.mrt_codec import mrt_codec
+from dnas.mrt_entry import mrt_entry
+from dnas.mrt_stats import mrt_stats
+
+
+class test_mrt_codec(unittest.TestCase):
+    def setUp(self: "test_mrt_codec") -> None:
+        self.stats = []
+        for path in (
+            "RRC23/rrc23.updates.20220421.0200.gz.json",
+            "SYDNEY/sydney.updates.20220601.0415.bz2.json",
+        ):
+            filename = os.path.join(
+                os.path.dirname(os.path.realpath(__file__)), path
+            )
+            if not os.path.isfile(filename):
+                raise Exception(f"Test stats file is not found: {filename}")
+            mrt_s = mrt_stats()
+            mrt_s.from_file(filename)
+            self.stats.append(mrt_s)
+
+        """
+        An entry with values which aren't stored as ints, or don't come from
+        the parser:
+        """
+        self.mrt_s = mrt_stats()
+        self.mrt_s.archive_list = set(["RRC23", "SYDNEY"])
+        self.mrt_s.file_list = ["file_1", "file_2"]
+        self.mrt_s.timestamp = "20220421.0200"
+        self.mrt_s.total_upd = 2**40
+        self.mrt_s.longest_as_path = [
+            mrt_entry(
+                as_path=["65001", "0", "012", "{64512,64513}", "ä"],
+                comm_set=["65001:1"],
+                med=None,  # type: ignore
+                next_hop=["2001:db8::1", "fe80::1"],
+                origin_asns=set(["4294967295", "{64512,64513}"]),
+                prefix="2001:db8::/32",
+                unknown_attrs=set([99, 255]),
+            )
+        ]
+
+    def test_decode(self: "test_mrt_codec") -> None:
+        self.assertRaises(ValueError, mrt_codec.decode, b"")
+        self.assertRaises(TypeError, mrt_codec.decode, "DNASSTAT")
+
+        for mrt_s in self.stats + [self.mrt_s]:
+            data = mrt_codec.encode(mrt_s)
+            decoded = mrt_codec.decode(data)
+            self.assertIsInstance(decoded, mrt_stats)
+            self.assertEqual(decoded.archive_list, mrt_s.archive_list)
+            for stat in mrt_stats.LEADERBOARDS:
+                self.assertEqual(
+                    [mrt_e.get_key(True) for mrt_e in getattr(decoded, stat)],
+                    [mrt_e.get_key(True) for mrt_e in getattr(mrt_s, stat)],
+                )
+                for d_e, mrt_e in zip(
+                    getattr(decoded, stat), getattr(mrt_s, stat)
+                ):
+                    self.assertEqual(type(d_e.next_hop), type(mrt_e.next_hop))
+                    self.assertEqual(d_e.med, mrt_e.med)
+            self.assertTrue(decoded.equal_to(copy.deepcopy(mrt_s), True))
+
+        data = mrt_codec.encode(self.stats[1])
+        self.assertRaises(ValueError, mrt_codec.decode, data, ["test"])
+
+        decoded = mrt_codec.decode(data, stats=["longest_as_path"])
+        self.assertEqual(
+            [mrt_e.get_key() for mrt_e in decoded.longest_as_path],
+            [mrt_e.get_key() for mrt_e in self.stats[1].longest_as_path],
+        )
+        self.assertEqual(decoded.most_upd_prefixes, [])
+        self.assertEqual(decoded.total_upd, self.stats[1].total_upd)
+        self.assertEqual(decoded.timestamp, self.stats[1].timestamp)
+
+        decoded = mrt_codec.decode(data, lazy=True)
+        self.assertNotIn("longest_as_path", vars(decoded))
+        self.assertTrue(decoded.equal_to(copy.deepcopy(self.stats[1]), True))
+        self.assertIn("longest_as_path", vars(decoded))
+
+        decoded = mrt_codec.decode(mrt_codec.encode(mrt_stats()))
+        self.assertTrue(decoded.is_empty())
+        self.assertEqual(decoded.file_list, [])
+        self.assertEqual(decoded.timestamp, "")
+
+    def test_encode(self: "test_mrt_codec") -> None:
+        self.assertRaises(ValueError, mrt_codec.encode, None)
+        self.assertRaises(TypeError, mrt_codec.encode, 123)
+
+        data = mrt_codec.encode(self.stats[1])
+        self.assertIsInstance(data, bytes)
+        self.assertTrue(data.startswith(mrt_codec.MAGIC))
+        self.assertLess(len(data), len(self.stats[1].to_json()) / 2)
+
+        mrt_s = copy.deepcopy(self.mrt_s)
+        mrt_s.longest_as_path[0].filename = None  # type: ignore
+        self.assertRaises(TypeError, mrt_codec.encode, mrt_s)
+
+    def test_encode_asn(self: "test_mrt_codec") -> None:
+        strs: dict[str, int] = {}
+        self.assertEqual(mrt_codec.encode_asn("0", strs), 0)
+        self.assertEqual(mrt_codec.encode_asn("65001", strs), 65001)
+        self.assertEqual(mrt_codec.encode_asn("4294967295", strs), 2**32 - 1)
+        self.assertEqual(strs, {})
+        self.assertEqual(mrt_codec.encode_asn("012", strs), -1)
+        self.assertEqual(mrt_codec.encode_asn("{1,2}", strs), -2)
+        self.assertEqual(mrt_codec.encode_asn("012", strs), -1)
+        self.assertEqual(strs, {"012": 0, "{1,2}": 1})
+
+    def test_is_encoded(self: "test_mrt_codec") -> None:
+        self.assertTrue(mrt_codec.is_encoded(mrt_codec.encode(self.mrt_s)))
+        self.assertFalse(
+            mrt_codec.is_encoded(self.mrt_s.to_json().encode("utf-8"))
+        )
+        self.assertFalse(mrt_codec.is_encoded(b""))
+
+    def test_unpack(self: "test_mrt_codec") -> None:
+        data = mrt_codec.encode(self.mrt_s)
+        strs, sections, ints, meta_len = mrt_codec.unpack(data)
+        self.assertIn("ä", strs)
+        self.assertEqual(list(sections), list(mrt_stats.LEADERBOARDS))
+        self.assertEqual(meta_len, 6 + 2 + 1 + 2)
+        self.assertEqual(
+            mrt_codec.decode_entries(
+                strs, ints, sections["longest_as_path"][0]
+            )[0].get_key(True),
+            self.mrt_s.longest_as_path[0].get_key(True),
+        )
+
+        self.assertRaises(ValueError, mrt_codec.unpack, b"DNASSTA")
+        self.assertRaises(ValueError, mrt_codec.unpack, b"{" + data[1:])
+        self.assertRaises(ValueError, mrt_codec.unpack, data[:-8])
+        future = mrt_codec.HEADER.pack(
+            mrt_codec.MAGIC, mrt_codec.VERSION + 1, 0, 0, 0, 0
+        )
+        self.assertRaises(ValueError, mrt_codec.unpack, future)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+import gzip
+import os
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.config import config as cfg
+from dnas.ip_prefix import ip_prefix
+from dnas.mrt_decoder import bgp_update, mrt_decoder
+from dnas.mrt_shm import mrt_shm
+
+
+class test_mrt_decoder(unittest.TestCase):
+    def setUp(self: "test_mrt_decoder") -> None:
+        self.gz_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "RRC23/",
+            "rrc23.updates.20220501.2305.gz",
+        )
+        # Only the BGP UPDATE messages, not all MRT records
+        self.no_of_updates = 29688
+
+    def test_init(self: "test_mrt_decoder") -> None:
+        self.assertRaises(ValueError, mrt_decoder, "")
+        self.assertRaises(TypeError, mrt_decoder, 1.23)
+        self.assertRaises(
+            FileNotFoundError, mrt_decoder, "PewjWxSQavM7tCQbXIZlgcK9zXfr1H"
+        )
+        self.assertRaises(TypeError, mrt_decoder, self.gz_filename, [2])
+
+        decoder = mrt_decoder(self.gz_filename)
+        self.assertTrue(isinstance(decoder, mrt_decoder))
+        self.assertEqual(decoder.filename, self.gz_filename)
+        self.assertEqual(decoder.attrs, mrt_decoder.ALL_ATTRS)
+        try:
+            decoder.close()
+        except StopIteration:
+            pass
+
+    def test_get_peer_index(self: "test_mrt_decoder") -> None:
+        # A PEER_INDEX_TABLE with a 4 byte ASN peer and a 2 byte ASN peer
+        peer_index = (
+            struct.pack(">IHH", 0, 0, 2)
+            + struct.pack(">BIII", 0x02, 1, 1, 4200000000)
+            + struct.pack(">BIIH", 0x00, 2, 2, 65001)
+        )
+        data = (
+            mrt_decoder.MRT_HDR.pack(
+                0,
+                mrt_decoder.TABLE_DUMP_V2,
+                mrt_decoder.PEER_INDEX_TABLE,
+                len(peer_index),
+            )
+            + peer_index
+        )
+
+        shm = mrt_shm.from_bytes(data)
+        try:
+            self.assertEqual(
+                mrt_decoder.get_peer_index(self.gz_filename, shm=shm),
+                ["4200000000", "65001"],
+            )
+            # The segment is left attached for the RIB entries to be read
+            self.assertFalse(shm.closed)
+            self.assertEqual(shm.tell(), 0)
+        finally:
+            shm.unlink()
+
+        self.assertEqual(mrt_decoder.get_peer_index(self.gz_filename), [])
+
+    def test_next(self: "test_mrt_decoder") -> None:
+        decoder = mrt_decoder(self.gz_filename)
+        upd = next(decoder)
+        self.assertTrue(isinstance(upd, bgp_update))
+        self.assertEqual(upd.timestamp, 1651446300)
+        self.assertEqual(upd.peer_asn, "199524")
+        self.assertEqual(upd.withdrawn, [])
+        self.assertEqual(upd.mp_withdrawn, [])
+        self.assertEqual(upd.has_attrs, True)
+        self.assertEqual(upd.as_path, ["199524", "1299", "3257", "13490"])
+        self.assertEqual(upd.next_hop, "27.111.228.222")
+        self.assertEqual(upd.med, cfg.MISSING_MED)
+        self.assertEqual(upd.comm_set, [])
+        self.assertEqual(
+            [ip_prefix.to_str(prefix) for prefix in upd.nlri],
+            ["72.240.130.0/24"],
+        )
+        self.assertEqual(upd.mp_nlri, [])
+        self.assertEqual(upd.unknown_attrs, set())
+
+        for upd in decoder:
+            if upd.mp_nlri:
+                break
+        self.assertEqual(upd.peer_asn, "14907")
+        self.assertEqual(
+            upd.next_hop, ["2001:de8:4::1:4907:1", "fe80::f27c:c7ff:fe11:2c1e"]
+        )
+        self.assertEqual(
+            upd.comm_set,
+            [
+                "6453:86",
+                "6453:1000",
+                "6453:1400",
+                "6453:1404",
+                "14907:0",
+                "14907:4",
+            ],
+        )
+        self.assertEqual(
+            [ip_prefix.to_str(prefix) for prefix in upd.mp_nlri],
+            [
+                "2606:2800:4a87::/48",
+                "2600:40fc:1011::/48",
+                "2606:2800:e004::/48",
+            ],
+        )
+
+        self.assertEqual(
+            len(list(mrt_decoder(self.gz_filename))), self.no_of_updates
+        )
+
+    def test_skipped(self: "test_mrt_decoder") -> None:
+        """
+        Malformed MRT records are skipped and counted, without losing the
+        MRT records after them. After a corrupt MRT header the decoder should
+        resync on the next valid MRT header.
+        """
+        decoder = mrt_decoder(self.gz_filename)
+        offsets = []
+        for upd in decoder:
+            offsets.append(decoder.record_offset)
+        self.assertEqual(decoder.skipped, 0)
+        self.assertEqual(len(offsets), self.no_of_updates)
+        self.assertEqual(len(set(offsets)), self.no_of_updates)
+
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = bytearray(f.read())
+
+        # An unsupported AFI in the BGP4MP header of a BGP4MP_MESSAGE_AS4
+        _, mrt_t, mrt_st, _ = mrt_decoder.MRT_HDR.unpack_from(
+            data, offsets[100]
+        )
+        self.assertEqual(mrt_t, mrt_decoder.BGP4MP)
+        self.assertEqual(mrt_st, mrt_decoder.BGP4MP_MESSAGE_AS4)
+        struct.pack_into(">H", data, offsets[100] + 12 + 10, 99)
+
+        # A corrupt MRT type and length in the MRT header
+        struct.pack_into(">H", data, offsets[200] + 4, 0xFFFF)
+        struct.pack_into(">I", data, offsets[200] + 8, 0xFFFFFFFF)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "corrupt.mrt")
+            with open(filename, "wb") as f:
+                f.write(data)
+            decoder = mrt_decoder(filename)
+            self.assertEqual(len(list(decoder)), self.no_of_updates - 2)
+            self.assertEqual(decoder.skipped, 2)
+
+            # A truncated MRT record at the end of the file
+            with open(filename, "wb") as f:
+                f.write(data[:-5])
+            decoder = mrt_decoder(filename)
+            self.assertEqual(len(list(decoder)), self.no_of_updates - 3)
+            self.assertEqual(decoder.skipped, 3)
+
+    def test_prefixes(self: "test_mrt_decoder") -> None:
+        """
+        Each prefix should only be stored once per MRT file.
+        """
+        decoder = mrt_decoder(self.gz_filename)
+        for upd in decoder:
+            for prefix in upd.withdrawn + upd.nlri + upd.mp_nlri:
+                self.assertIs(decoder.prefixes[prefix], prefix)
+        self.assertTrue(decoder.prefixes)
+
+        # Host bits which are set are masked, the other prefixes are kept
+        buf = bytes([9, 192, 168, 24, 10, 0, 1, 0])
+        self.assertEqual(
+            decoder.decode_prefixes(buf, 0, len(buf), 1, False),
+            [
+                ip_prefix.from_str("192.128.0.0/9"),
+                ip_prefix.from_str("10.0.1.0/24"),
+                ip_prefix.from_str("0.0.0.0/0"),
+            ],
+        )
+        buf = bytes([33, 0x20, 0x01, 0x0D, 0xB8, 0xFF])
+        self.assertEqual(
+            decoder.decode_prefixes(buf, 0, len(buf), 2, False),
+            [ip_prefix.from_str("2001:db8:8000::/33")],
+        )
+
+    def test_attrs(self: "test_mrt_decoder") -> None:
+        """
+        Only the requested path attributes should be decoded.
+        """
+        decoder = mrt_decoder(
+            self.gz_filename, set([mrt_decoder.MP_REACH_NLRI])
+        )
+        for upd in decoder:
+            self.assertEqual(upd.as_path, None)
+            self.assertEqual(upd.comm_set, [])
+            if upd.mp_nlri:
+                break
+        self.assertEqual(upd.peer_asn, "14907")
+        self.assertEqual(len(upd.mp_nlri), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -72,6 +72,13 @@ class test_mrt_entry(unittest.TestCase):
         self.assertIsInstance(self.mrt_e.withdraws, int)
         self.assertIsInstance(self.mrt_e.unknown_attrs, set)
         self.assertEqual(len(self.mrt_e.unknown_attrs), 0)
+        self.assertFalse(hasattr(self.mrt_e, "__dict__"))
+
+        e = mrt_entry()
+        self.assertIsNot(e.as_path, self.mrt_e.as_path)
+        self.assertIsNot(e.comm_set, self.mrt_e.comm_set)
+        self.assertIsNot(e.origin_asns, self.mrt_e.origin_asns)
+        self.assertIsNot(e.unknown_attrs, self.mrt_e.unknown_attrs)
 
     def test_equal_to(self: "test_mrt_entry") -> None:
         e1 = copy.deepcopy(self.mrt_s.longest_as_path[0])
@@ -95,6 +102,13 @@ class test_mrt_entry(unittest.TestCase):
 
         self.assertTrue(e.equal_to(self.mrt_s.longest_as_path[0], True))
 
+    def test_from_tuple(self: "test_mrt_entry") -> None:
+        for e in self.mrt_s.longest_as_path + self.mrt_s.most_origin_asns:
+            values = e.to_tuple()
+            self.assertIsInstance(values, tuple)
+            self.assertEqual(len(values), len(e.to_dict()))
+            self.assertTrue(mrt_entry.from_tuple(values).equal_to(e, True))
+
     def test_gen_timestamp(self: "test_mrt_entry") -> None:
         ret = mrt_entry.gen_timestamp()
         self.assertIsInstance(ret, str)
@@ -108,6 +122,66 @@ class test_mrt_entry(unittest.TestCase):
             )
         )
 
+    def test_get_key(self: "test_mrt_entry") -> None:
+        e1 = copy.deepcopy(self.mrt_s.longest_as_path[0])
+        e2 = copy.deepcopy(self.mrt_s.longest_as_path[0])
+
+        key = e1.get_key()
+        self.assertIsInstance(key, tuple)
+        self.assertEqual(hash(key), hash(e2.get_key()))
+        self.assertEqual(key, e2.get_key())
+        self.assertEqual(e1.get_key(True), e2.get_key(True))
+
+        e2.filename = "test"
+        self.assertEqual(key, e2.get_key())
+        self.assertNotEqual(e1.get_key(True), e2.get_key(True))
+
+        e2.origin_asns = e2.origin_asns.union(set(["65551"]))
+        self.assertFalse(e1.equal_to(e2))
+        self.assertNotEqual(key, e2.get_key())
+
+        entries = self.mrt_s.longest_as_path + self.mrt_s.most_origin_asns
+        for e in entries:
+            for mrt_e in entries:
+                self.assertEqual(
+                    e.get_key() == mrt_e.get_key(), e.equal_to(mrt_e)
+                )
+
+    def test_thaw(self: "test_mrt_entry") -> None:
+        as_path = ("65001", "65002")
+        comm_set = ("65001:1",)
+        next_hop = ("2001:db8::1", "fe80::1")
+        unknown_attrs = frozenset([99])
+        e1 = mrt_entry(
+            as_path=as_path,  # type: ignore
+            comm_set=comm_set,  # type: ignore
+            next_hop=next_hop,  # type: ignore
+            unknown_attrs=unknown_attrs,  # type: ignore
+        )
+        e2 = mrt_entry(
+            as_path=as_path,  # type: ignore
+            comm_set=comm_set,  # type: ignore
+            next_hop="192.0.2.1",
+            unknown_attrs=unknown_attrs,  # type: ignore
+        )
+        key = e1.get_key(True)
+
+        e1.thaw()
+        e2.thaw()
+        self.assertEqual(e1.as_path, ["65001", "65002"])
+        self.assertEqual(e1.comm_set, ["65001:1"])
+        self.assertEqual(e1.next_hop, ["2001:db8::1", "fe80::1"])
+        self.assertEqual(e1.unknown_attrs, set([99]))
+        self.assertIsInstance(e1.unknown_attrs, set)
+        self.assertEqual(e2.next_hop, "192.0.2.1")
+        self.assertEqual(e1.get_key(True), key)
+
+        # Each entry has its own values once thawed
+        e1.as_path.append("65003")
+        e1.unknown_attrs.add(100)
+        self.assertEqual(e2.as_path, ["65001", "65002"])
+        self.assertEqual(e2.unknown_attrs, set([99]))
+
     def test_to_json(self: "test_mrt_entry") -> None:
         with open(self.entry_1_path) as f:
             j1 = f.read()
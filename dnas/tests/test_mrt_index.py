@@ -0,0 +1,217 @@
+import bz2
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from typing import Union
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.config import config as cfg
+from dnas.mrt_decoder import mrt_decoder, mrtparse_decoder
+from dnas.mrt_index import mrt_index
+from dnas.mrt_walker import mrt_walker
+
+
+class test_mrt_index(unittest.TestCase):
+    def setUp(self: "test_mrt_index") -> None:
+        self.gz_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "RRC23/",
+            "rrc23.updates.20220501.2305.gz",
+        )
+        # All MRT records, not only the BGP UPDATE messages
+        self.no_of_entries = 30285
+        self.no_of_updates = 29688
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.split_dir = cfg.SPLIT_DIR
+        cfg.SPLIT_DIR = self.tmp_dir.name
+
+    def tearDown(self: "test_mrt_index") -> None:
+        cfg.SPLIT_DIR = self.split_dir
+        self.tmp_dir.cleanup()
+
+    def test_init(self: "test_mrt_index") -> None:
+        self.assertRaises(ValueError, mrt_index, "")
+        self.assertRaises(TypeError, mrt_index, 1.23)
+        self.assertRaises(
+            FileNotFoundError, mrt_index, "Zk4wQ9pLx2VbN7cR1tYh5mJf3sDg8A"
+        )
+
+        index = mrt_index(self.gz_filename)
+        self.assertEqual(index.filename, self.gz_filename)
+        self.assertEqual(
+            index.mrt_path,
+            os.path.join(
+                self.tmp_dir.name, os.path.basename(self.gz_filename) + ".mrt"
+            ),
+        )
+        self.assertEqual(index.index_path, index.mrt_path + ".idx")
+        self.assertEqual(len(index), 0)
+
+    def test_est_size(self: "test_mrt_index") -> None:
+        self.assertRaises(ValueError, mrt_index.est_size, "")
+        self.assertRaises(TypeError, mrt_index.est_size, 1.23)
+
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = f.read()
+        self.assertEqual(mrt_index.est_size(self.gz_filename), len(data))
+
+        bz2_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "SYDNEY/",
+            "sydney.updates.20220601.0415.bz2",
+        )
+        with bz2.BZ2File(bz2_filename, "rb") as f:
+            data = f.read()
+        self.assertGreaterEqual(mrt_index.est_size(bz2_filename), len(data))
+
+        index = mrt_index.get(self.gz_filename)
+        self.assertEqual(mrt_index.est_size(index.mrt_path), index.size)
+        index.remove()
+
+    def test_get(self: "test_mrt_index") -> None:
+        index = mrt_index.get(self.gz_filename)
+        self.assertTrue(os.path.isfile(index.mrt_path))
+        self.assertTrue(os.path.isfile(index.index_path))
+        self.assertEqual(len(index), self.no_of_entries)
+
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = f.read()
+        with open(index.mrt_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(index.size, len(data))
+
+        walker = mrt_walker(index.mrt_path, keep_offsets=True).walk()
+        self.assertEqual(list(index.offsets), walker.offsets)
+        self.assertEqual(index.timestamps[0], walker.first_ts)
+        self.assertEqual(index.timestamps[-1], walker.last_ts)
+        self.assertEqual(index.types[0], mrt_decoder.BGP4MP)
+        self.assertEqual(index.subtypes[0], mrt_decoder.BGP4MP_MESSAGE_AS4)
+        self.assertEqual(index.lengths[0], 79)
+
+        # The index file is reused
+        loaded = mrt_index(self.gz_filename)
+        self.assertTrue(loaded.from_file())
+        self.assertEqual(loaded.offsets, index.offsets)
+        self.assertEqual(loaded.lengths, index.lengths)
+        self.assertEqual(loaded.types, index.types)
+        self.assertEqual(loaded.subtypes, index.subtypes)
+        self.assertEqual(loaded.timestamps, index.timestamps)
+        self.assertEqual(loaded.size, index.size)
+
+        # Unless it doesn't match the uncompressed MRT file
+        with open(index.mrt_path, "ab") as f:
+            f.write(b"\x00")
+        self.assertFalse(mrt_index(self.gz_filename).from_file())
+
+        index.remove()
+        self.assertFalse(os.path.isfile(index.mrt_path))
+        self.assertFalse(os.path.isfile(index.index_path))
+        self.assertTrue(os.path.isfile(self.gz_filename))
+
+        # An uncompressed MRT file is indexed in place
+        mrt_path = os.path.join(self.tmp_dir.name, "uncompressed")
+        with open(mrt_path, "wb") as f:
+            f.write(data)
+        index = mrt_index.get(mrt_path)
+        self.assertEqual(index.mrt_path, mrt_path)
+        self.assertEqual(list(index.offsets), walker.offsets)
+        index.remove()
+        self.assertTrue(os.path.isfile(mrt_path))
+
+    def test_build(self: "test_mrt_index") -> None:
+        """
+        A compressed MRT file can be indexed without decompressing it to
+        disk, the offsets are the same.
+        """
+        index = mrt_index(self.gz_filename)
+        index.build(copy=False)
+        self.assertFalse(os.path.isfile(index.mrt_path))
+        self.assertEqual(len(index), self.no_of_entries)
+
+        copy_index = mrt_index.get(self.gz_filename)
+        self.assertEqual(index.offsets, copy_index.offsets)
+        self.assertEqual(index.timestamps, copy_index.timestamps)
+        self.assertEqual(index.size, copy_index.size)
+        copy_index.remove()
+
+        # A truncated compressed MRT file isn't indexed
+        with open(self.gz_filename, "rb") as f:
+            data = f.read()
+        filename = os.path.join(self.tmp_dir.name, "truncated.gz")
+        with open(filename, "wb") as f:
+            f.write(data[: len(data) // 2])
+        index = mrt_index(filename)
+        self.assertRaises(EOFError, index.build)
+        self.assertFalse(os.path.isfile(index.mrt_path))
+        self.assertFalse(os.path.isfile(index.mrt_path + ".tmp"))
+        self.assertRaises(EOFError, mrt_index.get, filename)
+
+    def test_ranges(self: "test_mrt_index") -> None:
+        index = mrt_index.get(self.gz_filename)
+        self.assertRaises(ValueError, index.ranges, 0)
+
+        self.assertEqual(index.ranges(1), [(0, index.size)])
+        offset_ranges = index.ranges(4)
+        self.assertEqual(len(offset_ranges), 4)
+        self.assertEqual(offset_ranges[0][0], 0)
+        self.assertEqual(offset_ranges[-1][1], index.size)
+        for (_, end), (start, _) in zip(offset_ranges, offset_ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertIn(start, index.offsets)
+
+        # Each BGP UPDATE is decoded from exactly one range
+        offsets = []
+        for start, end in offset_ranges:
+            decoder = mrt_decoder(index.mrt_path, start=start, end=end)
+            for _ in decoder:
+                self.assertTrue(start <= decoder.record_offset < end)
+                offsets.append(decoder.record_offset)
+        self.assertEqual(len(offsets), self.no_of_updates)
+        self.assertEqual(len(set(offsets)), self.no_of_updates)
+
+        # The MRT file is closed at the end of each range
+        start, end = offset_ranges[0]
+        range_decoders: list[Union[mrt_decoder, mrtparse_decoder]] = [
+            mrt_decoder(index.mrt_path, start=start, end=end),
+            mrtparse_decoder(index.mrt_path, start=start, end=end),
+        ]
+        for range_decoder in range_decoders:
+            self.assertFalse(range_decoder.f.closed)
+            for _ in range_decoder:
+                pass
+            self.assertTrue(range_decoder.f.closed)
+
+        # More ranges than MRT records
+        offset_ranges = index.ranges(self.no_of_entries * 2)
+        self.assertLessEqual(len(offset_ranges), self.no_of_entries)
+        for start, end in offset_ranges:
+            self.assertLess(start, end)
+
+        # Ranges covering equal time windows
+        offset_ranges = index.ranges(5, by_time=True)
+        self.assertEqual(len(offset_ranges), 5)
+        self.assertEqual(offset_ranges[0][0], 0)
+        self.assertEqual(offset_ranges[-1][1], index.size)
+        times = [index.range_times(start, end) for start, end in offset_ranges]
+        self.assertEqual(times[0][0], 1651446300)
+        self.assertEqual(times[-1][1], 1651446599)
+        for first_ts, last_ts in times:
+            self.assertLess(last_ts - first_ts, 65)
+        self.assertEqual(index.range_times(index.size, index.size), (0, 0))
+
+        self.assertRaises(
+            ValueError, mrt_decoder, self.gz_filename, None, None, 1, 2
+        )
+        self.assertRaises(
+            ValueError, mrt_decoder, index.mrt_path, None, None, 2, 1
+        )
+        index.remove()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import gzip
 import os
 import shutil
+import socket
+import struct
 import sys
 import unittest
 
@@ -9,7 +12,9 @@ sys.path.append(
 from dnas.config import config
 from dnas.mrt_archives import mrt_archives
 from dnas.mrt_entry import mrt_entry
+from dnas.mrt_index import mrt_index
 from dnas.mrt_parser import mrt_parser
+from dnas.mrt_splitter import mrt_splitter
 from dnas.mrt_stats import mrt_stats
 
 
@@ -82,6 +87,9 @@ class test_mrt_parser(unittest.TestCase):
                 self.upd_2_mrt = os.path.join(arch.MRT_DIR, self.upd_2_fn)
                 self.upd_4_mrt = os.path.join(arch.MRT_DIR, self.upd_4_fn)
                 self.upd_5_mrt = os.path.join(arch.MRT_DIR, self.upd_5_fn)
+                self.rib_1_mrt = os.path.join(
+                    arch.MRT_DIR, "rrc23.bview.20220501.2300.gz"
+                )
             if arch.NAME == "UNIT_TEST_RV_SYDNEY":
                 os.makedirs(arch.MRT_DIR, exist_ok=True)
                 self.upd_3_mrt = os.path.join(arch.MRT_DIR, self.upd_3_fn)
@@ -105,6 +113,195 @@ class test_mrt_parser(unittest.TestCase):
         self.assertEqual(type(mrt_p), mrt_parser)
         self.assertEqual(asserted, False)
 
+    def write_rib_dump(self: "test_mrt_parser", filename: str) -> None:
+        """
+        There are no RIB dumps in the test data (they are too large), so write
+        a small TABLE_DUMP_V2 RIB dump with a known set of entries.
+        """
+        ts = 1651446000
+
+        def mrt_record(subtype: int, data: bytes) -> bytes:
+            return struct.pack(">IHHI", ts, 13, subtype, len(data)) + data
+
+        def rib_entry(peer: int, as_path: list[int], attrs: bytes) -> bytes:
+            path = struct.pack(">BB", 2, len(as_path)) + b"".join(
+                [struct.pack(">I", asn) for asn in as_path]
+            )
+            attrs = (
+                b"\x40\x01\x01\x00"
+                + b"\x40\x02"
+                + struct.pack(">B", len(path))
+                + path
+                + attrs
+            )
+            return struct.pack(">HIH", peer, ts, len(attrs)) + attrs
+
+        def rib(seq: int, prefix: str, entries: list[bytes]) -> bytes:
+            addr, length = prefix.split("/")
+            afi = socket.AF_INET6 if ":" in addr else socket.AF_INET
+            subtype = 4 if ":" in addr else 2
+            data = (
+                struct.pack(">IB", seq, int(length))
+                + socket.inet_pton(afi, addr)[: (int(length) + 7) // 8]
+                + struct.pack(">H", len(entries))
+                + b"".join(entries)
+            )
+            return mrt_record(subtype, data)
+
+        # Peer 0 is 4 byte ASN, peer 1 is 2 byte ASN, peer 2 is IPv6 peer
+        peer_table = (
+            socket.inet_aton("192.0.2.1")
+            + struct.pack(">HH", 0, 3)
+            + b"\x02"
+            + socket.inet_aton("192.0.2.2")
+            + socket.inet_aton("192.0.2.2")
+            + struct.pack(">I", 3356)
+            + b"\x00"
+            + socket.inet_aton("192.0.2.3")
+            + socket.inet_aton("192.0.2.3")
+            + struct.pack(">H", 174)
+            + b"\x03"
+            + socket.inet_aton("192.0.2.4")
+            + socket.inet_pton(socket.AF_INET6, "2001:db8::4")
+            + struct.pack(">I", 6939)
+        )
+        med = b"\x80\x04\x04" + struct.pack(">I", 100)
+        comms = b"\xc0\x08\x08" + struct.pack(">HHHH", 174, 21000, 174, 22013)
+        mp_nh = b"\x80\x0e\x11\x10" + socket.inet_pton(
+            socket.AF_INET6, "2001:db8::4"
+        )
+
+        with gzip.open(filename, "wb") as f:
+            f.write(mrt_record(1, peer_table))
+            f.write(
+                rib(0, "192.168.0.0/16", [rib_entry(0, [3356, 64512], b"")])
+            )
+            f.write(
+                rib(
+                    1,
+                    "8.8.8.0/24",
+                    [
+                        rib_entry(0, [3356, 15169], b""),
+                        rib_entry(1, [174, 15169], b""),
+                        rib_entry(2, [6939, 13335], b""),
+                    ],
+                )
+            )
+            f.write(
+                rib(
+                    2,
+                    "1.0.0.0/25",
+                    [rib_entry(1, [174, 13335], med + comms)],
+                )
+            )
+            f.write(
+                rib(
+                    3,
+                    "2a00:1450::/29",
+                    [rib_entry(2, [6939, 174, 3356, 15169, 15169], mp_nh)],
+                )
+            )
+
+    def test_parse_rib_dump(self: "test_mrt_parser") -> None:
+        mrt_p = mrt_parser()
+
+        self.assertRaises(ValueError, mrt_p.parse_rib_dump, None)
+        self.assertRaises(TypeError, mrt_p.parse_rib_dump, 123)
+
+        self.write_rib_dump(self.rib_1_mrt)
+        rib_stats = mrt_p.parse_rib_dump(self.rib_1_mrt)
+        self.assertIsInstance(rib_stats, mrt_stats)
+        self.assertEqual(rib_stats.timestamp, "20220501.2300")
+        self.assertEqual(rib_stats.file_list, [self.rib_1_mrt])
+
+        # RIB dumps don't contain advertisements or withdraws
+        self.assertEqual(rib_stats.total_upd, 0)
+        self.assertEqual(rib_stats.total_advt, 0)
+        self.assertEqual(rib_stats.total_withd, 0)
+        self.assertEqual(rib_stats.most_advt_prefixes, [])
+        self.assertEqual(rib_stats.most_upd_prefixes, [])
+        self.assertEqual(rib_stats.most_withd_prefixes, [])
+        self.assertEqual(rib_stats.most_advt_origin_asn, [])
+        self.assertEqual(rib_stats.most_advt_peer_asn, [])
+        self.assertEqual(rib_stats.most_upd_peer_asn, [])
+        self.assertEqual(rib_stats.most_withd_peer_asn, [])
+
+        self.assertEqual(len(rib_stats.bogon_origin_asns), 1)
+        self.assertEqual(
+            rib_stats.bogon_origin_asns[0].prefix, "192.168.0.0/16"
+        )
+        self.assertEqual(
+            rib_stats.bogon_origin_asns[0].origin_asns, set(["64512"])
+        )
+        self.assertEqual(rib_stats.bogon_origin_asns[0].peer_asn, "3356")
+
+        self.assertEqual(len(rib_stats.bogon_prefixes), 1)
+        self.assertEqual(rib_stats.bogon_prefixes[0].prefix, "192.168.0.0/16")
+
+        self.assertEqual(len(rib_stats.highest_med_prefixes), 1)
+        self.assertEqual(
+            rib_stats.highest_med_prefixes[0].prefix, "1.0.0.0/25"
+        )
+        self.assertEqual(rib_stats.highest_med_prefixes[0].med, 100)
+        self.assertEqual(rib_stats.highest_med_prefixes[0].peer_asn, "174")
+
+        self.assertEqual(len(rib_stats.invalid_len), 1)
+        self.assertEqual(rib_stats.invalid_len[0].prefix, "1.0.0.0/25")
+
+        self.assertEqual(len(rib_stats.longest_as_path), 1)
+        self.assertEqual(rib_stats.longest_as_path[0].prefix, "2a00:1450::/29")
+        self.assertEqual(
+            rib_stats.longest_as_path[0].as_path,
+            ["6939", "174", "3356", "15169", "15169"],
+        )
+        self.assertEqual(
+            rib_stats.longest_as_path[0].next_hop, ["2001:db8::4"]
+        )
+        self.assertEqual(rib_stats.longest_as_path[0].peer_asn, "6939")
+
+        self.assertEqual(len(rib_stats.longest_comm_set), 1)
+        self.assertEqual(
+            rib_stats.longest_comm_set[0].comm_set,
+            ["174:21000", "174:22013"],
+        )
+
+        self.assertEqual(len(rib_stats.most_bogon_asns), 1)
+        self.assertEqual(rib_stats.most_bogon_asns[0].as_path, ["3356"])
+
+        self.assertEqual(len(rib_stats.most_origin_asns), 1)
+        self.assertEqual(rib_stats.most_origin_asns[0].prefix, "8.8.8.0/24")
+        self.assertEqual(
+            rib_stats.most_origin_asns[0].origin_asns,
+            set(["13335", "15169"]),
+        )
+
+        """
+        The chunks of a split RIB dump don't contain the peer index table,
+        it must be read from the original RIB dump.
+        """
+        splitter = mrt_splitter(self.rib_1_mrt)
+        total, chunk_names = splitter.split(
+            no_chunks=2, outdir=self.cfg.SPLIT_DIR
+        )
+        try:
+            splitter.close()
+        except StopIteration:
+            pass
+        self.assertEqual(total, 4)
+
+        chunk_stats = mrt_stats()
+        for chunk_name in chunk_names:
+            chunk_stats.add(mrt_p.parse_rib_dump(chunk_name))
+            os.remove(
+                os.path.join(self.cfg.SPLIT_DIR, os.path.basename(chunk_name))
+            )
+        self.assertEqual(chunk_stats.most_origin_asns[0].prefix, "8.8.8.0/24")
+        self.assertEqual(
+            chunk_stats.longest_as_path[0].prefix, "2a00:1450::/29"
+        )
+        self.assertEqual(chunk_stats.longest_as_path[0].peer_asn, "6939")
+        self.assertEqual(chunk_stats.highest_med_prefixes[0].peer_asn, "174")
+
     def test_parse_upd_dump(self: "test_mrt_parser") -> None:
         """
         Throughout this function the MRT file being parsed is alternating,
@@ -1215,6 +1412,218 @@ class test_mrt_parser(unittest.TestCase):
         self.assertEqual(upd_5_stats.most_unreg_origins[0].updates, 0)
         self.assertEqual(upd_5_stats.most_unreg_origins[0].withdraws, 0)
 
+    def test_parse_upd_dump_skipped(self: "test_mrt_parser") -> None:
+        """
+        Malformed MRT records are counted in total_skipped, and the stats
+        from the rest of the MRT file are still generated.
+        """
+        mrt_p = mrt_parser()
+        upd_2_stats = mrt_p.parse_upd_dump(self.upd_2_mrt)
+        self.assertEqual(upd_2_stats.total_skipped, 0)
+        self.assertEqual(upd_2_stats.skipped_ratio(), 0.0)
+
+        with gzip.open(self.upd_2_mrt, "rb") as f:
+            data = bytearray(f.read())
+        # Corrupt the type and length in the MRT header of the 10th record
+        p = 0
+        for _ in range(0, 10):
+            p += 12 + struct.unpack_from(">I", data, p + 8)[0]
+        struct.pack_into(">H", data, p + 4, 0xFFFF)
+        struct.pack_into(">I", data, p + 8, 0xFFFFFFFF)
+        with gzip.open(self.upd_2_mrt, "wb") as f:
+            f.write(data)
+
+        skipped_stats = mrt_p.parse_upd_dump(self.upd_2_mrt)
+        self.assertEqual(skipped_stats.total_skipped, 1)
+        self.assertGreater(skipped_stats.skipped_ratio(), 0.0)
+        self.assertLess(skipped_stats.total_upd, upd_2_stats.total_upd)
+        self.assertGreater(skipped_stats.total_upd, upd_2_stats.total_upd - 10)
+
+    def test_parse_upd_dump_offset_range(self: "test_mrt_parser") -> None:
+        """
+        Parsing each range of the uncompressed MRT file must count every BGP
+        UPDATE once, with either engine.
+        """
+        mrt_p = mrt_parser()
+        upd_1_stats = mrt_p.parse_upd_dump(self.upd_1_mrt)
+
+        index = mrt_index.get(self.upd_1_mrt)
+        offset_ranges = index.ranges(3)
+        self.assertEqual(len(offset_ranges), 3)
+        for engine in self.cfg.MRT_ENGINES:
+            range_stats = mrt_stats()
+            for offset_range in offset_ranges:
+                range_stats.add(
+                    mrt_p.parse_upd_dump(
+                        self.upd_1_mrt, engine, offset_range=offset_range
+                    )
+                )
+            self.assertEqual(range_stats.total_upd, upd_1_stats.total_upd)
+            self.assertEqual(range_stats.total_advt, upd_1_stats.total_advt)
+            self.assertEqual(range_stats.total_withd, upd_1_stats.total_withd)
+            self.assertEqual(range_stats.file_list, [self.upd_1_mrt])
+        index.remove()
+
+    def test_parse_upd_dump_shm(self: "test_mrt_parser") -> None:
+        """
+        Parsing each range of the MRT file from a shared memory segment must
+        give the same stats as parsing them from the uncompressed copy.
+        """
+        mrt_p = mrt_parser()
+        index = mrt_index.get(self.upd_1_mrt)
+        disk_stats = {}
+        for engine in self.cfg.MRT_ENGINES:
+            disk_stats[engine] = mrt_stats()
+            for offset_range in index.ranges(3):
+                disk_stats[engine].add(
+                    mrt_p.parse_upd_dump(
+                        self.upd_1_mrt, engine, offset_range=offset_range
+                    )
+                )
+        index.remove()
+
+        self.assertRaises(
+            ValueError,
+            mrt_p.parse_upd_dump,
+            self.upd_1_mrt,
+            shm_name="pewjwxsq",
+        )
+
+        index = mrt_index(self.upd_1_mrt)
+        shm = index.build_shm()
+        self.assertFalse(os.path.isfile(index.mrt_path))
+        try:
+            for engine in self.cfg.MRT_ENGINES:
+                shm_stats = mrt_stats()
+                for offset_range in index.ranges(3):
+                    shm_stats.add(
+                        mrt_p.parse_upd_dump(
+                            self.upd_1_mrt,
+                            engine,
+                            offset_range=offset_range,
+                            shm_name=shm.name,
+                        )
+                    )
+                self.assertTrue(
+                    shm_stats.equal_to(disk_stats[engine], meta=True)
+                )
+        finally:
+            shm.unlink()
+
+    def test_parse_upd_dump_file_options(self: "test_mrt_parser") -> None:
+        """
+        The file timestamp and archive options which are passed in must be
+        used, instead of being looked up from the MRT file.
+        """
+        mrt_p = mrt_parser()
+        mrt_p.preload()
+        upd_1_stats = mrt_p.parse_upd_dump(self.upd_1_mrt)
+
+        upd_stats = mrt_p.parse_upd_dump(
+            self.upd_1_mrt, file_ts="20000101.0000", strip_comm=""
+        )
+        self.assertEqual(upd_stats.timestamp, "20000101.0000")
+        self.assertEqual(upd_stats.total_upd, upd_1_stats.total_upd)
+
+        upd_stats = mrt_p.parse_upd_dump(
+            self.upd_1_mrt,
+            file_ts=upd_1_stats.timestamp,
+            strip_comm=mrt_archives().get_arch_option(
+                self.upd_1_mrt, "STRIP_COMM"
+            ),
+        )
+        self.assertTrue(upd_stats.equal_to(upd_1_stats, meta=True))
+
+    def test_parse_upd_dump_engines(self: "test_mrt_parser") -> None:
+        """
+        The native and mrtparse engines must produce identical stats.
+        """
+        mrt_p = mrt_parser()
+
+        self.assertRaises(
+            ValueError, mrt_p.parse_upd_dump, self.upd_1_mrt, "pewjwxsq"
+        )
+
+        for filename in [self.upd_1_mrt, self.upd_3_mrt]:
+            native_stats = mrt_p.parse_upd_dump(filename, "native")
+            self.assertIsInstance(native_stats, mrt_stats)
+            mrtparse_stats = mrt_p.parse_upd_dump(filename, "mrtparse")
+            self.assertIsInstance(mrtparse_stats, mrt_stats)
+            self.assertEqual(native_stats.total_upd, mrtparse_stats.total_upd)
+            self.assertEqual(
+                native_stats.total_advt, mrtparse_stats.total_advt
+            )
+            self.assertEqual(
+                native_stats.total_withd, mrtparse_stats.total_withd
+            )
+            self.assertTrue(native_stats.equal_to(mrtparse_stats, meta=True))
+
+    def test_parse_upd_dump_attrs(self: "test_mrt_parser") -> None:
+        """
+        Path attributes which only a disabled stat uses aren't decoded.
+        """
+        mrt_p = mrt_parser()
+        all_stats = mrt_p.parse_upd_dump(self.upd_4_mrt)
+        self.assertTrue(
+            any(mrt_e.comm_set for mrt_e in all_stats.highest_med_prefixes)
+        )
+
+        for engine in self.cfg.MRT_ENGINES:
+            med_stats = mrt_p.parse_upd_dump(
+                self.upd_4_mrt, engine=engine, stats=["highest_med_prefixes"]
+            )
+            self.assertEqual(
+                len(med_stats.highest_med_prefixes),
+                len(all_stats.highest_med_prefixes),
+            )
+            for med_e, all_e in zip(
+                med_stats.highest_med_prefixes, all_stats.highest_med_prefixes
+            ):
+                # COMMUNITIES are only used by longest_comm_set
+                self.assertEqual(med_e.comm_set, [])
+                self.assertEqual(med_e.med, all_e.med)
+                self.assertEqual(med_e.as_path, all_e.as_path)
+                self.assertEqual(med_e.next_hop, all_e.next_hop)
+                self.assertEqual(med_e.prefix, all_e.prefix)
+
+    def test_parse_upd_dump_stats(self: "test_mrt_parser") -> None:
+        """
+        Only the requested stats are generated, and they must be identical to
+        the same stats when all stats are generated.
+        """
+        mrt_p = mrt_parser()
+
+        self.assertRaises(
+            ValueError,
+            mrt_p.parse_upd_dump,
+            self.upd_1_mrt,
+            stats=["pewjwxsq"],
+        )
+
+        all_stats = mrt_p.parse_upd_dump(self.upd_1_mrt)
+        some_stats = mrt_p.parse_upd_dump(
+            self.upd_1_mrt, stats=["most_origin_asns", "most_upd_prefixes"]
+        )
+        self.assertIsInstance(some_stats, mrt_stats)
+        self.assertEqual(all_stats.total_upd, some_stats.total_upd)
+        self.assertEqual(all_stats.total_advt, some_stats.total_advt)
+        self.assertEqual(all_stats.total_withd, some_stats.total_withd)
+
+        for stat in mrt_stats.LEADERBOARDS:
+            if stat in [
+                "most_advt_prefixes",
+                "most_origin_asns",
+                "most_upd_prefixes",
+                "most_withd_prefixes",
+            ]:
+                self.assertTrue(getattr(some_stats, stat))
+                self.assertEqual(
+                    [e.to_json() for e in getattr(all_stats, stat)],
+                    [e.to_json() for e in getattr(some_stats, stat)],
+                )
+            else:
+                self.assertEqual(getattr(some_stats, stat), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.mrt_reducer import mrt_reducer
+from dnas.mrt_stats import mrt_stats
+
+
+def count_partial(total_upd: int) -> bytes:
+    mrt_s = mrt_stats()
+    mrt_s.total_upd = total_upd
+    mrt_s.file_list = [f"{total_upd}.mrt"]
+    return mrt_s.to_partial()
+
+
+def fail_partial(total_upd: int) -> bytes:
+    raise ValueError(f"Failed to parse {total_upd}")
+
+
+class test_mrt_reducer(unittest.TestCase):
+    def setUp(self: "test_mrt_reducer") -> None:
+        self.pool = multiprocessing.Pool(2)
+
+    def tearDown(self: "test_mrt_reducer") -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def test_init(self: "test_mrt_reducer") -> None:
+        self.assertRaises(ValueError, mrt_reducer, None)
+
+        reducer = mrt_reducer(self.pool)
+        self.assertFalse(reducer.closed)
+        self.assertFalse(reducer.ready())
+        reducer.close()
+        self.assertTrue(reducer.ready())
+        self.assertRaises(ValueError, reducer.apply, count_partial, (1,))
+
+        # No tasks
+        mrt_s = reducer.get()
+        self.assertIsInstance(mrt_s, mrt_stats)
+        self.assertTrue(mrt_s.is_empty())
+
+    def test_get(self: "test_mrt_reducer") -> None:
+        """
+        Every partial must be added exactly once, in the order of the tasks,
+        whatever order they finish in.
+        """
+        for tasks in (1, 2, 13, 32):
+            reducer = mrt_reducer(self.pool)
+            for i in range(tasks, 0, -1):
+                reducer.apply(count_partial, (i,))
+            mrt_s = reducer.get()
+            self.assertTrue(reducer.ready())
+            self.assertEqual(mrt_s.total_upd, sum(range(1, tasks + 1)))
+            self.assertEqual(
+                mrt_s.file_list, [f"{i}.mrt" for i in range(tasks, 0, -1)]
+            )
+
+        # Tasks added after others have been added together
+        reducer = mrt_reducer(self.pool)
+        for i in range(1, 6):
+            reducer.apply(count_partial, (i,)).wait()
+        self.assertFalse(reducer.ready())
+        for i in range(6, 12):
+            reducer.apply(count_partial, (i,))
+        mrt_s = reducer.get()
+        self.assertEqual(mrt_s.total_upd, sum(range(1, 12)))
+        self.assertEqual(mrt_s.file_list, [f"{i}.mrt" for i in range(1, 12)])
+
+        # The first error is raised
+        reducer = mrt_reducer(self.pool)
+        reducer.apply(count_partial, (1,))
+        reducer.apply(fail_partial, (2,))
+        reducer.apply(count_partial, (3,))
+        self.assertRaises(ValueError, reducer.get)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import bz2
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.mrt_shm import mrt_shm
+
+
+class test_mrt_shm(unittest.TestCase):
+    def setUp(self: "test_mrt_shm") -> None:
+        self.bz2_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "SYDNEY/",
+            "sydney.updates.20220601.0415.bz2",
+        )
+        with bz2.BZ2File(self.bz2_filename, "rb") as f:
+            self.data = f.read()
+
+    def test_init(self: "test_mrt_shm") -> None:
+        self.assertRaises(ValueError, mrt_shm, "")
+        self.assertRaises(TypeError, mrt_shm, 1.23)
+        self.assertRaises(FileNotFoundError, mrt_shm, "pewjwxsq")
+        self.assertRaises(ValueError, mrt_shm.create, "")
+        self.assertRaises(
+            FileNotFoundError, mrt_shm.create, "Tz8fKq2LwN5xVb0rYj3mHc7sDa1Ue"
+        )
+
+    def test_create(self: "test_mrt_shm") -> None:
+        shm = mrt_shm.create(self.bz2_filename)
+        try:
+            self.assertEqual(shm.size, len(self.data))
+            self.assertEqual(shm.read(12), self.data[:12])
+            self.assertEqual(shm.tell(), 12)
+            self.assertEqual(shm.read(), self.data[12:])
+            self.assertEqual(shm.read(12), b"")
+
+            # Another handle to the same segment
+            with mrt_shm(shm.name, shm.size) as f:
+                f.seek(len(self.data) - 10)
+                self.assertEqual(f.read(100), self.data[-10:])
+                f.seek(-20, os.SEEK_END)
+                self.assertEqual(f.read(10), self.data[-20:-10])
+                self.assertRaises(ValueError, f.seek, -1)
+            self.assertTrue(f.closed)
+            self.assertRaises(ValueError, f.read)
+            self.assertRaises(ValueError, mrt_shm, shm.name, shm.size + 4096)
+        finally:
+            shm.unlink()
+
+        self.assertTrue(shm.closed)
+        self.assertRaises(FileNotFoundError, mrt_shm, shm.name)
+
+        # A truncated compressed MRT file isn't copied into a segment
+        with open(self.bz2_filename, "rb") as bz2_f:
+            data = bz2_f.read()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "truncated.bz2")
+            with open(filename, "wb") as bz2_f:
+                bz2_f.write(data[: len(data) // 2])
+            self.assertRaises(EOFError, mrt_shm.create, filename)
+
+    def test_from_bytes(self: "test_mrt_shm") -> None:
+        shm = mrt_shm.from_bytes(memoryview(self.data)[:1000])
+        try:
+            self.assertEqual(shm.size, 1000)
+            with mrt_shm(shm.name, shm.size) as f:
+                self.assertEqual(f.read(), self.data[:1000])
+        finally:
+            shm.unlink()
+
+        # A shared memory segment can't be empty
+        self.assertRaises(ValueError, mrt_shm.from_bytes, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,15 @@
 import gzip
 import os
 import sys
+import tempfile
 import unittest
 
 sys.path.append(
     os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
 )
 
+from dnas.mrt_format_error import MrtFormatError
+from dnas.mrt_index import mrt_index
 from dnas.mrt_parser import mrt_parser
 from dnas.mrt_splitter import mrt_splitter
 
@@ -39,6 +42,106 @@ class test_mrt_splitter(unittest.TestCase):
         except StopIteration:
             pass
 
+    def test_chunks(self: "test_mrt_splitter") -> None:
+        """
+        Each chunk must be whole MRT records of up to the chunk size, unless
+        one MRT record is larger.
+        """
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = f.read()
+
+        splitter = mrt_splitter(self.gz_filename)
+        self.assertRaises(ValueError, next, splitter.chunks(11))
+
+        read_size = mrt_splitter.READ_SIZE
+        mrt_splitter.READ_SIZE = 1000
+        chunks = [bytes(chunk) for chunk in splitter.chunks(5000)]
+        mrt_splitter.READ_SIZE = read_size
+        self.assertEqual(b"".join(chunks), data)
+        self.assertTrue(splitter.f.closed)
+        records = 0
+        for chunk in chunks:
+            p = 0
+            while p < len(chunk):
+                p += 12 + int.from_bytes(chunk[p + 8 : p + 12], "big")
+                records += 1
+            self.assertEqual(p, len(chunk))
+            self.assertTrue(len(chunk) <= 5000 or p == len(chunk))
+        self.assertEqual(records, self.file_size)
+
+        # One chunk per MRT record
+        chunks = [
+            bytes(chunk) for chunk in mrt_splitter(self.gz_filename).chunks(12)
+        ]
+        self.assertEqual(len(chunks), self.file_size)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "truncated.mrt")
+
+            # A truncated MRT record is a chunk of its own
+            with open(filename, "wb") as f:
+                f.write(data[:-5])
+            chunks = [
+                bytes(chunk) for chunk in mrt_splitter(filename).chunks(5000)
+            ]
+            self.assertEqual(b"".join(chunks), data[:-5])
+            self.assertTrue(data.endswith(chunks[-1] + data[-5:]))
+            self.assertEqual(
+                len(chunks[-1]) + 5,
+                12 + int.from_bytes(chunks[-1][8:12], "big"),
+            )
+
+            # A truncated compressed MRT file raises EOFError
+            with open(self.gz_filename, "rb") as f:
+                compressed = f.read()
+            filename = os.path.join(tmp_dir, "truncated.gz")
+            with open(filename, "wb") as f:
+                f.write(compressed[: len(compressed) // 2])
+            splitter = mrt_splitter(filename)
+            self.assertRaises(EOFError, list, splitter.chunks(5000))
+            self.assertTrue(splitter.f.closed)
+            splitter = mrt_splitter(filename)
+            self.assertRaises(EOFError, list, splitter)
+
+    def test_next(self: "test_mrt_splitter") -> None:
+        """
+        Each entry must be one whole MRT record, also across the boundaries
+        of the read buffer.
+        """
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = f.read()
+
+        read_size = mrt_splitter.READ_SIZE
+        mrt_splitter.READ_SIZE = 1000
+        splitter = mrt_splitter(self.gz_filename)
+        records = [bytes(entry.data) for entry in splitter]
+        mrt_splitter.READ_SIZE = read_size
+        self.assertEqual(len(records), self.file_size)
+        self.assertEqual(b"".join(records), data)
+        for record in records:
+            self.assertEqual(
+                len(record), 12 + int.from_bytes(record[8:12], "big")
+            )
+        self.assertRaises(StopIteration, next, splitter)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "truncated.mrt")
+
+            # A truncated MRT record is returned as it is
+            with open(filename, "wb") as f:
+                f.write(data[:-5])
+            records = [bytes(entry.data) for entry in mrt_splitter(filename)]
+            self.assertEqual(len(records), self.file_size)
+            self.assertEqual(b"".join(records), data[:-5])
+
+            # A truncated MRT header is an error
+            with open(filename, "wb") as f:
+                f.write(records[0] + data[:5])
+            splitter = mrt_splitter(filename)
+            next(splitter)
+            self.assertRaises(MrtFormatError, next, splitter)
+            splitter.f.close()
+
     def test_split(self: "test_mrt_splitter") -> None:
         splitter = mrt_splitter(self.gz_filename)
 
@@ -67,6 +170,64 @@ class test_mrt_splitter(unittest.TestCase):
         for filename in chunk_names:
             os.unlink(filename)
 
+    def test_split_modes(self: "test_mrt_splitter") -> None:
+        """
+        Each split mode must write every MRT record to exactly one chunk. The
+        contiguous modes must keep the MRT records in their original order.
+        """
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = f.read()
+
+        splitter = mrt_splitter(self.gz_filename)
+        self.assertRaises(
+            ValueError,
+            splitter.split,
+            self.no_of_chunks,
+            os.path.dirname(splitter.filename),
+            "pewjwxsq",
+        )
+        try:
+            splitter.close()
+        except StopIteration:
+            pass
+
+        for mode in ["contiguous", "round_robin", "time"]:
+            splitter = mrt_splitter(self.gz_filename)
+            total, chunk_names = splitter.split(
+                no_chunks=self.no_of_chunks,
+                outdir=os.path.dirname(splitter.filename),
+                mode=mode,
+            )
+            self.assertEqual(total, self.file_size)
+            self.assertEqual(len(chunk_names), self.no_of_chunks)
+            # The decompressed copy which was split is removed
+            self.assertFalse(
+                os.path.isfile(mrt_index.get_paths(self.gz_filename)[0])
+            )
+
+            chunks = []
+            for filename in chunk_names:
+                with open(filename, "rb") as f:
+                    chunks.append(f.read())
+                os.unlink(filename)
+            self.assertEqual(sum(len(chunk) for chunk in chunks), len(data))
+
+            if mode == "round_robin":
+                self.assertEqual(splitter.chunk_ranges, [])
+                continue
+
+            self.assertEqual(b"".join(chunks), data)
+            self.assertEqual(
+                len(splitter.chunk_ranges), len(splitter.chunk_times)
+            )
+            for (start, end), chunk in zip(splitter.chunk_ranges, chunks):
+                self.assertEqual(data[start:end], chunk)
+            for (first_ts, last_ts), (next_ts, _) in zip(
+                splitter.chunk_times, splitter.chunk_times[1:]
+            ):
+                self.assertLessEqual(first_ts, last_ts)
+                self.assertLessEqual(last_ts, next_ts)
+
 
 if __name__ == "__main__":
     unittest.main()
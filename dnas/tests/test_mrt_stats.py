@@ -1,5 +1,7 @@
+import copy
 import json
 import os
+import pickle
 import re
 import shutil
 import sys
@@ -1846,6 +1848,29 @@ class test_mrt_stats(unittest.TestCase):
         f.close()
         self.assertTrue(stats.equal_to(self.upd_5_stats))
 
+        with open(self.upd_1_json, "r") as f:
+            json_str = f.read()
+        self.assertRaises(ValueError, stats.from_json, json_str, ["test"])
+        full_stats = mrt_stats()
+        full_stats.from_json(json_str)
+
+        stats = mrt_stats()
+        stats.from_json(json_str, stats=["longest_as_path"])
+        self.assertTrue(stats.longest_as_path)
+        self.assertEqual(
+            [mrt_e.get_key() for mrt_e in stats.longest_as_path],
+            [mrt_e.get_key() for mrt_e in full_stats.longest_as_path],
+        )
+        self.assertEqual(stats.most_upd_prefixes, [])
+        self.assertEqual(stats.total_upd, full_stats.total_upd)
+        self.assertEqual(stats.file_list, full_stats.file_list)
+
+        stats = mrt_stats()
+        stats.from_json(json_str, lazy=True)
+        self.assertNotIn("longest_as_path", vars(stats))
+        self.assertTrue(stats.equal_to(copy.deepcopy(full_stats), True))
+        self.assertIn("longest_as_path", vars(stats))
+
     def test_gen_ts_from_ymd(self: "test_mrt_stats") -> None:
         self.assertRaises(ValueError, self.upd_1_stats.gen_ts_from_ymd, None)
         self.assertRaises(TypeError, self.upd_1_stats.gen_ts_from_ymd, 123)
@@ -2328,7 +2353,7 @@ class test_mrt_stats(unittest.TestCase):
         self.assertEqual(diff_1.longest_comm_set[3].updates, 0)
         self.assertEqual(diff_1.longest_comm_set[3].withdraws, 0)
 
-        self.assertEqual(len(diff_1.invalid_len), 12)
+        self.assertEqual(len(diff_1.invalid_len), 6)
         self.assertEqual(diff_1.invalid_len[0].advt, 0)
         self.assertEqual(diff_1.invalid_len[0].as_path, ["199524", "38082"])
         self.assertEqual(diff_1.invalid_len[0].comm_set, [])
@@ -4409,6 +4434,87 @@ class test_mrt_stats(unittest.TestCase):
         )
         self.assertEqual(stats_1.timestamp, "20220501.2305")
 
+    def test_merge_many(self: "test_mrt_stats") -> None:
+        stats_1 = mrt_stats()
+        stats_1.from_file(self.upd_1_json)
+
+        self.assertRaises(TypeError, stats_1.merge_many, None)
+        self.assertRaises(ValueError, stats_1.merge_many, [None])
+        self.assertRaises(TypeError, stats_1.merge_many, [123])
+        self.assertEqual(stats_1.merge_many([]), [])
+
+        stats_list = [
+            self.upd_2_stats,
+            self.upd_1_stats,
+            self.upd_3_stats,
+            self.upd_4_stats,
+            self.upd_5_stats,
+        ]
+        ret = stats_1.merge_many(stats_list)
+        self.assertIsInstance(ret, list)
+        self.assertEqual(len(ret), len(stats_list))
+
+        stats_2 = mrt_stats()
+        stats_2.from_file(self.upd_1_json)
+        merged = [stats_2.merge(mrt_s) for mrt_s in stats_list]
+        self.assertEqual(ret, merged)
+        self.assertTrue(ret[0])
+        self.assertTrue(stats_1.equal_to(stats_2))
+        self.assertEqual(stats_1.file_list, stats_2.file_list)
+        self.assertEqual(stats_1.timestamp, stats_2.timestamp)
+
+    def test_select_stats(self: "test_mrt_stats") -> None:
+        self.assertEqual(mrt_stats.select_stats(), set(mrt_stats.LEADERBOARDS))
+        self.assertEqual(mrt_stats.select_stats([]), set())
+        self.assertEqual(
+            mrt_stats.select_stats(("longest_as_path", "invalid_len")),
+            set(["longest_as_path", "invalid_len"]),
+        )
+        self.assertRaises(ValueError, mrt_stats.select_stats, ["test"])
+        self.assertRaises(TypeError, mrt_stats.select_stats, "invalid_len")
+
+    def test_set_lazy(self: "test_mrt_stats") -> None:
+        stats = mrt_stats()
+        self.assertRaises(ValueError, stats.set_lazy, "test", list)
+        self.assertRaises(TypeError, stats.set_lazy, "invalid_len", 123)
+        self.assertRaises(AttributeError, getattr, stats, "test")
+
+        loads = []
+
+        def loader() -> list[mrt_entry]:
+            loads.append(1)
+            return self.upd_1_stats.longest_as_path
+
+        stats.set_lazy("longest_as_path", loader)
+        self.assertEqual(loads, [])
+        self.assertEqual(stats.longest_as_path, loader())
+        self.assertEqual(len(loads), 2)
+        stats.longest_as_path
+        self.assertEqual(len(loads), 2)
+
+        stats.set_lazy("longest_as_path", loader)
+        copied = copy.deepcopy(stats)
+        self.assertEqual(len(copied.longest_as_path), len(loader()))
+
+    def test_skipped_ratio(self: "test_mrt_stats") -> None:
+        stats = mrt_stats()
+        self.assertEqual(stats.skipped_ratio(), 0.0)
+        stats.total_skipped = 5
+        self.assertEqual(stats.skipped_ratio(), 0.0)
+        stats.total_upd = 1000
+        self.assertEqual(stats.skipped_ratio(), 0.005)
+
+        merge_data = mrt_stats()
+        merge_data.total_skipped = 3
+        self.assertTrue(stats.add(merge_data))
+        self.assertEqual(stats.total_skipped, 8)
+        self.assertFalse(stats.merge(merge_data))
+        self.assertEqual(stats.total_skipped, 8)
+
+        self.assertEqual(merge_data.get_diff(stats).total_skipped, 8)
+        self.assertEqual(merge_data.get_diff_larger(stats).total_skipped, 8)
+        self.assertEqual(stats.get_diff_larger(merge_data).total_skipped, 0)
+
     def test_to_file(self: "test_mrt_stats") -> None:
         self.assertRaises(ValueError, self.upd_1_stats.to_file, None)
         self.assertRaises(TypeError, self.upd_1_stats.to_file, 123)
@@ -4467,6 +4573,21 @@ class test_mrt_stats(unittest.TestCase):
 
         self.assertTrue(stats.equal_to(self.upd_1_stats))
 
+    def test_to_partial(self: "test_mrt_stats") -> None:
+        self.assertRaises(ValueError, mrt_stats.from_partial, b"")
+        self.assertRaises(TypeError, mrt_stats.from_partial, "partial")
+
+        self.upd_1_stats.add_archive("UNIT_TEST_RRC_23")
+        partial = self.upd_1_stats.to_partial()
+        self.assertIsInstance(partial, bytes)
+        self.assertTrue(len(partial) < len(pickle.dumps(self.upd_1_stats)))
+
+        stats = mrt_stats.from_partial(partial)
+        self.assertEqual(stats.archive_list, self.upd_1_stats.archive_list)
+        self.assertEqual(stats.file_list, self.upd_1_stats.file_list)
+        self.assertEqual(stats.timestamp, self.upd_1_stats.timestamp)
+        self.assertTrue(stats.equal_to(self.upd_1_stats, meta=True))
+
     def test_ts_ymd(self: "test_mrt_stats") -> None:
         self.assertEqual(self.upd_1_stats.ts_ymd(), "20220421")
 
@@ -0,0 +1,128 @@
+import gzip
+import os
+import struct
+import sys
+import tempfile
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+
+from dnas.mrt_decoder import mrt_decoder
+from dnas.mrt_parser import mrt_parser
+from dnas.mrt_walker import mrt_header, mrt_walker
+
+
+class test_mrt_walker(unittest.TestCase):
+    def setUp(self: "test_mrt_walker") -> None:
+        self.gz_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "RRC23/",
+            "rrc23.updates.20220501.2305.gz",
+        )
+        self.bz2_filename = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "SYDNEY/",
+            "sydney.updates.20220601.0230.bz2",
+        )
+        # All MRT records, not only the BGP UPDATE messages
+        self.gz_entries = 30285
+        self.bz2_entries = 35976
+
+    def test_init(self: "test_mrt_walker") -> None:
+        self.assertRaises(ValueError, mrt_walker, "")
+        self.assertRaises(TypeError, mrt_walker, 1.23)
+        self.assertRaises(
+            FileNotFoundError, mrt_walker, "5Vr1mLqT0aJwXnS8eHkZc2Ug7dPbYo"
+        )
+
+        walker = mrt_walker(self.gz_filename)
+        self.assertTrue(isinstance(walker, mrt_walker))
+        self.assertEqual(walker.filename, self.gz_filename)
+        self.assertEqual(walker.total, 0)
+        walker.close()
+
+    def test_next(self: "test_mrt_walker") -> None:
+        walker = mrt_walker(self.gz_filename)
+        mrt_h = next(walker)
+        self.assertTrue(isinstance(mrt_h, mrt_header))
+        self.assertEqual(mrt_h.offset, 0)
+        self.assertEqual(mrt_h.timestamp, 1651446300)
+        self.assertEqual(mrt_h.type, mrt_decoder.BGP4MP)
+        self.assertEqual(mrt_h.subtype, mrt_decoder.BGP4MP_MESSAGE_AS4)
+        self.assertEqual(mrt_h.length, 79)
+        self.assertEqual(next(walker).offset, 12 + 79)
+        walker.close()
+        self.assertRaises(StopIteration, next, walker)
+
+    def test_walk(self: "test_mrt_walker") -> None:
+        walker = mrt_walker(self.gz_filename, keep_offsets=True).walk()
+        self.assertEqual(walker.total, self.gz_entries)
+        self.assertEqual(sum(walker.counts.values()), self.gz_entries)
+        self.assertEqual(
+            walker.counts[(mrt_decoder.BGP4MP, mrt_decoder.BGP4MP_MESSAGE)], 4
+        )
+        self.assertEqual(walker.first_ts, 1651446300)
+        self.assertEqual(walker.last_ts, 1651446599)
+        self.assertEqual(len(walker.offsets), self.gz_entries)
+        self.assertEqual(walker.offsets, sorted(set(walker.offsets)))
+        self.assertFalse(walker.truncated)
+        self.assertFalse(walker.corrupt)
+
+        # The MRT record offsets should match the decoder's
+        decoder = mrt_decoder(self.gz_filename)
+        for _ in decoder:
+            self.assertIn(decoder.record_offset, walker.offsets)
+
+        walker = mrt_walker(self.bz2_filename).walk()
+        self.assertEqual(walker.total, self.bz2_entries)
+        self.assertEqual(walker.offsets, [])
+
+    def test_truncated(self: "test_mrt_walker") -> None:
+        """
+        A truncated MRT record or a corrupt MRT header should stop the walk,
+        and be reported.
+        """
+        with gzip.open(self.gz_filename, "rb") as f:
+            data = bytearray(f.read())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "truncated.mrt")
+
+            # Truncated MRT record data
+            with open(filename, "wb") as f:
+                f.write(data[:-5])
+            walker = mrt_walker(filename).walk()
+            self.assertTrue(walker.truncated)
+            self.assertFalse(walker.corrupt)
+            self.assertEqual(walker.total, self.gz_entries - 1)
+
+            # Truncated MRT header
+            with open(filename, "wb") as f:
+                f.write(data + data[:5])
+            walker = mrt_walker(filename).walk()
+            self.assertTrue(walker.truncated)
+            self.assertEqual(walker.total, self.gz_entries)
+
+            # A corrupt MRT type in the 3rd MRT header
+            offsets = mrt_walker(self.gz_filename, True).walk().offsets
+            struct.pack_into(">H", data, offsets[2] + 4, 0xFFFF)
+            with open(filename, "wb") as f:
+                f.write(data)
+            walker = mrt_walker(filename).walk()
+            self.assertFalse(walker.truncated)
+            self.assertTrue(walker.corrupt)
+            self.assertEqual(walker.total, 2)
+
+    def test_mrt_parser(self: "test_mrt_walker") -> None:
+        self.assertEqual(
+            mrt_parser.mrt_count(self.gz_filename), self.gz_entries
+        )
+        self.assertEqual(
+            mrt_parser.get_timestamp(self.bz2_filename), "20220601.0230"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
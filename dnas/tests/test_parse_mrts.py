@@ -0,0 +1,416 @@
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+import unittest
+from collections import deque
+from typing import Any, Callable, Optional, Tuple
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../scripts/")
+)
+
+"""
+The Redis credentials, secrets/redis_auth.py, are only copied into the
+container (see dnas.Dockerfile). These tests never connect to Redis.
+"""
+if importlib.util.find_spec("dnas.redis_auth") is None:
+    redis_auth = types.ModuleType("dnas.redis_auth")
+    setattr(
+        redis_auth,
+        "redis_auth",
+        type("redis_auth", (), {"host": "", "port": 0, "password": ""}),
+    )
+    sys.modules["dnas.redis_auth"] = redis_auth
+
+import parse_mrts
+from dnas.config import config as cfg
+from dnas.mrt_index import mrt_index
+from dnas.mrt_reducer import mrt_reducer
+from dnas.mrt_shm import mrt_shm
+from dnas.mrt_stats import mrt_stats
+
+
+class fake_redis_db:
+    """
+    Stands in for redis_db in parse_files(), no MRT file has been parsed
+    before.
+    """
+
+    def __init__(self: "fake_redis_db") -> None:
+        self.stats: dict[str, mrt_stats] = {}
+
+    def close(self: "fake_redis_db") -> None:
+        pass
+
+    def get_stats(self: "fake_redis_db", key: str) -> Optional[mrt_stats]:
+        return self.stats.get(key)
+
+    def set_stats(self: "fake_redis_db", key: str, mrt_s: mrt_stats) -> None:
+        self.stats[key] = mrt_s
+
+
+class test_parse_mrts(unittest.TestCase):
+    def setUp(self: "test_parse_mrts") -> None:
+        """
+        Copy the test files to the MRT archives they came from, named as they
+        would be if we had downloaded them, the MRT archives are moved to a
+        temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.mrt_dirs: dict[str, str] = {}
+        for arch in cfg.MRT_ARCHIVES:
+            name = str(arch["NAME"])
+            if name in ["UNIT_TEST_RV_SYDNEY", "UNIT_TEST_RRC_1"]:
+                self.mrt_dirs[name] = str(arch["MRT_DIR"])
+                mrt_dir = os.path.join(self.tmp_dir.name, name)
+                os.makedirs(mrt_dir)
+                arch["MRT_DIR"] = mrt_dir
+        sydney_dir = os.path.join(self.tmp_dir.name, "UNIT_TEST_RV_SYDNEY")
+        rrc_dir = os.path.join(self.tmp_dir.name, "UNIT_TEST_RRC_1")
+
+        # Estimated to be about 9MB uncompressed, larger than cfg.SPLIT_SIZE
+        self.bz2_filename = os.path.join(
+            sydney_dir, "updates.20220601.0415.bz2"
+        )
+        # About 5MB uncompressed, smaller than cfg.SPLIT_SIZE
+        self.bz2_small = os.path.join(sydney_dir, "updates.20220601.0230.bz2")
+        # About 15MB uncompressed
+        self.gz_large = os.path.join(rrc_dir, "updates.20241001.0055.gz")
+        # About 6MB uncompressed
+        self.gz_small = os.path.join(rrc_dir, "updates.20100827.0840.gz")
+        for filename in [self.bz2_filename, self.bz2_small]:
+            shutil.copy2(
+                os.path.join(
+                    test_dir, "SYDNEY/", "sydney." + os.path.basename(filename)
+                ),
+                filename,
+            )
+        for filename in [self.gz_large, self.gz_small]:
+            shutil.copy2(
+                os.path.join(
+                    test_dir, "RRC1/", "rrc01." + os.path.basename(filename)
+                ),
+                filename,
+            )
+        self.invalid_filename = os.path.join(
+            rrc_dir, "updates.20241001.0100.gz"
+        )
+        with open(self.invalid_filename, "wb") as f:
+            f.write(b"\x00" * (cfg.MIN_MRT_SIZE - 1))
+
+        self.max_mrt_memory = cfg.MAX_MRT_MEMORY
+        self.split_dir = cfg.SPLIT_DIR
+        self.split_shm = cfg.SPLIT_SHM
+        self.split_size = cfg.SPLIT_SIZE
+        cfg.SPLIT_DIR = os.path.join(self.tmp_dir.name, "split/")
+        os.makedirs(cfg.SPLIT_DIR)
+        cfg.SPLIT_SHM = False
+        cfg.SPLIT_SIZE = 8000000
+
+        self.args = {
+            "multi": True,
+            "overwrite": False,
+            "remove": False,
+            "stats": ["most_upd_prefixes"],
+        }
+        self.store_error: Optional[Exception] = None
+        # The MRT files and their stats passed to store_stats(), in order
+        self.stored: list[Tuple[str, mrt_stats]] = []
+        self.redis_db = parse_mrts.redis_db
+        self.store_stats = parse_mrts.store_stats
+        setattr(parse_mrts, "redis_db", fake_redis_db)
+        setattr(parse_mrts, "store_stats", self.fake_store_stats)
+        """
+        The names of the shared memory segments created during the test,
+        other tests running in parallel create their own in /dev/shm too:
+        """
+        self.shm_names: list[str] = []
+        self.shm_create = mrt_shm.create
+        self.shm_from_bytes = mrt_shm.from_bytes
+        setattr(
+            mrt_shm, "create", staticmethod(self.record_shm(mrt_shm.create))
+        )
+        setattr(
+            mrt_shm,
+            "from_bytes",
+            staticmethod(self.record_shm(mrt_shm.from_bytes)),
+        )
+
+    def fake_store_stats(
+        self: "test_parse_mrts",
+        filename: str,
+        mrt_s: mrt_stats,
+        *args: Any,
+    ) -> None:
+        if not self.stored and self.store_error:
+            raise self.store_error
+        self.stored.append((filename, mrt_s))
+
+    def record_shm(
+        self: "test_parse_mrts", func: Callable[..., mrt_shm]
+    ) -> Callable[..., mrt_shm]:
+        """
+        Wrap a function which creates a shared memory segment, to record its
+        name.
+        """
+
+        def create(*args: Any) -> mrt_shm:
+            shm = func(*args)
+            self.shm_names.append(shm.name)
+            return shm
+
+        return create
+
+    def shm_segments(self: "test_parse_mrts") -> list[str]:
+        """
+        Return the shared memory segments created during the test which
+        haven't been unlinked.
+        """
+        return [
+            name
+            for name in self.shm_names
+            if os.path.exists(os.path.join("/dev/shm", name))
+        ]
+
+    def tearDown(self: "test_parse_mrts") -> None:
+        setattr(mrt_shm, "create", staticmethod(self.shm_create))
+        setattr(mrt_shm, "from_bytes", staticmethod(self.shm_from_bytes))
+        setattr(parse_mrts, "redis_db", self.redis_db)
+        setattr(parse_mrts, "store_stats", self.store_stats)
+        for arch in cfg.MRT_ARCHIVES:
+            if str(arch["NAME"]) in self.mrt_dirs:
+                arch["MRT_DIR"] = self.mrt_dirs[str(arch["NAME"])]
+        cfg.MAX_MRT_MEMORY = self.max_mrt_memory
+        cfg.SPLIT_DIR = self.split_dir
+        cfg.SPLIT_SHM = self.split_shm
+        cfg.SPLIT_SIZE = self.split_size
+        self.tmp_dir.cleanup()
+
+    def test_store_stats(self: "test_parse_mrts") -> None:
+        rdb: Any = fake_redis_db()
+        mrt_a = parse_mrts.mrt_archives()
+        day_key = mrt_a.get_day_key(self.gz_small)
+        mrt_s = mrt_stats()
+        mrt_s.file_list = [self.gz_small]
+        mrt_s.timestamp = "20100827.0840"
+        mrt_s.total_upd = 1
+
+        # The incomplete stats of a targeted run aren't stored
+        self.store_stats(self.gz_small, mrt_s, rdb, mrt_a, self.args)
+        self.assertEqual(rdb.stats, {})
+        self.assertFalse(
+            parse_mrts.is_parsed(self.gz_small, rdb, mrt_a, self.args)
+        )
+
+        self.args["stats"] = []
+        self.store_stats(self.gz_small, mrt_s, rdb, mrt_a, self.args)
+        self.assertEqual(rdb.stats[day_key].file_list, [self.gz_small])
+        self.assertTrue(
+            parse_mrts.is_parsed(self.gz_small, rdb, mrt_a, self.args)
+        )
+
+    def test_split_count(self: "test_parse_mrts") -> None:
+        self.assertEqual(parse_mrts.split_count(0), 1)
+        self.assertEqual(parse_mrts.split_count(cfg.SPLIT_SIZE), 1)
+        self.assertEqual(parse_mrts.split_count(cfg.SPLIT_SIZE + 1), 2)
+        self.assertEqual(parse_mrts.split_count(cfg.SPLIT_SIZE * 3), 3)
+
+    def test_plan_file(self: "test_parse_mrts") -> None:
+        self.assertEqual(
+            parse_mrts.plan_file(self.invalid_filename),
+            (0, cfg.MIN_MRT_SIZE - 1),
+        )
+        self.assertEqual(
+            parse_mrts.plan_file(self.gz_small),
+            (1, mrt_index.est_size(self.gz_small)),
+        )
+        self.assertEqual(
+            parse_mrts.plan_file(self.bz2_small),
+            (1, mrt_index.est_size(self.bz2_small)),
+        )
+        self.assertEqual(
+            parse_mrts.plan_file(self.gz_large),
+            (2, mrt_index.est_size(self.gz_large)),
+        )
+        self.assertEqual(
+            parse_mrts.plan_file(self.bz2_filename),
+            (2, mrt_index.est_size(self.bz2_filename)),
+        )
+
+        # A larger split size parses every file whole
+        cfg.SPLIT_SIZE = 20000000
+        self.assertEqual(parse_mrts.plan_file(self.gz_large)[0], 1)
+        self.assertEqual(parse_mrts.plan_file(self.bz2_filename)[0], 1)
+
+    def test_prepare_file(self: "test_parse_mrts") -> None:
+        self.assertRaises(ValueError, parse_mrts.prepare_file, "")
+        self.assertRaises(TypeError, parse_mrts.prepare_file, 123)
+
+        job = parse_mrts.prepare_file(self.invalid_filename)
+        self.assertTrue(job.skip)
+        self.assertFalse(job.offset_ranges)
+
+        job = parse_mrts.prepare_file(self.gz_large, multi=False)
+        self.assertFalse(job.multi)
+        self.assertFalse(job.skip)
+        self.assertFalse(job.offset_ranges)
+
+        job = parse_mrts.prepare_file(self.gz_small)
+        self.assertTrue(job.multi)
+        self.assertEqual(job.offset_ranges, [None])
+        self.assertIsNone(job.mrt_idx)
+        self.assertEqual(job.size, mrt_index.est_size(self.gz_small))
+
+        for filename in (self.gz_large, self.bz2_filename):
+            job = parse_mrts.prepare_file(filename)
+            try:
+                self.assertIsInstance(job.mrt_idx, mrt_index)
+                index_size = job.mrt_idx.size if job.mrt_idx else 0
+                mrt_path = job.mrt_idx.mrt_path if job.mrt_idx else ""
+                self.assertEqual(job.size, index_size)
+                offset_ranges = [r for r in job.offset_ranges if r]
+                self.assertEqual(
+                    len(offset_ranges), parse_mrts.split_count(index_size)
+                )
+                self.assertEqual(len(offset_ranges), len(job.offset_ranges))
+                self.assertEqual(offset_ranges[0][0], 0)
+                self.assertEqual(offset_ranges[-1][1], index_size)
+            finally:
+                parse_mrts.cleanup_file(job)
+            self.assertFalse(os.path.exists(mrt_path))
+
+    def test_can_start(self: "test_parse_mrts") -> None:
+        self.assertTrue(parse_mrts.can_start([]))
+
+        queue_size = (
+            cfg.PARSE_QUEUE * multiprocessing.cpu_count() * cfg.SPLIT_SIZE
+        )
+        job = parse_mrts.parse_job(
+            self.gz_small, True, False, None, [None], 0, "", "", None, deque()
+        )
+        # The oldest file has been parsed, its stats are stored first
+        self.assertFalse(parse_mrts.can_start([job]))
+
+        with multiprocessing.Pool(1) as pool:
+            parsing = [
+                job._replace(size=queue_size // 2, reducer=mrt_reducer(pool)),
+                job._replace(size=queue_size // 2 - 1),
+            ]
+            self.assertTrue(parse_mrts.can_start(parsing))
+            # The queue is full
+            parsing.append(job._replace(size=1))
+            self.assertFalse(parse_mrts.can_start(parsing))
+
+    def test_shm_budget(self: "test_parse_mrts") -> None:
+        self.assertRaises(TypeError, parse_mrts.shm_budget, "1")
+        self.assertRaises(ValueError, parse_mrts.shm_budget, 0)
+
+        budget = parse_mrts.shm_budget(25)
+        jobs = [
+            parse_mrts.parse_job(
+                filename, True, False, None, [], 0, "", "", None, deque()
+            )._replace(budget=budget)
+            for filename in (self.gz_small, self.gz_large)
+        ]
+        with multiprocessing.Pool(1) as pool:
+            for job in jobs:
+                for _ in range(3):
+                    budget.reserve(10)
+                    shm = mrt_shm.from_bytes(b"\x00" * 10)
+                    budget.add(job, shm, pool.apply_async(time.sleep, (0.1,)))
+                    self.assertLessEqual(budget.size, budget.limit)
+                    self.assertEqual(
+                        budget.size,
+                        sum(shm.size for j in jobs for shm in j.segments),
+                    )
+
+            # The segments of the first job made room for the second
+            self.assertEqual(len(jobs[0].segments), 0)
+            self.assertEqual(len(jobs[1].segments), 2)
+
+            # A copy of a job shares its segments
+            parse_mrts.cleanup_file(jobs[1]._replace(size=1))
+            self.assertEqual(len(jobs[1].segments), 0)
+            self.assertEqual(budget.size, 0)
+            self.assertFalse(budget.pending)
+            budget.reserve(budget.limit + 1)
+
+        self.assertEqual(self.shm_segments(), [])
+
+    def split_files(self: "test_parse_mrts") -> list[str]:
+        """
+        Return the decompressed copies and indexes in cfg.SPLIT_DIR.
+        """
+        return [
+            filename
+            for filename in os.listdir(cfg.SPLIT_DIR)
+            if filename.endswith((".mrt", ".idx"))
+        ]
+
+    def test_new_pool(self: "test_parse_mrts") -> None:
+        # PyPy has no gc.freeze()
+        gc = parse_mrts.gc
+        setattr(parse_mrts, "gc", types.ModuleType("gc"))
+        try:
+            pool = parse_mrts.new_pool()
+        finally:
+            setattr(parse_mrts, "gc", gc)
+        with pool:
+            self.assertEqual(pool.apply(sum, ([1, 2],)), 3)
+
+    def test_parse_files(self: "test_parse_mrts") -> None:
+        self.assertRaises(ValueError, parse_mrts.parse_files, [], self.args)
+        self.assertRaises(
+            TypeError, parse_mrts.parse_files, self.gz_small, self.args
+        )
+
+        # A file listed twice is only parsed once
+        filelist = [self.gz_large, self.bz2_filename, self.gz_small]
+        # Less shared memory than one file, it's shared between the files
+        cfg.MAX_MRT_MEMORY = 4000000
+        for split_shm in (False, True):
+            cfg.SPLIT_SHM = split_shm
+            self.stored = []
+            with multiprocessing.Pool(2) as pool:
+                parse_mrts.parse_files(
+                    filelist + [self.gz_small], self.args, pool, pool
+                )
+            # The stats are stored in the order of the files
+            self.assertEqual([f for f, _ in self.stored], filelist)
+            for filename, mrt_s in self.stored:
+                self.assertEqual(mrt_s.file_list, [filename])
+                self.assertTrue(mrt_s.total_upd)
+            self.assertEqual(self.split_files(), [])
+            self.assertEqual(self.shm_segments(), [])
+        self.assertTrue(self.shm_names)
+
+        # The prepared and in flight files are cleaned up after an error
+        self.store_error = ValueError("Failed to store stats")
+        for split_shm in (False, True):
+            cfg.SPLIT_SHM = split_shm
+            self.stored = []
+            with multiprocessing.Pool(2) as pool:
+                self.assertRaises(
+                    ValueError,
+                    parse_mrts.parse_files,
+                    filelist,
+                    self.args,
+                    pool,
+                    pool,
+                )
+            self.assertEqual(self.stored, [])
+            self.assertEqual(self.split_files(), [])
+            self.assertEqual(self.shm_segments(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
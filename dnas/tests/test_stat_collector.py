@@ -0,0 +1,197 @@
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+)
+from dnas.config import config as cfg
+from dnas.ip_prefix import ip_prefix
+from dnas.mrt_decoder import bgp_update, mrt_decoder
+from dnas.mrt_entry import mrt_entry
+from dnas.mrt_stats import mrt_stats
+from dnas.stat_collector import (
+    counters_collector,
+    most_origin_asns_collector,
+    parse_state,
+    peer_counters_collector,
+    prefix_counters_collector,
+    stat_collector,
+    stat_collectors,
+)
+
+
+class test_stat_collector(unittest.TestCase):
+    def test_get_collectors(self: "test_stat_collector") -> None:
+        self.assertRaises(TypeError, stat_collectors.get_collectors, "abc")
+        self.assertRaises(
+            ValueError, stat_collectors.get_collectors, ["pewjwxsq"]
+        )
+
+        self.assertEqual(
+            stat_collectors.get_collectors(), stat_collectors.COLLECTORS
+        )
+        self.assertEqual(
+            stat_collectors.get_collectors([]), stat_collectors.COLLECTORS
+        )
+        self.assertEqual(
+            stat_collectors.get_collectors(
+                ["most_withd_prefixes", "most_origin_asns"]
+            ),
+            [prefix_counters_collector, most_origin_asns_collector],
+        )
+        self.assertEqual(
+            stat_collectors.get_collectors(
+                ["most_advt_peer_asn", "most_upd_peer_asn"]
+            ),
+            [peer_counters_collector],
+        )
+
+        # The advertisement and withdraw counters aren't used for RIB dumps
+        self.assertEqual(
+            stat_collectors.get_collectors(["most_upd_peer_asn"], rib=True),
+            [],
+        )
+        for collector in stat_collectors.get_collectors(rib=True):
+            self.assertTrue(collector.RIB)
+
+    def test_get_attrs(self: "test_stat_collector") -> None:
+        self.assertEqual(stat_collectors.get_attrs(), mrt_decoder.ALL_ATTRS)
+        self.assertEqual(
+            stat_collectors.get_attrs(["most_upd_prefixes"]),
+            stat_collectors.ATTRS,
+        )
+        self.assertEqual(
+            stat_collectors.get_attrs(["highest_med_prefixes"]),
+            set(
+                [
+                    mrt_decoder.AS_PATH,
+                    mrt_decoder.MP_REACH_NLRI,
+                    mrt_decoder.MP_UNREACH_NLRI,
+                    mrt_decoder.MULTI_EXIT_DISC,
+                    mrt_decoder.NEXT_HOP,
+                ]
+            ),
+        )
+        for collector in stat_collectors.COLLECTORS:
+            self.assertTrue(collector.ATTRS <= mrt_decoder.ALL_ATTRS)
+
+    def test_init(self: "test_stat_collector") -> None:
+        mrt_s = mrt_stats()
+        state = parse_state("abc", "20220101.0000")
+
+        # Collectors which don't implement every abstract method can't be run
+        class test_collector(stat_collector):
+            STATS = ("most_origin_asns",)
+
+            def finalize(self: "test_collector") -> None:
+                pass
+
+        self.assertRaises(TypeError, stat_collector, mrt_s, state)
+        self.assertRaises(TypeError, test_collector, mrt_s, state)
+
+        class test_counters_collector(counters_collector):
+            STATS = ("most_advt_prefixes",)
+
+            def observe(self: "test_counters_collector") -> None:
+                pass
+
+        self.assertRaises(TypeError, test_counters_collector, mrt_s, state)
+
+        collector = prefix_counters_collector(mrt_s, state)
+        self.assertIs(collector.mrt_s, mrt_s)
+        self.assertIs(collector.state, state)
+
+    def test_entry(self: "test_stat_collector") -> None:
+        state = parse_state("abc", "20220101.0000")
+        state.as_path = ("65001", "65002")
+        state.comm_set = ("65001:1",)
+        state.next_hop = ("2001:db8::1",)
+        state.origin_asn = "65002"
+        state.unknown_attrs = frozenset([99])
+        state.upd = bgp_update(
+            timestamp=0,
+            peer_asn="65001",
+            withdrawn=[],
+            mp_withdrawn=[],
+            has_attrs=True,
+            as_path=["65001", "65002"],
+            next_hop=["2001:db8::1"],
+            med=10,
+            comm_set=["65001:1"],
+            nlri=[],
+            mp_nlri=[],
+            unknown_attrs=set([99]),
+        )
+
+        # Entries made from the same UPDATE share its immutable values
+        e1 = state.entry(ip_prefix.from_str("2001:db8::/32"))
+        e2 = state.entry(ip_prefix.from_str("2001:db8:1::/48"), med=False)
+        self.assertEqual(e1.prefix, "2001:db8::/32")
+        self.assertEqual(e1.med, 10)
+        self.assertEqual(e2.med, cfg.MISSING_MED)
+        for attr in ("as_path", "comm_set", "next_hop", "unknown_attrs"):
+            self.assertIs(getattr(e1, attr), getattr(e2, attr))
+        self.assertIsNot(e1.origin_asns, e2.origin_asns)
+        self.assertRaises(AttributeError, getattr, e1.as_path, "append")
+        self.assertRaises(AttributeError, getattr, e1.unknown_attrs, "add")
+
+    def test_names(self: "test_stat_collector") -> None:
+        names = stat_collectors.names()
+        self.assertEqual(sorted(names), sorted(mrt_stats.LEADERBOARDS))
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_register(self: "test_stat_collector") -> None:
+        self.assertRaises(TypeError, stat_collectors.register, mrt_stats)
+
+        class test_collector(stat_collector):
+            STATS = ("pewjwxsq",)
+
+        self.assertRaises(ValueError, stat_collectors.register, test_collector)
+
+        class test_attrs_collector(stat_collector):
+            STATS = ("most_origin_asns",)
+            ATTRS = frozenset([99])
+
+        self.assertRaises(
+            ValueError, stat_collectors.register, test_attrs_collector
+        )
+
+        class most_origin_asns_test(stat_collector):
+            STATS = ("most_origin_asns",)
+
+            def finalize(self: "most_origin_asns_test") -> None:
+                pass
+
+            def observe(self: "most_origin_asns_test") -> None:
+                pass
+
+        # prefix_counters_collector also generates most_advt_prefixes
+        class most_upd_prefixes_test(most_origin_asns_test):
+            STATS = ("most_upd_prefixes",)
+
+        collectors = stat_collectors.COLLECTORS
+        try:
+            self.assertRaises(
+                ValueError, stat_collectors.register, most_upd_prefixes_test
+            )
+            self.assertEqual(stat_collectors.COLLECTORS, collectors)
+
+            stat_collectors.register(most_origin_asns_test)
+            self.assertEqual(
+                stat_collectors.get_collectors(["most_origin_asns"]),
+                [most_origin_asns_test],
+            )
+            self.assertNotIn(
+                most_origin_asns_collector, stat_collectors.COLLECTORS
+            )
+            self.assertEqual(
+                sorted(stat_collectors.names()),
+                sorted(mrt_stats.LEADERBOARDS),
+            )
+        finally:
+            stat_collectors.COLLECTORS = collectors
+
+
+if __name__ == "__main__":
+    unittest.main()
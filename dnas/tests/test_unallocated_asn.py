@@ -5,6 +5,7 @@ import unittest
 sys.path.append(
     os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
 )
+from dnas.asn_classifier import asn_classifier
 from dnas.unallocated_asn import unallocated_asn
 
 
@@ -13,7 +14,12 @@ class test_unallocated_asn(unittest.TestCase):
 
     def test_init(self: "test_unallocated_asn") -> None:
         self.assertIsInstance(self.ua, unallocated_asn)
-        self.assertTrue(len(self.ua.unallocated_ranges))
+        self.assertTrue(len(asn_classifier.first))
+
+        # The ranges are only loaded once
+        first = asn_classifier.first
+        unallocated_asn()
+        self.assertIs(asn_classifier.first, first)
 
     def test_is_unallocated(self: "test_unallocated_asn") -> None:
         # 16 bit ASNs are all "allocated"
@@ -30,6 +36,8 @@ class test_unallocated_asn(unittest.TestCase):
         # Beyond end of range
         self.assertFalse(self.ua.is_unallocated(4200000000))
 
+        self.assertRaises(TypeError, self.ua.is_unallocated, "402333")
+
 
 if __name__ == "__main__":
     unittest.main()